@@ -0,0 +1,79 @@
+"""
+Calibra los parámetros de Scrypt para este equipo.
+
+Mide el tiempo de un hash con valores crecientes de N y elige el mayor que
+no supere el tiempo objetivo (y el límite de memoria). Imprime las variables
+de entorno a configurar.
+
+Uso:
+    python -m app.commands.calibrate_scrypt --target-ms 100
+"""
+import argparse
+import secrets
+import statistics
+import time
+import scrypt
+
+MIN_LOG_N = 10
+MAX_LOG_N = 22
+# Mismos límites que acepta la configuración (PASSWORD_SCRYPT_R / PASSWORD_SCRYPT_P)
+MAX_R = 32
+MAX_P = 16
+
+
+def measure_ms(log_n: int, r: int, p: int, rounds: int) -> float:
+    """
+    Retorna la mediana en milisegundos de `rounds` hashes con los parámetros dados
+    """
+    salt = secrets.token_bytes(16)
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        scrypt.hash(b"calibracion", salt=salt, N=2**log_n, r=r, p=p, buflen=32)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def calibrate(target_ms: float, r: int, p: int, max_memory_mb: int, rounds: int) -> int:
+    """
+    Retorna el log2 de N más alto cuyo tiempo por hash no supera target_ms
+    """
+    best = MIN_LOG_N
+    for log_n in range(MIN_LOG_N, MAX_LOG_N + 1):
+        # Scrypt usa aproximadamente 128 * N * r bytes de memoria
+        memory_mb = 128 * 2**log_n * r / (1024 * 1024)
+        if memory_mb > max_memory_mb:
+            break
+
+        elapsed = measure_ms(log_n, r, p, rounds)
+        print(f"ln={log_n:<2} N={2**log_n:<8} memoria={memory_mb:7.1f} MB  tiempo={elapsed:8.1f} ms")
+        if elapsed > target_ms:
+            break
+        best = log_n
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Calibra los parámetros de Scrypt")
+    parser.add_argument("--target-ms", type=float, default=100, help="Tiempo objetivo por hash")
+    parser.add_argument("--r", type=int, default=8, help="Tamaño de bloque")
+    parser.add_argument("--p", type=int, default=1, help="Factor de paralelización")
+    parser.add_argument("--max-memory-mb", type=int, default=256, help="Memoria máxima por hash")
+    parser.add_argument("--rounds", type=int, default=3, help="Mediciones por valor de N")
+    args = parser.parse_args()
+    if not 1 <= args.r <= MAX_R:
+        parser.error(f"--r debe estar entre 1 y {MAX_R}")
+    if not 1 <= args.p <= MAX_P:
+        parser.error(f"--p debe estar entre 1 y {MAX_P}")
+
+    log_n = calibrate(args.target_ms, args.r, args.p, args.max_memory_mb, args.rounds)
+
+    print()
+    print("# Agregar al archivo .env de este equipo:")
+    print(f"PASSWORD_SCRYPT_LOG_N={log_n}")
+    print(f"PASSWORD_SCRYPT_R={args.r}")
+    print(f"PASSWORD_SCRYPT_P={args.p}")
+
+
+if __name__ == "__main__":
+    main()
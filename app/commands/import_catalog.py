@@ -0,0 +1,38 @@
+"""
+Importa productos, precios y proveedores desde un archivo CSV o NDJSON.
+
+Imprime una línea JSON de progreso por lote y el resumen final.
+
+Uso:
+    python -m app.commands.import_catalog catalogo.csv --batch-size 1000
+"""
+import argparse
+import json
+from app.config.database import SessionLocal
+from app.config.settings import settings
+from app.services.catalog_import_service import (
+    FORMAT_CSV, FORMAT_NDJSON, CatalogImportService, read_records
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Importa el catálogo de productos")
+    parser.add_argument("archivo")
+    parser.add_argument("--formato", choices=[FORMAT_CSV, FORMAT_NDJSON], default=None,
+                        help="Por defecto según la extensión del archivo")
+    parser.add_argument("--batch-size", type=int, default=settings.CATALOG_IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    formato = args.formato or (FORMAT_NDJSON if args.archivo.endswith((".ndjson", ".jsonl")) else FORMAT_CSV)
+    db = SessionLocal()
+    try:
+        with open(args.archivo, encoding="utf-8-sig", newline="") as stream:
+            service = CatalogImportService(db, batch_size=args.batch_size)
+            for item in service.run(read_records(stream, formato)):
+                print(json.dumps(item, ensure_ascii=False), flush=True)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Purga manual de sesiones vencidas o cerradas.
+
+Uso:
+    python -m app.commands.purge_sessions --retention-days 30 --archive
+"""
+import argparse
+from app.config.database import SessionLocal
+from app.config.settings import settings
+from app.services.session_purge_service import SessionPurgeService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Purga sesiones vencidas o cerradas")
+    parser.add_argument("--retention-days", type=int, default=settings.SESSION_RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=settings.SESSION_PURGE_BATCH_SIZE)
+    parser.add_argument("--pause-seconds", type=float, default=settings.SESSION_PURGE_PAUSE_SECONDS)
+    parser.add_argument("--archive", action="store_true", default=settings.SESSION_PURGE_ARCHIVE,
+                        help="Archivar en sesion_usuario_archivo antes de eliminar")
+    parser.add_argument("--max-batches", type=int, default=None)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = SessionPurgeService.purge(
+            db,
+            retention_days=args.retention_days,
+            batch_size=args.batch_size,
+            pause_seconds=args.pause_seconds,
+            archive=args.archive,
+            max_batches=args.max_batches
+        )
+    finally:
+        db.close()
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
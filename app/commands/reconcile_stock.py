@@ -0,0 +1,21 @@
+"""
+Reconstruye el stock por sucursal y producto (stock_sucursal) desde Inventario.
+
+Uso:
+    python -m app.commands.reconcile_stock
+"""
+from app.config.database import SessionLocal
+from app.services.stock_aggregate_service import StockAggregateService
+
+
+def main() -> None:
+    db = SessionLocal()
+    try:
+        result = StockAggregateService.reconcile(db)
+    finally:
+        db.close()
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
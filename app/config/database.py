@@ -1,18 +1,121 @@
+from typing import Any, Callable, Dict, Optional, TypeVar
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+from app.config.pool_monitor import (
+    InstrumentedAsyncQueuePool, InstrumentedQueuePool, attach_pool_monitor
+)
 from app.config.settings import settings
 
+T = TypeVar("T")
+
+def engine_options(url: str, async_engine: bool = False) -> Dict[str, Any]:
+    """
+    Opciones del pool de conexiones según Settings. SQLite en memoria conserva
+    su pool por defecto (una sola conexión compartida).
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if async_engine else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
 # Usa la configuración centralizada
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+attach_pool_monitor(engine, "primary")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# Drivers async equivalentes a los drivers síncronos
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+_async_engine: Optional[AsyncEngine] = None
+_async_sessionmaker: Optional[async_sessionmaker] = None
+
+def to_async_url(url: str) -> str:
+    """
+    Convierte una URL de base de datos síncrona a su equivalente async
+    (postgresql:// -> postgresql+asyncpg://, sqlite:// -> sqlite+aiosqlite://)
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if parsed.drivername in _ASYNC_DRIVERS.values() or backend not in _ASYNC_DRIVERS:
+        return url
+    return parsed.set(drivername=_ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+def get_async_engine() -> AsyncEngine:
+    """
+    Engine async, creado en el primer uso (solo se necesita en modo async)
+    """
+    global _async_engine
+    if _async_engine is None:
+        url = settings.DATABASE_ASYNC_URL or to_async_url(settings.DATABASE_URL)
+        _async_engine = create_async_engine(url, **engine_options(url, async_engine=True))
+        attach_pool_monitor(_async_engine.sync_engine, "primary_async")
+    return _async_engine
+
+def AsyncSessionLocal() -> AsyncSession:
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        # expire_on_commit=False: los objetos se siguen leyendo tras el commit
+        # (p. ej. al serializar la respuesta) sin I/O implícito
+        _async_sessionmaker = async_sessionmaker(
+            get_async_engine(), autoflush=False, expire_on_commit=False
+        )
+    return _async_sessionmaker()
+
+async def dispose_engines() -> None:
+    """
+    Cierra las conexiones de los pools (al apagar la aplicación)
+    """
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_sessionmaker = None
+    await run_in_threadpool(engine.dispose)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # Dependency
-def get_db():
+async def get_db():
+    """
+    Sesión de base de datos de la petición: AsyncSession si DATABASE_ASYNC_MODE
+    está activo, Session síncrona en caso contrario.
+    """
+    if settings.DATABASE_ASYNC_MODE:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        await run_in_threadpool(db.close)
+
+async def run_db(db: Any, fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Ejecuta código ORM síncrono `fn(session, *args, **kwargs)` sin bloquear el event loop.
+
+    Con una AsyncSession se usa run_sync (el I/O lo hace el driver async); con una
+    Session síncrona la función se ejecuta en el threadpool.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
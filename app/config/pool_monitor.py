@@ -0,0 +1,131 @@
+import time
+from typing import Any, Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.utils.metrics import Histogram, metrics
+
+# Límites del histograma de espera por una conexión (ms)
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class PoolMonitor:
+    """
+    Estadísticas de un pool de conexiones en este worker: conexiones en uso,
+    tiempo de espera para obtener una conexión, uso del overflow y timeouts.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool: Optional[QueuePool] = None
+        self.wait_ms = Histogram(WAIT_BUCKETS_MS)
+        self.checkouts = 0
+        self.overflow_checkouts = 0
+        self.max_checked_out = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+
+    def observe_wait(self, seconds: float) -> None:
+        self.wait_ms.observe(seconds * 1000)
+
+    def on_checkout(self, pool: QueuePool) -> None:
+        self.checkouts += 1
+        checked_out = pool.checkedout()
+        self.max_checked_out = max(self.max_checked_out, checked_out)
+        # Conexión por encima de pool_size: se está usando el overflow
+        if checked_out > pool.size():
+            self.overflow_checkouts += 1
+
+    def stats(self) -> Dict[str, Any]:
+        pool = self.pool
+        return {
+            "pool_size": pool.size() if pool else None,
+            "en_uso": pool.checkedout() if pool else None,
+            "disponibles": pool.checkedin() if pool else None,
+            "overflow_actual": max(pool.overflow(), 0) if pool else None,
+            "max_en_uso": self.max_checked_out,
+            "checkouts": self.checkouts,
+            "checkouts_overflow": self.overflow_checkouts,
+            "conexiones_abiertas": self.connects,
+            "conexiones_invalidadas": self.invalidations,
+            "timeouts": self.timeouts,
+            "espera_ms": self.wait_ms.snapshot(),
+        }
+
+
+class _InstrumentedPoolMixin:
+    """
+    Mide el tiempo que tarda pool.connect() (espera por una conexión libre o
+    apertura de una nueva) y cuenta los timeouts del pool.
+    """
+    monitor: Optional[PoolMonitor] = None
+
+    def connect(self):
+        monitor = self.monitor
+        if monitor is None:
+            return super().connect()
+
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            monitor.timeouts += 1
+            raise
+        finally:
+            monitor.observe_wait(time.perf_counter() - start)
+
+    def recreate(self):
+        # engine.dispose() recrea el pool: conservar el monitor
+        pool = super().recreate()
+        pool.monitor = self.monitor
+        if self.monitor is not None:
+            self.monitor.pool = pool
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+_monitors: Dict[str, PoolMonitor] = {}
+
+
+def attach_pool_monitor(engine: Engine, name: str) -> Optional[PoolMonitor]:
+    """
+    Registra un monitor para el pool del engine (solo pools instrumentados)
+    """
+    pool = engine.pool
+    if not isinstance(pool, _InstrumentedPoolMixin):
+        return None
+
+    monitor = PoolMonitor(name)
+    monitor.pool = pool
+    pool.monitor = monitor
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        monitor.on_checkout(monitor.pool)
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        monitor.connects += 1
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        monitor.invalidations += 1
+
+    _monitors[name] = monitor
+    return monitor
+
+
+def _pool_stats() -> Dict[str, Any]:
+    return {name: monitor.stats() for name, monitor in _monitors.items()}
+
+
+metrics.register("db_pool", _pool_stats)
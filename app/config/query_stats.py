@@ -0,0 +1,178 @@
+import logging
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+from fastapi import FastAPI
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.config.settings import settings
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Longitud máxima de una sentencia en los logs
+_LOG_STATEMENT_CHARS = 500
+
+
+class RequestQueryStats:
+    """
+    Sentencias SQL ejecutadas durante una petición HTTP
+    """
+
+    def __init__(self, scope: Dict[str, Any]):
+        self.scope = scope
+        self.count = 0
+        self.total_ms = 0.0
+        # Forma de la sentencia (SQL con parámetros sin sustituir) -> ejecuciones
+        self.shapes: Counter = Counter()
+
+    @property
+    def route(self) -> str:
+        # FastAPI guarda la ruta resuelta en el scope al despachar la petición
+        route = self.scope.get("route")
+        path = getattr(route, "path", None)
+        return f"{self.scope.get('method', '')} {path or '<sin ruta>'}"
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.shapes[statement] += 1
+
+    def repeated(self, threshold: int):
+        """
+        Sentencias idénticas ejecutadas `threshold` veces o más (probable N+1)
+        """
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    return _current.get()
+
+
+class RouteQueryMetrics:
+    """
+    Totales por ruta de este worker, expuestos en /api/metrics
+    """
+
+    def __init__(self):
+        self._routes: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stats: RequestQueryStats, repeated: bool) -> None:
+        with self._lock:
+            route = self._routes.setdefault(stats.route, {
+                "peticiones": 0,
+                "sentencias": 0,
+                "tiempo_db_ms": 0.0,
+                "max_sentencias": 0,
+                "posibles_n_mas_1": 0,
+            })
+            route["peticiones"] += 1
+            route["sentencias"] += stats.count
+            route["tiempo_db_ms"] = round(route["tiempo_db_ms"] + stats.total_ms, 3)
+            route["max_sentencias"] = max(route["max_sentencias"], stats.count)
+            if repeated:
+                route["posibles_n_mas_1"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                route: dict(
+                    values,
+                    sentencias_por_peticion=round(values["sentencias"] / values["peticiones"], 2)
+                )
+                for route, values in self._routes.items()
+            }
+
+
+route_metrics = RouteQueryMetrics()
+metrics.register("db_queries", route_metrics.stats)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed_ms)
+
+    if settings.QUERY_SLOW_MS > 0 and elapsed_ms >= settings.QUERY_SLOW_MS:
+        logger.warning(
+            "Sentencia lenta (%.1f ms) en %s: %s",
+            elapsed_ms,
+            stats.route if stats is not None else "<fuera de petición>",
+            " ".join(statement.split())[:_LOG_STATEMENT_CHARS]
+        )
+
+
+class QueryStatsMiddleware:
+    """
+    Middleware ASGI que asocia las sentencias SQL a la petición en curso y agrega
+    los totales como cabeceras X-DB-Query-Count / X-DB-Time-Ms.
+
+    Las cabeceras reflejan las sentencias ejecutadas antes de enviar la respuesta.
+    """
+
+    def __init__(self, app, repeat_threshold: int, add_headers: bool = True):
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+        self.add_headers = add_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(scope)
+        token = _current.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start" and self.add_headers:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.total_ms:.1f}".encode()))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current.reset(token)
+            self._report(stats)
+
+    def _report(self, stats: RequestQueryStats) -> None:
+        repeated = stats.repeated(self.repeat_threshold) if self.repeat_threshold > 0 else []
+        for shape, count in repeated:
+            logger.warning(
+                "Posible N+1 en %s: sentencia ejecutada %d veces: %s",
+                stats.route, count, " ".join(shape.split())[:_LOG_STATEMENT_CHARS]
+            )
+        if stats.count:
+            route_metrics.add(stats, bool(repeated))
+
+
+def setup_query_stats(app: FastAPI) -> None:
+    """
+    Registra el middleware de instrumentación de consultas por petición
+    """
+    if not settings.QUERY_STATS_ENABLED:
+        return
+    app.add_middleware(
+        QueryStatsMiddleware,
+        repeat_threshold=settings.QUERY_REPEAT_THRESHOLD,
+        add_headers=settings.QUERY_STATS_HEADERS,
+    )
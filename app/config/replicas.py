@@ -0,0 +1,280 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+from fastapi import Depends, FastAPI, Request
+from sqlalchemy import create_engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+from app.config.database import engine_options, get_db, to_async_url
+from app.config.pool_monitor import attach_pool_monitor
+from app.config.settings import settings
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Métodos que no modifican datos
+_READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class _Replica:
+    """
+    Engine (sync y, en modo async, async) de una réplica de lectura
+    """
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.url = url
+        self.engine = create_engine(url, **engine_options(url))
+        attach_pool_monitor(self.engine, name)
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self._async_session_factory: Optional[async_sessionmaker] = None
+        self.unhealthy_until = 0.0
+        self.sessions = 0
+        self.failures = 0
+
+    def session(self) -> Session:
+        return self.session_factory()
+
+    def async_session(self) -> AsyncSession:
+        if self._async_session_factory is None:
+            async_url = to_async_url(self.url)
+            async_engine = create_async_engine(
+                async_url, **engine_options(async_url, async_engine=True)
+            )
+            attach_pool_monitor(async_engine.sync_engine, f"{self.name}_async")
+            self._async_session_factory = async_sessionmaker(
+                async_engine, autoflush=False, expire_on_commit=False
+            )
+        return self._async_session_factory()
+
+
+class ReplicaRouter:
+    """
+    Reparte las sesiones de solo lectura entre las réplicas (round-robin).
+
+    - Una réplica que falla al conectar se descarta durante `cooldown_seconds` y la
+      petición pasa a la siguiente; sin réplicas sanas se usa el primario.
+    - Un cliente que acaba de escribir queda fijado al primario durante
+      `pin_seconds` (lectura de sus propias escrituras pese al retraso de replicación).
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        cooldown_seconds: float = 30,
+        pin_seconds: float = 5,
+        max_pins: int = 10000,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.replicas = [_Replica(f"replica_{i}", url) for i, url in enumerate(urls)]
+        self.cooldown_seconds = cooldown_seconds
+        self.pin_seconds = pin_seconds
+        self.max_pins = max_pins
+        self._clock = clock
+        self._next = 0
+        self._pins: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.primary_reads = 0
+        self.pinned_reads = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def candidates(self) -> List[_Replica]:
+        """
+        Réplicas sanas en orden round-robin a partir de la siguiente en turno
+        """
+        now = self._clock()
+        with self._lock:
+            count = len(self.replicas)
+            start = self._next
+            self._next = (self._next + 1) % max(count, 1)
+        ordered = [self.replicas[(start + i) % count] for i in range(count)]
+        return [replica for replica in ordered if replica.unhealthy_until <= now]
+
+    def mark_unhealthy(self, replica: _Replica, error: Exception) -> None:
+        replica.failures += 1
+        replica.unhealthy_until = self._clock() + self.cooldown_seconds
+        logger.warning("Réplica %s no disponible, se usa el primario: %s", replica.name, error)
+
+    def pin(self, key: str) -> None:
+        if self.pin_seconds <= 0:
+            return
+        with self._lock:
+            self._pins[key] = self._clock() + self.pin_seconds
+            self._pins.move_to_end(key)
+            while len(self._pins) > self.max_pins:
+                self._pins.popitem(last=False)
+
+    def is_pinned(self, key: str) -> bool:
+        with self._lock:
+            until = self._pins.get(key)
+            if until is None:
+                return False
+            if until <= self._clock():
+                del self._pins[key]
+                return False
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        now = self._clock()
+        return {
+            "replicas": {
+                replica.name: {
+                    "sana": replica.unhealthy_until <= now,
+                    "sesiones": replica.sessions,
+                    "fallos": replica.failures,
+                }
+                for replica in self.replicas
+            },
+            "lecturas_primario": self.primary_reads,
+            "lecturas_fijadas": self.pinned_reads,
+            "clientes_fijados": len(self._pins),
+        }
+
+
+def client_key(request: Request) -> str:
+    """
+    Identifica al cliente para la fijación al primario: token de la petición o,
+    si no hay, su IP
+    """
+    identity = request.headers.get("authorization") or (
+        request.client.host if request.client else ""
+    )
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+
+replica_router = ReplicaRouter(
+    settings.DATABASE_REPLICA_URLS,
+    cooldown_seconds=settings.DATABASE_REPLICA_COOLDOWN_SECONDS,
+    pin_seconds=settings.DATABASE_READ_AFTER_WRITE_SECONDS,
+)
+metrics.register("db_replicas", replica_router.stats)
+
+# Errores al conectar con una réplica: los del driver que SQLAlchemy envuelve
+# (DBAPIError) y los de red que los drivers async propagan sin envolver
+# (conexión rechazada, host inalcanzable, tiempo de espera agotado)
+_CONNECTION_ERRORS = (DBAPIError, OSError, TimeoutError, asyncio.TimeoutError)
+
+
+async def _open_replica_session(replica: _Replica) -> Any:
+    """
+    Abre una sesión en la réplica y obtiene su conexión, para detectar una réplica
+    caída antes de ejecutar el código de la petición
+    """
+    if settings.DATABASE_ASYNC_MODE:
+        db = replica.async_session()
+        try:
+            await db.connection()
+        except Exception:
+            await db.close()
+            raise
+        return db
+
+    db = replica.session()
+    try:
+        await run_in_threadpool(db.connection)
+    except Exception:
+        await run_in_threadpool(db.close)
+        raise
+    return db
+
+
+class ReadSession:
+    """
+    Sesión de solo lectura que se abre en el primer uso: una réplica sana si hay
+    réplicas configuradas y el cliente no escribió recientemente; el primario en
+    otro caso. Las respuestas servidas desde caché (o 304) no abren conexión.
+    """
+
+    def __init__(self, request: Request, primary: Any):
+        self._request = request
+        self._primary = primary
+        self._db: Any = None
+        self._replica_db: Any = None
+
+    async def get(self) -> Any:
+        if self._db is None:
+            self._db = await self._open()
+        return self._db
+
+    async def _open(self) -> Any:
+        router = replica_router
+        if not router.enabled:
+            return self._primary
+
+        if router.is_pinned(client_key(self._request)):
+            router.pinned_reads += 1
+            return self._primary
+
+        for replica in router.candidates():
+            try:
+                db = await _open_replica_session(replica)
+            except _CONNECTION_ERRORS as e:
+                router.mark_unhealthy(replica, e)
+                continue
+            replica.sessions += 1
+            self._replica_db = db
+            return db
+
+        router.primary_reads += 1
+        return self._primary
+
+    async def close(self) -> None:
+        # La sesión del primario la cierra get_db
+        db, self._replica_db = self._replica_db, None
+        if db is None:
+            return
+        if isinstance(db, AsyncSession):
+            await db.close()
+        else:
+            await run_in_threadpool(db.close)
+
+
+async def get_read_session(request: Request, primary: Any = Depends(get_db)):
+    """
+    ReadSession perezosa para endpoints que pueden responder sin consultar la base
+    de datos (caché, ETag)
+
+    La sesión del primario (get_db) no abre conexión hasta que se usa.
+    """
+    reader = ReadSession(request, primary)
+    try:
+        yield reader
+    finally:
+        await reader.close()
+
+
+async def get_read_db(reader: ReadSession = Depends(get_read_session)):
+    """
+    Sesión para endpoints de solo lectura (ver ReadSession), abierta antes de
+    ejecutar la petición
+    """
+    yield await reader.get()
+
+
+def setup_replica_routing(app: FastAPI) -> None:
+    """
+    Fija al primario a los clientes que envían peticiones de escritura
+    """
+    if not replica_router.enabled:
+        return
+
+    @app.middleware("http")
+    async def pin_writes_to_primary(request: Request, call_next):
+        if request.method in _READ_METHODS:
+            return await call_next(request)
+
+        key = client_key(request)
+        replica_router.pin(key)
+        response = await call_next(request)
+        # La ventana se cuenta desde el fin de la escritura
+        replica_router.pin(key)
+        return response
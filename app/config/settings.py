@@ -23,6 +23,51 @@ class Settings(BaseModel):
         description="URL de conexión a PostgreSQL"
     )
     
+    DATABASE_ASYNC_MODE: bool = Field(
+        default=os.getenv("DATABASE_ASYNC_MODE", "false").lower() == "true",
+        description="Usar engine y sesiones async (asyncpg / aiosqlite) en las peticiones"
+    )
+    DATABASE_ASYNC_URL: str = Field(
+        default=os.getenv("DATABASE_ASYNC_URL", ""),
+        description="URL async; si está vacía se deriva de DATABASE_URL"
+    )
+    
+    # Réplicas de lectura
+    DATABASE_REPLICA_URLS: List[str] = Field(
+        default=[url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()],
+        description="URLs de réplicas de solo lectura, separadas por comas"
+    )
+    DATABASE_REPLICA_COOLDOWN_SECONDS: float = Field(
+        default=float(os.getenv("DATABASE_REPLICA_COOLDOWN_SECONDS", "30")),
+        description="Segundos que se descarta una réplica tras un error de conexión"
+    )
+    DATABASE_READ_AFTER_WRITE_SECONDS: float = Field(
+        default=float(os.getenv("DATABASE_READ_AFTER_WRITE_SECONDS", "5")),
+        description="Segundos que un cliente lee del primario después de escribir"
+    )
+    
+    # Pool de conexiones (por worker; no aplica a SQLite en memoria)
+    DB_POOL_SIZE: int = Field(
+        default=int(os.getenv("DB_POOL_SIZE", "5")),
+        description="Conexiones que el pool mantiene abiertas"
+    )
+    DB_MAX_OVERFLOW: int = Field(
+        default=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        description="Conexiones adicionales permitidas por encima de DB_POOL_SIZE"
+    )
+    DB_POOL_TIMEOUT: float = Field(
+        default=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        description="Segundos de espera por una conexión libre antes de fallar"
+    )
+    DB_POOL_RECYCLE: int = Field(
+        default=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        description="Segundos tras los que se reemplaza una conexión (-1 desactiva)"
+    )
+    DB_POOL_PRE_PING: bool = Field(
+        default=os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+        description="Comprobar la conexión antes de entregarla (descarta conexiones caídas)"
+    )
+    
     # JWT
     JWT_SECRET_KEY: str = Field(
         default=os.getenv("JWT_SECRET_KEY", ""),
@@ -65,6 +110,224 @@ class Settings(BaseModel):
         description="Headers HTTP permitidos"
     )
 
+    # Hashing de contraseñas
+    PASSWORD_HASH_WORKERS: int = Field(
+        default=int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1))),
+        description="Procesos dedicados al hashing de contraseñas (0 usa hilos)"
+    )
+    PASSWORD_HASH_MAX_PENDING: int = Field(
+        default=int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64")),
+        description="Máximo de hashes en curso o en espera en el pool"
+    )
+
+    # Política de Scrypt (calibrar con: python -m app.commands.calibrate_scrypt)
+    PASSWORD_SCRYPT_LOG_N: int = Field(
+        default=int(os.getenv("PASSWORD_SCRYPT_LOG_N", "16")),
+        description="log2 del factor de costo N de Scrypt"
+    )
+    PASSWORD_SCRYPT_R: int = Field(
+        default=int(os.getenv("PASSWORD_SCRYPT_R", "8")),
+        description="Tamaño de bloque r de Scrypt"
+    )
+    PASSWORD_SCRYPT_P: int = Field(
+        default=int(os.getenv("PASSWORD_SCRYPT_P", "1")),
+        description="Factor de paralelización p de Scrypt"
+    )
+
+    # Caché de tokens
+    TOKEN_CLAIMS_CACHE_SIZE: int = Field(
+        default=int(os.getenv("TOKEN_CLAIMS_CACHE_SIZE", "10000")),
+        description="Máximo de tokens validados en caché por worker (0 la desactiva)"
+    )
+
+    # Estado de sesiones
+    SESSION_CACHE_SIZE: int = Field(
+        default=int(os.getenv("SESSION_CACHE_SIZE", "10000")),
+        description="Máximo de sesiones activas en memoria por worker (0 la desactiva)"
+    )
+    SESSION_REVOKED_CACHE_SIZE: int = Field(
+        default=int(os.getenv("SESSION_REVOKED_CACHE_SIZE", "100000")),
+        description="Máximo de sesiones revocadas recordadas por worker"
+    )
+    SESSION_FEED_INTERVAL_SECONDS: float = Field(
+        default=float(os.getenv("SESSION_FEED_INTERVAL_SECONDS", "5")),
+        description="Intervalo de sincronización de revocaciones entre workers (0 lo desactiva)"
+    )
+
+    # Purga de sesiones
+    SESSION_RETENTION_DAYS: int = Field(
+        default=int(os.getenv("SESSION_RETENTION_DAYS", "30")),
+        description="Días que se conservan las sesiones vencidas o cerradas"
+    )
+    SESSION_PURGE_BATCH_SIZE: int = Field(
+        default=int(os.getenv("SESSION_PURGE_BATCH_SIZE", "1000")),
+        description="Sesiones eliminadas por lote"
+    )
+    SESSION_PURGE_PAUSE_SECONDS: float = Field(
+        default=float(os.getenv("SESSION_PURGE_PAUSE_SECONDS", "0.1")),
+        description="Pausa entre lotes para mantener cortos los bloqueos"
+    )
+    SESSION_PURGE_ARCHIVE: bool = Field(
+        default=os.getenv("SESSION_PURGE_ARCHIVE", "false").lower() == "true",
+        description="Archivar las sesiones en sesion_usuario_archivo en lugar de solo eliminarlas"
+    )
+    SESSION_PURGE_INTERVAL_MINUTES: float = Field(
+        default=float(os.getenv("SESSION_PURGE_INTERVAL_MINUTES", "60")),
+        description="Intervalo de la purga automática (0 la desactiva)"
+    )
+
+    # Control de admisión del login
+    LOGIN_MAX_CONCURRENT_HASHES: int = Field(
+        default=int(os.getenv("LOGIN_MAX_CONCURRENT_HASHES", str(os.cpu_count() or 1))),
+        description="Máximo de hashes de contraseña ejecutándose a la vez"
+    )
+    LOGIN_HASH_QUEUE_SIZE: int = Field(
+        default=int(os.getenv("LOGIN_HASH_QUEUE_SIZE", "32")),
+        description="Posiciones de la cola de espera de hashes"
+    )
+    LOGIN_HASH_QUEUE_TIMEOUT_SECONDS: float = Field(
+        default=float(os.getenv("LOGIN_HASH_QUEUE_TIMEOUT_SECONDS", "2")),
+        description="Tiempo máximo de espera en la cola antes de responder 503"
+    )
+    LOGIN_FAILURES_PER_EMAIL: int = Field(
+        default=int(os.getenv("LOGIN_FAILURES_PER_EMAIL", "5")),
+        description="Intentos fallidos permitidos por email en la ventana"
+    )
+    LOGIN_FAILURES_PER_IP: int = Field(
+        default=int(os.getenv("LOGIN_FAILURES_PER_IP", "20")),
+        description="Intentos fallidos permitidos por IP en la ventana"
+    )
+    LOGIN_FAILURE_WINDOW_SECONDS: int = Field(
+        default=int(os.getenv("LOGIN_FAILURE_WINDOW_SECONDS", "300")),
+        description="Ventana en segundos en la que se recuperan los intentos fallidos"
+    )
+
+    # Autorización por roles (Rol/Permiso)
+    RBAC_ENABLED: bool = Field(
+        default=os.getenv("RBAC_ENABLED", "false").lower() == "true",
+        description="Exigir los permisos del rol en las rutas protegidas"
+    )
+    RBAC_TOKEN_PERMISSIONS: bool = Field(
+        default=os.getenv("RBAC_TOKEN_PERMISSIONS", "false").lower() == "true",
+        description="Incluir el bitset de permisos en el JWT (los cambios aplican al renovar el token)"
+    )
+    RBAC_CACHE_TTL_SECONDS: float = Field(
+        default=float(os.getenv("RBAC_CACHE_TTL_SECONDS", "300")),
+        description="Vigencia de los permisos compilados en memoria"
+    )
+
+    # Datos de referencia (roles, sucursales)
+    REFERENCE_CACHE_TTL_SECONDS: float = Field(
+        default=float(os.getenv("REFERENCE_CACHE_TTL_SECONDS", "300")),
+        description="Vigencia de la caché de roles y sucursales (0 desactiva)"
+    )
+
+    # Listado de usuarios
+    USER_COUNT_CACHE_SECONDS: float = Field(
+        default=float(os.getenv("USER_COUNT_CACHE_SECONDS", "60")),
+        description="Vigencia del total en caché del listado de usuarios (total=estimado)"
+    )
+    USER_SEARCH_INDEX_REFRESH_SECONDS: float = Field(
+        default=float(os.getenv("USER_SEARCH_INDEX_REFRESH_SECONDS", "300")),
+        description="Reconstrucción del índice de búsqueda en memoria (bases sin pg_trgm)"
+    )
+
+    # Actualización de stock
+    STOCK_UPDATE_MODE: str = Field(
+        default=os.getenv("STOCK_UPDATE_MODE", "bloqueo"),
+        description="Modo de actualización de Inventario: bloqueo, delta, optimista o diferido"
+    )
+    STOCK_OPTIMISTIC_RETRIES: int = Field(
+        default=int(os.getenv("STOCK_OPTIMISTIC_RETRIES", "8")),
+        description="Reintentos de un documento ante conflictos de versión (modo optimista)"
+    )
+    STOCK_FOLD_INTERVAL_SECONDS: float = Field(
+        default=float(os.getenv("STOCK_FOLD_INTERVAL_SECONDS", "5")),
+        description="Intervalo de aplicación de los cambios diferidos a Inventario y Kardex; solo con STOCK_UPDATE_MODE=diferido (0 desactiva)"
+    )
+    STOCK_FOLD_BATCH_SIZE: int = Field(
+        default=int(os.getenv("STOCK_FOLD_BATCH_SIZE", "5000")),
+        description="Cambios diferidos aplicados por transacción"
+    )
+
+    # Alertas de stock
+    STOCK_ALERTS_ENABLED: bool = Field(
+        default=os.getenv("STOCK_ALERTS_ENABLED", "true").lower() == "true",
+        description="Evaluar las alertas de stock de los inventarios modificados en cada cambio de stock"
+    )
+    STOCK_ALERT_MARGIN: float = Field(
+        default=float(os.getenv("STOCK_ALERT_MARGIN", "0.2")),
+        description="Margen sobre stock_minimo para la alerta de stock bajo (0 solo alerta al llegar al mínimo)"
+    )
+
+    # Precios vigentes
+    PRICE_CACHE_TTL_SECONDS: float = Field(
+        default=float(os.getenv("PRICE_CACHE_TTL_SECONDS", "300")),
+        description="Vigencia de la caché de precios vigentes por producto (0 desactiva)"
+    )
+    PRICE_CACHE_MAX_ENTRIES: int = Field(
+        default=int(os.getenv("PRICE_CACHE_MAX_ENTRIES", "200000")),
+        description="Productos como máximo en la caché de precios vigentes (se descartan los menos usados)"
+    )
+
+    # Búsqueda de productos en memoria
+    CATALOG_INDEX_ENABLED: bool = Field(
+        default=os.getenv("CATALOG_INDEX_ENABLED", "true").lower() == "true",
+        description="Buscar productos por código y nombre en un índice en memoria (false: siempre SQL)"
+    )
+    CATALOG_INDEX_REFRESH_SECONDS: float = Field(
+        default=float(os.getenv("CATALOG_INDEX_REFRESH_SECONDS", "3600")),
+        description="Reconstrucción completa del índice de productos para recoger cambios externos (0 nunca)"
+    )
+
+    # Importación de catálogo
+    CATALOG_IMPORT_BATCH_SIZE: int = Field(
+        default=int(os.getenv("CATALOG_IMPORT_BATCH_SIZE", "1000")),
+        description="Filas validadas y guardadas por transacción en la importación de catálogo"
+    )
+
+    # Exportación de Kardex
+    KARDEX_EXPORT_BATCH_SIZE: int = Field(
+        default=int(os.getenv("KARDEX_EXPORT_BATCH_SIZE", "5000")),
+        description="Filas leídas del cursor y enviadas por bloque en la exportación de Kardex"
+    )
+
+    # Puntos de control del Kardex (stock a una fecha)
+    KARDEX_CHECKPOINT_EVERY: int = Field(
+        default=int(os.getenv("KARDEX_CHECKPOINT_EVERY", "500")),
+        description="Movimientos de un inventario entre dos puntos de control de saldo"
+    )
+    KARDEX_CHECKPOINT_INTERVAL_SECONDS: float = Field(
+        default=float(os.getenv("KARDEX_CHECKPOINT_INTERVAL_SECONDS", "300")),
+        description="Intervalo de generación de puntos de control a partir de las filas nuevas de Kardex (0 desactiva)"
+    )
+    KARDEX_CHECKPOINT_BATCH_SIZE: int = Field(
+        default=int(os.getenv("KARDEX_CHECKPOINT_BATCH_SIZE", "5000")),
+        description="Filas de Kardex procesadas por transacción al generar puntos de control"
+    )
+    KARDEX_CHECKPOINT_LAG_SECONDS: float = Field(
+        default=float(os.getenv("KARDEX_CHECKPOINT_LAG_SECONDS", "60")),
+        description="Antigüedad mínima de una fila de Kardex para incluirla en un punto de control"
+    )
+
+    # Instrumentación de consultas por petición
+    QUERY_STATS_ENABLED: bool = Field(
+        default=os.getenv("QUERY_STATS_ENABLED", "true").lower() == "true",
+        description="Contar sentencias SQL y tiempo de base de datos por petición"
+    )
+    QUERY_STATS_HEADERS: bool = Field(
+        default=os.getenv("QUERY_STATS_HEADERS", "true").lower() == "true",
+        description="Agregar las cabeceras X-DB-Query-Count y X-DB-Time-Ms"
+    )
+    QUERY_SLOW_MS: float = Field(
+        default=float(os.getenv("QUERY_SLOW_MS", "200")),
+        description="Registrar en el log las sentencias más lentas que este umbral (0 desactiva)"
+    )
+    QUERY_REPEAT_THRESHOLD: int = Field(
+        default=int(os.getenv("QUERY_REPEAT_THRESHOLD", "5")),
+        description="Ejecuciones de una misma sentencia en una petición para marcarla como N+1"
+    )
+
     # Logging
     LOG_LEVEL: str = Field(
         default=os.getenv("LOG_LEVEL", "INFO"),
@@ -72,6 +335,34 @@ class Settings(BaseModel):
     )
 
     # Validadores
+    @field_validator("STOCK_UPDATE_MODE")
+    @classmethod
+    def validate_stock_update_mode(cls, v: str):
+        if v not in ("bloqueo", "delta", "optimista", "diferido"):
+            raise ValueError("STOCK_UPDATE_MODE debe ser bloqueo, delta, optimista o diferido")
+        return v
+
+    @field_validator("PASSWORD_SCRYPT_LOG_N")
+    @classmethod
+    def validate_scrypt_log_n(cls, v: int):
+        if not 10 <= v <= 22:
+            raise ValueError("PASSWORD_SCRYPT_LOG_N debe estar entre 10 y 22")
+        return v
+
+    @field_validator("PASSWORD_SCRYPT_R")
+    @classmethod
+    def validate_scrypt_r(cls, v: int):
+        if not 1 <= v <= 32:
+            raise ValueError("PASSWORD_SCRYPT_R debe estar entre 1 y 32")
+        return v
+
+    @field_validator("PASSWORD_SCRYPT_P")
+    @classmethod
+    def validate_scrypt_p(cls, v: int):
+        if not 1 <= v <= 16:
+            raise ValueError("PASSWORD_SCRYPT_P debe estar entre 1 y 16")
+        return v
+
     @field_validator("JWT_SECRET_KEY")
     @classmethod
     def validate_jwt_secret(cls, v: str, info):
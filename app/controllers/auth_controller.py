@@ -3,26 +3,33 @@ from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordRequestForm
 from app.services.auth_service import AuthService
 from app.schemas import auth_schemas
-from app.config.database import get_db
+from app.config.database import get_db, run_db
+from typing import Optional
 
 class AuthController:
     @staticmethod
-    async def login(form_data: OAuth2PasswordRequestForm, db: Session) -> auth_schemas.TokenResponse:
+    async def login(
+        form_data: OAuth2PasswordRequestForm, db: Session, client_ip: Optional[str] = None
+    ) -> auth_schemas.TokenResponse:
         """
         Maneja el proceso de inicio de sesión
         
         Args:
             form_data: Datos del formulario de inicio de sesión
             db: Sesión de base de datos
+            client_ip: IP del cliente (para limitar intentos fallidos)
             
         Returns:
             TokenResponse: Token de acceso y datos del usuario
             
         Raises:
-            HTTPException: Si las credenciales son inválidas
+            HTTPException: Si las credenciales son inválidas, hay demasiados intentos
+                fallidos (429) o el servidor está saturado (503)
         """
-        user = AuthService.authenticate_user(db, form_data.username, form_data.password)
-        session = AuthService.create_user_session(db, user)
+        user = await AuthService.authenticate_user(
+            db, form_data.username, form_data.password, client_ip=client_ip
+        )
+        session = await run_db(db, AuthService.create_user_session, user)
         
         # Convertir el modelo SQLAlchemy a un dict para crear el TokenResponse
         return auth_schemas.TokenResponse(
@@ -46,7 +53,7 @@ class AuthController:
         Raises:
             HTTPException: Si hay un error al cerrar la sesión
         """
-        if AuthService.logout_user(db, token):
+        if await run_db(db, AuthService.logout_user, token):
             return {"message": "Sesión cerrada exitosamente"}
         raise HTTPException(status_code=400, detail="Error al cerrar sesión")
 
@@ -65,4 +72,4 @@ class AuthController:
         Raises:
             HTTPException: Si la sesión es inválida o ha expirado
         """
-        return AuthService.get_current_session(db, token)
\ No newline at end of file
+        return await run_db(db, AuthService.get_current_session, token)
\ No newline at end of file
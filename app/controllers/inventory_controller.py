@@ -0,0 +1,275 @@
+import asyncio
+import csv
+import json
+import logging
+import queue
+import threading
+from datetime import datetime
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
+from sqlalchemy.orm import Session
+from app.config.database import SessionLocal, get_db, run_db
+from app.config.settings import settings
+from app.schemas import catalog_schemas, movement_schemas, stock_schemas
+from app.services.catalog_import_service import (
+    FORMAT_CSV, FORMAT_NDJSON, CatalogImportService, read_records
+)
+from app.services.catalog_search_service import CatalogSearchService
+from app.services.kardex_checkpoint_service import KardexCheckpointService
+from app.services.kardex_export_service import KardexExportService, kardex_export_query
+from app.services.movement_service import MovementService
+from app.services.price_service import PriceService
+from app.services.stock_aggregate_service import StockAggregateService
+from app.services.stock_alert_service import StockAlertService
+from app.utils.streaming import gzip_chunks, open_text
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Bloques del cuerpo en espera de ser importados (acota la memoria por importación)
+_IMPORT_QUEUE_CHUNKS = 16
+# Cada cuánto revisa la importación si la respuesta sigue leyendo el progreso
+_IMPORT_PUBLISH_TIMEOUT_SECONDS = 1.0
+
+class InventoryController:
+    @staticmethod
+    async def post_movement(
+        movement_data: movement_schemas.MovimientoCreate,
+        token: Dict[str, Any],
+        db: Session = Depends(get_db)
+    ) -> movement_schemas.MovimientoResponse:
+        """
+        Registra un documento de movimiento a nombre del usuario del token
+        """
+        id_usuario = int(token["sub"])
+        return await MovementService.post_movement_async(db, movement_data, id_usuario)
+
+    @staticmethod
+    async def import_catalog(request: Request, formato: Optional[str] = None) -> StreamingResponse:
+        """
+        Importa el catálogo enviado en el cuerpo (CSV o NDJSON) y responde en NDJSON
+        el progreso de cada lote y el resumen final.
+
+        La respuesta empieza a enviarse de inmediato: una tarea lee el cuerpo y lo
+        pasa por una cola acotada a un hilo que importa mientras llegan los datos,
+        y el progreso de cada lote vuelve por otra cola acotada (si el cliente no
+        lo lee, la importación espera). Ver _ImportResponse.
+        """
+        if formato is None:
+            content_type = request.headers.get("content-type", "")
+            formato = FORMAT_NDJSON if "json" in content_type else FORMAT_CSV
+
+        chunks: "queue.Queue[Any]" = queue.Queue(maxsize=_IMPORT_QUEUE_CHUNKS)
+        progress: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=_IMPORT_QUEUE_CHUNKS)
+        # La respuesta terminó (o el cliente se desconectó): nadie lee el progreso
+        closed = threading.Event()
+
+        body_ended = False
+
+        def body() -> Iterator[bytes]:
+            nonlocal body_ended
+            for chunk in iter(chunks.get, None):
+                if isinstance(chunk, Exception):
+                    body_ended = True
+                    raise chunk
+                yield chunk
+            body_ended = True
+
+        def publish(item: Optional[Dict[str, Any]]) -> bool:
+            while not closed.is_set():
+                try:
+                    progress.put(item, timeout=_IMPORT_PUBLISH_TIMEOUT_SECONDS)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def run_import() -> None:
+            # Sesión síncrona propia, a propósito fuera de get_db (y de
+            # DATABASE_ASYNC_MODE): la de la petición se cierra antes de enviar la
+            # respuesta y la carga por lotes (COPY con psycopg2) necesita el driver
+            # síncrono. El hilo no ocupa el event loop.
+            db = SessionLocal()
+            try:
+                service = CatalogImportService(db, batch_size=settings.CATALOG_IMPORT_BATCH_SIZE)
+                stream = open_text(body())
+                for item in service.run(read_records(stream, formato)):
+                    if not publish(item):
+                        break
+            except ClientDisconnect:
+                logger.warning("Importación de catálogo interrumpida: el cliente se desconectó")
+            except (UnicodeDecodeError, csv.Error) as e:
+                publish({"error": f"Archivo inválido: {e}"})
+            except Exception:
+                logger.exception("Error en la importación de catálogo")
+                publish({"error": "Error al importar el catálogo"})
+            finally:
+                db.close()
+                publish(None)
+                # Si la importación terminó antes, descartar el resto del cuerpo
+                if not body_ended:
+                    for _ in iter(chunks.get, None):
+                        pass
+
+        async def read_body() -> None:
+            try:
+                async for chunk in request.stream():
+                    if chunk:
+                        await asyncio.to_thread(chunks.put, chunk)
+            except ClientDisconnect as e:
+                # Un cuerpo incompleto no debe importarse como si hubiera terminado
+                await asyncio.to_thread(chunks.put, e)
+            finally:
+                await asyncio.to_thread(chunks.put, None)
+
+        def lines() -> Iterator[bytes]:
+            for item in iter(progress.get, None):
+                yield json.dumps(item, ensure_ascii=False).encode("utf-8") + b"\n"
+
+        worker = asyncio.create_task(asyncio.to_thread(run_import))
+        reader = asyncio.create_task(read_body())
+        return _ImportResponse(lines(), tasks=(worker, reader), closed=closed)
+
+    @staticmethod
+    async def export_kardex(
+        formato: str = FORMAT_CSV,
+        id_sucursal: Optional[int] = None,
+        id_producto: Optional[int] = None,
+        desde: Optional[datetime] = None,
+        hasta: Optional[datetime] = None,
+        comprimir: bool = False
+    ) -> StreamingResponse:
+        """
+        Exporta el Kardex filtrado en CSV o NDJSON (opcionalmente gzip) sin cargarlo
+        en memoria
+        """
+        statement = kardex_export_query(id_sucursal, id_producto, desde, hasta)
+
+        def export() -> Iterator[bytes]:
+            # Sesión propia: la de la petición se cierra antes de enviar la respuesta.
+            # Starlette recorre este generador en el threadpool.
+            db = SessionLocal()
+            try:
+                service = KardexExportService(db, batch_size=settings.KARDEX_EXPORT_BATCH_SIZE)
+                yield from service.stream(statement, formato)
+            finally:
+                db.close()
+
+        filename = f"kardex.{formato}"
+        media_type = "text/csv; charset=utf-8" if formato == FORMAT_CSV else "application/x-ndjson"
+        content = export()
+        if comprimir:
+            filename += ".gz"
+            media_type = "application/gzip"
+            content = gzip_chunks(content)
+        return StreamingResponse(
+            content,
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
+
+    @staticmethod
+    async def stock_at(
+        fecha: datetime,
+        id_producto: Optional[int] = None,
+        id_ubicacion: Optional[int] = None,
+        id_sucursal: Optional[int] = None,
+        db: Session = Depends(get_db)
+    ) -> List[stock_schemas.StockAFechaResponse]:
+        """
+        Stock a una fecha de los inventarios filtrados por producto, ubicación
+        y/o sucursal
+        """
+        if id_producto is None and id_ubicacion is None and id_sucursal is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Indique id_producto, id_ubicacion o id_sucursal"
+            )
+        return await run_db(
+            db,
+            lambda session: KardexCheckpointService.inventory_stock_at(
+                session, fecha, id_producto, id_ubicacion, id_sucursal
+            )
+        )
+
+    @staticmethod
+    async def stock_by_sucursal(
+        id_sucursal: int,
+        ids_producto: Optional[Sequence[int]] = None,
+        db: Session = Depends(get_db)
+    ) -> List[stock_schemas.StockSucursalResponse]:
+        """
+        Stock total por producto de la sucursal, desde el agregado stock_sucursal
+        """
+        stock = await run_db(
+            db, lambda session: StockAggregateService.by_sucursal(session, id_sucursal, ids_producto)
+        )
+        return [
+            stock_schemas.StockSucursalResponse(id_producto=id_producto, cantidad=cantidad)
+            for id_producto, cantidad in sorted(stock.items())
+        ]
+
+    @staticmethod
+    async def open_alerts(
+        id_sucursal: int,
+        limit: int = 500,
+        db: Session = Depends(get_db)
+    ) -> List[Dict[str, Any]]:
+        """
+        Alertas de stock abiertas de la sucursal
+        """
+        return await run_db(db, lambda session: StockAlertService.open_by_sucursal(session, id_sucursal, limit))
+
+    @staticmethod
+    async def prices(
+        ids_producto: Sequence[int],
+        fecha: Optional[datetime] = None,
+        db: Session = Depends(get_db)
+    ) -> List[catalog_schemas.PrecioVigenteResponse]:
+        """
+        Precio vigente (o a una fecha) de los productos indicados
+        """
+        prices = await run_db(db, lambda session: PriceService.resolve(session, ids_producto, fecha))
+        return [
+            catalog_schemas.PrecioVigenteResponse(id_producto=id_producto, precio=precio)
+            for id_producto, precio in sorted(prices.items())
+        ]
+
+    @staticmethod
+    async def search_products(
+        q: str,
+        limit: int = 20,
+        db: Session = Depends(get_db)
+    ) -> List[catalog_schemas.ProductoBusquedaResponse]:
+        """
+        Productos activos por código o nombre, los más relevantes primero
+        """
+        matches = await run_db(db, lambda session: CatalogSearchService.search(session, q, limit))
+        return [
+            catalog_schemas.ProductoBusquedaResponse(id_producto=id_producto, codigo_producto=codigo, nombre=nombre)
+            for id_producto, codigo, nombre in matches
+        ]
+
+class _ImportResponse(StreamingResponse):
+    """
+    Respuesta de la importación de catálogo. El cuerpo de la petición lo lee una
+    tarea mientras se envía el progreso, así que la respuesta no escucha la
+    desconexión con receive() como StreamingResponse (competiría por los bloques
+    del cuerpo): la desconexión la detectan la lectura del cuerpo y el envío.
+    Al terminar se espera a la importación y a la lectura del cuerpo.
+    """
+
+    def __init__(self, content: Iterator[bytes], tasks: Sequence["asyncio.Task"], closed: threading.Event):
+        super().__init__(content, media_type="application/x-ndjson")
+        self.tasks = tasks
+        self.closed = closed
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        finally:
+            self.closed.set()
+            await asyncio.gather(*self.tasks)
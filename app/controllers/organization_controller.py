@@ -1,30 +1,51 @@
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from app.config.database import get_db
-from app.services.organization_service import OrganizationService
-from app.schemas.organization_schemas import RolResponse, SucursalResponse
-from typing import List
+from app.config.database import get_db, run_db
+from app.config.replicas import ReadSession
+from app.services.organization_service import (
+    REFERENCE_ROLES, REFERENCE_SUCURSALES, OrganizationService, reference_cache
+)
+from app.utils.serialization import rows_to_json
+from typing import Callable, Optional, Union
 
 class OrganizationController:
-    def __init__(self, db: Session):
+    def __init__(self, db: Union[Session, ReadSession]):
         self.db = db
 
-    def get_roles(self) -> List[RolResponse]:
+    async def get_roles(self, if_none_match: Optional[str] = None) -> Response:
         """
         Endpoint para obtener la lista de roles (solo id y nombre)
         """
-        roles = OrganizationService.get_roles(self.db)
-        return [RolResponse.model_validate({
-            'id_rol': rol.id_rol,
-            'nombre': rol.nombre
-        }) for rol in roles]
+        return await self._reference_response(
+            REFERENCE_ROLES,
+            lambda session: rows_to_json(OrganizationService.get_roles(session)),
+            if_none_match
+        )
 
-    def get_sucursales(self) -> List[SucursalResponse]:
+    async def get_sucursales(self, if_none_match: Optional[str] = None) -> Response:
         """
         Endpoint para obtener la lista de sucursales (solo id y nombre)
         """
-        sucursales = OrganizationService.get_sucursales(self.db)
-        return [SucursalResponse.model_validate({
-            'id_sucursal': sucursal.id_sucursal,
-            'nombre': sucursal.nombre
-        }) for sucursal in sucursales]
\ No newline at end of file
+        return await self._reference_response(
+            REFERENCE_SUCURSALES,
+            lambda session: rows_to_json(OrganizationService.get_sucursales(session)),
+            if_none_match
+        )
+
+    async def _reference_response(
+        self,
+        name: str,
+        load: Callable[[Session], bytes],
+        if_none_match: Optional[str]
+    ) -> Response:
+        """
+        Sirve la respuesta desde la caché de datos de referencia; solo consulta la
+        base de datos cuando la entrada venció o fue invalidada
+        """
+        entry = reference_cache.get(name)
+        if entry is None:
+            version = reference_cache.version(name)
+            db = await self.db.get() if isinstance(self.db, ReadSession) else self.db
+            body = await run_db(db, load)
+            entry = reference_cache.put(name, body, version)
+        return reference_cache.response(entry, if_none_match)
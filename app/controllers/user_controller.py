@@ -1,10 +1,15 @@
-from fastapi import HTTPException, Depends, Query
+from fastapi import HTTPException, Depends, Query, Response
 from sqlalchemy.orm import Session
-from app.services.user_service import UserService
+from app.services.user_service import TOTAL_EXACT, TOTAL_NONE, UserService
 from app.schemas import user_schemas
-from app.config.database import get_db
+from app.config.database import get_db, run_db
+from app.utils.serialization import json_response
 from typing import Optional
 
+# Modos de paginación del listado de usuarios
+PAGINATION_OFFSET = "offset"
+PAGINATION_CURSOR = "cursor"
+
 class UserController:
     @staticmethod
     async def get_users(
@@ -12,21 +17,45 @@ class UserController:
         limit: int = Query(default=10, ge=1, le=100),
         search: Optional[str] = None,
         activo: Optional[bool] = None,
-        db: Session = Depends(get_db)
-    ) -> user_schemas.UserList:
+        db: Session = Depends(get_db),
+        cursor: Optional[str] = None,
+        paginacion: str = PAGINATION_OFFSET,
+        total: Optional[str] = None
+    ) -> Response:
         """
-        Obtiene la lista paginada de usuarios
+        Obtiene la lista paginada de usuarios (por offset o por cursor) como JSON
+        con la forma de UserList
         """
-        service = UserService(db)
-        usuarios, total = service.get_users(
-            skip=skip,
-            limit=limit,
-            search=search,
-            activo=activo
-        )
-        # Convertir los usuarios a UserResponse
-        user_responses = [user_schemas.UserResponse.model_validate(usuario) for usuario in usuarios]
-        return user_schemas.UserList(total=total, usuarios=user_responses)
+        if paginacion == PAGINATION_CURSOR or cursor:
+            # Por cursor el total es opcional: por defecto no se calcula
+            total_mode = total or TOTAL_NONE
+
+            def load(session: Session):
+                service = UserService(session)
+                page = service.get_users_page(limit=limit, cursor=cursor, search=search, activo=activo)
+                return page, service.count_users(search, activo, total_mode)
+
+            (usuarios, next_cursor, prev_cursor), total_value = await run_db(db, load)
+        else:
+            total_mode = total or TOTAL_EXACT
+            usuarios, total_value = await run_db(db, lambda session: UserService(session).get_users(
+                skip=skip,
+                limit=limit,
+                search=search,
+                activo=activo,
+                total_mode=total_mode
+            ))
+            next_cursor = prev_cursor = None
+
+        # Las filas ya tienen exactamente los campos de UserResponse: se serializan
+        # directamente a JSON, sin crear modelos ni volver a validar la respuesta
+        return json_response({
+            "total": total_value,
+            "usuarios": [usuario._asdict() for usuario in usuarios],
+            "siguiente_cursor": next_cursor,
+            "anterior_cursor": prev_cursor,
+            "total_aproximado": total_value is not None and total_mode != TOTAL_EXACT,
+        })
 
     @staticmethod
     async def create_user(
@@ -37,7 +66,7 @@ class UserController:
         Crea un nuevo usuario
         """
         service = UserService(db)
-        return service.create_user(user_data=user_data)
+        return await service.create_user(user_data=user_data)
 
     @staticmethod
     async def update_user(
@@ -49,7 +78,7 @@ class UserController:
         Actualiza los datos de un usuario
         """
         service = UserService(db)
-        return service.update_user(user_id=user_id, user_data=user_data)
+        return await service.update_user(user_id=user_id, user_data=user_data)
 
     @staticmethod
     async def toggle_user_status(
@@ -60,5 +89,6 @@ class UserController:
         """
         Activa o desactiva un usuario
         """
-        service = UserService(db)
-        return service.toggle_user_status(user_id=user_id, active=active)
\ No newline at end of file
+        return await run_db(
+            db, lambda session: UserService(session).toggle_user_status(user_id=user_id, active=active)
+        )
\ No newline at end of file
@@ -1,7 +1,8 @@
-from .auth_models import Usuario, SesionUsuario
+from .auth_models import Usuario, SesionUsuario, SesionUsuarioArchivo
 from .organization_models import Sucursal, Rol, Permiso
 from .inventory_models import (
     Categoria, Marca, Producto, PrecioProducto, Proveedor,
     Ubicacion, Inventario, MotivoMovimiento,
-    Kardex, Movimiento, MovimientoDetalle, AlertaStock
+    Kardex, Movimiento, MovimientoDetalle, InventarioDelta, StockSucursal, KardexSaldo, KardexSaldoProgreso,
+    AlertaStock
 )
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, UUID, CheckConstraint
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, UUID, CheckConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -24,6 +24,8 @@ class Usuario(Base):
 
     __table_args__ = (
         CheckConstraint("id_usuario != id_supervisor", name="chk_usuario_no_supervisor"),
+        # Paginación por cursor filtrada por estado
+        Index("ix_usuario_activo_id", "activo", "id_usuario"),
     )
 
     # Relaciones
@@ -38,11 +40,39 @@ class SesionUsuario(Base):
 
     id_sesion = Column(UUID, primary_key=True, default=uuid.uuid4)
     id_usuario = Column(Integer, ForeignKey("usuario.id_usuario"), nullable=False)
-    token_sesion = Column(String(255), unique=True, nullable=False)
+    token_sesion = Column(Text, nullable=False)
+    # SHA-256 (hex) del token: clave compacta para las búsquedas por token
+    token_digest = Column(String(64), nullable=False)
     fecha_inicio = Column(DateTime(timezone=True), default=datetime.utcnow)
     fecha_expiracion = Column(DateTime(timezone=True))
     activa = Column(Boolean, default=True)
+    # Momento en que la sesión fue desactivada (alimenta el feed de revocaciones)
+    fecha_revocacion = Column(DateTime(timezone=True), nullable=True, index=True)
+
+    __table_args__ = (
+        Index("uq_sesion_usuario_token_digest", "token_digest", unique=True),
+        Index("ix_sesion_usuario_digest_activa_exp", "token_digest", "activa", "fecha_expiracion"),
+        # Desactivación de las sesiones anteriores de un usuario al iniciar sesión
+        Index("ix_sesion_usuario_usuario_activa", "id_usuario", "activa"),
+        # Purga de sesiones vencidas
+        Index("ix_sesion_usuario_fecha_expiracion", "fecha_expiracion"),
+    )
 
     # Relaciones
     usuario = relationship("Usuario", back_populates="sesiones")
 
+class SesionUsuarioArchivo(Base):
+    """
+    Sesiones vencidas o cerradas movidas fuera de sesion_usuario por la purga.
+    Solo se archiva el digest del token, nunca el token completo.
+    """
+    __tablename__ = "sesion_usuario_archivo"
+
+    id_sesion = Column(UUID, primary_key=True)
+    id_usuario = Column(Integer, nullable=False, index=True)
+    token_digest = Column(String(64), nullable=False)
+    fecha_inicio = Column(DateTime(timezone=True))
+    fecha_expiracion = Column(DateTime(timezone=True))
+    fecha_revocacion = Column(DateTime(timezone=True))
+    activa = Column(Boolean)
+    fecha_archivo = Column(DateTime(timezone=True), default=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Table, Numeric, Text, CheckConstraint
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Table, Numeric, Text, CheckConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.config.database import Base
@@ -71,8 +71,29 @@ class PrecioProducto(Base):
     id_producto = Column(Integer, ForeignKey("producto.id_producto"), nullable=False)
     precio = Column(Numeric(10, 2), nullable=False)
     fecha_inicio = Column(DateTime(timezone=True), default=datetime.utcnow)
+    # Vigencia [fecha_inicio, fecha_fin); nula mientras el precio está vigente
     fecha_fin = Column(DateTime(timezone=True))
 
+    # Los intervalos de un producto no se superponen (ver PriceService); en
+    # PostgreSQL además con una restricción de exclusión (migración 011)
+    __table_args__ = (
+        CheckConstraint(
+            "fecha_fin IS NULL OR fecha_fin >= fecha_inicio",
+            name="chk_precio_producto_vigencia"
+        ),
+        # Precio vigente o a una fecha de varios productos en una consulta
+        Index(
+            "ix_precio_producto_vigencia", "id_producto", "fecha_inicio", "fecha_fin",
+            postgresql_include=["precio"]
+        ),
+        # Un solo precio abierto por producto
+        Index(
+            "ux_precio_producto_abierto", "id_producto", unique=True,
+            postgresql_where=fecha_fin.is_(None),
+            sqlite_where=fecha_fin.is_(None)
+        ),
+    )
+
     # Relaciones
     producto = relationship("Producto", back_populates="precios")
 
@@ -122,6 +143,8 @@ class Inventario(Base):
     cantidad_actual = Column(Numeric(10, 2), default=0, nullable=False)
     stock_minimo = Column(Numeric(10, 2), default=0)
     fecha_ultima_actualizacion = Column(DateTime(timezone=True), default=datetime.utcnow)
+    # Se incrementa en cada cambio de stock (modo de actualización optimista)
+    version = Column(Integer, default=0, server_default="0", nullable=False)
 
     # Relaciones
     ubicacion = relationship("Ubicacion", back_populates="inventarios")
@@ -171,6 +194,10 @@ class Kardex(Base):
             tipo_movimiento.in_(['INGRESO', 'EGRESO']),
             name='kardex_tipo_movimiento_check'
         ),
+        # Exportación e historial por inventario en orden de registro
+        Index("ix_kardex_inventario_id", "id_inventario", "id_kardex"),
+        # Exportación por rango de fechas
+        Index("ix_kardex_fecha_movimiento", "fecha_movimiento"),
     )
 
     # Relaciones
@@ -217,6 +244,72 @@ class MovimientoDetalle(Base):
     movimiento = relationship("Movimiento", back_populates="detalles")
     inventario = relationship("Inventario")
 
+class InventarioDelta(Base):
+    """
+    Cambio de stock pendiente de aplicar a Inventario y Kardex (modo de
+    actualización diferido)
+    """
+    __tablename__ = "inventario_delta"
+
+    id_delta = Column(Integer, primary_key=True, index=True)
+    id_inventario = Column(Integer, ForeignKey("inventario.id_inventario"), nullable=False, index=True)
+    tipo_movimiento = Column(String(10), nullable=False)
+    id_motivo = Column(Integer, ForeignKey("motivo_movimiento.id_motivo"), nullable=False)
+    cantidad = Column(Numeric(10, 2), nullable=False)
+    observacion = Column(String(500))
+    numero_documento = Column(String(50))
+    id_usuario = Column(Integer, ForeignKey("usuario.id_usuario"), nullable=False)
+    fecha_movimiento = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+    # Check constraint para tipo_movimiento
+    __table_args__ = (
+        CheckConstraint(
+            tipo_movimiento.in_(['INGRESO', 'EGRESO']),
+            name='inventario_delta_tipo_movimiento_check'
+        ),
+    )
+
+class StockSucursal(Base):
+    """
+    Stock total de un producto en una sucursal (suma de sus inventarios),
+    mantenido en la misma transacción que cada cambio de Inventario
+    """
+    __tablename__ = "stock_sucursal"
+
+    id_sucursal = Column(Integer, ForeignKey("sucursal.id_sucursal"), primary_key=True)
+    id_producto = Column(Integer, ForeignKey("producto.id_producto"), primary_key=True)
+    cantidad = Column(Numeric(12, 2), default=0, nullable=False)
+    fecha_actualizacion = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+class KardexSaldo(Base):
+    """
+    Punto de control del Kardex: saldo de un inventario después de la fila
+    id_kardex. La consulta de stock a una fecha parte del punto anterior más
+    cercano y suma solo las filas posteriores.
+    """
+    __tablename__ = "kardex_saldo"
+
+    id_inventario = Column(Integer, ForeignKey("inventario.id_inventario"), primary_key=True)
+    id_kardex = Column(Integer, ForeignKey("kardex.id_kardex"), primary_key=True)
+    fecha_movimiento = Column(DateTime(timezone=True), nullable=False)
+    cantidad = Column(Numeric(10, 2), nullable=False)
+    # Filas de Kardex del inventario hasta id_kardex inclusive
+    movimientos = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_kardex_saldo_inventario_fecha", "id_inventario", "fecha_movimiento"),
+    )
+
+class KardexSaldoProgreso(Base):
+    """
+    Última fila de Kardex incorporada a los puntos de control (una sola fila)
+    """
+    __tablename__ = "kardex_saldo_progreso"
+
+    id_progreso = Column(Integer, primary_key=True)
+    id_kardex = Column(Integer, nullable=False, default=0)
+    fecha_actualizacion = Column(DateTime(timezone=True), default=datetime.utcnow)
+
 class AlertaStock(Base):
     __tablename__ = "alerta_stock"
 
@@ -226,6 +319,8 @@ class AlertaStock(Base):
     cantidad_actual = Column(Numeric(10, 2), nullable=False)
     estado = Column(String(20), nullable=False)
     observacion = Column(Text)
+    # Nula mientras la alerta está abierta
+    fecha_resolucion = Column(DateTime)
 
     # Check constraint para estado
     __table_args__ = (
@@ -233,6 +328,12 @@ class AlertaStock(Base):
             estado.in_(['creado', 'stock_minimo', 'stock_bajo']),
             name='chk_alerta_stock_estado'
         ),
+        # Una sola alerta abierta por inventario; índice parcial de alertas abiertas
+        Index(
+            "ux_alerta_stock_abierta", "id_inventario", unique=True,
+            postgresql_where=fecha_resolucion.is_(None),
+            sqlite_where=fecha_resolucion.is_(None)
+        ),
     )
 
     # Relaciones
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
 from app.config.database import get_db
 from app.schemas import auth_schemas
@@ -10,8 +10,13 @@ router = APIRouter(tags=["auth"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
 @router.post("/login", response_model=auth_schemas.TokenResponse)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    return await AuthController.login(form_data, db)
+async def login(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db)
+):
+    client_ip = request.client.host if request.client else None
+    return await AuthController.login(form_data, db, client_ip=client_ip)
 
 @router.post("/logout")
 async def logout(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
@@ -0,0 +1,161 @@
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.orm import Session
+from app.config.database import get_db
+from app.controllers.inventory_controller import InventoryController
+from app.schemas import catalog_schemas, movement_schemas, stock_schemas
+from app.utils.permissions import require_permission
+from datetime import datetime
+from typing import List, Optional
+
+router = APIRouter(
+    prefix="/api/inventory",
+    tags=["inventory"]
+)
+
+# Permiso (Permiso.modulo) exigido por las operaciones de inventario cuando RBAC_ENABLED está activo
+require_inventory_permission = require_permission("inventario")
+
+@router.post("/movimientos", response_model=movement_schemas.MovimientoResponse)
+async def post_movement(
+    movement_data: movement_schemas.MovimientoCreate,
+    db: Session = Depends(get_db),
+    token: dict = Depends(require_inventory_permission)
+):
+    """
+    Registra un documento de ingreso o egreso de varias líneas.
+    - **tipo_movimiento**: INGRESO o EGRESO (debe coincidir con el del motivo)
+    - **detalles**: líneas con id_inventario y cantidad (positiva)
+    """
+    return await InventoryController.post_movement(
+        movement_data=movement_data,
+        token=token,
+        db=db
+    )
+
+@router.get("/productos/buscar", response_model=List[catalog_schemas.ProductoBusquedaResponse])
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(default=20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    token: dict = Depends(require_inventory_permission)
+):
+    """
+    Búsqueda de productos activos para los puntos de venta: código exacto,
+    prefijo de código y subcadena del nombre, en ese orden de relevancia.
+    - **q**: código o parte del nombre (sin distinguir mayúsculas ni acentos)
+    - **limit**: cantidad máxima de resultados
+    """
+    return await InventoryController.search_products(q=q, limit=limit, db=db)
+
+@router.post("/productos/importar")
+async def import_catalog(
+    request: Request,
+    formato: Optional[str] = Query(default=None, pattern="^(csv|ndjson)$"),
+    token: dict = Depends(require_inventory_permission)
+):
+    """
+    Importa productos, precios y proveedores desde el cuerpo de la petición
+    (CSV con encabezado o NDJSON), procesándolo por lotes a medida que llega.
+    - **formato**: `csv` o `ndjson` (por defecto según el Content-Type)
+    - Columnas: codigo_producto, nombre, descripcion, id_categoria, id_marca,
+      unidad_medida, activo, precio, proveedores (ids separados por `|` en CSV)
+
+    Responde en NDJSON una línea de progreso por lote (con los errores por fila)
+    y una línea final con el resumen.
+    """
+    return await InventoryController.import_catalog(request=request, formato=formato)
+
+@router.get("/kardex/exportar")
+async def export_kardex(
+    formato: str = Query(default="csv", pattern="^(csv|ndjson)$"),
+    id_sucursal: Optional[int] = Query(default=None),
+    id_producto: Optional[int] = Query(default=None),
+    desde: Optional[datetime] = Query(default=None),
+    hasta: Optional[datetime] = Query(default=None),
+    comprimir: bool = Query(default=False),
+    token: dict = Depends(require_inventory_permission)
+):
+    """
+    Exporta el historial de Kardex con columnas legibles (motivo, usuario,
+    ubicación y producto), enviado por bloques a medida que se lee.
+    - **formato**: `csv` o `ndjson`
+    - **id_sucursal** / **id_producto**: filtros opcionales
+    - **desde** / **hasta**: rango de fecha_movimiento (hasta exclusivo)
+    - **comprimir**: entrega el archivo en gzip
+    """
+    return await InventoryController.export_kardex(
+        formato=formato,
+        id_sucursal=id_sucursal,
+        id_producto=id_producto,
+        desde=desde,
+        hasta=hasta,
+        comprimir=comprimir
+    )
+
+@router.get("/stock/historico", response_model=List[stock_schemas.StockAFechaResponse])
+async def stock_at(
+    fecha: datetime = Query(...),
+    id_producto: Optional[int] = Query(default=None),
+    id_ubicacion: Optional[int] = Query(default=None),
+    id_sucursal: Optional[int] = Query(default=None),
+    db: Session = Depends(get_db),
+    token: dict = Depends(require_inventory_permission)
+):
+    """
+    Stock de cada inventario al instante indicado, reconstruido desde el Kardex
+    a partir del punto de control de saldo más cercano.
+    - **fecha**: instante de la consulta (incluye los movimientos de ese instante)
+    - **id_producto** / **id_ubicacion** / **id_sucursal**: al menos un filtro
+    """
+    return await InventoryController.stock_at(
+        fecha=fecha,
+        id_producto=id_producto,
+        id_ubicacion=id_ubicacion,
+        id_sucursal=id_sucursal,
+        db=db
+    )
+
+@router.get("/stock/sucursal/{id_sucursal}", response_model=List[stock_schemas.StockSucursalResponse])
+async def stock_by_sucursal(
+    id_sucursal: int,
+    id_producto: Optional[List[int]] = Query(default=None),
+    db: Session = Depends(get_db),
+    token: dict = Depends(require_inventory_permission)
+):
+    """
+    Stock total por producto en la sucursal (suma de todas sus ubicaciones).
+    - **id_producto**: uno o más productos (se repite el parámetro); todos si se omite
+    """
+    return await InventoryController.stock_by_sucursal(
+        id_sucursal=id_sucursal,
+        ids_producto=id_producto,
+        db=db
+    )
+
+@router.get("/alertas", response_model=List[stock_schemas.AlertaStockResponse])
+async def open_alerts(
+    id_sucursal: int = Query(...),
+    limit: int = Query(default=500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+    token: dict = Depends(require_inventory_permission)
+):
+    """
+    Alertas de stock abiertas de la sucursal (stock_minimo primero, luego las
+    más antiguas). Se generan y resuelven con cada movimiento de stock.
+    """
+    return await InventoryController.open_alerts(id_sucursal=id_sucursal, limit=limit, db=db)
+
+@router.get("/precios", response_model=List[catalog_schemas.PrecioVigenteResponse])
+async def prices(
+    id_producto: List[int] = Query(..., max_length=5000),
+    fecha: Optional[datetime] = Query(default=None),
+    db: Session = Depends(get_db),
+    token: dict = Depends(require_inventory_permission)
+):
+    """
+    Precio de cada producto vigente ahora o a la fecha indicada. Los productos
+    sin precio a esa fecha no se incluyen.
+    - **id_producto**: uno o más productos (se repite el parámetro)
+    - **fecha**: instante de la consulta; el precio vigente si se omite
+    """
+    return await InventoryController.prices(ids_producto=id_producto, fecha=fecha, db=db)
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends
+from app.utils.metrics import metrics
+from app.utils.permissions import require_permission
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"]
+)
+
+# Permiso (Permiso.modulo) exigido para ver las métricas internas cuando RBAC_ENABLED está activo
+require_metrics_permission = require_permission("metricas")
+
+@router.get("")
+def get_metrics(token: dict = Depends(require_metrics_permission)):
+    """
+    Obtiene las métricas en memoria de este worker
+    """
+    return metrics.snapshot()
@@ -1,35 +1,38 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, Response
 from app.controllers.organization_controller import OrganizationController
 from app.schemas.organization_schemas import RolResponse, SucursalResponse
 from app.utils.auth import verify_token
-from app.config.database import get_db
-from typing import List
+from app.config.replicas import ReadSession, get_read_session
+from typing import List, Optional
 
 router = APIRouter(
     prefix="/organization",
     tags=["organization"]
 )
 
-def get_controller(db: Session = Depends(get_db)) -> OrganizationController:
-    return OrganizationController(db)
+def get_controller(reader: ReadSession = Depends(get_read_session)) -> OrganizationController:
+    # La sesión se abre solo si la caché de referencia no puede responder
+    return OrganizationController(reader)
 
-@router.get("/roles", response_model=List[RolResponse])
-def get_roles(
+# Respuestas pre-serializadas de la caché de referencia (Response): el modelo solo documenta el esquema
+@router.get("/roles", response_class=Response, responses={200: {"model": List[RolResponse]}})
+async def get_roles(
     controller: OrganizationController = Depends(get_controller),
-    token: str = Depends(verify_token)
+    token: str = Depends(verify_token),
+    if_none_match: Optional[str] = Header(default=None)
 ):
     """
-    Obtiene la lista de roles activos
+    Obtiene la lista de roles activos (304 si el ETag enviado sigue vigente)
     """
-    return controller.get_roles()
+    return await controller.get_roles(if_none_match)
 
-@router.get("/sucursales", response_model=List[SucursalResponse])
-def get_sucursales(
+@router.get("/sucursales", response_class=Response, responses={200: {"model": List[SucursalResponse]}})
+async def get_sucursales(
     controller: OrganizationController = Depends(get_controller),
-    token: str = Depends(verify_token)
+    token: str = Depends(verify_token),
+    if_none_match: Optional[str] = Header(default=None)
 ):
     """
-    Obtiene la lista de sucursales activas
+    Obtiene la lista de sucursales activas (304 si el ETag enviado sigue vigente)
     """
-    return controller.get_sucursales()
\ No newline at end of file
+    return await controller.get_sucursales(if_none_match)
\ No newline at end of file
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from app.controllers.user_controller import UserController
 from app.schemas import user_schemas
 from typing import Optional
 from sqlalchemy.orm import Session
 from app.config.database import get_db
-from app.utils.auth import verify_token
+from app.config.replicas import get_read_db
+from app.utils.permissions import require_permission
 from app.schemas.user_schemas import ToggleStatusRequest
 
 router = APIRouter(
@@ -12,35 +13,48 @@ router = APIRouter(
     tags=["users"]
 )
 
-@router.get("/listarUsuarios", response_model=user_schemas.UserList)
+# Permiso (Permiso.modulo) exigido por la gestión de usuarios cuando RBAC_ENABLED está activo
+require_users_permission = require_permission("usuarios")
+
+# El controlador responde JSON ya serializado (Response): el modelo solo documenta el esquema
+@router.get("/listarUsuarios", response_class=Response, responses={200: {"model": user_schemas.UserList}})
 async def get_users(
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=10, ge=1, le=100),
     search: Optional[str] = None,
     activo: Optional[bool] = None,
-    db: Session = Depends(get_db),
-    token: str = Depends(verify_token)
+    cursor: Optional[str] = None,
+    paginacion: str = Query(default="offset", pattern="^(offset|cursor)$"),
+    total: Optional[str] = Query(default=None, pattern="^(exacto|estimado|ninguno)$"),
+    db: Session = Depends(get_read_db),
+    token: str = Depends(require_users_permission)
 ):
     """
     Obtiene la lista paginada de usuarios.
-    - **skip**: Número de registros a saltar (paginación)
+    - **skip**: Número de registros a saltar (paginación por offset)
     - **limit**: Número máximo de registros a retornar
     - **search**: Término de búsqueda (nombre, apellido o email)
     - **activo**: Filtrar por estado del usuario
+    - **cursor**: Cursor `siguiente_cursor` / `anterior_cursor` de una respuesta previa
+    - **paginacion**: `offset` (por defecto) o `cursor`
+    - **total**: `exacto` (por defecto con offset), `estimado` o `ninguno` (por defecto con cursor)
     """
     return await UserController.get_users(
         skip=skip,
         limit=limit,
         search=search,
         activo=activo,
-        db=db
+        db=db,
+        cursor=cursor,
+        paginacion=paginacion,
+        total=total
     )
 
 @router.post("/crearUsuario", response_model=user_schemas.UserResponse)
 async def create_user(
     user_data: user_schemas.UserCreate,
     db: Session = Depends(get_db),
-    token: str = Depends(verify_token)
+    token: str = Depends(require_users_permission)
 ):
     """
     Crea un nuevo usuario.
@@ -52,7 +66,7 @@ async def update_user(
     user_id: int,
     user_data: user_schemas.UserUpdate,
     db: Session = Depends(get_db),
-    token: str = Depends(verify_token)
+    token: str = Depends(require_users_permission)
 ):
     """
     Actualiza los datos de un usuario existente.
@@ -68,7 +82,7 @@ async def toggle_user_status(
     user_id: int,
     body: ToggleStatusRequest,
     db: Session = Depends(get_db),
-    token: str = Depends(verify_token)
+    token: str = Depends(require_users_permission)
 ):
     """
     Activa o desactiva un usuario.
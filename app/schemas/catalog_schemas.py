@@ -0,0 +1,44 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Literal, Optional
+from decimal import Decimal
+
+UnidadMedida = Literal["UNIDAD", "KG", "GRAMO", "LITRO", "ML", "METRO", "CM"]
+
+# Fila de una importación de catálogo (CSV o NDJSON). Los campos opcionales
+# vacíos conservan el valor actual del producto.
+class ProductoImportRow(BaseModel):
+    codigo_producto: str = Field(min_length=1, max_length=50)
+    # Requerido solo para productos nuevos
+    nombre: Optional[str] = Field(default=None, min_length=1, max_length=200)
+    descripcion: Optional[str] = None
+    id_categoria: Optional[int] = None
+    id_marca: Optional[int] = None
+    unidad_medida: Optional[UnidadMedida] = None
+    activo: Optional[bool] = None
+    # Nuevo precio vigente; si difiere del actual se cierra el anterior
+    precio: Optional[Decimal] = Field(default=None, gt=0, max_digits=10, decimal_places=2)
+    # Ids de proveedor; en CSV separados por "|"
+    proveedores: List[int] = []
+
+    class Config:
+        str_strip_whitespace = True
+
+    @field_validator("proveedores", mode="before")
+    @classmethod
+    def split_proveedores(cls, v):
+        if v is None:
+            return []
+        if isinstance(v, str):
+            return [part for part in v.split("|") if part.strip()]
+        return v
+
+# Precio de un producto vigente a una fecha
+class PrecioVigenteResponse(BaseModel):
+    id_producto: int
+    precio: Decimal
+
+# Producto encontrado por código o nombre
+class ProductoBusquedaResponse(BaseModel):
+    id_producto: int
+    codigo_producto: str
+    nombre: str
@@ -0,0 +1,28 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from decimal import Decimal
+from datetime import datetime
+
+TipoMovimiento = Literal["INGRESO", "EGRESO"]
+
+# Línea de un documento de movimiento
+class MovimientoDetalleCreate(BaseModel):
+    id_inventario: int
+    cantidad: Decimal = Field(gt=0, max_digits=10, decimal_places=2)
+
+# Documento de ingreso o egreso de varias líneas
+class MovimientoCreate(BaseModel):
+    tipo_movimiento: TipoMovimiento
+    id_motivo: int
+    id_sucursal: Optional[int] = None
+    numero_documento: Optional[str] = Field(default=None, max_length=50)
+    observacion: Optional[str] = Field(default=None, max_length=500)
+    detalles: List[MovimientoDetalleCreate] = Field(min_length=1, max_length=1000)
+
+# Esquema para respuesta
+class MovimientoResponse(BaseModel):
+    id_movimiento: int
+    tipo_movimiento: TipoMovimiento
+    numero_documento: Optional[str]
+    fecha_movimiento: datetime
+    lineas: int
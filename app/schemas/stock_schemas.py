@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from typing import Optional
+from decimal import Decimal
+from datetime import datetime
+
+# Stock de un inventario a una fecha (reconstruido desde el Kardex)
+class StockAFechaResponse(BaseModel):
+    id_inventario: int
+    id_ubicacion: int
+    id_producto: int
+    cantidad: Decimal
+
+# Stock total de un producto en una sucursal
+class StockSucursalResponse(BaseModel):
+    id_producto: int
+    cantidad: Decimal
+
+# Alerta de stock abierta
+class AlertaStockResponse(BaseModel):
+    id_alerta: int
+    id_inventario: int
+    id_producto: int
+    codigo_producto: str
+    producto: str
+    codigo_ubicacion: str
+    cantidad_actual: Decimal
+    stock_minimo: Optional[Decimal]
+    estado: str
+    fecha_alerta: datetime
@@ -42,8 +42,14 @@ class UserResponse(BaseModel):
 
 # Esquema para lista de usuarios
 class UserList(BaseModel):
-    total: int
+    # None cuando se pide total=ninguno
+    total: Optional[int] = None
     usuarios: list[UserResponse]
+    # Paginación por cursor
+    siguiente_cursor: Optional[str] = None
+    anterior_cursor: Optional[str] = None
+    # El total proviene de estadísticas o de una caché
+    total_aproximado: bool = False
 
     # Esquema para cambiar estado de usuario
 class ToggleStatusRequest(BaseModel):
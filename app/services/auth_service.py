@@ -1,83 +1,180 @@
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
+from app.config.database import run_db
 from app.models.auth_models import Usuario, SesionUsuario
 from app.schemas import auth_schemas
-from app.utils.auth import verify_password, create_access_token, get_password_hash
+from app.utils.auth import (
+    verify_password_async, hash_password_async, password_needs_rehash,
+    create_access_token, check_login_rate_limit, register_login_failure,
+    claims_cache, session_state, hash_token
+)
+from app.utils.session_state import SessionSnapshot
+from app.services.permission_service import encode_bits, permission_cache
+from app.config.settings import settings
+from typing import Optional
 from fastapi import HTTPException
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Duración de una sesión de usuario
+SESSION_DURATION = timedelta(days=1)
 
 class AuthService:
     @staticmethod
-    def authenticate_user(db: Session, email: str, password: str) -> Usuario:
-        user = db.query(Usuario).filter(
-            Usuario.email == email, 
-            Usuario.activo.is_(True)
-        ).first()
+    async def authenticate_user(
+        db: Session, email: str, password: str, client_ip: Optional[str] = None
+    ) -> Usuario:
+        # Rechazar antes de consultar la BD o calcular el hash si hay demasiados fallos
+        check_login_rate_limit(email, client_ip)
+
+        user = await run_db(db, AuthService.get_active_user_by_email, email)
         
         if not user:
+            register_login_failure(email, client_ip)
             raise HTTPException(status_code=401, detail="Credenciales incorrectas")
             
         # Obtener el valor real del hash de la contraseña
         stored_hash = str(user.password_hash) if user.password_hash is not None else ""
         
-        if not verify_password(password, stored_hash):
+        # scrypt se calcula en el pool de procesos, sin bloquear el event loop
+        if not await verify_password_async(password, stored_hash):
+            register_login_failure(email, client_ip)
             raise HTTPException(status_code=401, detail="Credenciales incorrectas")
+
+        # Regenerar el hash si fue creado con otro formato o parámetros de Scrypt
+        if password_needs_rehash(stored_hash):
+            await AuthService._rehash_password(db, user, password)
             
         return user
 
+    @staticmethod
+    def get_active_user_by_email(db: Session, email: str) -> Optional[Usuario]:
+        return db.query(Usuario).filter(
+            Usuario.email == email, 
+            Usuario.activo.is_(True)
+        ).first()
+
+    @staticmethod
+    async def _rehash_password(db: Session, user: Usuario, password: str) -> None:
+        """
+        Actualiza el hash de la contraseña a la política actual. Un fallo aquí
+        no debe impedir el login: se registra y se reintenta en el próximo login.
+        """
+        try:
+            new_hash = await hash_password_async(password)
+            await run_db(db, AuthService._save_password_hash, user, new_hash)
+        except Exception:
+            logger.warning("No se pudo actualizar el hash del usuario %s", user.id_usuario, exc_info=True)
+
+    @staticmethod
+    def _save_password_hash(db: Session, user: Usuario, password_hash: str) -> None:
+        try:
+            user.password_hash = password_hash
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
     @staticmethod
     def create_user_session(db: Session, user: Usuario) -> SesionUsuario:
-        # Desactivar sesiones anteriores usando update con synchronize_session
-        db.query(SesionUsuario).filter(
-            SesionUsuario.id_usuario == user.id_usuario,
-            SesionUsuario.activa.is_(True)
-        ).update(
-            {SesionUsuario.activa: False}, 
-            synchronize_session='fetch'
-        )
+        # Desactivar sesiones anteriores; RETURNING evita releerlas para sincronizar
+        now = datetime.utcnow()
+        revoked = db.execute(
+            update(SesionUsuario)
+            .where(
+                SesionUsuario.id_usuario == user.id_usuario,
+                SesionUsuario.activa.is_(True)
+            )
+            .values(activa=False, fecha_revocacion=now)
+            .returning(SesionUsuario.token_digest, SesionUsuario.fecha_expiracion),
+            execution_options={"synchronize_session": False}
+        ).all()
         
         # Crear nueva sesión
-        access_token = create_access_token(
-            data={"sub": str(user.id_usuario), "email": user.email}
-        )
+        token_data = {"sub": str(user.id_usuario), "email": user.email, "rol": user.id_rol}
+        if settings.RBAC_TOKEN_PERMISSIONS:
+            # Bitset de permisos del rol: las comprobaciones no consultan la base de datos
+            bits = permission_cache.get(db).role_bits.get(user.id_rol, 0)
+            token_data["perm"] = encode_bits(bits)
+        access_token = create_access_token(data=token_data)
         
+        access_digest = hash_token(access_token)
         session = SesionUsuario(
             id_usuario=user.id_usuario,
             token_sesion=access_token,
+            token_digest=access_digest,
             activa=True,
-            fecha_expiracion=datetime.utcnow() + timedelta(days=1)
+            fecha_expiracion=now + SESSION_DURATION
         )
         
         db.add(session)
         db.commit()
         db.refresh(session)
+
+        # Las sesiones anteriores quedan revocadas en este worker sin esperar al feed
+        claims_cache.invalidate_subject(str(user.id_usuario))
+        for token_digest, fecha_expiracion in revoked:
+            session_state.revoke(token_digest, fecha_expiracion)
+        session_state.remember(access_digest, AuthService._snapshot(session))
         
         return session
 
     @staticmethod
-    def get_current_session(db: Session, token: str) -> SesionUsuario:
+    def get_current_session(db: Session, token: str) -> SessionSnapshot:
+        digest = hash_token(token)
+        if session_state.is_revoked(digest):
+            raise HTTPException(status_code=401, detail="Sesión inválida o expirada")
+
+        # Solo se consulta la base de datos si la sesión no está en memoria
+        snapshot = session_state.get_active(digest)
+        if snapshot is not None:
+            return snapshot
+
         session = db.query(SesionUsuario).filter(
-            SesionUsuario.token_sesion == token,
+            SesionUsuario.token_digest == digest,
             SesionUsuario.activa == True,
             SesionUsuario.fecha_expiracion > datetime.utcnow()
         ).first()
         
         if not session:
             raise HTTPException(status_code=401, detail="Sesión inválida o expirada")
-        
-        return session
+
+        snapshot = AuthService._snapshot(session)
+        session_state.remember(digest, snapshot)
+        return snapshot
 
     @staticmethod
     def logout_user(db: Session, token: str) -> bool:
         # Asegurarnos de que el token es un string
         token_str = str(token) if token is not None else ""
+        digest = hash_token(token_str)
         
-        result = db.query(SesionUsuario).filter(
-            SesionUsuario.token_sesion == token_str,
-            SesionUsuario.activa.is_(True)
-        ).update(
-            {SesionUsuario.activa: False},
-            synchronize_session='fetch'
-        )
+        revoked = db.execute(
+            update(SesionUsuario)
+            .where(
+                SesionUsuario.token_digest == digest,
+                SesionUsuario.activa.is_(True)
+            )
+            .values(activa=False, fecha_revocacion=datetime.utcnow())
+            .returning(SesionUsuario.fecha_expiracion),
+            execution_options={"synchronize_session": False}
+        ).all()
         
         db.commit()
-        return result > 0
\ No newline at end of file
+
+        claims_cache.invalidate(digest)
+        for (fecha_expiracion,) in revoked:
+            session_state.revoke(digest, fecha_expiracion)
+        return len(revoked) > 0
+
+    @staticmethod
+    def _snapshot(session: SesionUsuario) -> SessionSnapshot:
+        return SessionSnapshot(
+            id_sesion=session.id_sesion,
+            id_usuario=session.id_usuario,
+            fecha_inicio=session.fecha_inicio,
+            fecha_expiracion=session.fecha_expiracion,
+            activa=bool(session.activa)
+        )
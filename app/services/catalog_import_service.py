@@ -0,0 +1,399 @@
+import csv
+import io
+import json
+import logging
+import time
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from pydantic import ValidationError
+from sqlalchemy import (
+    Boolean, Column, DateTime, Integer, MetaData, String, Table, Text, bindparam, func, insert, select, text, tuple_, update
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models.inventory_models import (
+    Categoria, Marca, Producto, Proveedor, producto_proveedor
+)
+from app.schemas.catalog_schemas import ProductoImportRow
+from app.services.catalog_search_service import catalog_index
+from app.services.price_service import PriceService
+from app.utils.orm_events import invalidate_keys_after_commit
+
+logger = logging.getLogger(__name__)
+
+FORMAT_CSV = "csv"
+FORMAT_NDJSON = "ndjson"
+
+# Columnas de producto cargadas por la importación
+_PRODUCT_COLUMNS = [
+    "codigo_producto", "nombre", "descripcion", "id_categoria",
+    "id_marca", "unidad_medida", "activo", "fecha_creacion",
+]
+# Columnas que conservan su valor actual cuando la fila no las trae
+_OPTIONAL_COLUMNS = ["descripcion", "id_categoria", "id_marca", "unidad_medida", "activo"]
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# Tabla temporal (por conexión) para cargar productos con COPY en PostgreSQL
+_staging = Table(
+    "producto_importacion",
+    MetaData(),
+    Column("codigo_producto", String(50)),
+    Column("nombre", String(200)),
+    Column("descripcion", Text),
+    Column("id_categoria", Integer),
+    Column("id_marca", Integer),
+    Column("unidad_medida", String(10)),
+    Column("activo", Boolean),
+    Column("fecha_creacion", DateTime(timezone=True)),
+)
+_CREATE_STAGING = text(
+    "CREATE TEMPORARY TABLE IF NOT EXISTS producto_importacion ("
+    "codigo_producto varchar(50), nombre varchar(200), descripcion text, id_categoria integer, "
+    "id_marca integer, unidad_medida varchar(10), activo boolean, fecha_creacion timestamptz"
+    ") ON COMMIT DELETE ROWS"
+)
+
+Record = Tuple[int, Union[Dict[str, Any], str]]
+
+
+def read_records(stream: io.TextIOBase, formato: str) -> Iterator[Record]:
+    """
+    Registros del archivo, leídos de forma incremental: (fila, datos) o
+    (fila, mensaje de error) si la fila no se pudo interpretar
+    """
+    if formato == FORMAT_CSV:
+        for fila, row in enumerate(csv.DictReader(stream), start=1):
+            if None in row:
+                yield fila, "La fila tiene más columnas que el encabezado"
+                continue
+            # Celdas vacías: sin valor
+            yield fila, {key: value for key, value in row.items() if value not in ("", None)}
+        return
+
+    fila = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        fila += 1
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield fila, "JSON inválido"
+            continue
+        if not isinstance(record, dict):
+            yield fila, "Se esperaba un objeto JSON"
+            continue
+        yield fila, {key: value for key, value in record.items() if value not in ("", None)}
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, item['loc'])) or 'fila'}: {item['msg']}" for item in error.errors()
+    )
+
+
+class CatalogImportService:
+    """
+    Importación de productos, precios y proveedores por lotes.
+
+    Los registros se consumen de un iterador (el archivo nunca se carga completo)
+    y cada lote se valida y se guarda en su propia transacción:
+
+    - productos: upsert por codigo_producto con un INSERT ... ON CONFLICT de
+      varias filas; en PostgreSQL con psycopg2 las filas se cargan con COPY en
+      una tabla temporal y se insertan desde ella. Otros motores insertan los
+      productos nuevos y actualizan los existentes por separado.
+    - precios: si el precio difiere del vigente, se cierra el vigente
+      (fecha_fin) y se inserta el nuevo, ambos con la misma fecha.
+    - proveedores: se agregan las relaciones producto_proveedor que faltan.
+
+    Un lote con errores de base de datos se descarta completo y la importación
+    continúa con el siguiente; las filas inválidas se informan y se omiten. Como
+    la importación es un upsert, repetirla con el mismo archivo es seguro.
+    """
+
+    def __init__(self, db: Session, batch_size: int = 1000):
+        self.db = db
+        self.batch_size = batch_size
+        self._categorias: Optional[Set[int]] = None
+        self._marcas: Optional[Set[int]] = None
+
+    def run(self, records: Iterable[Record]) -> Iterator[Dict[str, Any]]:
+        """
+        Importa los registros y produce el progreso de cada lote y, al final, el resumen
+        """
+        started = time.perf_counter()
+        totals = {"filas": 0, "insertados": 0, "actualizados": 0, "precios": 0, "proveedores": 0, "errores": 0}
+        records = iter(records)
+        lote = 0
+        while True:
+            batch = list(islice(records, self.batch_size))
+            if not batch:
+                break
+            lote += 1
+            progress = self.import_batch(batch)
+            for key in totals:
+                totals[key] += len(progress[key]) if key == "errores" else progress[key]
+            yield dict(progress, lote=lote)
+
+        totals.update(lotes=lote, duracion_s=round(time.perf_counter() - started, 3))
+        yield {"resumen": totals}
+
+    def import_batch(self, batch: List[Record]) -> Dict[str, Any]:
+        errors: List[Dict[str, Any]] = []
+        rows: Dict[str, Tuple[int, ProductoImportRow]] = {}
+        for fila, record in batch:
+            if isinstance(record, str):
+                errors.append({"fila": fila, "error": record})
+                continue
+            try:
+                row = ProductoImportRow.model_validate(record)
+            except ValidationError as e:
+                errors.append({"fila": fila, "error": _validation_message(e)})
+                continue
+            # Un código repetido en el lote: prevalece la última fila
+            rows.pop(row.codigo_producto, None)
+            rows[row.codigo_producto] = (fila, row)
+
+        progress = {"filas": len(batch), "insertados": 0, "actualizados": 0, "precios": 0, "proveedores": 0}
+        try:
+            existing = self._existing_products(list(rows))
+            valid = self._check_references(rows, existing, errors)
+            if valid:
+                now = datetime.utcnow()
+                ids = self._upsert_products(valid, existing, now)
+                # Escritura fuera del ORM: el índice de búsqueda recarga estos productos al confirmar
+                invalidate_keys_after_commit(self.db, catalog_index.mark_stale, ids.values())
+                progress["insertados"] = sum(1 for row in valid if row.codigo_producto not in existing)
+                progress["actualizados"] = len(valid) - progress["insertados"]
+                progress["precios"] = self._update_prices(valid, ids, now, rows, errors)
+                progress["proveedores"] = self._link_suppliers(valid, ids)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.exception("Error al guardar un lote de la importación de catálogo")
+            progress.update(insertados=0, actualizados=0, precios=0, proveedores=0)
+            errors.extend(
+                {"fila": fila, "error": f"Error al guardar el lote: {type(e).__name__}"}
+                for fila, _ in rows.values()
+            )
+        progress["errores"] = sorted(errors, key=lambda item: item["fila"])
+        return progress
+
+    def _existing_products(self, codigos: List[str]) -> Dict[str, Tuple[int, str]]:
+        if not codigos:
+            return {}
+        return {
+            codigo: (id_producto, nombre)
+            for codigo, id_producto, nombre in self.db.execute(
+                select(Producto.codigo_producto, Producto.id_producto, Producto.nombre)
+                .where(Producto.codigo_producto.in_(codigos))
+            )
+        }
+
+    def _check_references(
+        self,
+        rows: Dict[str, Tuple[int, ProductoImportRow]],
+        existing: Dict[str, Tuple[int, str]],
+        errors: List[Dict[str, Any]]
+    ) -> List[ProductoImportRow]:
+        """
+        Filas que referencian categorías, marcas y proveedores existentes (y con
+        nombre si el producto es nuevo); las demás se agregan a `errors`
+        """
+        if self._categorias is None:
+            # Categorías y marcas son pocas: se cargan una vez por importación
+            self._categorias = set(self.db.scalars(select(Categoria.id_categoria)))
+            self._marcas = set(self.db.scalars(select(Marca.id_marca)))
+
+        requested = {id_proveedor for _, row in rows.values() for id_proveedor in row.proveedores}
+        proveedores = set(self.db.scalars(
+            select(Proveedor.id_proveedor).where(Proveedor.id_proveedor.in_(requested))
+        )) if requested else set()
+
+        valid = []
+        for fila, row in rows.values():
+            if row.codigo_producto not in existing and not row.nombre:
+                error = "nombre es requerido para productos nuevos"
+            elif row.id_categoria is not None and row.id_categoria not in self._categorias:
+                error = f"La categoría {row.id_categoria} no existe"
+            elif row.id_marca is not None and row.id_marca not in self._marcas:
+                error = f"La marca {row.id_marca} no existe"
+            elif any(id_proveedor not in proveedores for id_proveedor in row.proveedores):
+                missing = sorted(set(row.proveedores) - proveedores)
+                error = f"Proveedores inexistentes: {', '.join(map(str, missing))}"
+            else:
+                valid.append(row)
+                continue
+            errors.append({"fila": fila, "error": error})
+        return valid
+
+    def _upsert_products(
+        self,
+        rows: List[ProductoImportRow],
+        existing: Dict[str, Tuple[int, str]],
+        now: datetime
+    ) -> Dict[str, int]:
+        """
+        Inserta o actualiza los productos; retorna id_producto por código
+        """
+        values = []
+        for row in rows:
+            is_new = row.codigo_producto not in existing
+            values.append({
+                "codigo_producto": row.codigo_producto,
+                # El INSERT valida NOT NULL aun cuando termina en UPDATE
+                "nombre": row.nombre or existing[row.codigo_producto][1],
+                "descripcion": row.descripcion,
+                "id_categoria": row.id_categoria,
+                "id_marca": row.id_marca,
+                "unidad_medida": row.unidad_medida or ("UNIDAD" if is_new else None),
+                "activo": row.activo if row.activo is not None else (True if is_new else None),
+                "fecha_creacion": now,
+            })
+
+        dialect = self.db.get_bind().dialect.name
+        dialect_insert = _INSERTS.get(dialect)
+        if dialect_insert is None:
+            return self._upsert_portable(values, existing)
+
+        statement = dialect_insert(Producto)
+        if dialect == "postgresql" and self._copy_to_staging(values):
+            statement = statement.from_select(
+                _PRODUCT_COLUMNS, select(*[_staging.c[name] for name in _PRODUCT_COLUMNS])
+            )
+        else:
+            statement = statement.values(values)
+
+        excluded = statement.excluded
+        statement = statement.on_conflict_do_update(
+            index_elements=[Producto.codigo_producto],
+            set_=dict(
+                {name: func.coalesce(excluded[name], getattr(Producto, name)) for name in _OPTIONAL_COLUMNS},
+                nombre=excluded.nombre
+            )
+        ).returning(Producto.codigo_producto, Producto.id_producto)
+        return {codigo: id_producto for codigo, id_producto in self.db.execute(statement)}
+
+    def _upsert_portable(
+        self,
+        values: List[Dict[str, Any]],
+        existing: Dict[str, Tuple[int, str]]
+    ) -> Dict[str, int]:
+        """
+        Upsert sin ON CONFLICT (otros motores): INSERT de varias filas para los
+        productos nuevos y UPDATE por código (executemany) para los existentes
+        """
+        new_rows = [row for row in values if row["codigo_producto"] not in existing]
+        updated_rows = [row for row in values if row["codigo_producto"] in existing]
+        if new_rows:
+            self.db.execute(insert(Producto), new_rows)
+        if updated_rows:
+            producto = Producto.__table__
+            self.db.execute(
+                update(producto)
+                .where(producto.c.codigo_producto == bindparam("b_codigo"))
+                .values(
+                    nombre=bindparam("b_nombre"),
+                    **{
+                        name: func.coalesce(bindparam(f"b_{name}", type_=producto.c[name].type), producto.c[name])
+                        for name in _OPTIONAL_COLUMNS
+                    }
+                ),
+                [
+                    dict({f"b_{name}": row[name] for name in _OPTIONAL_COLUMNS},
+                         b_codigo=row["codigo_producto"], b_nombre=row["nombre"])
+                    for row in updated_rows
+                ]
+            )
+
+        ids = {codigo: id_producto for codigo, (id_producto, _) in existing.items()}
+        if new_rows:
+            result = self.db.execute(
+                select(Producto.codigo_producto, Producto.id_producto)
+                .where(Producto.codigo_producto.in_([row["codigo_producto"] for row in new_rows]))
+            )
+            ids.update({codigo: id_producto for codigo, id_producto in result})
+        return ids
+
+    def _copy_to_staging(self, values: List[Dict[str, Any]]) -> bool:
+        """
+        Carga las filas con COPY en la tabla temporal (solo con psycopg2)
+        """
+        connection = self.db.connection()
+        dbapi_connection = connection.connection.dbapi_connection
+        cursor = dbapi_connection.cursor()
+        if not hasattr(cursor, "copy_expert"):
+            cursor.close()
+            return False
+
+        connection.execute(_CREATE_STAGING)
+        buffer = io.StringIO()
+        # QUOTE_NONNUMERIC: los textos van entre comillas y None queda como campo
+        # vacío sin comillas, que COPY interpreta como NULL
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+        for row in values:
+            writer.writerow([row[name] for name in _PRODUCT_COLUMNS])
+        buffer.seek(0)
+        try:
+            cursor.copy_expert(
+                f"COPY producto_importacion ({', '.join(_PRODUCT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+        finally:
+            cursor.close()
+        return True
+
+    def _update_prices(
+        self,
+        rows: List[ProductoImportRow],
+        ids: Dict[str, int],
+        now: datetime,
+        filas: Dict[str, Tuple[int, ProductoImportRow]],
+        errors: List[Dict[str, Any]]
+    ) -> int:
+        """
+        Reemplaza desde `now` los precios vigentes que cambian; retorna cuántos
+        precios se insertaron. Los productos con un precio programado después
+        de `now` conservan su historial y la fila se informa en `errors`.
+        """
+        prices = {ids[row.codigo_producto]: row.precio for row in rows if row.precio is not None}
+        if not prices:
+            return 0
+
+        current = PriceService.resolve(self.db, prices, fecha=now)
+        changed = {
+            id_producto: precio for id_producto, precio in prices.items()
+            if current.get(id_producto) != precio
+        }
+        rejected = PriceService.set_prices(self.db, changed, now)
+        if rejected:
+            codigos = {id_producto: codigo for codigo, id_producto in ids.items()}
+            errors.extend(
+                {"fila": filas[codigos[id_producto]][0],
+                 "error": "precio: se superpone con un precio programado; se conserva el precio actual"}
+                for id_producto in sorted(rejected)
+            )
+        return len(changed) - len(rejected)
+
+    def _link_suppliers(self, rows: List[ProductoImportRow], ids: Dict[str, int]) -> int:
+        pairs = {
+            (ids[row.codigo_producto], id_proveedor)
+            for row in rows for id_proveedor in row.proveedores
+        }
+        if not pairs:
+            return 0
+
+        existing = set(self.db.execute(
+            select(producto_proveedor.c.id_producto, producto_proveedor.c.id_proveedor)
+            .where(tuple_(producto_proveedor.c.id_producto, producto_proveedor.c.id_proveedor).in_(list(pairs)))
+        ).tuples())
+        missing = sorted(pairs - existing)
+        if missing:
+            self.db.execute(insert(producto_proveedor), [
+                {"id_producto": id_producto, "id_proveedor": id_proveedor}
+                for id_producto, id_proveedor in missing
+            ])
+        return len(missing)
@@ -0,0 +1,500 @@
+import heapq
+import logging
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.config.settings import settings
+from app.models.inventory_models import Producto
+from app.services.user_search_service import escape_like
+from app.utils.metrics import metrics
+from app.utils.ngram_index import NGramIndex, match_score, normalize_text
+from app.utils.orm_events import invalidate_keys_on_commit
+
+logger = logging.getLogger(__name__)
+
+# Relevancia por código: igual al término, o prefijo (más alto cuanto más largo
+# el término respecto del código). Las de nombre (NGramIndex) van de 1 a 5.
+_SCORE_EXACT_CODE = 10.0
+_SCORE_CODE_PREFIX = 5.0
+
+# Resultado de búsqueda: (id_producto, codigo_producto, nombre)
+Match = Tuple[int, str, str]
+
+_ACTIVE = Producto.activo.is_not(False)
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+class _WordIndex:
+    """
+    Palabras de los nombres en una lista ordenada (búsqueda por prefijo) y, por
+    palabra, los productos cuyo nombre empieza con ella y los que la contienen,
+    ordenados por `rank` (nombre más corto primero). Recorrer esas listas en
+    orden entrega primero los más relevantes: basta leer los primeros `limit`.
+    """
+
+    def __init__(self, rank: Callable[[int], Any]):
+        self._rank = rank
+        self._words: List[str] = []
+        self._first: Dict[str, array] = {}
+        self._any: Dict[str, array] = {}
+
+    def append(self, doc_id: int, words: List[str]) -> None:
+        """
+        Agrega un producto de rango mayor que todos los anteriores (construcción
+        en orden de rango); luego se debe llamar a sort_words()
+        """
+        if not words:
+            return
+        self._postings(self._first, words[0]).append(doc_id)
+        for word in set(words):
+            self._postings(self._any, word).append(doc_id)
+
+    def sort_words(self) -> None:
+        self._words = sorted(self._any)
+
+    def add(self, doc_id: int, words: List[str]) -> None:
+        if not words:
+            return
+        rank = self._rank
+        new_words = [word for word in set(words) if word not in self._any]
+        for postings in [self._postings(self._first, words[0])] + [self._postings(self._any, w) for w in set(words)]:
+            postings.insert(bisect_left(postings, rank(doc_id), key=rank), doc_id)
+        for word in new_words:
+            self._words.insert(bisect_left(self._words, word), word)
+
+    def remove(self, doc_id: int, words: List[str]) -> None:
+        if not words:
+            return
+        self._discard(self._first, words[0], doc_id)
+        for word in set(words):
+            self._discard(self._any, word, doc_id)
+            if word not in self._any:
+                del self._words[bisect_left(self._words, word)]
+
+    @staticmethod
+    def _postings(lists: Dict[str, array], word: str) -> array:
+        postings = lists.get(word)
+        if postings is None:
+            postings = lists[word] = array("i")
+        return postings
+
+    def _discard(self, lists: Dict[str, array], word: str, doc_id: int) -> None:
+        postings = lists[word]
+        position = bisect_left(postings, self._rank(doc_id), key=self._rank)
+        while postings[position] != doc_id:
+            position += 1
+        del postings[position]
+        if not postings:
+            del lists[word]
+
+    def postings(self, word: str) -> Sequence[int]:
+        """
+        Productos que contienen la palabra, por rango
+        """
+        return self._any.get(word, ())
+
+    def ranked(self, prefix: str, first: bool) -> Iterator[int]:
+        """
+        Productos con alguna palabra que empieza con `prefix`, al inicio del
+        nombre (`first`) o en cualquier posición, por rango
+        """
+        lists = self._first if first else self._any
+        words = self._words
+        position = bisect_left(words, prefix)
+        matches = []
+        while position < len(words) and words[position].startswith(prefix):
+            if words[position] in lists:
+                matches.append(lists[words[position]])
+            position += 1
+        if len(matches) == 1:
+            return iter(matches[0])
+        return heapq.merge(*matches, key=self._rank)
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def entries(self) -> int:
+        return sum(len(postings) for postings in self._first.values()) + sum(
+            len(postings) for postings in self._any.values()
+        )
+
+
+class CatalogIndex:
+    """
+    Índice en memoria de los productos activos para la búsqueda de los puntos de
+    venta:
+
+    - códigos normalizados en un arreglo ordenado (búsqueda binaria para código
+      exacto y prefijo) con los ids en un arreglo paralelo de enteros de 32 bits
+    - palabras del nombre con sus productos ordenados por largo del nombre
+      (inicio de nombre o de palabra: se leen solo los primeros resultados)
+    - índice de n-gramas (NGramIndex) sobre el nombre, para subcadenas en medio
+      de una palabra
+
+    Se construye en un hilo aparte (al iniciar la aplicación o en la primera
+    búsqueda); mientras tanto las búsquedas van a SQL. Las escrituras de
+    productos marcan sus ids como pendientes al confirmarse y la siguiente
+    búsqueda los recarga por id; cada `refresh_seconds` se reconstruye completo
+    para recoger cambios hechos fuera de la aplicación.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._codes: List[str] = []
+        self._code_ids = array("i")
+        # id_producto -> (codigo_producto, nombre) tal como están en la base
+        self._products: Dict[int, Tuple[str, str]] = {}
+        self._names = NGramIndex(n=3)
+        self._words = _WordIndex(_rank_in(self._products))
+        self._stale: Set[int] = set()
+        # Productos modificados durante una construcción (None si no hay una en curso)
+        self._changed_during_build: Optional[Set[int]] = None
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._build_thread: Optional[threading.Thread] = None
+        self.builds = 0
+        self.build_seconds = 0.0
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and (
+            self.refresh_seconds <= 0 or time.monotonic() - self._loaded_at < self.refresh_seconds
+        )
+
+    def ensure_loaded(self, bind: Engine) -> bool:
+        """
+        Inicia la construcción en segundo plano si el índice no existe o venció;
+        retorna si ya se puede buscar en memoria
+        """
+        if not self._is_fresh():
+            with self._lock:
+                if self._build_thread is None or not self._build_thread.is_alive():
+                    self._build_thread = threading.Thread(
+                        target=self._build_quietly, args=(bind,), name="catalog-index", daemon=True
+                    )
+                    self._build_thread.start()
+        return self.loaded
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """
+        Espera la construcción en segundo plano en curso
+        """
+        thread = self._build_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _build_quietly(self, bind: Engine) -> None:
+        try:
+            self.build(bind)
+        except Exception:
+            logger.exception("Error al construir el índice de catálogo")
+
+    def build(self, bind: Engine) -> None:
+        """
+        Carga todos los productos activos y reemplaza el índice. Se sigue
+        respondiendo con el índice anterior hasta el reemplazo.
+        """
+        if not self._build_lock.acquire(blocking=False):
+            return
+        try:
+            started = time.perf_counter()
+            with self._lock:
+                self._changed_during_build = set()
+
+            rows: List[Tuple[str, int]] = []
+            products: Dict[int, Tuple[str, str]] = {}
+            names = NGramIndex(n=3)
+            with Session(bind=bind) as db:
+                for id_producto, codigo, nombre in db.execute(
+                    select(Producto.id_producto, Producto.codigo_producto, Producto.nombre)
+                    .where(_ACTIVE)
+                    .execution_options(yield_per=10000)
+                ):
+                    products[id_producto] = (codigo, nombre)
+                    rows.append((_code_key(codigo), id_producto))
+                    names.add(id_producto, (nombre,))
+            rows.sort()
+            rank = _rank_in(products)
+            words = _WordIndex(rank)
+            for id_producto in sorted(products, key=rank):
+                words.append(id_producto, _name_words(products[id_producto][1]))
+            words.sort_words()
+
+            with self._lock:
+                self._codes = [code for code, _ in rows]
+                self._code_ids = array("i", (id_producto for _, id_producto in rows))
+                self._products, self._names, self._words = products, names, words
+                # Los cambios confirmados durante la carga se vuelven a leer
+                self._stale |= self._changed_during_build
+                self._changed_during_build = None
+                self._loaded_at = time.monotonic()
+                self.builds += 1
+                self.build_seconds = round(time.perf_counter() - started, 3)
+        except Exception:
+            with self._lock:
+                self._changed_during_build = None
+            raise
+        finally:
+            self._build_lock.release()
+
+    def mark_stale(self, ids: Iterable[int]) -> None:
+        """
+        Productos creados, modificados o eliminados: se recargan antes de la
+        siguiente búsqueda en memoria
+        """
+        with self._lock:
+            if self._changed_during_build is not None:
+                self._changed_during_build.update(ids)
+                self._stale.update(ids)
+            elif self._loaded_at is not None:
+                self._stale.update(ids)
+
+    def refresh(self, db: Session) -> int:
+        """
+        Recarga por id los productos pendientes; retorna cuántos se recargaron
+        """
+        with self._lock:
+            if not self._stale:
+                return 0
+            ids, self._stale = self._stale, set()
+        try:
+            current = {
+                id_producto: (codigo, nombre)
+                for id_producto, codigo, nombre in db.execute(
+                    select(Producto.id_producto, Producto.codigo_producto, Producto.nombre)
+                    .where(Producto.id_producto.in_(sorted(ids)), _ACTIVE)
+                )
+            }
+        except Exception:
+            with self._lock:
+                self._stale |= ids
+            raise
+        with self._lock:
+            for id_producto in ids:
+                self._remove(id_producto)
+                if id_producto in current:
+                    self._add(id_producto, *current[id_producto])
+        return len(ids)
+
+    def _add(self, id_producto: int, codigo: str, nombre: str) -> None:
+        key = _code_key(codigo)
+        position = bisect_left(self._codes, key)
+        self._codes.insert(position, key)
+        self._code_ids.insert(position, id_producto)
+        self._products[id_producto] = (codigo, nombre)
+        self._names.add(id_producto, (nombre,))
+        self._words.add(id_producto, _name_words(nombre))
+
+    def _remove(self, id_producto: int) -> None:
+        product = self._products.get(id_producto)
+        if product is None:
+            return
+        # Las listas por palabra se ordenan con los datos del producto: quitarlo antes
+        self._words.remove(id_producto, _name_words(product[1]))
+        del self._products[id_producto]
+        key = _code_key(product[0])
+        position = bisect_left(self._codes, key)
+        # Códigos que solo difieren en mayúsculas comparten clave
+        while self._code_ids[position] != id_producto:
+            position += 1
+        del self._codes[position]
+        del self._code_ids[position]
+        self._names.remove(id_producto)
+
+    def _code_matches(self, key: str, limit: int) -> Iterable[Tuple[int, str]]:
+        # Códigos con prefijo `key` en orden, a lo sumo `limit`
+        codes = self._codes
+        position = bisect_left(codes, key)
+        end = min(position + limit, len(codes))
+        while position < end and codes[position].startswith(key):
+            yield self._code_ids[position], codes[position]
+            position += 1
+
+    def by_code(self, codigo: str) -> Optional[Match]:
+        """
+        Producto con el código indicado (sin distinguir mayúsculas ni acentos)
+        """
+        key = _code_key(codigo.strip())
+        with self._lock:
+            for id_producto, code in self._code_matches(key, 1):
+                if code == key:
+                    return (id_producto,) + self._products[id_producto]
+        return None
+
+    def search(self, term: str, limit: int = 20) -> List[Match]:
+        """
+        Productos por código (exacto y prefijo) o por el nombre (al inicio, al
+        inicio de una palabra o, si no alcanzan, como subcadena), ordenados por
+        relevancia y luego por código
+        """
+        key = normalize_text(term).strip()
+        if not key or limit <= 0:
+            return []
+        with self._lock:
+            scores: Dict[int, float] = {}
+            for id_producto, code in self._code_matches(key, limit):
+                scores[id_producto] = _SCORE_EXACT_CODE if code == key else _SCORE_CODE_PREFIX + len(key) / len(code)
+            products = self._products
+            for id_producto in self._name_matches(key, limit):
+                if id_producto not in scores:
+                    scores[id_producto] = match_score(self._names.fields(id_producto)[0], key)
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], products[item[0]][0]))[:limit]
+            return [(id_producto,) + products[id_producto] for id_producto, _ in ranked]
+
+    def _name_matches(self, key: str, limit: int) -> List[int]:
+        """
+        Los `limit` productos más relevantes por nombre: primero los que empiezan
+        con el término, luego los que lo tienen al inicio de una palabra (listas
+        por palabra, en orden de rango) y, solo si faltan, los que lo contienen
+        en medio de una palabra (índice de n-gramas)
+        """
+        found: List[int] = []
+        words = _WORD.findall(key)
+        if words and key.startswith(words[0]):
+            if len(words) == 1 and key == words[0]:
+                seen: Set[int] = set()
+                for first in (True, False):
+                    for id_producto in self._words.ranked(key, first=first):
+                        if id_producto not in seen:
+                            seen.add(id_producto)
+                            found.append(id_producto)
+                            if len(found) >= limit:
+                                return found
+            # Una palabra con puntuación ("usb-", "cable.") queda para código y n-gramas
+            elif len(words) > 1:
+                found = self._phrase_matches(key, words[:-1], limit)
+                if len(found) >= limit:
+                    return found
+
+        # Términos más cortos que un n-grama recorrerían todos los nombres
+        if len(key) >= self._names.n:
+            seen = set(found)
+            for id_producto, _ in self._names.search(key):
+                if id_producto not in seen:
+                    found.append(id_producto)
+                    if len(found) >= limit:
+                        break
+        return found
+
+    def _phrase_matches(self, key: str, complete: List[str], limit: int) -> List[int]:
+        """
+        Término de varias palabras: se recorre en orden de rango la lista más
+        corta de sus palabras completas (todas menos la última, que puede estar a
+        medio escribir) y se verifica el término en el nombre normalizado
+        """
+        lists = [self._words.postings(word) for word in complete]
+        starts: List[int] = []
+        inside: List[int] = []
+        for id_producto in min(lists, key=len):
+            name = self._names.fields(id_producto)[0]
+            if name.startswith(key):
+                starts.append(id_producto)
+                if len(starts) >= limit:
+                    break
+            elif len(inside) < limit and _at_word_start(name, key):
+                inside.append(id_producto)
+        return (starts + inside)[:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._codes = []
+            self._code_ids = array("i")
+            self._products = {}
+            self._names = NGramIndex(n=3)
+            self._words = _WordIndex(_rank_in(self._products))
+            self._stale = set()
+            self._loaded_at = None
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(
+            self._names.stats(),
+            codigos=len(self._codes),
+            palabras=len(self._words),
+            entradas_palabras=self._words.entries(),
+            pendientes=len(self._stale),
+            construcciones=self.builds,
+            duracion_construccion_s=self.build_seconds,
+            cargado=self.loaded,
+        )
+
+
+def _rank_in(products: Dict[int, Tuple[str, str]]) -> Callable[[int], Tuple[int, str]]:
+    # Nombre más corto primero (más relevante ante el mismo término), luego código
+    return lambda id_producto: (len(products[id_producto][1]), products[id_producto][0])
+
+
+def _name_words(nombre: str) -> List[str]:
+    return _WORD.findall(normalize_text(nombre))
+
+
+def _at_word_start(name: str, term: str) -> bool:
+    # `term` aparece al inicio de alguna palabra de `name`
+    position = name.find(term)
+    while position > 0 and name[position - 1].isalnum():
+        position = name.find(term, position + 1)
+    return position >= 0
+
+
+def _code_key(codigo: str) -> str:
+    key = normalize_text(codigo)
+    # Reutilizar el mismo objeto si el código ya está normalizado
+    return codigo if key == codigo else key
+
+
+catalog_index = CatalogIndex(settings.CATALOG_INDEX_REFRESH_SECONDS)
+metrics.register("catalog_index", catalog_index.stats)
+
+# Productos escritos con el ORM; las escrituras fuera del ORM (importación de
+# catálogo) deben marcar sus ids con invalidate_keys_after_commit
+invalidate_keys_on_commit(Producto, lambda producto: producto.id_producto, catalog_index.mark_stale)
+
+
+class CatalogSearchService:
+    """
+    Búsqueda de productos activos por código o nombre para los puntos de venta:
+    en memoria con CatalogIndex o, mientras se construye (o si
+    CATALOG_INDEX_ENABLED está desactivado), con SQL.
+    """
+
+    @staticmethod
+    def search(db: Session, term: str, limit: int = 20) -> List[Match]:
+        if settings.CATALOG_INDEX_ENABLED and catalog_index.ensure_loaded(db.get_bind()):
+            catalog_index.refresh(db)
+            return catalog_index.search(term, limit)
+        return CatalogSearchService.search_sql(db, term, limit)
+
+    @staticmethod
+    def search_sql(db: Session, term: str, limit: int = 20) -> List[Match]:
+        """
+        Misma búsqueda con SQL: código igual, prefijo de código, prefijo de
+        nombre y subcadena de nombre, en ese orden
+        """
+        term = term.strip()
+        if not term or limit <= 0:
+            return []
+        pattern = escape_like(term)
+        code_prefix = Producto.codigo_producto.ilike(f"{pattern}%", escape="\\")
+        rank = case(
+            (func.lower(Producto.codigo_producto) == term.lower(), 0),
+            (code_prefix, 1),
+            (Producto.nombre.ilike(f"{pattern}%", escape="\\"), 2),
+            else_=3
+        )
+        rows = db.execute(
+            select(Producto.id_producto, Producto.codigo_producto, Producto.nombre)
+            .where(_ACTIVE, or_(code_prefix, Producto.nombre.ilike(f"%{pattern}%", escape="\\")))
+            .order_by(rank, func.length(Producto.nombre), Producto.codigo_producto)
+            .limit(limit)
+        )
+        return [tuple(row) for row in rows]
@@ -0,0 +1,297 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, case, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+from app.config.database import SessionLocal
+from app.config.settings import settings
+from app.models.inventory_models import Inventario, Kardex, KardexSaldo, KardexSaldoProgreso, Ubicacion
+from app.services.movement_service import INGRESO
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_PROGRESS_ID = 1
+
+# Inventarios por consulta de las filas posteriores a los puntos de control
+_TAIL_CHUNK = 500
+
+# Cantidad con signo de una fila de Kardex
+_SIGNED = case((Kardex.tipo_movimiento == INGRESO, Kardex.cantidad), else_=-Kardex.cantidad)
+
+_last_run: Dict[str, Any] = {}
+metrics.register("kardex_checkpoints", lambda: dict(_last_run))
+
+# (saldo, filas de Kardex acumuladas) por inventario
+Balance = Tuple[Decimal, int]
+
+class KardexCheckpointService:
+    @staticmethod
+    def stock_at(db: Session, ids: Iterable[int], fecha: datetime) -> Dict[int, Decimal]:
+        """
+        Stock de cada inventario al instante `fecha` (movimientos con
+        fecha_movimiento <= fecha): saldo del punto de control anterior más
+        cercano más las filas de Kardex posteriores hasta la fecha.
+
+        El costo depende de las filas posteriores al punto de control (a lo sumo
+        KARDEX_CHECKPOINT_EVERY más las que el job aún no procesó), no del tamaño
+        del historial.
+        """
+        balances = _balances(
+            db, ids,
+            checkpoint_filter=[KardexSaldo.fecha_movimiento <= fecha],
+            ledger_filter=[Kardex.fecha_movimiento <= fecha]
+        )
+        return {id_inventario: cantidad for id_inventario, (cantidad, _) in balances.items()}
+
+    @staticmethod
+    def inventory_stock_at(
+        db: Session,
+        fecha: datetime,
+        id_producto: Optional[int] = None,
+        id_ubicacion: Optional[int] = None,
+        id_sucursal: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Stock a la fecha de los inventarios que cumplen los filtros
+        """
+        statement = select(Inventario.id_inventario, Inventario.id_ubicacion, Inventario.id_producto)
+        if id_producto is not None:
+            statement = statement.where(Inventario.id_producto == id_producto)
+        if id_ubicacion is not None:
+            statement = statement.where(Inventario.id_ubicacion == id_ubicacion)
+        if id_sucursal is not None:
+            statement = statement.join(Ubicacion, Ubicacion.id_ubicacion == Inventario.id_ubicacion).where(
+                Ubicacion.id_sucursal == id_sucursal
+            )
+        inventories = db.execute(statement.order_by(Inventario.id_inventario)).all()
+        stock = KardexCheckpointService.stock_at(db, [row.id_inventario for row in inventories], fecha)
+        return [
+            dict(row._asdict(), cantidad=stock.get(row.id_inventario, Decimal(0)))
+            for row in inventories
+        ]
+
+    @staticmethod
+    def build(
+        db: Session,
+        every: int = 500,
+        batch_size: int = 5000,
+        lag_seconds: float = 60
+    ) -> Dict[str, Any]:
+        """
+        Agrega puntos de control a partir de las filas de Kardex nuevas: uno por
+        inventario cada `every` movimientos. Avanza de forma incremental desde la
+        última fila procesada (kardex_saldo_progreso), en lotes confirmados por
+        separado.
+
+        Solo procesa filas con más de `lag_seconds` de antigüedad, para no saltar
+        filas de transacciones aún abiertas con un id_kardex menor.
+
+        Returns:
+            dict: Lotes, filas leídas y puntos de control creados
+        """
+        started = time.perf_counter()
+        every = max(every, 1)
+        batches = 0
+        rows_read = 0
+        created = 0
+
+        watermark = _lock_progress(db)
+        if watermark is None:
+            # Otro worker está generando puntos de control
+            db.rollback()
+            return {"omitido": True}
+
+        try:
+            cutoff = datetime.utcnow() - timedelta(seconds=lag_seconds)
+            while True:
+                rows = db.execute(
+                    select(Kardex.id_kardex, Kardex.id_inventario, Kardex.fecha_movimiento, _SIGNED.label("cantidad"))
+                    .where(Kardex.id_kardex > watermark, Kardex.fecha_movimiento <= cutoff)
+                    .order_by(Kardex.id_kardex)
+                    .limit(batch_size)
+                ).all()
+                if not rows:
+                    break
+
+                state = _balances(
+                    db, {row.id_inventario for row in rows},
+                    checkpoint_filter=[KardexSaldo.id_kardex <= watermark],
+                    ledger_filter=[Kardex.id_kardex <= watermark]
+                )
+                checkpoints: List[Dict[str, Any]] = []
+                for row in rows:
+                    cantidad, movimientos = state[row.id_inventario]
+                    cantidad += row.cantidad
+                    movimientos += 1
+                    state[row.id_inventario] = (cantidad, movimientos)
+                    if movimientos % every == 0:
+                        checkpoints.append({
+                            "id_inventario": row.id_inventario, "id_kardex": row.id_kardex,
+                            "fecha_movimiento": row.fecha_movimiento, "cantidad": cantidad,
+                            "movimientos": movimientos,
+                        })
+
+                if checkpoints:
+                    db.execute(insert(KardexSaldo), checkpoints)
+                watermark = rows[-1].id_kardex
+                db.execute(
+                    update(KardexSaldoProgreso)
+                    .where(KardexSaldoProgreso.id_progreso == _PROGRESS_ID)
+                    .values(id_kardex=watermark, fecha_actualizacion=datetime.utcnow())
+                )
+                db.commit()
+
+                batches += 1
+                rows_read += len(rows)
+                created += len(checkpoints)
+                if len(rows) < batch_size:
+                    break
+                # El commit liberó el bloqueo: tomarlo de nuevo para el siguiente lote
+                watermark = _lock_progress(db)
+                if watermark is None:
+                    break
+            # Liberar el bloqueo (y guardar la fila de progreso si se acaba de crear)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        result = {
+            "fecha": datetime.utcnow().isoformat(),
+            "lotes": batches,
+            "filas": rows_read,
+            "puntos_de_control": created,
+            "duracion_s": round(time.perf_counter() - started, 3),
+        }
+        _last_run.clear()
+        _last_run.update(result)
+        return result
+
+    @staticmethod
+    def build_with_settings() -> Dict[str, Any]:
+        db = SessionLocal()
+        try:
+            return KardexCheckpointService.build(
+                db,
+                every=settings.KARDEX_CHECKPOINT_EVERY,
+                batch_size=settings.KARDEX_CHECKPOINT_BATCH_SIZE,
+                lag_seconds=settings.KARDEX_CHECKPOINT_LAG_SECONDS
+            )
+        finally:
+            db.close()
+
+    @staticmethod
+    async def run(interval_seconds: float) -> None:
+        """
+        Generación periódica de puntos de control; se ejecuta como tarea de fondo
+        durante la vida de la aplicación
+        """
+        while True:
+            try:
+                result = await asyncio.to_thread(KardexCheckpointService.build_with_settings)
+                if result.get("puntos_de_control"):
+                    logger.info("Puntos de control de Kardex generados: %s", result)
+            except Exception:
+                logger.exception("Error al generar los puntos de control de Kardex")
+            await asyncio.sleep(interval_seconds)
+
+
+def _lock_progress(db: Session) -> Optional[int]:
+    """
+    Bloquea la fila de progreso y retorna la última fila de Kardex procesada;
+    None si otro worker la tiene bloqueada
+    """
+    progress = db.execute(
+        select(KardexSaldoProgreso.id_kardex)
+        .where(KardexSaldoProgreso.id_progreso == _PROGRESS_ID)
+        .with_for_update(skip_locked=True)
+    ).scalar()
+    if progress is not None:
+        return progress
+
+    exists = db.execute(
+        select(KardexSaldoProgreso.id_progreso).where(KardexSaldoProgreso.id_progreso == _PROGRESS_ID)
+    ).first()
+    if exists:
+        return None
+    db.add(KardexSaldoProgreso(id_progreso=_PROGRESS_ID, id_kardex=0))
+    db.flush()
+    return 0
+
+
+def _balances(
+    db: Session,
+    ids: Iterable[int],
+    checkpoint_filter: List[Any],
+    ledger_filter: List[Any]
+) -> Dict[int, Balance]:
+    """
+    Saldo y filas acumuladas por inventario: último punto de control que cumple
+    `checkpoint_filter` más las filas de Kardex posteriores que cumplen
+    `ledger_filter`. Sin punto de control se parte del saldo anterior a la
+    primera fila de Kardex (o del stock actual si el inventario no tiene
+    movimientos).
+    """
+    ids = sorted(set(ids))
+    if not ids:
+        return {}
+
+    last = (
+        select(KardexSaldo.id_inventario, func.max(KardexSaldo.id_kardex).label("id_kardex"))
+        .where(KardexSaldo.id_inventario.in_(ids), *checkpoint_filter)
+        .group_by(KardexSaldo.id_inventario)
+        .subquery()
+    )
+    checkpoints: Dict[int, int] = {}
+    balances: Dict[int, Balance] = {}
+    for row in db.execute(
+        select(KardexSaldo.id_inventario, KardexSaldo.id_kardex, KardexSaldo.cantidad, KardexSaldo.movimientos)
+        .join(last, and_(
+            KardexSaldo.id_inventario == last.c.id_inventario,
+            KardexSaldo.id_kardex == last.c.id_kardex
+        ))
+    ):
+        checkpoints[row.id_inventario] = row.id_kardex
+        balances[row.id_inventario] = (row.cantidad, row.movimientos)
+
+    missing = [i for i in ids if i not in checkpoints]
+    if missing:
+        first = (
+            select(Kardex.id_inventario, func.min(Kardex.id_kardex).label("id_kardex"))
+            .where(Kardex.id_inventario.in_(missing))
+            .group_by(Kardex.id_inventario)
+            .subquery()
+        )
+        opening = db.execute(
+            select(Inventario.id_inventario, func.coalesce(Kardex.cantidad_anterior, Inventario.cantidad_actual))
+            .outerjoin(first, first.c.id_inventario == Inventario.id_inventario)
+            .outerjoin(Kardex, Kardex.id_kardex == first.c.id_kardex)
+            .where(Inventario.id_inventario.in_(missing))
+        )
+        for id_inventario, cantidad in opening:
+            balances[id_inventario] = (cantidad or Decimal(0), 0)
+
+    # Un rango de ix_kardex_inventario_id por inventario, con el límite inferior
+    # como literal: el recorrido no depende del historial anterior al punto de control
+    for offset in range(0, len(ids), _TAIL_CHUNK):
+        chunk = ids[offset:offset + _TAIL_CHUNK]
+        ranges = [
+            and_(Kardex.id_inventario == i, Kardex.id_kardex > checkpoints[i])
+            for i in chunk if i in checkpoints
+        ]
+        unbounded = [i for i in chunk if i not in checkpoints]
+        if unbounded:
+            ranges.append(Kardex.id_inventario.in_(unbounded))
+        tail = db.execute(
+            select(Kardex.id_inventario, func.sum(_SIGNED), func.count())
+            .where(or_(*ranges), *ledger_filter)
+            .group_by(Kardex.id_inventario)
+        )
+        for id_inventario, cantidad, movimientos in tail:
+            base, count = balances.get(id_inventario, (Decimal(0), 0))
+            balances[id_inventario] = (base + Decimal(cantidad), count + movimientos)
+    return balances
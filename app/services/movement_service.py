@@ -0,0 +1,440 @@
+import asyncio
+import random
+import time
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import Integer, Numeric, Row, bindparam, case, column, func, insert, select, update, values
+from sqlalchemy.orm import Session
+from app.config.database import run_db
+from app.config.settings import settings
+from app.models.inventory_models import (
+    Inventario, InventarioDelta, Kardex, Movimiento, MovimientoDetalle, MotivoMovimiento, Ubicacion
+)
+from app.schemas import movement_schemas
+from app.services.stock_aggregate_service import StockAggregateService
+from app.services.stock_alert_service import StockAlertService
+from app.utils.metrics import metrics
+
+INGRESO = "INGRESO"
+EGRESO = "EGRESO"
+
+# Modos de actualización del stock (STOCK_UPDATE_MODE)
+STOCK_MODE_LOCK = "bloqueo"
+STOCK_MODE_DELTA = "delta"
+STOCK_MODE_OPTIMISTIC = "optimista"
+STOCK_MODE_DEFERRED = "diferido"
+
+_inventario = Inventario.__table__
+
+# Actualización por delta, para ejecutarse con executemany (una fila por inventario)
+_DELTA_UPDATE = (
+    update(_inventario)
+    .where(_inventario.c.id_inventario == bindparam("b_id"))
+    .values(
+        cantidad_actual=_inventario.c.cantidad_actual + bindparam("b_delta", type_=Numeric(10, 2)),
+        fecha_ultima_actualizacion=bindparam("b_fecha"),
+        version=_inventario.c.version + 1
+    )
+)
+
+# Modo delta: una sentencia por inventario que no deja el stock en negativo y
+# retorna el saldo nuevo (sin lectura previa)
+_RETURNING_UPDATE = (
+    _DELTA_UPDATE
+    .where(_inventario.c.cantidad_actual + bindparam("b_delta", type_=Numeric(10, 2)) >= 0)
+    .returning(_inventario.c.cantidad_actual)
+)
+
+# Modo optimista: solo se aplica si nadie cambió el inventario desde la lectura
+_VERSIONED_UPDATE = _DELTA_UPDATE.where(_inventario.c.version == bindparam("b_version"))
+
+_stats = {"conflictos": 0, "reintentos_agotados": 0}
+metrics.register("stock_updates", lambda: dict(_stats, modo=settings.STOCK_UPDATE_MODE))
+
+class _VersionConflict(Exception):
+    """
+    Otro documento modificó un inventario entre la lectura y la actualización
+    """
+
+def _retry_delay(attempt: int, conflict: _VersionConflict) -> float:
+    """
+    Espera antes del reintento `attempt` de un documento en conflicto; 409 si
+    se agotaron los reintentos
+    """
+    if attempt > settings.STOCK_OPTIMISTIC_RETRIES:
+        _stats["reintentos_agotados"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="El inventario fue modificado por otro movimiento, intente nuevamente"
+        ) from conflict
+    # Espera exponencial con jitter: los reintentos no vuelven a coincidir
+    return random.uniform(0, min(0.001 * 2 ** attempt, 0.1))
+
+class MovementService:
+    """
+    Registro de documentos de movimiento (ingresos y egresos de varias líneas).
+
+    Cada documento se registra en una sola transacción: cabecera y líneas de
+    detalle en bloque, y el cambio neto de cada inventario según el modo
+    (STOCK_UPDATE_MODE):
+
+    - bloqueo: SELECT ... FOR UPDATE de los inventarios en orden de id_inventario
+      (el mismo orden en todas las transacciones evita interbloqueos), UPDATE por
+      delta y Kardex con el saldo anterior y el nuevo.
+    - delta: sin lectura previa; un UPDATE ... RETURNING por inventario (en orden
+      de id) que suma el delta, rechaza el stock negativo y retorna el saldo nuevo.
+      El bloqueo de la fila dura solo desde la sentencia hasta el commit.
+    - optimista: lectura sin bloqueo y UPDATE condicionado a Inventario.version;
+      ante un conflicto el documento se reintenta con espera exponencial.
+    - diferido: para SKU muy concurridos. Los cambios se agregan a
+      inventario_delta (solo inserciones, sin tocar la fila de Inventario) y
+      StockFoldService los aplica por lotes a Inventario y Kardex. La validación
+      de stock de un egreso usa el saldo más los cambios pendientes sin bloquear,
+      por lo que egresos simultáneos pueden dejar el stock en negativo.
+    """
+
+    def __init__(self, db: Session, mode: Optional[str] = None):
+        self.db = db
+        self.mode = mode or settings.STOCK_UPDATE_MODE
+
+    def post_movement(
+        self,
+        data: movement_schemas.MovimientoCreate,
+        id_usuario: int
+    ) -> movement_schemas.MovimientoResponse:
+        """
+        Registra un documento de movimiento y actualiza el stock. Los reintentos
+        del modo optimista esperan con time.sleep: desde el event loop usar
+        post_movement_async.
+        """
+        attempt = 0
+        while True:
+            try:
+                return self.post_once(data, id_usuario)
+            except _VersionConflict as e:
+                attempt += 1
+                time.sleep(_retry_delay(attempt, e))
+
+    @staticmethod
+    async def post_movement_async(
+        db: Any,
+        data: movement_schemas.MovimientoCreate,
+        id_usuario: int,
+        mode: Optional[str] = None
+    ) -> movement_schemas.MovimientoResponse:
+        """
+        Igual que post_movement sobre la sesión de la petición (ver run_db), con
+        la espera entre reintentos fuera de la función síncrona: con una
+        AsyncSession, run_sync se ejecuta en el hilo del event loop.
+        """
+        attempt = 0
+        while True:
+            try:
+                return await run_db(db, lambda session: MovementService(session, mode).post_once(data, id_usuario))
+            except _VersionConflict as e:
+                attempt += 1
+                await asyncio.sleep(_retry_delay(attempt, e))
+
+    def post_once(
+        self,
+        data: movement_schemas.MovimientoCreate,
+        id_usuario: int
+    ) -> movement_schemas.MovimientoResponse:
+        """
+        Un intento de registro; ante un conflicto de versión (modo optimista)
+        deshace la transacción y lanza _VersionConflict para reintentar
+        """
+        sign = 1 if data.tipo_movimiento == INGRESO else -1
+        # Cambio neto por inventario (un inventario puede repetirse en el documento)
+        deltas: Dict[int, Decimal] = {}
+        for line in data.detalles:
+            deltas[line.id_inventario] = deltas.get(line.id_inventario, 0) + sign * line.cantidad
+
+        try:
+            now = datetime.utcnow()
+            id_movimiento = self._post(data, deltas, id_usuario, now)
+            self.db.commit()
+        except _VersionConflict:
+            self.db.rollback()
+            _stats["conflictos"] += 1
+            raise
+        except HTTPException:
+            self.db.rollback()
+            raise
+        except Exception as e:
+            self.db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error al registrar el movimiento"
+            ) from e
+
+        return movement_schemas.MovimientoResponse(
+            id_movimiento=id_movimiento,
+            tipo_movimiento=data.tipo_movimiento,
+            numero_documento=data.numero_documento,
+            fecha_movimiento=now,
+            lineas=len(data.detalles)
+        )
+
+    def _post(
+        self,
+        data: movement_schemas.MovimientoCreate,
+        deltas: Dict[int, Decimal],
+        id_usuario: int,
+        now: datetime
+    ) -> int:
+        self._validate_motivo(data.id_motivo, data.tipo_movimiento)
+        ids = sorted(deltas)
+        inventories = self.read_inventories(ids, lock=self.mode == STOCK_MODE_LOCK)
+        if self.mode == STOCK_MODE_DEFERRED:
+            balances = self._pending_balances(inventories)
+        else:
+            balances = {i: row.cantidad_actual or Decimal(0) for i, row in inventories.items()}
+        # En modo delta el stock lo valida el propio UPDATE
+        self._validate_lines(deltas, inventories, balances, data.id_sucursal,
+                             check_stock=self.mode != STOCK_MODE_DELTA)
+
+        id_movimiento = self._insert_document(data, inventories, id_usuario, now)
+
+        if self.mode == STOCK_MODE_DEFERRED:
+            self.db.execute(insert(InventarioDelta), self._ledger_rows(data, id_usuario, now))
+            return id_movimiento
+
+        if self.mode == STOCK_MODE_LOCK:
+            self.apply_deltas(deltas, now)
+        elif self.mode == STOCK_MODE_OPTIMISTIC:
+            self._apply_versioned(deltas, inventories, now)
+        else:
+            balances = self._apply_returning(deltas, now)
+        StockAggregateService.apply(self.db, deltas, inventories, now)
+        self.db.execute(insert(Kardex), kardex_rows(self._ledger_rows(data, id_usuario, now), balances))
+        evaluate_alerts(self.db, deltas, inventories, balances, now)
+        return id_movimiento
+
+    def _validate_motivo(self, id_motivo: int, tipo_movimiento: str) -> None:
+        motivo = self.db.execute(
+            select(MotivoMovimiento.tipo_movimiento, MotivoMovimiento.activo)
+            .where(MotivoMovimiento.id_motivo == id_motivo)
+        ).first()
+        if motivo is None or not motivo.activo:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="El motivo de movimiento no existe o está inactivo"
+            )
+        if motivo.tipo_movimiento != tipo_movimiento:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"El motivo no corresponde a un movimiento de tipo {tipo_movimiento}"
+            )
+
+    def read_inventories(self, ids: List[int], lock: bool = False) -> Dict[int, Row]:
+        """
+        Cantidad actual, versión, stock mínimo, producto y sucursal de los
+        inventarios. Con `lock` las filas se bloquean (SELECT ... FOR UPDATE) en
+        orden de id.
+        """
+        query = (
+            select(
+                Inventario.id_inventario, Inventario.cantidad_actual, Inventario.version,
+                Inventario.stock_minimo, Inventario.id_producto, Ubicacion.id_sucursal
+            )
+            .join(Ubicacion, Ubicacion.id_ubicacion == Inventario.id_ubicacion)
+            .where(Inventario.id_inventario.in_(ids))
+            .order_by(Inventario.id_inventario)
+        )
+        if lock:
+            query = query.with_for_update(of=Inventario)
+        return {row.id_inventario: row for row in self.db.execute(query)}
+
+    def _pending_balances(self, inventories: Dict[int, Row]) -> Dict[int, Decimal]:
+        """
+        Saldo de cada inventario más sus cambios diferidos aún no aplicados
+        """
+        balances = {i: row.cantidad_actual or Decimal(0) for i, row in inventories.items()}
+        signed = case(
+            (InventarioDelta.tipo_movimiento == INGRESO, InventarioDelta.cantidad),
+            else_=-InventarioDelta.cantidad
+        )
+        for id_inventario, pending in self.db.execute(
+            select(InventarioDelta.id_inventario, func.sum(signed))
+            .where(InventarioDelta.id_inventario.in_(list(inventories)))
+            .group_by(InventarioDelta.id_inventario)
+        ):
+            balances[id_inventario] += Decimal(pending or 0)
+        return balances
+
+    @staticmethod
+    def _validate_lines(
+        deltas: Dict[int, Decimal],
+        inventories: Dict[int, Row],
+        balances: Dict[int, Decimal],
+        id_sucursal: Optional[int],
+        check_stock: bool = True
+    ) -> None:
+        missing = [i for i in deltas if i not in inventories]
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Inventario no encontrado: {', '.join(map(str, sorted(missing)))}"
+            )
+        if id_sucursal is not None:
+            foreign = [i for i in deltas if inventories[i].id_sucursal != id_sucursal]
+            if foreign:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Inventarios de otra sucursal: {', '.join(map(str, sorted(foreign)))}"
+                )
+        if check_stock:
+            insufficient = [i for i, delta in deltas.items() if balances[i] + delta < 0]
+            if insufficient:
+                raise _insufficient_stock(insufficient)
+
+    def _insert_document(
+        self,
+        data: movement_schemas.MovimientoCreate,
+        inventories: Dict[int, Row],
+        id_usuario: int,
+        now: datetime
+    ) -> int:
+        id_sucursal = data.id_sucursal
+        sucursales = {row.id_sucursal for row in inventories.values()}
+        if id_sucursal is None and len(sucursales) == 1:
+            # Sin sucursal explícita: la de las ubicaciones, si es una sola
+            id_sucursal = sucursales.pop()
+
+        movimiento = Movimiento(
+            tipo_movimiento=data.tipo_movimiento,
+            id_motivo=data.id_motivo,
+            id_sucursal=id_sucursal,
+            numero_documento=data.numero_documento,
+            observacion=data.observacion,
+            id_usuario=id_usuario,
+            fecha_movimiento=now,
+            activo=True
+        )
+        self.db.add(movimiento)
+        self.db.flush()
+
+        self.db.execute(insert(MovimientoDetalle), [
+            {
+                "id_movimiento": movimiento.id_movimiento,
+                "id_inventario": line.id_inventario,
+                "cantidad": line.cantidad,
+            }
+            for line in data.detalles
+        ])
+        return movimiento.id_movimiento
+
+    def apply_deltas(self, deltas: Dict[int, Decimal], now: datetime) -> None:
+        """
+        Suma cada delta a Inventario.cantidad_actual (cantidad_actual = cantidad_actual + delta).
+        Las filas deben estar bloqueadas.
+        """
+        if self.db.get_bind().dialect.name == "postgresql":
+            # Una sola sentencia: UPDATE inventario ... FROM (VALUES ...)
+            delta = values(
+                column("id_inventario", Integer), column("delta", Numeric(10, 2)), name="delta"
+            ).data(list(deltas.items()))
+            self.db.execute(
+                update(_inventario)
+                .where(_inventario.c.id_inventario == delta.c.id_inventario)
+                .values(
+                    cantidad_actual=_inventario.c.cantidad_actual + delta.c.delta,
+                    fecha_ultima_actualizacion=now,
+                    version=_inventario.c.version + 1
+                )
+            )
+            return
+        self.db.execute(_DELTA_UPDATE, [
+            {"b_id": id_inventario, "b_delta": value, "b_fecha": now}
+            for id_inventario, value in deltas.items()
+        ])
+
+    def _apply_returning(self, deltas: Dict[int, Decimal], now: datetime) -> Dict[int, Decimal]:
+        """
+        Modo delta: aplica cada delta en orden de id y retorna el saldo anterior
+        de cada inventario (saldo nuevo retornado menos el delta)
+        """
+        balances = {}
+        insufficient = []
+        for id_inventario in sorted(deltas):
+            nueva = self.db.execute(
+                _RETURNING_UPDATE,
+                {"b_id": id_inventario, "b_delta": deltas[id_inventario], "b_fecha": now}
+            ).scalar()
+            if nueva is None:
+                insufficient.append(id_inventario)
+            else:
+                balances[id_inventario] = nueva - deltas[id_inventario]
+        if insufficient:
+            raise _insufficient_stock(insufficient)
+        return balances
+
+    def _apply_versioned(self, deltas: Dict[int, Decimal], inventories: Dict[int, Row], now: datetime) -> None:
+        for id_inventario in sorted(deltas):
+            result = self.db.execute(_VERSIONED_UPDATE, {
+                "b_id": id_inventario,
+                "b_delta": deltas[id_inventario],
+                "b_fecha": now,
+                "b_version": inventories[id_inventario].version,
+            })
+            if result.rowcount != 1:
+                raise _VersionConflict()
+
+    @staticmethod
+    def _ledger_rows(data: movement_schemas.MovimientoCreate, id_usuario: int, now: datetime) -> List[dict]:
+        # Una fila por línea, con los campos comunes a Kardex e InventarioDelta
+        return [
+            {
+                "id_inventario": line.id_inventario,
+                "tipo_movimiento": data.tipo_movimiento,
+                "id_motivo": data.id_motivo,
+                "cantidad": line.cantidad,
+                "observacion": data.observacion,
+                "numero_documento": data.numero_documento,
+                "id_usuario": id_usuario,
+                "fecha_movimiento": now,
+            }
+            for line in data.detalles
+        ]
+
+def kardex_rows(ledger: List[dict], balances: Dict[int, Decimal]) -> List[dict]:
+    """
+    Filas de Kardex para los movimientos de `ledger` (en orden) a partir del saldo
+    anterior de cada inventario; el saldo avanza fila a fila si un inventario se repite
+    """
+    running = dict(balances)
+    rows = []
+    for row in ledger:
+        anterior = running[row["id_inventario"]]
+        signed = row["cantidad"] if row["tipo_movimiento"] == INGRESO else -row["cantidad"]
+        nueva = anterior + signed
+        running[row["id_inventario"]] = nueva
+        rows.append(dict(row, cantidad_anterior=anterior, cantidad_nueva=nueva))
+    return rows
+
+def evaluate_alerts(
+    db: Session,
+    deltas: Dict[int, Decimal],
+    inventories: Dict[int, Row],
+    balances: Dict[int, Decimal],
+    now: datetime
+) -> None:
+    """
+    Evalúa las alertas de stock de los inventarios modificados a partir del saldo
+    anterior más el delta (sin volver a leer Inventario)
+    """
+    if not settings.STOCK_ALERTS_ENABLED:
+        return
+    StockAlertService(db, margin=settings.STOCK_ALERT_MARGIN).evaluate(
+        {i: (balances[i] + delta, inventories[i].stock_minimo) for i, delta in deltas.items()},
+        now
+    )
+
+def _insufficient_stock(ids: List[int]) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Stock insuficiente en los inventarios: {', '.join(map(str, sorted(ids)))}"
+    )
@@ -1,18 +1,35 @@
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
+from app.config.settings import settings
 from app.models.organization_models import Rol, Sucursal
+from app.utils.metrics import metrics
+from app.utils.orm_events import invalidate_on_commit
+from app.utils.reference_cache import ReferenceDataCache
 from typing import List
 
+# Nombres de los datos de referencia en caché
+REFERENCE_ROLES = "roles"
+REFERENCE_SUCURSALES = "sucursales"
+
+reference_cache = ReferenceDataCache(ttl_seconds=settings.REFERENCE_CACHE_TTL_SECONDS)
+metrics.register("reference_cache", reference_cache.stats)
+
 class OrganizationService:
     @staticmethod
-    def get_roles(db: Session) -> List[Rol]:
+    def get_roles(db: Session) -> List[Row]:
         """
-        Obtiene la lista de roles activos
+        Obtiene la lista de roles activos (filas con id_rol y nombre)
         """
-        return db.query(Rol).filter(Rol.activo == True).all()
+        return db.query(Rol.id_rol, Rol.nombre).filter(Rol.activo == True).all()
 
     @staticmethod
-    def get_sucursales(db: Session) -> List[Sucursal]:
+    def get_sucursales(db: Session) -> List[Row]:
         """
-        Obtiene la lista de sucursales activas
+        Obtiene la lista de sucursales activas (filas con id_sucursal y nombre)
         """
-        return db.query(Sucursal).filter(Sucursal.activo == True).all()
\ No newline at end of file
+        return db.query(Sucursal.id_sucursal, Sucursal.nombre).filter(Sucursal.activo == True).all()
+
+# Los cambios de Rol/Sucursal confirmados con el ORM invalidan su entrada; las
+# escrituras fuera del ORM deben llamar a reference_cache.invalidate()
+invalidate_on_commit(Rol, lambda: reference_cache.invalidate(REFERENCE_ROLES))
+invalidate_on_commit(Sucursal, lambda: reference_cache.invalidate(REFERENCE_SUCURSALES))
@@ -0,0 +1,120 @@
+import threading
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.config.settings import settings
+from app.models.organization_models import Permiso, Rol, rol_permiso
+from app.utils.metrics import metrics
+from app.utils.orm_events import invalidate_on_commit
+
+
+class PermissionSnapshot(NamedTuple):
+    """
+    Permisos compilados: un entero por rol con el bit `id_permiso` encendido por
+    cada permiso activo del rol, y la máscara de bits de cada módulo
+    """
+    role_bits: Dict[int, int]
+    module_bits: Dict[str, int]
+
+    def allows(self, bits: int, modulo: str) -> bool:
+        # Un módulo desconocido no autoriza a nadie
+        return bool(bits & self.module_bits.get(modulo, 0))
+
+
+def encode_bits(bits: int) -> str:
+    """
+    Representación compacta (hexadecimal) del bitset para el JWT
+    """
+    return format(bits, "x")
+
+
+def decode_bits(value: str) -> int:
+    return int(value, 16)
+
+
+class PermissionCache:
+    """
+    Bitsets de permisos por rol, compilados con una sola consulta y guardados en
+    memoria hasta `ttl_seconds` o hasta que se confirma un cambio de Rol o Permiso.
+    """
+
+    def __init__(self, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._snapshot: Optional[PermissionSnapshot] = None
+        self._loaded_at = 0.0
+        self._version = 0
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def current(self) -> Optional[PermissionSnapshot]:
+        """
+        Permisos compilados si siguen vigentes; None si hay que recargarlos
+        """
+        snapshot = self._snapshot
+        if snapshot is None or self._clock() - self._loaded_at >= self.ttl_seconds:
+            return None
+        return snapshot
+
+    def load(self, db: Session) -> PermissionSnapshot:
+        version = self._version
+        snapshot = PermissionService.compile(db)
+        with self._lock:
+            # Una invalidación durante la carga descarta el resultado para las
+            # siguientes peticiones (esta petición lo usa igualmente)
+            if version == self._version:
+                self._snapshot = snapshot
+                self._loaded_at = self._clock()
+            self.loads += 1
+        return snapshot
+
+    def get(self, db: Session) -> PermissionSnapshot:
+        return self.current() or self.load(db)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._snapshot = None
+            self._version += 1
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "roles": len(snapshot.role_bits) if snapshot else 0,
+            "modulos": len(snapshot.module_bits) if snapshot else 0,
+            "cargas": self.loads,
+        }
+
+
+class PermissionService:
+    @staticmethod
+    def compile(db: Session) -> PermissionSnapshot:
+        """
+        Compila los permisos activos de los roles activos en bitsets
+        """
+        role_bits: Dict[int, int] = {}
+        module_bits: Dict[str, int] = {}
+
+        for id_permiso, modulo in db.execute(
+            select(Permiso.id_permiso, Permiso.modulo).where(Permiso.activo == True)
+        ):
+            if modulo:
+                module_bits[modulo] = module_bits.get(modulo, 0) | (1 << id_permiso)
+
+        for id_rol, id_permiso in db.execute(
+            select(rol_permiso.c.id_rol, rol_permiso.c.id_permiso)
+            .join(Rol, Rol.id_rol == rol_permiso.c.id_rol)
+            .join(Permiso, Permiso.id_permiso == rol_permiso.c.id_permiso)
+            .where(Rol.activo == True, Permiso.activo == True)
+        ):
+            role_bits[id_rol] = role_bits.get(id_rol, 0) | (1 << id_permiso)
+
+        return PermissionSnapshot(role_bits, module_bits)
+
+
+permission_cache = PermissionCache(ttl_seconds=settings.RBAC_CACHE_TTL_SECONDS)
+metrics.register("permission_cache", permission_cache.stats)
+
+# Cambios de roles, permisos o de la asignación rol-permiso (colección Rol.permisos)
+invalidate_on_commit(Rol, permission_cache.invalidate)
+invalidate_on_commit(Permiso, permission_cache.invalidate)
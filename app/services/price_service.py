@@ -0,0 +1,227 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import and_, insert, or_, select, update
+from sqlalchemy.orm import Session
+from app.config.settings import settings
+from app.models.inventory_models import PrecioProducto, Producto
+from app.utils.metrics import metrics
+from app.utils.orm_events import invalidate_keys_after_commit, invalidate_keys_on_commit
+
+# Productos por consulta de resolución (límite de parámetros del motor)
+_RESOLVE_CHUNK = 5000
+
+# (precio, fin de vigencia o None si está abierto) por producto
+Effective = Tuple[Decimal, Optional[datetime]]
+
+
+class CurrentPriceCache:
+    """
+    Precio vigente por producto. Cada entrada vence a los `ttl_seconds`, al
+    terminar la vigencia del precio (fecha_fin) o cuando se invalida tras una
+    escritura; si se supera `max_entries` se descartan las menos usadas. Los
+    productos sin precio vigente no se guardan.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        # id_producto -> (precio, fin de vigencia, vencimiento)
+        self._entries: "OrderedDict[int, Tuple[Decimal, Optional[datetime], float]]" = OrderedDict()
+        # Descarta cargas iniciadas antes de una invalidación
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    @property
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def get_many(self, ids: Iterable[int], now: datetime) -> Tuple[Dict[int, Decimal], List[int]]:
+        """
+        Precios en caché vigentes a `now` y los productos que hay que cargar
+        """
+        found: Dict[int, Decimal] = {}
+        missing: List[int] = []
+        clock = self._clock()
+        with self._lock:
+            for id_producto in ids:
+                entry = self._entries.get(id_producto)
+                if entry is None or entry[2] <= clock or (entry[1] is not None and entry[1] <= now):
+                    missing.append(id_producto)
+                    continue
+                self._entries.move_to_end(id_producto)
+                found[id_producto] = entry[0]
+            self.hits += len(found)
+            self.misses += len(missing)
+        return found, missing
+
+    def put_many(self, prices: Dict[int, Effective], generation: int) -> None:
+        """
+        Guarda precios cargados; se descartan si hubo una invalidación desde
+        que se leyó `generation`
+        """
+        if not self.enabled:
+            return
+        expires_at = self._clock() + self.ttl_seconds
+        with self._lock:
+            if generation != self._generation:
+                return
+            for id_producto, (precio, fecha_fin) in prices.items():
+                self._entries[id_producto] = (precio, fecha_fin, expires_at)
+                self._entries.move_to_end(id_producto)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, ids: Optional[Iterable[int]] = None) -> None:
+        """
+        Invalida los productos indicados o, sin productos, toda la caché
+        """
+        with self._lock:
+            if ids is None:
+                self._entries.clear()
+            else:
+                for id_producto in ids:
+                    self._entries.pop(id_producto, None)
+            self._generation += 1
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entradas": len(self._entries),
+            "aciertos": self.hits,
+            "fallos": self.misses,
+            "invalidaciones": self.invalidations,
+        }
+
+
+price_cache = CurrentPriceCache(
+    ttl_seconds=settings.PRICE_CACHE_TTL_SECONDS,
+    max_entries=settings.PRICE_CACHE_MAX_ENTRIES
+)
+metrics.register("price_cache", price_cache.stats)
+
+# Precios insertados, cerrados o eliminados con el ORM; las escrituras fuera del
+# ORM pasan por PriceService.set_prices o deben llamar a price_cache.invalidate()
+invalidate_keys_on_commit(PrecioProducto, lambda precio: precio.id_producto, price_cache.invalidate)
+
+
+class PriceService:
+    """
+    Precios de PrecioProducto por intervalo de vigencia [fecha_inicio, fecha_fin).
+    Los intervalos de un producto no se superponen, de modo que a cada instante
+    hay a lo sumo un precio por producto.
+    """
+
+    @staticmethod
+    def resolve(db: Session, ids: Iterable[int], fecha: Optional[datetime] = None) -> Dict[int, Decimal]:
+        """
+        Precio de cada producto vigente a `fecha` (o ahora, desde la caché de
+        precios vigentes). Los productos sin precio a esa fecha no se incluyen.
+        """
+        ids = sorted(set(ids))
+        if fecha is not None or not price_cache.enabled:
+            effective = _effective(db, ids, fecha or datetime.utcnow())
+            return {id_producto: precio for id_producto, (precio, _) in effective.items()}
+
+        now = datetime.utcnow()
+        found, missing = price_cache.get_many(ids, now)
+        if missing:
+            generation = price_cache.generation
+            effective = _effective(db, missing, now)
+            price_cache.put_many(effective, generation)
+            found.update((id_producto, precio) for id_producto, (precio, _) in effective.items())
+        return found
+
+    @staticmethod
+    def conflicts(db: Session, ids: Iterable[int], desde: datetime) -> Set[int]:
+        """
+        Productos cuyo historial se superpone con un precio nuevo desde `desde`:
+        tienen un precio que empieza en `desde` o después, o uno ya cerrado
+        después de `desde`. El precio abierto anterior no cuenta: se cierra.
+        """
+        ids = sorted(set(ids))
+        if not ids:
+            return set()
+        return set(db.scalars(
+            select(PrecioProducto.id_producto).distinct().where(
+                PrecioProducto.id_producto.in_(ids),
+                or_(
+                    PrecioProducto.fecha_inicio >= desde,
+                    and_(PrecioProducto.fecha_fin.is_not(None), PrecioProducto.fecha_fin > desde)
+                )
+            )
+        ))
+
+    @staticmethod
+    def set_prices(db: Session, prices: Dict[int, Decimal], desde: datetime) -> Set[int]:
+        """
+        Cierra en `desde` el precio abierto de cada producto e inserta el nuevo
+        precio vigente desde `desde`. Los productos en conflicto (ver conflicts)
+        se rechazan y se retornan sin cambios. No confirma la transacción; la
+        caché de precios vigentes se invalida al confirmarla.
+        """
+        if not prices:
+            return set()
+        ids = sorted(prices)
+        # Serializa los cambios de precio de un mismo producto: la lectura
+        # siguiente ya ve el precio abierto que otra transacción acaba de insertar
+        db.execute(
+            select(Producto.id_producto).where(Producto.id_producto.in_(ids))
+            .order_by(Producto.id_producto).with_for_update()
+        )
+        rejected = PriceService.conflicts(db, ids, desde)
+        accepted = [id_producto for id_producto in ids if id_producto not in rejected]
+        if not accepted:
+            return rejected
+
+        db.execute(
+            update(PrecioProducto)
+            .where(PrecioProducto.id_producto.in_(accepted), PrecioProducto.fecha_fin.is_(None))
+            .values(fecha_fin=desde)
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(insert(PrecioProducto), [
+            {"id_producto": id_producto, "precio": prices[id_producto], "fecha_inicio": desde}
+            for id_producto in accepted
+        ])
+        invalidate_keys_after_commit(db, price_cache.invalidate, accepted)
+        return rejected
+
+
+def _effective(db: Session, ids: List[int], fecha: datetime) -> Dict[int, Effective]:
+    """
+    Precio vigente a `fecha` y fin de su vigencia: una consulta por cada
+    _RESOLVE_CHUNK productos sobre ix_precio_producto_vigencia
+    """
+    effective: Dict[int, Effective] = {}
+    for offset in range(0, len(ids), _RESOLVE_CHUNK):
+        rows = db.execute(
+            select(PrecioProducto.id_producto, PrecioProducto.precio, PrecioProducto.fecha_fin)
+            .where(
+                PrecioProducto.id_producto.in_(ids[offset:offset + _RESOLVE_CHUNK]),
+                PrecioProducto.fecha_inicio <= fecha,
+                or_(PrecioProducto.fecha_fin.is_(None), PrecioProducto.fecha_fin > fecha)
+            )
+        )
+        for id_producto, precio, fecha_fin in rows:
+            effective[id_producto] = (precio, _naive_utc(fecha_fin))
+    return effective
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Comparable con datetime.utcnow() aunque el motor retorne fechas con zona
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from app.config.database import SessionLocal
+from app.models.auth_models import SesionUsuario
+from app.utils.auth import claims_cache, session_state
+from app.utils.session_state import naive_utc
+
+logger = logging.getLogger(__name__)
+
+class SessionFeedService:
+    """
+    Feed de revocaciones: lee periódicamente las sesiones desactivadas en
+    sesion_usuario (por fecha_revocacion) y las aplica al estado en memoria del
+    worker, para que un logout hecho en otro worker también se respete aquí.
+    """
+
+    def __init__(self, batch_size: int = 1000, overlap: timedelta = timedelta(seconds=30)):
+        self.batch_size = batch_size
+        # Margen de relectura para tolerar diferencias de reloj entre workers
+        self.overlap = overlap
+        self._cursor = datetime.utcnow() - overlap
+        self.applied = 0
+
+    def poll(self, db: Session) -> int:
+        """
+        Aplica las revocaciones nuevas desde la última lectura. Retorna cuántas leyó.
+        """
+        since = self._cursor - self.overlap
+        last_ts: Optional[datetime] = None
+        last_id: Optional[UUID] = None
+        read = 0
+
+        while True:
+            query = db.query(
+                SesionUsuario.id_sesion,
+                SesionUsuario.token_digest,
+                SesionUsuario.fecha_expiracion,
+                SesionUsuario.fecha_revocacion
+            ).filter(SesionUsuario.fecha_revocacion > since)
+            if last_ts is not None:
+                query = query.filter(or_(
+                    SesionUsuario.fecha_revocacion > last_ts,
+                    and_(SesionUsuario.fecha_revocacion == last_ts, SesionUsuario.id_sesion > last_id)
+                ))
+            rows = query.order_by(
+                SesionUsuario.fecha_revocacion, SesionUsuario.id_sesion
+            ).limit(self.batch_size).all()
+
+            for id_sesion, digest, fecha_expiracion, fecha_revocacion in rows:
+                session_state.revoke(digest, fecha_expiracion)
+                claims_cache.invalidate(digest)
+                last_ts, last_id = fecha_revocacion, id_sesion
+
+            read += len(rows)
+            if len(rows) < self.batch_size:
+                break
+
+        if last_ts is not None:
+            self._cursor = max(self._cursor, naive_utc(last_ts))
+        session_state.prune()
+        self.applied += read
+        return read
+
+    def poll_once(self) -> int:
+        db = SessionLocal()
+        try:
+            return self.poll(db)
+        finally:
+            db.close()
+
+    async def run(self, interval: float) -> None:
+        """
+        Bucle del feed; se ejecuta como tarea de fondo durante la vida de la aplicación
+        """
+        while True:
+            try:
+                await asyncio.to_thread(self.poll_once)
+            except Exception:
+                logger.exception("Error al sincronizar las revocaciones de sesión")
+            await asyncio.sleep(interval)
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from sqlalchemy import and_, delete, func, insert, or_, select
+from sqlalchemy.orm import Session
+from app.config.database import SessionLocal
+from app.config.settings import settings
+from app.models.auth_models import SesionUsuario, SesionUsuarioArchivo
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Columnas copiadas al archivo
+_ARCHIVED_COLUMNS = [
+    "id_sesion", "id_usuario", "token_digest", "fecha_inicio",
+    "fecha_expiracion", "fecha_revocacion", "activa",
+]
+
+_last_run: Dict[str, Any] = {}
+metrics.register("session_purge", lambda: dict(_last_run))
+
+class SessionPurgeService:
+    @staticmethod
+    def purge(
+        db: Session,
+        retention_days: int,
+        batch_size: int = 1000,
+        pause_seconds: float = 0.0,
+        archive: bool = False,
+        max_batches: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Elimina (o archiva) en lotes pequeños las sesiones vencidas o cerradas hace
+        más de `retention_days` días. Cada lote se confirma por separado y entre
+        lotes se hace una pausa, para no retener bloqueos sobre sesion_usuario.
+
+        Returns:
+            dict: Lotes y filas procesadas en esta ejecución
+        """
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        condition = or_(
+            SesionUsuario.fecha_expiracion < cutoff,
+            and_(
+                SesionUsuario.activa.is_(False),
+                func.coalesce(SesionUsuario.fecha_revocacion, SesionUsuario.fecha_inicio) < cutoff
+            )
+        )
+
+        started = time.perf_counter()
+        batches = 0
+        deleted = 0
+        archived = 0
+
+        while max_batches is None or batches < max_batches:
+            # SKIP LOCKED: varios workers pueden ejecutar la purga sin esperarse
+            ids = [row[0] for row in db.execute(
+                select(SesionUsuario.id_sesion)
+                .where(condition)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )]
+            if not ids:
+                break
+
+            try:
+                if archive:
+                    source = select(
+                        *[getattr(SesionUsuario, name) for name in _ARCHIVED_COLUMNS]
+                    ).where(SesionUsuario.id_sesion.in_(ids))
+                    db.execute(insert(SesionUsuarioArchivo).from_select(_ARCHIVED_COLUMNS, source))
+                    archived += len(ids)
+                deleted += db.execute(
+                    delete(SesionUsuario)
+                    .where(SesionUsuario.id_sesion.in_(ids))
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+            batches += 1
+            if len(ids) < batch_size:
+                break
+            if pause_seconds > 0:
+                time.sleep(pause_seconds)
+
+        result = {
+            "fecha": datetime.utcnow().isoformat(),
+            "lotes": batches,
+            "eliminadas": deleted,
+            "archivadas": archived,
+            "duracion_s": round(time.perf_counter() - started, 3),
+        }
+        _last_run.clear()
+        _last_run.update(result)
+        return result
+
+    @staticmethod
+    def purge_with_settings() -> Dict[str, Any]:
+        db = SessionLocal()
+        try:
+            return SessionPurgeService.purge(
+                db,
+                retention_days=settings.SESSION_RETENTION_DAYS,
+                batch_size=settings.SESSION_PURGE_BATCH_SIZE,
+                pause_seconds=settings.SESSION_PURGE_PAUSE_SECONDS,
+                archive=settings.SESSION_PURGE_ARCHIVE
+            )
+        finally:
+            db.close()
+
+    @staticmethod
+    async def run(interval_minutes: float) -> None:
+        """
+        Purga periódica; se ejecuta como tarea de fondo durante la vida de la aplicación
+        """
+        while True:
+            try:
+                result = await asyncio.to_thread(SessionPurgeService.purge_with_settings)
+                logger.info("Purga de sesiones: %s", result)
+            except Exception:
+                logger.exception("Error al purgar sesiones")
+            await asyncio.sleep(interval_minutes * 60)
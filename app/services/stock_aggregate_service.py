@@ -0,0 +1,165 @@
+import time
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import Row, bindparam, delete, func, insert, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models.inventory_models import Inventario, StockSucursal, Ubicacion
+from app.utils.metrics import metrics
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+_stock_sucursal = StockSucursal.__table__
+
+# Suma por clave existente, para executemany (motores sin ON CONFLICT)
+_ADD_UPDATE = (
+    update(_stock_sucursal)
+    .where(
+        _stock_sucursal.c.id_sucursal == bindparam("b_sucursal"),
+        _stock_sucursal.c.id_producto == bindparam("b_producto")
+    )
+    .values(
+        cantidad=_stock_sucursal.c.cantidad + bindparam("b_delta", type_=_stock_sucursal.c.cantidad.type),
+        fecha_actualizacion=bindparam("b_fecha")
+    )
+)
+
+_last_reconcile: Dict[str, Any] = {}
+metrics.register("stock_sucursal", lambda: dict(_last_reconcile))
+
+Key = Tuple[int, int]
+
+class StockAggregateService:
+    """
+    Stock por (id_sucursal, id_producto) en stock_sucursal. Cada cambio de stock
+    suma su delta en la misma transacción que la actualización de Inventario, de
+    modo que la consulta por sucursal es una lectura por clave primaria en lugar
+    de un SUM sobre las ubicaciones.
+    """
+
+    @staticmethod
+    def apply(db: Session, deltas: Dict[int, Decimal], inventories: Dict[int, Row], now: datetime) -> None:
+        """
+        Suma los deltas de inventario al total de su sucursal y producto.
+        `inventories` debe traer id_sucursal e id_producto (MovementService.read_inventories).
+        """
+        totals: Dict[Key, Decimal] = {}
+        for id_inventario, delta in deltas.items():
+            row = inventories[id_inventario]
+            key = (row.id_sucursal, row.id_producto)
+            totals[key] = totals.get(key, 0) + delta
+        # Orden fijo de claves: dos transacciones no se bloquean en orden inverso
+        keys = sorted(key for key, delta in totals.items() if delta)
+        if not keys:
+            return
+
+        dialect_insert = _INSERTS.get(db.get_bind().dialect.name)
+        if dialect_insert is None:
+            _apply_portable(db, [(key, totals[key]) for key in keys], now)
+            return
+
+        statement = dialect_insert(StockSucursal).values([
+            {"id_sucursal": s, "id_producto": p, "cantidad": totals[(s, p)], "fecha_actualizacion": now}
+            for s, p in keys
+        ])
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[StockSucursal.id_sucursal, StockSucursal.id_producto],
+            set_={
+                "cantidad": StockSucursal.cantidad + statement.excluded.cantidad,
+                "fecha_actualizacion": statement.excluded.fecha_actualizacion,
+            }
+        ))
+
+    @staticmethod
+    def get(db: Session, id_sucursal: int, id_producto: int) -> Decimal:
+        """
+        Stock total del producto en la sucursal (0 si nunca tuvo stock)
+        """
+        stock = db.get(StockSucursal, (id_sucursal, id_producto))
+        return stock.cantidad if stock is not None else Decimal(0)
+
+    @staticmethod
+    def by_sucursal(db: Session, id_sucursal: int, ids_producto: Optional[Iterable[int]] = None) -> Dict[int, Decimal]:
+        """
+        Stock total por producto en la sucursal, opcionalmente solo de `ids_producto`
+        """
+        statement = select(StockSucursal.id_producto, StockSucursal.cantidad).where(
+            StockSucursal.id_sucursal == id_sucursal
+        )
+        if ids_producto is not None:
+            statement = statement.where(StockSucursal.id_producto.in_(list(ids_producto)))
+        return {id_producto: cantidad for id_producto, cantidad in db.execute(statement)}
+
+    @staticmethod
+    def reconcile(db: Session) -> Dict[str, Any]:
+        """
+        Reconstruye stock_sucursal desde Inventario (corrige diferencias por
+        cambios hechos fuera de la aplicación). En PostgreSQL la tabla se bloquea
+        en modo EXCLUSIVE: los movimientos en curso esperan y suman su delta sobre
+        el total reconstruido.
+
+        Returns:
+            dict: Filas reconstruidas y filas que diferían del cálculo
+        """
+        started = time.perf_counter()
+        try:
+            if db.get_bind().dialect.name == "postgresql":
+                db.execute(text("LOCK TABLE stock_sucursal IN EXCLUSIVE MODE"))
+            current = {(row.id_sucursal, row.id_producto): row.cantidad for row in db.execute(
+                select(StockSucursal.id_sucursal, StockSucursal.id_producto, StockSucursal.cantidad)
+            )}
+            now = datetime.utcnow()
+            rebuilt = [
+                {"id_sucursal": row.id_sucursal, "id_producto": row.id_producto,
+                 "cantidad": row.cantidad or Decimal(0), "fecha_actualizacion": now}
+                for row in db.execute(
+                    select(Ubicacion.id_sucursal, Inventario.id_producto, func.sum(Inventario.cantidad_actual).label("cantidad"))
+                    .join(Ubicacion, Ubicacion.id_ubicacion == Inventario.id_ubicacion)
+                    .group_by(Ubicacion.id_sucursal, Inventario.id_producto)
+                )
+            ]
+            differences = sum(
+                1 for row in rebuilt
+                if current.pop((row["id_sucursal"], row["id_producto"]), None) != row["cantidad"]
+            ) + sum(1 for cantidad in current.values() if cantidad)
+
+            db.execute(delete(StockSucursal))
+            if rebuilt:
+                db.execute(insert(StockSucursal), rebuilt)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        result = {
+            "fecha": datetime.utcnow().isoformat(),
+            "filas": len(rebuilt),
+            "diferencias": differences,
+            "duracion_s": round(time.perf_counter() - started, 3),
+        }
+        _last_reconcile.clear()
+        _last_reconcile.update(result)
+        return result
+
+
+def _apply_portable(db: Session, totals: List[Tuple[Key, Decimal]], now: datetime) -> None:
+    """
+    Sin ON CONFLICT (otros motores): UPDATE por clave (executemany) e INSERT de
+    las claves que aún no existen
+    """
+    db.execute(_ADD_UPDATE, [
+        {"b_sucursal": s, "b_producto": p, "b_delta": delta, "b_fecha": now}
+        for (s, p), delta in totals
+    ])
+    existing = set(db.execute(
+        select(StockSucursal.id_sucursal, StockSucursal.id_producto)
+        .where(StockSucursal.id_sucursal.in_(sorted({s for (s, _), _ in totals})))
+        .where(StockSucursal.id_producto.in_(sorted({p for (_, p), _ in totals})))
+    ).tuples())
+    new_rows = [
+        {"id_sucursal": s, "id_producto": p, "cantidad": delta, "fecha_actualizacion": now}
+        for (s, p), delta in totals if (s, p) not in existing
+    ]
+    if new_rows:
+        db.execute(insert(StockSucursal), new_rows)
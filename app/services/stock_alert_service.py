@@ -0,0 +1,146 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models.inventory_models import AlertaStock, Inventario, Producto, Ubicacion
+from app.utils.metrics import metrics
+
+ESTADO_STOCK_MINIMO = "stock_minimo"
+ESTADO_STOCK_BAJO = "stock_bajo"
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+_alerta = AlertaStock.__table__
+_OPEN = _alerta.c.fecha_resolucion.is_(None)
+
+# Cambio de estado o de cantidad de una alerta abierta, para executemany
+_ALERT_UPDATE = (
+    update(_alerta)
+    .where(_alerta.c.id_alerta == bindparam("b_id"))
+    .values(estado=bindparam("b_estado"), cantidad_actual=bindparam("b_cantidad"))
+)
+
+_stats = {"evaluados": 0, "creadas": 0, "actualizadas": 0, "resueltas": 0}
+metrics.register("stock_alerts", lambda: dict(_stats))
+
+# (cantidad actual, stock mínimo) por inventario
+Level = Tuple[Decimal, Optional[Decimal]]
+
+class StockAlertService:
+    """
+    Alertas de stock (AlertaStock) evaluadas en cada cambio de stock, solo para
+    los inventarios modificados y en la misma transacción:
+
+    - stock_minimo: cantidad_actual <= stock_minimo
+    - stock_bajo: cantidad_actual <= stock_minimo * (1 + margen), aviso previo
+      al mínimo (desactivado con margen 0)
+
+    Cada inventario tiene a lo sumo una alerta abierta (fecha_resolucion nula,
+    con índice único parcial): si el nivel cambia se actualiza su estado y si el
+    stock se recupera se resuelve. Los inventarios con stock_minimo 0 o nulo no
+    generan alertas.
+    """
+
+    def __init__(self, db: Session, margin: float = 0.2):
+        self.db = db
+        self.margin = Decimal(str(margin))
+
+    def state_for(self, cantidad: Decimal, stock_minimo: Optional[Decimal]) -> Optional[str]:
+        if not stock_minimo or stock_minimo <= 0:
+            return None
+        if cantidad <= stock_minimo:
+            return ESTADO_STOCK_MINIMO
+        if self.margin > 0 and cantidad <= stock_minimo * (1 + self.margin):
+            return ESTADO_STOCK_BAJO
+        return None
+
+    def evaluate(self, levels: Dict[int, Level], now: datetime) -> Dict[str, int]:
+        """
+        Abre, actualiza o resuelve las alertas de los inventarios de `levels`
+        según su nuevo saldo. Las inserciones y actualizaciones van en bloque.
+        """
+        if not levels:
+            return {"creadas": 0, "actualizadas": 0, "resueltas": 0}
+
+        open_alerts = {
+            row.id_inventario: row
+            for row in self.db.execute(
+                select(_alerta.c.id_alerta, _alerta.c.id_inventario, _alerta.c.estado, _alerta.c.cantidad_actual)
+                .where(_alerta.c.id_inventario.in_(sorted(levels)), _OPEN)
+            )
+        }
+
+        new_alerts: List[Dict[str, Any]] = []
+        changed: List[Dict[str, Any]] = []
+        resolved: List[int] = []
+        for id_inventario in sorted(levels):
+            cantidad, stock_minimo = levels[id_inventario]
+            estado = self.state_for(cantidad, stock_minimo)
+            alert = open_alerts.get(id_inventario)
+            if alert is None:
+                if estado is not None:
+                    new_alerts.append({
+                        "id_inventario": id_inventario, "fecha_alerta": now, "cantidad_actual": cantidad,
+                        "estado": estado, "observacion": f"Stock {cantidad} (mínimo {stock_minimo})",
+                    })
+            elif estado is None:
+                resolved.append(alert.id_alerta)
+            elif estado != alert.estado or cantidad != alert.cantidad_actual:
+                changed.append({"b_id": alert.id_alerta, "b_estado": estado, "b_cantidad": cantidad})
+
+        if new_alerts:
+            self._insert(new_alerts)
+        if changed:
+            self.db.execute(_ALERT_UPDATE, changed)
+        if resolved:
+            self.db.execute(
+                update(_alerta).where(_alerta.c.id_alerta.in_(resolved)).values(fecha_resolucion=now)
+            )
+
+        _stats["evaluados"] += len(levels)
+        _stats["creadas"] += len(new_alerts)
+        _stats["actualizadas"] += len(changed)
+        _stats["resueltas"] += len(resolved)
+        return {"creadas": len(new_alerts), "actualizadas": len(changed), "resueltas": len(resolved)}
+
+    def _insert(self, rows: List[Dict[str, Any]]) -> None:
+        dialect_insert = _INSERTS.get(self.db.get_bind().dialect.name)
+        if dialect_insert is None:
+            self.db.execute(insert(AlertaStock), rows)
+            return
+        # Respaldo del índice único parcial ante una alerta abierta por otra transacción
+        self.db.execute(
+            dialect_insert(AlertaStock).values(rows).on_conflict_do_nothing(
+                index_elements=[AlertaStock.id_inventario], index_where=_OPEN
+            )
+        )
+
+    @staticmethod
+    def open_by_sucursal(db: Session, id_sucursal: int, limit: int = 500) -> List[Dict[str, Any]]:
+        """
+        Alertas abiertas de la sucursal, las más críticas (stock_minimo) y
+        antiguas primero
+        """
+        rows = db.execute(
+            select(
+                AlertaStock.id_alerta,
+                AlertaStock.id_inventario,
+                Inventario.id_producto,
+                Producto.codigo_producto,
+                Producto.nombre.label("producto"),
+                Ubicacion.codigo_ubicacion,
+                AlertaStock.cantidad_actual,
+                Inventario.stock_minimo,
+                AlertaStock.estado,
+                AlertaStock.fecha_alerta,
+            )
+            .join(Inventario, Inventario.id_inventario == AlertaStock.id_inventario)
+            .join(Ubicacion, Ubicacion.id_ubicacion == Inventario.id_ubicacion)
+            .join(Producto, Producto.id_producto == Inventario.id_producto)
+            .where(AlertaStock.fecha_resolucion.is_(None), Ubicacion.id_sucursal == id_sucursal)
+            .order_by((AlertaStock.estado == ESTADO_STOCK_MINIMO).desc(), AlertaStock.fecha_alerta, AlertaStock.id_alerta)
+            .limit(limit)
+        )
+        return [row._asdict() for row in rows]
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+from app.config.database import SessionLocal
+from app.config.settings import settings
+from app.models.inventory_models import InventarioDelta, Kardex
+from app.services.movement_service import INGRESO, MovementService, evaluate_alerts, kardex_rows
+from app.services.stock_aggregate_service import StockAggregateService
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_DELTA_COLUMNS = [
+    "id_inventario", "tipo_movimiento", "id_motivo", "cantidad",
+    "observacion", "numero_documento", "id_usuario", "fecha_movimiento",
+]
+
+_last_run: Dict[str, Any] = {}
+metrics.register("stock_fold", lambda: dict(_last_run))
+
+class StockFoldService:
+    @staticmethod
+    def fold(db: Session, batch_size: int = 5000) -> Dict[str, Any]:
+        """
+        Aplica a Inventario y Kardex los cambios diferidos de inventario_delta
+        (modo de actualización diferido), en lotes y en orden de llegada.
+
+        Por cada lote: bloquea los inventarios afectados en orden de id, escribe
+        una fila de Kardex por cambio con el saldo anterior y el nuevo, suma el
+        neto de cada inventario con un UPDATE por delta (y a stock_sucursal),
+        evalúa sus alertas de stock y elimina los cambios aplicados; todo en una
+        transacción.
+
+        Returns:
+            dict: Lotes y cambios aplicados en esta ejecución
+        """
+        started = time.perf_counter()
+        batches = 0
+        folded = 0
+        service = MovementService(db)
+        columns = [getattr(InventarioDelta, name) for name in _DELTA_COLUMNS]
+
+        while True:
+            # SKIP LOCKED: varios workers pueden aplicar lotes distintos a la vez
+            pending = db.execute(
+                select(InventarioDelta.id_delta, *columns)
+                .order_by(InventarioDelta.id_delta)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not pending:
+                break
+
+            try:
+                ledger = [{name: getattr(row, name) for name in _DELTA_COLUMNS} for row in pending]
+                deltas: Dict[int, Decimal] = {}
+                for row in ledger:
+                    signed = row["cantidad"] if row["tipo_movimiento"] == INGRESO else -row["cantidad"]
+                    deltas[row["id_inventario"]] = deltas.get(row["id_inventario"], 0) + signed
+
+                inventories = service.read_inventories(sorted(deltas), lock=True)
+                balances = {i: row.cantidad_actual or Decimal(0) for i, row in inventories.items()}
+                db.execute(insert(Kardex), kardex_rows(ledger, balances))
+                now = datetime.utcnow()
+                service.apply_deltas(deltas, now)
+                StockAggregateService.apply(db, deltas, inventories, now)
+                evaluate_alerts(db, deltas, inventories, balances, now)
+                db.execute(
+                    delete(InventarioDelta)
+                    .where(InventarioDelta.id_delta.in_([row.id_delta for row in pending]))
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+            batches += 1
+            folded += len(pending)
+            if len(pending) < batch_size:
+                break
+
+        result = {
+            "fecha": datetime.utcnow().isoformat(),
+            "lotes": batches,
+            "aplicados": folded,
+            "duracion_s": round(time.perf_counter() - started, 3),
+        }
+        _last_run.clear()
+        _last_run.update(result)
+        return result
+
+    @staticmethod
+    def fold_with_settings() -> Dict[str, Any]:
+        db = SessionLocal()
+        try:
+            return StockFoldService.fold(db, batch_size=settings.STOCK_FOLD_BATCH_SIZE)
+        finally:
+            db.close()
+
+    @staticmethod
+    async def run(interval_seconds: float) -> None:
+        """
+        Aplicación periódica de los cambios diferidos; se ejecuta como tarea de
+        fondo durante la vida de la aplicación
+        """
+        while True:
+            try:
+                result = await asyncio.to_thread(StockFoldService.fold_with_settings)
+                if result["aplicados"]:
+                    logger.info("Cambios de stock diferidos aplicados: %s", result)
+            except Exception:
+                logger.exception("Error al aplicar los cambios de stock diferidos")
+            await asyncio.sleep(interval_seconds)
@@ -0,0 +1,225 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+from app.config.settings import settings
+from app.models.auth_models import Usuario
+from app.utils.metrics import metrics
+from app.utils.ngram_index import NGramIndex, normalize_text
+
+
+def escape_like(term: str) -> str:
+    """
+    Escapa los comodines de LIKE para buscar el término literal
+    """
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class UserSearchIndex:
+    """
+    Índice de n-gramas en memoria sobre nombre, apellido y email de los usuarios.
+
+    Se usa cuando la base de datos no tiene índices trigram (SQLite). Se construye
+    en la primera búsqueda, se actualiza con las escrituras de UserService en este
+    proceso y se reconstruye cada `refresh_seconds` para recoger cambios externos;
+    durante la reconstrucción se sigue respondiendo con el índice anterior.
+
+    Los últimos resultados se guardan por (término, activo): la página y el total
+    de una misma búsqueda se calculan una sola vez.
+    """
+
+    def __init__(self, refresh_seconds: float, max_cached_results: int = 32):
+        self.refresh_seconds = refresh_seconds
+        self.max_cached_results = max_cached_results
+        self._index = NGramIndex(n=3)
+        self._activo: Dict[int, bool] = {}
+        self._results: "OrderedDict[Tuple[str, Optional[bool]], List[int]]" = OrderedDict()
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        # Escrituras ocurridas mientras se reconstruye el índice
+        self._pending: Optional[List[Tuple[int, Tuple[str, str, str], bool]]] = None
+        self.builds = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and (
+            self.refresh_seconds <= 0 or time.monotonic() - self._loaded_at < self.refresh_seconds
+        )
+
+    def ensure_loaded(self, db: Session) -> None:
+        if self._is_fresh():
+            return
+        # Si ya hay un índice, otra petición puede estar reconstruyéndolo: no esperar
+        if not self._build_lock.acquire(blocking=not self.loaded):
+            return
+        try:
+            if self._is_fresh():
+                return
+            with self._lock:
+                self._pending = []
+
+            index = NGramIndex(n=3)
+            activo = {}
+            rows = db.execute(
+                select(Usuario.id_usuario, Usuario.nombre, Usuario.apellido, Usuario.email, Usuario.activo)
+                .execution_options(yield_per=5000)
+            )
+            for id_usuario, nombre, apellido, email, is_active in rows:
+                index.add(id_usuario, (nombre, apellido, email))
+                activo[id_usuario] = bool(is_active)
+
+            with self._lock:
+                for id_usuario, fields, is_active in self._pending:
+                    index.add(id_usuario, fields)
+                    activo[id_usuario] = is_active
+                self._pending = None
+                self._index, self._activo = index, activo
+                self._results.clear()
+                self._loaded_at = time.monotonic()
+                self.builds += 1
+        finally:
+            self._build_lock.release()
+
+    def upsert(self, user: Usuario) -> None:
+        """
+        Refleja un usuario creado o modificado (solo si el índice ya fue construido
+        o se está construyendo)
+        """
+        fields = (user.nombre, user.apellido, user.email)
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((user.id_usuario, fields, bool(user.activo)))
+            if self._loaded_at is None:
+                return
+            self._index.add(user.id_usuario, fields)
+            self._activo[user.id_usuario] = bool(user.activo)
+            self._results.clear()
+
+    def search(self, term: str, activo: Optional[bool] = None) -> List[int]:
+        """
+        Ids de los usuarios que coinciden, ordenados por relevancia
+        """
+        key = (normalize_text(term).strip(), activo)
+        predicate = None
+        if activo is not None:
+            predicate = lambda id_usuario: self._activo.get(id_usuario) == activo
+        with self._lock:
+            ids = self._results.get(key)
+            if ids is None:
+                ids = [id_usuario for id_usuario, _ in self._index.search(term, predicate)]
+                self._results[key] = ids
+                while len(self._results) > self.max_cached_results:
+                    self._results.popitem(last=False)
+            self._results.move_to_end(key)
+            return ids
+
+    def clear(self) -> None:
+        with self._lock:
+            self._index = NGramIndex(n=3)
+            self._activo = {}
+            self._results.clear()
+            self._loaded_at = None
+
+    def stats(self) -> Dict[str, object]:
+        return dict(self._index.stats(), construcciones=self.builds, cargado=self.loaded)
+
+
+user_search_index = UserSearchIndex(settings.USER_SEARCH_INDEX_REFRESH_SECONDS)
+metrics.register("user_search_index", user_search_index.stats)
+
+
+class UserSearchService:
+    """
+    Búsqueda de usuarios por subcadena en nombre, apellido o email, con resultados
+    ordenados por relevancia.
+
+    - PostgreSQL: ILIKE sobre índices GIN pg_trgm y orden por similarity().
+    - Otros motores: índice de n-gramas en memoria (UserSearchIndex).
+    """
+
+    @staticmethod
+    def _uses_trigram(db: Session) -> bool:
+        return db.get_bind().dialect.name == "postgresql"
+
+    @staticmethod
+    def _sql_condition(term: str, activo: Optional[bool]):
+        pattern = f"%{escape_like(term)}%"
+        conditions = [or_(
+            Usuario.nombre.ilike(pattern, escape="\\"),
+            Usuario.apellido.ilike(pattern, escape="\\"),
+            Usuario.email.ilike(pattern, escape="\\")
+        )]
+        if activo is not None:
+            conditions.append(Usuario.activo == activo)
+        return conditions
+
+    @staticmethod
+    def search(
+        db: Session,
+        term: str,
+        activo: Optional[bool] = None,
+        offset: int = 0,
+        limit: int = 10
+    ) -> List[int]:
+        """
+        Ids de una página de resultados, ordenados por relevancia
+        """
+        if not UserSearchService._uses_trigram(db):
+            user_search_index.ensure_loaded(db)
+            return user_search_index.search(term, activo)[offset:offset + limit]
+
+        rank = func.greatest(
+            func.similarity(Usuario.nombre, term),
+            func.similarity(Usuario.apellido, term),
+            func.similarity(Usuario.email, term)
+        )
+        return list(db.scalars(
+            select(Usuario.id_usuario)
+            .where(*UserSearchService._sql_condition(term, activo))
+            .order_by(rank.desc(), Usuario.id_usuario)
+            .offset(offset)
+            .limit(limit)
+        ))
+
+    @staticmethod
+    def count(db: Session, term: str, activo: Optional[bool] = None) -> int:
+        if not UserSearchService._uses_trigram(db):
+            user_search_index.ensure_loaded(db)
+            return len(user_search_index.search(term, activo))
+
+        return db.scalar(
+            select(func.count()).select_from(Usuario)
+            .where(*UserSearchService._sql_condition(term, activo))
+        )
+
+    @staticmethod
+    def load_users(db: Session, ids: List[int], columns: Sequence = (Usuario,)) -> List:
+        """
+        Carga los usuarios (o solo `columns`, que debe incluir id_usuario)
+        conservando el orden de `ids`
+        """
+        if not ids:
+            return []
+        users = {u.id_usuario: u for u in db.query(*columns).filter(Usuario.id_usuario.in_(ids))}
+        return [users[i] for i in ids if i in users]
+
+    @staticmethod
+    def search_users(
+        db: Session,
+        term: str,
+        activo: Optional[bool] = None,
+        offset: int = 0,
+        limit: int = 10,
+        columns: Sequence = (Usuario,)
+    ) -> Tuple[List, bool]:
+        """
+        Página de usuarios encontrados y si hay más resultados después de ella
+        """
+        ids = UserSearchService.search(db, term, activo, offset, limit + 1)
+        return UserSearchService.load_users(db, ids[:limit], columns), len(ids) > limit
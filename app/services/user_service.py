@@ -1,54 +1,191 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import Row, text
 from fastapi import HTTPException, status
 from app.models.auth_models import Usuario
 from app.schemas import user_schemas
-from app.utils.auth import get_password_hash
+from app.services.user_search_service import UserSearchService, user_search_index
+from app.config.database import run_db
+from app.config.settings import settings
+from app.utils.auth import hash_password_async, claims_cache
+from app.utils.pagination import CURSOR_NEXT, CURSOR_PREV, CountCache, decode_cursor, encode_cursor
 from typing import List, Tuple, Optional
 
+# Modos de cálculo del total en el listado de usuarios
+TOTAL_EXACT = "exacto"
+TOTAL_ESTIMATE = "estimado"
+TOTAL_NONE = "ninguno"
+
+_count_cache = CountCache(ttl_seconds=settings.USER_COUNT_CACHE_SECONDS)
+
+# Columnas del listado (las de UserResponse): se leen como filas, sin objetos ORM
+USER_LIST_COLUMNS = tuple(getattr(Usuario, name) for name in user_schemas.UserResponse.model_fields)
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Cursor de paginación inválido"
+    )
+
 class UserService:
     def __init__(self, db: Session):
+        # Los métodos síncronos requieren una Session; los async aceptan también
+        # una AsyncSession (ver run_db)
         self.db = db
         
+    def _filtered_query(self, activo: Optional[bool]):
+        query = self.db.query(*USER_LIST_COLUMNS)
+            
+        # Aplicar filtro de estado si existe
+        if activo is not None:
+            query = query.filter(Usuario.activo == activo)
+
+        return query
+
     def get_users(
         self,
         skip: int = 0,
         limit: int = 10,
         search: Optional[str] = None,
-        activo: Optional[bool] = None
-    ) -> Tuple[List[Usuario], int]:
+        activo: Optional[bool] = None,
+        total_mode: str = TOTAL_EXACT
+    ) -> Tuple[List[Row], Optional[int]]:
         """
-        Obtiene la lista de usuarios con filtros opcionales
+        Obtiene la lista de usuarios con filtros opcionales (paginación por offset).
+        Con `search` los usuarios se ordenan por relevancia.
+
+        Los usuarios se retornan como filas con las columnas de USER_LIST_COLUMNS.
         """
-        query = self.db.query(Usuario)
-        
-        # Aplicar filtro de búsqueda si existe
         if search:
-            search_filter = or_(
-                Usuario.nombre.ilike(f"%{search}%"),
-                Usuario.apellido.ilike(f"%{search}%"),
-                Usuario.email.ilike(f"%{search}%")
+            usuarios, _ = UserSearchService.search_users(
+                self.db, search, activo, skip, limit, USER_LIST_COLUMNS
             )
-            query = query.filter(search_filter)
-            
-        # Aplicar filtro de estado si existe
-        if activo is not None:
-            query = query.filter(Usuario.activo == activo)
-            
-        # Obtener total de registros
-        total = query.count()
+        else:
+            # Aplicar paginación (orden estable por id)
+            usuarios = self._filtered_query(activo).order_by(Usuario.id_usuario).offset(skip).limit(limit).all()
         
-        # Aplicar paginación
-        usuarios = query.offset(skip).limit(limit).all()
+        # Obtener total de registros
+        total = self.count_users(search, activo, total_mode)
         
         return usuarios, total
 
-    def create_user(self, user_data: user_schemas.UserCreate) -> Usuario:
+    def get_users_page(
+        self,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        search: Optional[str] = None,
+        activo: Optional[bool] = None
+    ) -> Tuple[List[Row], Optional[str], Optional[str]]:
+        """
+        Obtiene una página de usuarios por cursor (keyset sobre id_usuario): el
+        costo no depende de la profundidad de la página. Con `search` el cursor
+        guarda la posición dentro de los resultados ordenados por relevancia.
+
+        Returns:
+            Tuple: (usuarios, cursor siguiente, cursor anterior)
+        """
+        direction, key = decode_cursor(cursor) if cursor else (CURSOR_NEXT, None)
+        if search:
+            return self._search_page(search, activo, limit, direction, key)
+        if key is not None and not isinstance(key, int):
+            raise _invalid_cursor()
+
+        query = self._filtered_query(activo)
+        if direction == CURSOR_NEXT:
+            if key is not None:
+                query = query.filter(Usuario.id_usuario > key)
+            usuarios = query.order_by(Usuario.id_usuario.asc()).limit(limit + 1).all()
+            has_more = len(usuarios) > limit
+            usuarios = usuarios[:limit]
+            has_next, has_prev = has_more, key is not None
+        else:
+            query = query.filter(Usuario.id_usuario < key)
+            usuarios = query.order_by(Usuario.id_usuario.desc()).limit(limit + 1).all()
+            has_more = len(usuarios) > limit
+            usuarios = list(reversed(usuarios[:limit]))
+            has_next, has_prev = True, has_more
+
+        if not usuarios:
+            return usuarios, None, None
+
+        next_cursor = encode_cursor(CURSOR_NEXT, usuarios[-1].id_usuario) if has_next else None
+        prev_cursor = encode_cursor(CURSOR_PREV, usuarios[0].id_usuario) if has_prev else None
+        return usuarios, next_cursor, prev_cursor
+
+    def _search_page(
+        self,
+        search: str,
+        activo: Optional[bool],
+        limit: int,
+        direction: str,
+        key: Optional[dict]
+    ) -> Tuple[List[Row], Optional[str], Optional[str]]:
+        if key is not None and not (isinstance(key, dict) and isinstance(key.get("pos"), int)):
+            raise _invalid_cursor()
+        position = key["pos"] if key is not None else 0
+        # Un cursor "anterior" apunta al inicio de la página siguiente a la buscada
+        offset = position if direction == CURSOR_NEXT else max(position - limit, 0)
+
+        usuarios, has_more = UserSearchService.search_users(
+            self.db, search, activo, offset, limit, USER_LIST_COLUMNS
+        )
+        end = offset + len(usuarios)
+        next_cursor = encode_cursor(CURSOR_NEXT, {"pos": end}) if has_more else None
+        prev_cursor = encode_cursor(CURSOR_PREV, {"pos": offset}) if offset > 0 else None
+        return usuarios, next_cursor, prev_cursor
+
+    def count_users(
+        self,
+        search: Optional[str] = None,
+        activo: Optional[bool] = None,
+        total_mode: str = TOTAL_EXACT
+    ) -> Optional[int]:
+        """
+        Total de usuarios que cumplen los filtros según `total_mode`:
+        - exacto: COUNT(*) en cada llamada
+        - estimado: estadísticas de PostgreSQL (sin filtros) o conteo en caché
+        - ninguno: no se calcula
+        """
+        if total_mode == TOTAL_NONE:
+            return None
+
+        def count() -> int:
+            if search:
+                return UserSearchService.count(self.db, search, activo)
+            return self._filtered_query(activo).count()
+
+        if total_mode == TOTAL_EXACT:
+            return count()
+
+        if not search and activo is None:
+            estimate = self._estimated_table_rows()
+            if estimate is not None:
+                return estimate
+        return _count_cache.get_or_compute((search, activo), count)
+
+    def _estimated_table_rows(self) -> Optional[int]:
+        if self.db.get_bind().dialect.name != "postgresql":
+            return None
+        reltuples = self.db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'usuario'::regclass")
+        ).scalar()
+        # -1: la tabla aún no fue analizada
+        return reltuples if reltuples is not None and reltuples >= 0 else None
+
+    async def create_user(self, user_data: user_schemas.UserCreate) -> Usuario:
         """
         Crea un nuevo usuario
         """
+        await run_db(self.db, UserService._validate_new_user, user_data)
+        
+        # Crear el hash de la contraseña
+        hashed_password = await hash_password_async(user_data.password)
+        
+        return await run_db(self.db, UserService._insert_user, user_data, hashed_password)
+
+    @staticmethod
+    def _validate_new_user(db: Session, user_data: user_schemas.UserCreate) -> None:
         # Verificar si el email ya existe
-        if self.db.query(Usuario).filter(Usuario.email == user_data.email).first():
+        if db.query(Usuario).filter(Usuario.email == user_data.email).first():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="El email ya está registrado"
@@ -56,18 +193,10 @@ class UserService:
             
         # Verificar si el supervisor existe
         if user_data.id_supervisor:
-            supervisor = self.db.query(Usuario).filter(
-                Usuario.id_usuario == user_data.id_supervisor
-            ).first()
-            if not supervisor:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="El supervisor especificado no existe"
-                )
-        
-        # Crear el hash de la contraseña
-        hashed_password = get_password_hash(user_data.password)
-        
+            UserService._ensure_supervisor_exists(db, user_data.id_supervisor)
+
+    @staticmethod
+    def _insert_user(db: Session, user_data: user_schemas.UserCreate, hashed_password: str) -> Usuario:
         # Crear el usuario
         db_user = Usuario(
             **user_data.model_dump(exclude={'password'}),
@@ -76,18 +205,19 @@ class UserService:
         )
         
         try:
-            self.db.add(db_user)
-            self.db.commit()
-            self.db.refresh(db_user)
+            db.add(db_user)
+            db.commit()
+            db.refresh(db_user)
+            user_search_index.upsert(db_user)
             return db_user
         except Exception as e:
-            self.db.rollback()
+            db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Error al crear el usuario"
             ) from e
 
-    def update_user(
+    async def update_user(
         self,
         user_id: int,
         user_data: user_schemas.UserUpdate
@@ -95,8 +225,19 @@ class UserService:
         """
         Actualiza los datos de un usuario
         """
+        update_data = user_data.model_dump(exclude_unset=True)
+        db_user = await run_db(self.db, UserService._validate_update, user_id, update_data)
+                
+        # Actualizar contraseña si se proporciona
+        if 'password' in update_data:
+            update_data['password_hash'] = await hash_password_async(update_data.pop('password'))
+        
+        return await run_db(self.db, UserService._apply_update, db_user, update_data)
+
+    @staticmethod
+    def _validate_update(db: Session, user_id: int, update_data: dict) -> Usuario:
         # Buscar el usuario
-        db_user = self.db.query(Usuario).filter(Usuario.id_usuario == user_id).first()
+        db_user = db.query(Usuario).filter(Usuario.id_usuario == user_id).first()
         if not db_user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -104,17 +245,12 @@ class UserService:
             )
             
         # Verificar si el nuevo email ya existe
-        if user_data.email and user_data.email != db_user.email:
-            if self.db.query(Usuario).filter(Usuario.email == user_data.email).first():
+        if update_data.get('email') and update_data['email'] != db_user.email:
+            if db.query(Usuario).filter(Usuario.email == update_data['email']).first():
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="El email ya está registrado"
                 )
-                
-        # Actualizar contraseña si se proporciona
-        update_data = user_data.model_dump(exclude_unset=True)
-        if 'password' in update_data:
-            update_data['password_hash'] = get_password_hash(update_data.pop('password'))
             
         # Verificar supervisor si se proporciona
         if 'id_supervisor' in update_data and update_data['id_supervisor']:
@@ -123,30 +259,39 @@ class UserService:
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Un usuario no puede ser su propio supervisor"
                 )
-            supervisor = self.db.query(Usuario).filter(
-                Usuario.id_usuario == update_data['id_supervisor']
-            ).first()
-            if not supervisor:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="El supervisor especificado no existe"
-                )
-        
+            UserService._ensure_supervisor_exists(db, update_data['id_supervisor'])
+
+        return db_user
+
+    @staticmethod
+    def _apply_update(db: Session, db_user: Usuario, update_data: dict) -> Usuario:
         try:
             # Actualizar los datos
             for key, value in update_data.items():
                 setattr(db_user, key, value)
             
-            self.db.commit()
-            self.db.refresh(db_user)
+            db.commit()
+            db.refresh(db_user)
+            user_search_index.upsert(db_user)
             return db_user
         except Exception as e:
-            self.db.rollback()
+            db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Error al actualizar el usuario"
             ) from e
 
+    @staticmethod
+    def _ensure_supervisor_exists(db: Session, id_supervisor: int) -> None:
+        supervisor = db.query(Usuario).filter(
+            Usuario.id_usuario == id_supervisor
+        ).first()
+        if not supervisor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="El supervisor especificado no existe"
+            )
+
     def toggle_user_status(self, user_id: int, active: bool) -> Usuario:
         """
         Activa o desactiva un usuario
@@ -168,7 +313,11 @@ class UserService:
                 synchronize_session='fetch'
             )
             self.db.commit()
+            if not active:
+                # Un usuario desactivado no debe seguir autenticándose desde la caché
+                claims_cache.invalidate_subject(str(user_id))
             self.db.refresh(db_user)
+            user_search_index.upsert(db_user)
             return db_user
         except Exception as e:
             self.db.rollback()
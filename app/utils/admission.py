@@ -0,0 +1,140 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, Optional, Tuple
+from fastapi import HTTPException, status
+
+
+class AdmissionController:
+    """
+    Controla cuántos trabajos intensivos en CPU (hashes) se ejecutan a la vez.
+
+    Hasta `max_concurrent` trabajos corren en paralelo; los siguientes esperan en una
+    cola corta de `max_queue` posiciones durante como máximo `queue_timeout` segundos.
+    Si la cola está llena o vence el plazo se responde 503 con Retry-After, en lugar
+    de acumular peticiones hasta que los clientes agoten su timeout.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float, retry_after: int = 1):
+        self.max_concurrent = max(max_concurrent, 1)
+        self.max_queue = max(max_queue, 0)
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Contadores
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.max_queue_depth = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def _overloaded(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servicio ocupado, intente nuevamente en unos segundos",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+    async def _acquire(self) -> None:
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise self._overloaded()
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+        try:
+            await asyncio.wait_for(waiter, timeout=self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # El cupo ya nos fue cedido: se traspasa al siguiente en la cola
+                self._release()
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejected_timeout += 1
+                raise self._overloaded() from e
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        self.admitted += 1
+
+    def _release(self) -> None:
+        # Cede el cupo directamente al primer trabajo en espera (orden FIFO)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        await self._acquire()
+        try:
+            yield
+        finally:
+            self._release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "activos": self.active,
+            "max_concurrentes": self.max_concurrent,
+            "en_cola": self.queue_depth,
+            "max_cola": self.max_queue,
+            "max_cola_observada": self.max_queue_depth,
+            "admitidos": self.admitted,
+            "rechazados_cola_llena": self.rejected_queue_full,
+            "rechazados_timeout": self.rejected_timeout,
+        }
+
+
+class TokenBucketLimiter:
+    """
+    Token buckets por clave (email, IP, ...) con un número máximo de claves en memoria.
+
+    Cada bucket tiene `capacity` tokens y se rellena por completo en `window_seconds`.
+    """
+
+    def __init__(self, capacity: int, window_seconds: float, max_keys: int = 10000):
+        self.capacity = float(max(capacity, 1))
+        self.refill_rate = self.capacity / max(window_seconds, 1e-6)
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def _tokens(self, key: str, now: float) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return self.capacity
+        tokens, updated = bucket
+        return min(self.capacity, tokens + (now - updated) * self.refill_rate)
+
+    def retry_after(self, key: str, now: Optional[float] = None) -> float:
+        """
+        Segundos que faltan para que el bucket tenga al menos un token (0 si ya lo tiene)
+        """
+        now = time.monotonic() if now is None else now
+        tokens = self._tokens(key, now)
+        if tokens >= 1:
+            return 0.0
+        return (1 - tokens) / self.refill_rate
+
+    def consume(self, key: str, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        tokens = max(self._tokens(key, now) - 1, 0.0)
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
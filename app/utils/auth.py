@@ -1,25 +1,170 @@
 from datetime import datetime, timedelta, timezone
 import jwt
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, NamedTuple, Tuple
 import scrypt
 import secrets
 import base64
+import hashlib
 from fastapi import HTTPException, status, Header
 from app.config.settings import settings
+from app.utils.password_executor import PasswordHashExecutor
+from app.utils.admission import AdmissionController, TokenBucketLimiter
+from app.utils.metrics import metrics
+from app.utils.token_cache import ClaimsCache
+from app.utils.session_state import SessionStateCache
 
 # Configuración de seguridad desde settings centralizado
 SECRET_KEY = settings.JWT_SECRET_KEY
 ALGORITHM = settings.JWT_ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES
-# Parámetros de Scrypt optimizados para seguridad en 2025
 
-# Parámetros de Scrypt optimizados para seguridad en 2025
-SCRYPT_N = 2**16  # CPU/Memory cost factor (debe ser potencia de 2)
-SCRYPT_R = 8      # Block size factor
-SCRYPT_P = 1      # Parallelization factor
+class ScryptParams(NamedTuple):
+    n: int  # CPU/Memory cost factor (potencia de 2)
+    r: int  # Block size factor
+    p: int  # Parallelization factor
+
+# Política actual de Scrypt (configurable por host, ver app/commands/calibrate_scrypt.py)
+SCRYPT_PARAMS = ScryptParams(
+    n=2**settings.PASSWORD_SCRYPT_LOG_N,
+    r=settings.PASSWORD_SCRYPT_R,
+    p=settings.PASSWORD_SCRYPT_P
+)
+SCRYPT_N, SCRYPT_R, SCRYPT_P = SCRYPT_PARAMS
 SCRYPT_KEY_LEN = 32  # Longitud de la clave derivada
 SALT_LENGTH = 16     # Longitud del salt en bytes
 
+# Parámetros de los hashes antiguos (formato scrypt$salt$hash, sin parámetros)
+LEGACY_SCRYPT_PARAMS = ScryptParams(n=2**16, r=8, p=1)
+HASH_FORMAT_VERSION = 1
+# Límites de seguridad al leer parámetros desde un hash almacenado (un costo
+# mayor dejaría el inicio de sesión sin responder)
+MAX_SCRYPT_LOG_N = 22
+MAX_SCRYPT_R = 32
+MAX_SCRYPT_P = 16
+
+# Executor compartido para calcular scrypt fuera del event loop
+password_executor = PasswordHashExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
+
+# Control de admisión para los hashes (login y cambios de contraseña)
+hash_admission = AdmissionController(
+    max_concurrent=settings.LOGIN_MAX_CONCURRENT_HASHES,
+    max_queue=settings.LOGIN_HASH_QUEUE_SIZE,
+    queue_timeout=settings.LOGIN_HASH_QUEUE_TIMEOUT_SECONDS
+)
+
+# Límites de intentos fallidos de login por email y por IP
+login_failures_by_email = TokenBucketLimiter(
+    capacity=settings.LOGIN_FAILURES_PER_EMAIL,
+    window_seconds=settings.LOGIN_FAILURE_WINDOW_SECONDS
+)
+login_failures_by_ip = TokenBucketLimiter(
+    capacity=settings.LOGIN_FAILURES_PER_IP,
+    window_seconds=settings.LOGIN_FAILURE_WINDOW_SECONDS
+)
+_login_rate_limited = 0
+
+def _login_admission_stats() -> Dict[str, Any]:
+    return {
+        **hash_admission.stats(),
+        "hashes_pendientes_pool": password_executor.pending,
+        "rechazados_limite_intentos": _login_rate_limited,
+        "claves_email": len(login_failures_by_email),
+        "claves_ip": len(login_failures_by_ip),
+    }
+
+metrics.register("login_admission", _login_admission_stats)
+
+# Caché de claims ya validados para verify_token
+claims_cache = ClaimsCache(max_entries=settings.TOKEN_CLAIMS_CACHE_SIZE)
+metrics.register("claims_cache", claims_cache.stats)
+
+# Sesiones activas y revocadas conocidas por este worker
+session_state = SessionStateCache(
+    max_active=settings.SESSION_CACHE_SIZE,
+    max_revoked=settings.SESSION_REVOKED_CACHE_SIZE
+)
+metrics.register("session_state", session_state.stats)
+
+def hash_token(token: str) -> str:
+    """
+    Digest SHA-256 (hex) de un token, usado como clave compacta en cachés
+    """
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+def _validate_new_password(password: str) -> None:
+    if not password:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La contraseña no puede estar vacía"
+        )
+
+def _format_hash(params: ScryptParams, salt: bytes, hash_bytes: bytes) -> str:
+    # Codifica salt y hash en base64
+    salt_b64 = base64.b64encode(salt).decode('utf-8')
+    hash_b64 = base64.b64encode(hash_bytes).decode('utf-8')
+    log_n = params.n.bit_length() - 1
+    return (
+        f"scrypt$v={HASH_FORMAT_VERSION}$ln={log_n},r={params.r},p={params.p}"
+        f"${salt_b64}${hash_b64}"
+    )
+
+def _parse_params(encoded: str) -> Optional[ScryptParams]:
+    try:
+        values = dict(item.split('=', 1) for item in encoded.split(','))
+        log_n, r, p = int(values['ln']), int(values['r']), int(values['p'])
+    except (KeyError, ValueError):
+        return None
+
+    if not (1 <= log_n <= MAX_SCRYPT_LOG_N and 1 <= r <= MAX_SCRYPT_R and 1 <= p <= MAX_SCRYPT_P):
+        return None
+    return ScryptParams(n=2**log_n, r=r, p=p)
+
+def _parse_hash(stored_hash: str) -> Optional[Tuple[ScryptParams, bytes, bytes]]:
+    """
+    Extrae parámetros, salt y hash de un hash almacenado.
+
+    Formatos soportados:
+        scrypt$v=1$ln=16,r=8,p=1$[salt_base64]$[hash_base64]
+        scrypt$[salt_base64]$[hash_base64]   (antiguo, parámetros LEGACY_SCRYPT_PARAMS)
+
+    Retorna None si el formato es inválido.
+    """
+    parts = stored_hash.split('$')
+    if parts[0] != 'scrypt':
+        return None
+
+    if len(parts) == 3:
+        params = LEGACY_SCRYPT_PARAMS
+        salt_b64, hash_b64 = parts[1], parts[2]
+    elif len(parts) == 5 and parts[1] == f"v={HASH_FORMAT_VERSION}":
+        params = _parse_params(parts[2])
+        if params is None:
+            return None
+        salt_b64, hash_b64 = parts[3], parts[4]
+    else:
+        return None
+
+    try:
+        return params, base64.b64decode(salt_b64), base64.b64decode(hash_b64)
+    except Exception:
+        return None
+
+def password_needs_rehash(stored_hash: str) -> bool:
+    """
+    Indica si un hash debe regenerarse porque no usa el formato o los parámetros
+    de la política actual.
+    """
+    if not stored_hash.startswith(f"scrypt$v={HASH_FORMAT_VERSION}$"):
+        return True
+    parsed = _parse_hash(stored_hash)
+    if parsed is None:
+        return True
+    params, _, hash_bytes = parsed
+    return params != SCRYPT_PARAMS or len(hash_bytes) != SCRYPT_KEY_LEN
+
 def get_password_hash(password: str) -> str:
     """
     Genera un hash de contraseña usando Scrypt.
@@ -28,16 +173,12 @@ def get_password_hash(password: str) -> str:
         password (str): La contraseña en texto plano
         
     Returns:
-        str: Hash en formato: scrypt$[salt_base64]$[hash_base64]
+        str: Hash en formato: scrypt$v=1$ln=[log2 N],r=[r],p=[p]$[salt_base64]$[hash_base64]
         
     Raises:
         HTTPException: Si hay un error al generar el hash
     """
-    if not password:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="La contraseña no puede estar vacía"
-        )
+    _validate_new_password(password)
         
     try:
         # Genera un salt aleatorio
@@ -53,12 +194,7 @@ def get_password_hash(password: str) -> str:
             buflen=SCRYPT_KEY_LEN
         )
         
-        # Codifica salt y hash en base64
-        salt_b64 = base64.b64encode(salt).decode('utf-8')
-        hash_b64 = base64.b64encode(hash_bytes).decode('utf-8')
-        
-        # Retorna el hash formateado
-        return f"scrypt${salt_b64}${hash_b64}"
+        return _format_hash(SCRYPT_PARAMS, salt, hash_bytes)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -71,7 +207,7 @@ def verify_password(plain_password: str, stored_hash: str) -> bool:
     
     Args:
         plain_password (str): La contraseña en texto plano a verificar
-        stored_hash (str): El hash almacenado en formato scrypt$[salt]$[hash]
+        stored_hash (str): El hash almacenado (ver _parse_hash para los formatos)
         
     Returns:
         bool: True si la contraseña coincide, False si no
@@ -79,48 +215,99 @@ def verify_password(plain_password: str, stored_hash: str) -> bool:
     if not plain_password or not stored_hash:
         return False
     
-    # Si el hash es exactamente igual a la contraseña (temporal para debug)
-    if plain_password == stored_hash:
-        return True
-        
     try:
-        # Verifica el formato del hash
-        parts = stored_hash.split('$')
-        
-        if len(parts) != 3:
+        parsed = _parse_hash(stored_hash)
+        if parsed is None:
             return False
-            
-        algorithm, salt_b64, hash_b64 = parts
+        params, salt, stored_hash_bytes = parsed
         
-        if algorithm != 'scrypt':
-            return False
-            
-        # Decodifica salt y hash
-        try:
-            salt = base64.b64decode(salt_b64)
-            stored_hash_bytes = base64.b64decode(hash_b64)
-        except Exception:
-            return False
+        # Calcula el hash con los parámetros con los que se generó el almacenado
+        computed_hash = scrypt.hash(
+            plain_password.encode('utf-8'),
+            salt=salt,
+            N=params.n,
+            r=params.r,
+            p=params.p,
+            buflen=len(stored_hash_bytes)
+        )
         
+        # Compara los hashes usando comparación de tiempo constante
+        return secrets.compare_digest(computed_hash, stored_hash_bytes)
+    except Exception:
+        return False
+
+async def hash_password_async(password: str) -> str:
+    """
+    Igual que get_password_hash, pero calcula scrypt en el pool de procesos
+    para no bloquear el event loop.
+    """
+    _validate_new_password(password)
+
+    try:
+        salt = secrets.token_bytes(SALT_LENGTH)
+        async with hash_admission.slot():
+            hash_bytes = await password_executor.derive(
+                password.encode('utf-8'), salt, SCRYPT_N, SCRYPT_R, SCRYPT_P, SCRYPT_KEY_LEN
+            )
+        return _format_hash(SCRYPT_PARAMS, salt, hash_bytes)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al generar el hash de la contraseña"
+        ) from e
+
+async def verify_password_async(plain_password: str, stored_hash: str) -> bool:
+    """
+    Igual que verify_password, pero calcula scrypt en el pool de procesos
+    para no bloquear el event loop.
+    """
+    if not plain_password or not stored_hash:
+        return False
+
+    parsed = _parse_hash(stored_hash)
+    if parsed is None:
+        return False
+    params, salt, stored_hash_bytes = parsed
+
+    # Si no hay cupo en la cola de admisión se propaga el 503
+    async with hash_admission.slot():
         try:
-            # Calcula el hash de la contraseña proporcionada
-            computed_hash = scrypt.hash(
-                plain_password.encode('utf-8'),
-                salt=salt,
-                N=SCRYPT_N,
-                r=SCRYPT_R,
-                p=SCRYPT_P,
-                buflen=SCRYPT_KEY_LEN
+            computed_hash = await password_executor.derive(
+                plain_password.encode('utf-8'), salt, params.n, params.r, params.p,
+                len(stored_hash_bytes)
             )
-            
-            # Compara los hashes usando comparación de tiempo constante
-            return secrets.compare_digest(computed_hash, stored_hash_bytes)
-            
         except Exception:
             return False
-            
-    except Exception:
-        return False
+
+    return secrets.compare_digest(computed_hash, stored_hash_bytes)
+
+def check_login_rate_limit(email: str, client_ip: Optional[str]) -> None:
+    """
+    Rechaza el login con 429 si el email o la IP agotaron sus intentos fallidos,
+    antes de gastar CPU en calcular el hash.
+    """
+    global _login_rate_limited
+    wait = login_failures_by_email.retry_after(email.lower())
+    if client_ip:
+        wait = max(wait, login_failures_by_ip.retry_after(client_ip))
+
+    if wait > 0:
+        _login_rate_limited += 1
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Demasiados intentos fallidos, intente más tarde",
+            headers={"Retry-After": str(int(wait) + 1)},
+        )
+
+def register_login_failure(email: str, client_ip: Optional[str]) -> None:
+    """
+    Descuenta un token de los buckets del email y de la IP tras un intento fallido
+    """
+    login_failures_by_email.consume(email.lower())
+    if client_ip:
+        login_failures_by_ip.consume(client_ip)
 
 def create_access_token(
     data: Dict[str, Any], 
@@ -147,6 +334,9 @@ def create_access_token(
         )
         
         to_encode.update({"exp": expire})
+        # Identificador único: dos tokens del mismo usuario nunca coinciden,
+        # aunque se emitan en el mismo segundo (las revocaciones usan su digest)
+        to_encode.setdefault("jti", secrets.token_hex(16))
         encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
         
         return encoded_jwt if isinstance(encoded_jwt, str) else encoded_jwt.decode('utf-8')
@@ -169,9 +359,23 @@ def verify_token(authorization: Optional[str] = Header(None)) -> Dict[str, Any]:
 
     token = authorization.split(" ")[1]  # Extrae el JWT puro
 
+    # Los clientes repiten el mismo token en cada petición: evitar decodificarlo de nuevo
+    digest = hash_token(token)
+    if session_state.is_revoked(digest):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="La sesión del token fue cerrada",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    cached = claims_cache.get(digest)
+    if cached is not None:
+        return dict(cached)
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        claims_cache.put(digest, payload)
+        return dict(payload)
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,57 @@
+import os
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Sequence
+
+
+class MetricsRegistry:
+    """
+    Registro en memoria de métricas del proceso (un registro por worker).
+
+    Cada subsistema registra una función que retorna un snapshot de sus contadores;
+    el endpoint de métricas los reúne en una sola respuesta.
+    """
+
+    def __init__(self):
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def register(self, name: str, collector: Callable[[], Dict[str, Any]]) -> None:
+        self._collectors[name] = collector
+
+    def snapshot(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"pid": os.getpid()}
+        for name, collector in self._collectors.items():
+            data[name] = collector()
+        return data
+
+
+# Registro global de métricas
+metrics = MetricsRegistry()
+
+
+class Histogram:
+    """
+    Histograma con límites fijos (por ejemplo, tiempos en milisegundos)
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"<={bound:g}" for bound in self.buckets] + ["+inf"]
+        return {
+            "buckets": dict(zip(labels, self._counts)),
+            "count": self.count,
+            "avg": round(self.total / self.count, 3) if self.count else 0.0,
+            "max": round(self.max, 3),
+        }
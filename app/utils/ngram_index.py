@@ -0,0 +1,161 @@
+import unicodedata
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """
+    Minúsculas y sin acentos, para comparar términos de búsqueda
+    """
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def match_score(field: str, term: str) -> float:
+    """
+    Relevancia de `term` (normalizado) en `field`: campo igual al término (4),
+    prefijo (3), inicio de palabra (2) o subcadena (1), más la fracción del
+    campo que cubre el término; 0 si no lo contiene
+    """
+    position = field.find(term)
+    if position < 0:
+        return 0.0
+    if field == term:
+        base = 4.0
+    elif position == 0:
+        base = 3.0
+    elif not field[position - 1].isalnum():
+        base = 2.0
+    else:
+        base = 1.0
+    return base + len(term) / len(field)
+
+
+class NGramIndex:
+    """
+    Índice invertido de n-gramas en memoria para búsquedas por subcadena.
+
+    Cada documento (identificado por un entero) tiene uno o más campos de texto. Una búsqueda toma la lista de
+    documentos del n-grama menos frecuente del término y verifica la subcadena solo
+    sobre esos candidatos, en lugar de recorrer todos los documentos.
+
+    Las listas de documentos por n-grama solo crecen: al actualizar o eliminar un
+    documento sus entradas antiguas quedan obsoletas (se descartan al verificar) y
+    se compactan cuando superan a las vigentes. Las listas son arreglos de enteros
+    de 32 bits (4 bytes por entrada).
+    """
+
+    def __init__(self, n: int = 3):
+        self.n = n
+        self._docs: Dict[int, Tuple[str, ...]] = {}
+        self._postings: Dict[str, array] = {}
+        self._entries = 0
+        self._live_entries = 0
+
+    def _grams(self, text: str) -> set:
+        return {text[i:i + self.n] for i in range(len(text) - self.n + 1)}
+
+    def _doc_grams(self, fields: Tuple[str, ...]) -> set:
+        grams = set()
+        for field in fields:
+            grams |= self._grams(field)
+        return grams
+
+    def add(self, doc_id: int, fields: Sequence[Optional[str]]) -> None:
+        """
+        Indexa (o reemplaza) un documento
+        """
+        self.remove(doc_id)
+        normalized = tuple(normalize_text(field) for field in fields)
+        self._docs[doc_id] = normalized
+        self._index_grams(doc_id, self._doc_grams(normalized))
+
+    def _index_grams(self, doc_id: int, grams: set) -> None:
+        postings = self._postings
+        for gram in grams:
+            doc_ids = postings.get(gram)
+            if doc_ids is None:
+                doc_ids = postings[gram] = array("i")
+            doc_ids.append(doc_id)
+        self._entries += len(grams)
+        self._live_entries += len(grams)
+
+    def remove(self, doc_id: int) -> None:
+        fields = self._docs.pop(doc_id, None)
+        if fields is None:
+            return
+        self._live_entries -= len(self._doc_grams(fields))
+        if self._entries > 2 * max(self._live_entries, 1024):
+            self._compact()
+
+    def _compact(self) -> None:
+        docs = self._docs
+        self._docs = {}
+        self._postings = {}
+        self._entries = self._live_entries = 0
+        for doc_id, fields in docs.items():
+            self._docs[doc_id] = fields
+            self._index_grams(doc_id, self._doc_grams(fields))
+
+    def search(
+        self,
+        term: str,
+        predicate: Optional[Callable[[int], bool]] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Documentos con algún campo que contiene `term`, ordenados por relevancia:
+        campo igual al término, luego prefijo, luego inicio de palabra, luego
+        subcadena; a igualdad, el campo más corto.
+        """
+        term = normalize_text(term).strip()
+        if not term:
+            return []
+
+        if len(term) < self.n:
+            # Términos más cortos que un n-grama: recorrido completo
+            candidates = self._docs.keys()
+        else:
+            grams = self._grams(term)
+            lists = [self._postings.get(gram) for gram in grams]
+            if any(postings is None for postings in lists):
+                return []
+            candidates = set(min(lists, key=len))
+
+        score = match_score
+        results = []
+        for doc_id in candidates:
+            fields = self._docs.get(doc_id)
+            if fields is None or (predicate is not None and not predicate(doc_id)):
+                continue
+            best = 0.0
+            for field in fields:
+                value = score(field, term)
+                if value > best:
+                    best = value
+            if best > 0:
+                results.append((-best, doc_id))
+
+        results.sort()
+        return [(doc_id, -negative) for negative, doc_id in results]
+
+    def fields(self, doc_id: int) -> Optional[Tuple[str, ...]]:
+        """
+        Campos normalizados del documento (None si no está indexado)
+        """
+        return self._docs.get(doc_id)
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, doc_id: int) -> bool:
+        return doc_id in self._docs
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "documentos": len(self._docs),
+            "ngramas": len(self._postings),
+            "entradas": self._entries,
+            "entradas_vigentes": self._live_entries,
+        }
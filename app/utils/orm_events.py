@@ -0,0 +1,80 @@
+from typing import Any, Callable, Iterable, Set
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Clave en Session.info con las invalidaciones pendientes de la transacción
+_PENDING_KEY = "pending_invalidations"
+
+
+def invalidate_on_commit(model: type, callback: Callable[[], None]) -> None:
+    """
+    Ejecuta `callback` cuando se confirma una transacción que insertó, modificó o
+    eliminó instancias de `model` con el ORM.
+
+    La invalidación se hace al confirmar (no al hacer flush) para que una recarga
+    concurrente no lea datos sin confirmar; si la transacción se revierte, se
+    descarta. Las escrituras fuera del ORM (UPDATE masivos, SQL directo) deben
+    invalidar explícitamente.
+    """
+    def mark_change(mapper, connection, target) -> None:
+        session = Session.object_session(target)
+        if session is None:
+            callback()
+        else:
+            session.info.setdefault(_PENDING_KEY, {})[id(callback)] = callback
+
+    for event_name in ("after_insert", "after_update", "after_delete"):
+        event.listen(model, event_name, mark_change)
+
+
+class _KeyedInvalidation:
+    """
+    Claves acumuladas en la transacción para un mismo callback
+    """
+
+    def __init__(self, callback: Callable[[Set[Any]], None]):
+        self.callback = callback
+        self.keys: Set[Any] = set()
+
+    def __call__(self) -> None:
+        self.callback(self.keys)
+
+
+def invalidate_keys_after_commit(session: Session, callback: Callable[[Set[Any]], None], keys: Iterable[Any]) -> None:
+    """
+    Acumula `keys` en la transacción de `session` y, al confirmarla, llama una
+    sola vez a `callback` con todas las claves. Para escrituras fuera del ORM
+    que invalidan entradas puntuales de una caché.
+    """
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    invalidation = pending.get(("keys", id(callback)))
+    if invalidation is None:
+        invalidation = pending[("keys", id(callback))] = _KeyedInvalidation(callback)
+    invalidation.keys.update(keys)
+
+
+def invalidate_keys_on_commit(model: type, key: Callable[[Any], Any], callback: Callable[[Set[Any]], None]) -> None:
+    """
+    Como invalidate_on_commit, pero `callback` recibe las claves (`key(instancia)`)
+    de las instancias de `model` modificadas con el ORM en la transacción
+    """
+    def mark_change(mapper, connection, target) -> None:
+        session = Session.object_session(target)
+        if session is None:
+            callback({key(target)})
+        else:
+            invalidate_keys_after_commit(session, callback, [key(target)])
+
+    for event_name in ("after_insert", "after_update", "after_delete"):
+        event.listen(model, event_name, mark_change)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_pending_invalidations(session) -> None:
+    for callback in session.info.pop(_PENDING_KEY, {}).values():
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_invalidations(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
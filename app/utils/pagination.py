@@ -0,0 +1,76 @@
+import base64
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Tuple
+from fastapi import HTTPException, status
+
+# Dirección de un cursor: página siguiente o anterior
+CURSOR_NEXT = "n"
+CURSOR_PREV = "p"
+
+
+def encode_cursor(direction: str, key: Any) -> str:
+    """
+    Cursor opaco (base64 url-safe) con la dirección y la clave de orden del
+    último elemento visto
+    """
+    raw = json.dumps({"d": direction, "k": key}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, Any]:
+    """
+    Retorna (dirección, clave) de un cursor generado por encode_cursor
+
+    Raises:
+        HTTPException: Si el cursor no es válido
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        direction, key = data["d"], data["k"]
+    except (ValueError, KeyError, TypeError):
+        direction, key = None, None
+
+    if direction not in (CURSOR_NEXT, CURSOR_PREV) or key is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginación inválido"
+        )
+    return direction, key
+
+
+class CountCache:
+    """
+    Caché con TTL de conteos (COUNT(*)) por combinación de filtros, para mostrar
+    un total aproximado sin contar la tabla en cada página
+    """
+
+    def __init__(self, ttl_seconds: float, max_keys: int = 256, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_keys = max_keys
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], int]) -> int:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = (now + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,68 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional
+import scrypt
+
+
+def _scrypt_derive(password: bytes, salt: bytes, n: int, r: int, p: int, buflen: int) -> bytes:
+    """
+    Calcula la clave derivada con scrypt. Se ejecuta dentro de los procesos del pool,
+    por eso es una función de módulo (debe poder serializarse con pickle).
+    """
+    return scrypt.hash(password, salt=salt, N=n, r=r, p=p, buflen=buflen)
+
+
+class PasswordHashExecutor:
+    """
+    Ejecuta el hashing de contraseñas fuera del event loop.
+
+    Usa un pool de procesos dimensionado según los núcleos disponibles y limita la
+    cantidad de trabajos pendientes, de modo que una ráfaga de logins espere en el
+    event loop (sin bloquearlo) en lugar de encolar trabajo sin límite.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, 1)
+        self._pool: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.pending = 0
+
+    def _get_pool(self) -> Optional[Executor]:
+        # Con max_workers = 0 se usa el executor de hilos por defecto del loop
+        if self.max_workers <= 0:
+            return None
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Un semáforo pertenece a un único event loop (los tests crean varios)
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def derive(self, password: bytes, salt: bytes, n: int, r: int, p: int, buflen: int) -> bytes:
+        """
+        Calcula scrypt en el pool sin bloquear el event loop.
+        """
+        async with self._get_semaphore():
+            self.pending += 1
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    self._get_pool(), _scrypt_derive, password, salt, n, r, p, buflen
+                )
+            finally:
+                self.pending -= 1
+
+    def shutdown(self) -> None:
+        """
+        Libera los procesos del pool (se llama al apagar la aplicación)
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
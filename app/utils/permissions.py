@@ -0,0 +1,54 @@
+from typing import Any, Callable, Dict
+from fastapi import Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from app.config.database import get_db, run_db
+from app.config.settings import settings
+from app.models.auth_models import Usuario
+from app.services.permission_service import PermissionSnapshot, decode_bits, permission_cache
+from app.utils.auth import verify_token
+
+
+def _user_role(db: Session, id_usuario: int):
+    return db.query(Usuario.id_rol).filter(Usuario.id_usuario == id_usuario).scalar()
+
+
+async def _token_bits(claims: Dict[str, Any], snapshot: PermissionSnapshot, db: Session) -> int:
+    # Bitset embebido en el token (RBAC_TOKEN_PERMISSIONS): ninguna consulta
+    if claims.get("perm") is not None:
+        try:
+            return decode_bits(claims["perm"])
+        except (TypeError, ValueError):
+            return 0
+
+    id_rol = claims.get("rol")
+    if id_rol is None:
+        # Tokens emitidos antes de incluir el rol
+        id_rol = await run_db(db, _user_role, int(claims["sub"]))
+    return snapshot.role_bits.get(id_rol, 0)
+
+
+def require_permission(*modulos: str) -> Callable:
+    """
+    Dependencia que exige un permiso activo del rol del usuario en cada módulo
+    indicado (Permiso.modulo). Con RBAC_ENABLED desactivado solo valida el token.
+
+    Uso:
+        token: dict = Depends(require_permission("usuarios"))
+    """
+    async def check_permission(
+        claims: Dict[str, Any] = Depends(verify_token),
+        db: Session = Depends(get_db)
+    ) -> Dict[str, Any]:
+        if not settings.RBAC_ENABLED:
+            return claims
+
+        snapshot = permission_cache.current() or await run_db(db, permission_cache.load)
+        bits = await _token_bits(claims, snapshot, db)
+        if not all(snapshot.allows(bits, modulo) for modulo in modulos):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="No tiene permiso para acceder a este recurso"
+            )
+        return claims
+
+    return check_permission
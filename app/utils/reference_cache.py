@@ -0,0 +1,110 @@
+import hashlib
+import threading
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional
+from fastapi import Response, status
+
+# Los navegadores deben revalidar con If-None-Match antes de reutilizar la respuesta
+CACHE_CONTROL = "private, no-cache"
+
+
+class CachedBody(NamedTuple):
+    """
+    Respuesta JSON ya serializada con su ETag
+    """
+    body: bytes
+    etag: str
+    expires_at: float
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evalúa la cabecera If-None-Match (lista de ETags, "*" o ETags débiles W/"...")
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
+
+
+class ReferenceDataCache:
+    """
+    Caché por nombre de respuestas de datos de referencia (roles, sucursales, ...)
+    serializadas una sola vez. Cada entrada vence a los `ttl_seconds` o cuando se
+    invalida explícitamente tras una escritura.
+    """
+
+    def __init__(self, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: Dict[str, CachedBody] = {}
+        # Versión por nombre: descarta cargas iniciadas antes de una invalidación
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+
+    def version(self, name: str) -> int:
+        with self._lock:
+            return self._versions.get(name, 0)
+
+    def get(self, name: str) -> Optional[CachedBody]:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry.expires_at <= self._clock():
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry
+
+    def put(self, name: str, body: bytes, version: Optional[int] = None) -> CachedBody:
+        """
+        Guarda el cuerpo serializado. Si `version` no coincide con la actual (hubo
+        una invalidación durante la carga) la entrada se retorna sin guardarse.
+        """
+        entry = CachedBody(body, make_etag(body), self._clock() + self.ttl_seconds)
+        with self._lock:
+            if self.ttl_seconds > 0 and (version is None or version == self._versions.get(name, 0)):
+                self._entries[name] = entry
+        return entry
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """
+        Invalida una entrada o, sin nombre, toda la caché
+        """
+        with self._lock:
+            names = [name] if name is not None else list(set(self._entries) | set(self._versions))
+            for key in names:
+                self._entries.pop(key, None)
+                self._versions[key] = self._versions.get(key, 0) + 1
+            self.invalidations += 1
+
+    def response(self, entry: CachedBody, if_none_match: Optional[str] = None) -> Response:
+        """
+        Respuesta HTTP para la entrada: 304 si el cliente ya tiene esa versión
+        """
+        headers = {"ETag": entry.etag, "Cache-Control": CACHE_CONTROL}
+        if etag_matches(if_none_match, entry.etag):
+            self.not_modified += 1
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entradas": sorted(self._entries),
+            "aciertos": self.hits,
+            "fallos": self.misses,
+            "no_modificadas": self.not_modified,
+            "invalidaciones": self.invalidations,
+        }
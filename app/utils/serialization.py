@@ -0,0 +1,23 @@
+from typing import Any, Iterable
+from fastapi import Response
+from pydantic_core import to_json
+from sqlalchemy import Row
+
+
+def rows_to_json(rows: Iterable[Row]) -> bytes:
+    """
+    Serializa filas de una consulta por columnas como una lista JSON de objetos.
+
+    Las columnas deben coincidir con los campos del esquema de respuesta: los
+    valores se codifican directamente (fechas en ISO 8601, igual que Pydantic),
+    sin crear ni validar modelos.
+    """
+    return to_json([row._asdict() for row in rows])
+
+
+def json_response(content: Any, status_code: int = 200) -> Response:
+    """
+    Respuesta JSON codificada en un solo paso; a diferencia de retornar un modelo,
+    FastAPI no vuelve a validar ni serializar el contenido
+    """
+    return Response(content=to_json(content), status_code=status_code, media_type="application/json")
@@ -0,0 +1,125 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, NamedTuple, Optional
+from uuid import UUID
+
+
+class SessionSnapshot(NamedTuple):
+    """
+    Copia inmutable de los campos de SesionUsuario que se exponen en SessionInfo
+    """
+    id_sesion: UUID
+    id_usuario: int
+    fecha_inicio: Optional[datetime]
+    fecha_expiracion: Optional[datetime]
+    activa: bool
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Las fechas se comparan contra datetime.utcnow(), igual que en las consultas
+    if value is not None and value.tzinfo is not None:
+        return value.replace(tzinfo=None) - (value.utcoffset() or timedelta(0))
+    return value
+
+
+class SessionStateCache:
+    """
+    Estado de sesiones en memoria del worker, indexado por el digest del token.
+
+    - Sesiones activas conocidas: se sirven sin consultar la base de datos hasta su
+      fecha de expiración.
+    - Sesiones revocadas recientemente (logout, nueva sesión del usuario): se recuerdan
+      hasta su expiración para rechazarlas sin consultar la base de datos.
+
+    Los demás workers se enteran de las revocaciones a través del feed de cambios
+    de la tabla sesion_usuario (ver SessionFeedService).
+    """
+
+    def __init__(self, max_active: int, max_revoked: int):
+        self.max_active = max_active
+        self.max_revoked = max_revoked
+        self._active: "OrderedDict[str, SessionSnapshot]" = OrderedDict()
+        self._revoked: "OrderedDict[str, datetime]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revoked_hits = 0
+
+    def get_active(self, digest: str) -> Optional[SessionSnapshot]:
+        with self._lock:
+            snapshot = self._active.get(digest)
+            if snapshot is None:
+                self.misses += 1
+                return None
+
+            expiration = naive_utc(snapshot.fecha_expiracion)
+            if expiration is not None and expiration <= datetime.utcnow():
+                del self._active[digest]
+                self.misses += 1
+                return None
+
+            self._active.move_to_end(digest)
+            self.hits += 1
+            return snapshot
+
+    def remember(self, digest: str, snapshot: SessionSnapshot) -> None:
+        if self.max_active <= 0 or not snapshot.activa:
+            return
+        with self._lock:
+            if digest in self._revoked:
+                return
+            self._active[digest] = snapshot
+            self._active.move_to_end(digest)
+            while len(self._active) > self.max_active:
+                self._active.popitem(last=False)
+
+    def revoke(self, digest: str, expires_at: Optional[datetime]) -> None:
+        """
+        Marca un token como revocado hasta `expires_at` (la expiración de su sesión)
+        """
+        expires_at = naive_utc(expires_at)
+        with self._lock:
+            self._active.pop(digest, None)
+            if expires_at is None or expires_at <= datetime.utcnow():
+                return
+            self._revoked[digest] = expires_at
+            self._revoked.move_to_end(digest)
+            while len(self._revoked) > self.max_revoked:
+                self._revoked.popitem(last=False)
+
+    def is_revoked(self, digest: str) -> bool:
+        with self._lock:
+            expires_at = self._revoked.get(digest)
+            if expires_at is None:
+                return False
+            if expires_at <= datetime.utcnow():
+                del self._revoked[digest]
+                return False
+            self.revoked_hits += 1
+            return True
+
+    def prune(self) -> int:
+        """
+        Elimina las revocaciones ya vencidas. Retorna cuántas se eliminaron.
+        """
+        now = datetime.utcnow()
+        with self._lock:
+            expired = [digest for digest, expires_at in self._revoked.items() if expires_at <= now]
+            for digest in expired:
+                del self._revoked[digest]
+        return len(expired)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._active.clear()
+            self._revoked.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sesiones_activas": len(self._active),
+            "sesiones_revocadas": len(self._revoked),
+            "aciertos": self.hits,
+            "fallos": self.misses,
+            "rechazos_revocadas": self.revoked_hits,
+        }
@@ -0,0 +1,49 @@
+import io
+import zlib
+from typing import Iterable, Iterator
+
+
+class ChunkReader(io.RawIOBase):
+    """
+    Archivo binario de solo lectura sobre un iterador de bloques de bytes; permite
+    usar io.TextIOWrapper / csv sobre un cuerpo recibido por partes sin cargarlo
+    completo en memoria
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._pending = chunk
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def open_text(chunks: Iterable[bytes], encoding: str = "utf-8-sig") -> io.TextIOWrapper:
+    """
+    Texto decodificado de forma incremental (newline="" como requiere csv)
+    """
+    return io.TextIOWrapper(io.BufferedReader(ChunkReader(chunks)), encoding=encoding, newline="")
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """
+    Comprime en formato gzip a medida que llegan los bloques; cada bloque se
+    vacía (Z_SYNC_FLUSH) para que el cliente reciba datos sin esperar al final
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
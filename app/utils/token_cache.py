@@ -0,0 +1,139 @@
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+
+class ClaimsCache:
+    """
+    LRU acotado de claims JWT ya validados, indexado por el digest del token.
+
+    Cada entrada vence en el `exp` del token, de modo que un token expirado nunca se
+    sirve desde la caché. También permite purgar un token (logout) o todos los tokens
+    de un usuario (desactivación, nueva sesión).
+    """
+
+    def __init__(self, max_entries: int, clock: Callable[[], float] = time.time):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._by_subject: Dict[str, Set[str]] = {}
+        # Heap (exp, digest) para desalojar entradas vencidas sin recorrer la caché
+        self._expirations: List[Tuple[float, str]] = []
+        # verify_token se ejecuta también en el threadpool (rutas síncronas)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+        self.invalidated = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            claims, exp = entry
+            if exp <= self._clock():
+                self._remove(digest)
+                self.expired += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return claims
+
+    def put(self, digest: str, claims: Dict[str, Any]) -> None:
+        exp = claims.get("exp")
+        # Solo se cachean tokens con expiración
+        if not self.enabled or not isinstance(exp, (int, float)):
+            return
+
+        with self._lock:
+            now = self._clock()
+            self._purge_expired(now)
+            if exp <= now:
+                return
+
+            if digest in self._entries:
+                self._remove(digest)
+            self._entries[digest] = (claims, float(exp))
+            heapq.heappush(self._expirations, (float(exp), digest))
+            subject = claims.get("sub")
+            if subject is not None:
+                self._by_subject.setdefault(str(subject), set()).add(digest)
+
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evicted += 1
+
+    def invalidate(self, digest: str) -> None:
+        with self._lock:
+            if digest in self._entries:
+                self._remove(digest)
+                self.invalidated += 1
+
+    def invalidate_subject(self, subject: str) -> None:
+        """
+        Elimina todos los tokens cacheados de un usuario (claim `sub`)
+        """
+        with self._lock:
+            for digest in list(self._by_subject.get(str(subject), ())):
+                self._remove(digest)
+                self.invalidated += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_subject.clear()
+            self._expirations.clear()
+
+    def _remove(self, digest: str) -> None:
+        entry = self._entries.pop(digest, None)
+        if entry is None:
+            return
+        subject = entry[0].get("sub")
+        if subject is not None:
+            digests = self._by_subject.get(str(subject))
+            if digests is not None:
+                digests.discard(digest)
+                if not digests:
+                    del self._by_subject[str(subject)]
+
+    def _purge_expired(self, now: float) -> None:
+        while self._expirations and self._expirations[0][0] <= now:
+            exp, digest = heapq.heappop(self._expirations)
+            entry = self._entries.get(digest)
+            # El heap puede tener registros obsoletos de entradas ya eliminadas
+            if entry is not None and entry[1] == exp:
+                self._remove(digest)
+                self.expired += 1
+        # Compactar el heap si acumula demasiados registros obsoletos
+        if len(self._expirations) > 2 * max(len(self._entries), 64):
+            self._expirations = [(entry[1], digest) for digest, entry in self._entries.items()]
+            heapq.heapify(self._expirations)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entradas": len(self._entries),
+            "max_entradas": self.max_entries,
+            "aciertos": self.hits,
+            "fallos": self.misses,
+            "tasa_aciertos": round(self.hits / lookups, 4) if lookups else 0.0,
+            "vencidas": self.expired,
+            "desalojadas": self.evicted,
+            "invalidadas": self.invalidated,
+        }
@@ -0,0 +1,89 @@
+"""
+Benchmark: concurrencia y latencia de un endpoint de lectura con la base de datos
+en modo síncrono (Session en el threadpool) y en modo async (AsyncSession).
+
+Por defecto usa SQLite (sqlite / aiosqlite) en un archivo temporal; con --url se
+puede apuntar a PostgreSQL (el modo async usa asyncpg).
+
+Uso:
+    python -m benchmarks.bench_async_db --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+if __name__ == "__main__":
+    _parser = argparse.ArgumentParser(description=__doc__)
+    _parser.add_argument("--url", default=None)
+    _parser.add_argument("--requests", type=int, default=2000)
+    _parser.add_argument("--concurrency", type=int, default=50)
+    ARGS = _parser.parse_args()
+    os.environ["DATABASE_URL"] = ARGS.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_async.db')}"
+    os.environ.setdefault("SESSION_FEED_INTERVAL_SECONDS", "0")
+    os.environ.setdefault("SESSION_PURGE_INTERVAL_MINUTES", "0")
+
+import httpx
+
+from app.config.database import Base, SessionLocal, engine, get_async_engine
+from app.config.settings import settings
+from app.models.organization_models import Rol
+from app.utils.auth import create_access_token
+from main import app
+
+
+def seed(roles: int = 20) -> None:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if db.query(Rol).count() == 0:
+            db.add_all([Rol(nombre=f"Rol {i}", activo=True) for i in range(roles)])
+            db.commit()
+    finally:
+        db.close()
+
+
+async def run(total: int, concurrency: int, headers: dict) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get("/api/organization/roles")
+                latencies.append((time.perf_counter() - start) * 1000)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "peticiones_s": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 2),
+    }
+
+
+async def main(total: int, concurrency: int) -> None:
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    seed()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1'})}"}
+
+    for async_mode in (False, True):
+        settings.DATABASE_ASYNC_MODE = async_mode
+        await run(min(total, 100), concurrency, headers)  # calentamiento
+        result = await run(total, concurrency, headers)
+        print({"modo": "async" if async_mode else "sync", **result})
+
+    await get_async_engine().dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(ARGS.requests, ARGS.concurrency))
@@ -0,0 +1,83 @@
+"""
+Benchmark: stock total de productos en una sucursal leyendo stock_sucursal (por
+clave primaria) frente a sumar los inventarios de todas sus ubicaciones
+(JOIN ubicacion + SUM) en cada consulta.
+
+Usa SQLite por defecto; con --url se puede apuntar a una base PostgreSQL vacía.
+
+Uso:
+    python -m benchmarks.bench_branch_stock --products 2000 --locations 100
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+if __name__ == "__main__":
+    _parser = argparse.ArgumentParser(description=__doc__)
+    _parser.add_argument("--url", default=None, help="URL de base de datos (por defecto SQLite temporal)")
+    _parser.add_argument("--products", type=int, default=2000)
+    _parser.add_argument("--locations", type=int, default=100)
+    _parser.add_argument("--queries", type=int, default=2000)
+    ARGS = _parser.parse_args()
+    os.environ["DATABASE_URL"] = ARGS.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_stock_sucursal.db')}"
+    os.environ.setdefault("QUERY_STATS_ENABLED", "false")
+
+from sqlalchemy import func, insert, select
+
+from app.config.database import SessionLocal, engine
+from app.models.inventory_models import Inventario, Ubicacion
+from app.services.stock_aggregate_service import StockAggregateService
+from benchmarks.inventory_data import seed_inventory
+
+
+def seed_locations(products: int, locations: int) -> None:
+    # Ubicaciones 2..locations de la sucursal 1, cada una con todos los productos
+    with engine.begin() as conn:
+        conn.execute(insert(Ubicacion), [
+            {"id_ubicacion": u, "nombre": f"Estante {u}", "codigo_ubicacion": f"E{u}", "id_sucursal": 1}
+            for u in range(2, locations + 1)
+        ])
+        conn.execute(insert(Inventario), [
+            {"id_ubicacion": u, "id_producto": p, "cantidad_actual": 10, "stock_minimo": 1}
+            for u in range(2, locations + 1)
+            for p in range(1, products + 1)
+        ])
+
+
+def sum_over_locations(db, id_producto: int):
+    return db.execute(
+        select(func.sum(Inventario.cantidad_actual))
+        .join(Ubicacion, Ubicacion.id_ubicacion == Inventario.id_ubicacion)
+        .where(Ubicacion.id_sucursal == 1, Inventario.id_producto == id_producto)
+    ).scalar()
+
+
+def run(name: str, read, products: int, queries: int) -> None:
+    rng = random.Random(5)
+    db = SessionLocal()
+    start = time.perf_counter()
+    for _ in range(queries):
+        read(db, rng.randint(1, products))
+        # Sin caché de identidad entre consultas
+        db.expire_all()
+    elapsed = time.perf_counter() - start
+    db.close()
+    print(f"{name:<18} {elapsed / queries * 1_000_000:9.1f} µs/consulta")
+
+
+def main(products: int, locations: int, queries: int) -> None:
+    seed_inventory(engine, products)
+    seed_locations(products, locations)
+    db = SessionLocal()
+    StockAggregateService.reconcile(db)
+    db.close()
+    print(f"{products} productos en {locations} ubicaciones de una sucursal")
+
+    run("SUM por ubicación", sum_over_locations, products, queries)
+    run("stock_sucursal", lambda db, id_producto: StockAggregateService.get(db, 1, id_producto), products, queries)
+
+
+if __name__ == "__main__":
+    main(ARGS.products, ARGS.locations, ARGS.queries)
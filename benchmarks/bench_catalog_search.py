@@ -0,0 +1,110 @@
+"""
+Benchmark: memoria y latencia del índice de búsqueda de productos (CatalogIndex)
+frente a la búsqueda SQL, con un catálogo sintético de nombres combinados a
+partir de listas de palabras.
+
+Usa SQLite por defecto; con --url se puede apuntar a una base PostgreSQL vacía.
+
+Uso:
+    python -m benchmarks.bench_catalog_search --products 500000
+"""
+import argparse
+import os
+import tempfile
+
+if __name__ == "__main__":
+    _parser = argparse.ArgumentParser(description=__doc__)
+    _parser.add_argument("--url", default=None, help="URL de base de datos (por defecto SQLite temporal)")
+    _parser.add_argument("--products", type=int, default=500_000)
+    _parser.add_argument("--queries", type=int, default=2000)
+    _parser.add_argument("--sql-queries", type=int, default=50)
+    ARGS = _parser.parse_args()
+    os.environ["DATABASE_URL"] = ARGS.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_catalogo.db')}"
+    os.environ.setdefault("QUERY_STATS_ENABLED", "false")
+
+import gc
+import random
+import time
+import tracemalloc
+
+from sqlalchemy import insert
+
+from app.config.database import Base, SessionLocal, engine
+from app.models.inventory_models import Producto
+from app.services.catalog_search_service import CatalogSearchService, catalog_index
+
+PRODUCTS = ["Arroz", "Azúcar", "Harina", "Aceite", "Leche", "Yogur", "Galletas", "Fideos", "Café", "Té",
+            "Jabón", "Detergente", "Shampoo", "Atún", "Sardinas", "Mermelada", "Chocolate", "Avena",
+            "Lentejas", "Garbanzos", "Vinagre", "Mostaza", "Mayonesa", "Ketchup", "Salsa de tomate"]
+VARIANTS = ["integral", "light", "extra", "premium", "clásico", "orgánico", "sin sal", "natural",
+            "con chocolate", "de vainilla", "de fresa", "descremada", "entera", "en polvo", "instantáneo"]
+BRANDS = ["Andes", "Sur", "La Granja", "Del Valle", "Costa", "Patagonia", "Norteño", "Serrano",
+          "Don Pedro", "Doña Rosa", "El Molino", "San Juan", "Santa Clara", "Los Alpes", "Pacífico"]
+SIZES = ["100 g", "250 g", "500 g", "1 kg", "2 kg", "5 kg", "200 ml", "500 ml", "1 l", "2 l", "x6", "x12"]
+
+
+def product_name(rng: random.Random) -> str:
+    return f"{rng.choice(PRODUCTS)} {rng.choice(VARIANTS)} {rng.choice(BRANDS)} {rng.choice(SIZES)}"
+
+
+def seed_catalog(products: int) -> None:
+    rng = random.Random(3)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for first in range(1, products + 1, 20000):
+            conn.execute(insert(Producto), [
+                {"id_producto": i, "codigo_producto": f"{i % 97:02d}{i:08d}", "nombre": product_name(rng)}
+                for i in range(first, min(first + 20000, products + 1))
+            ])
+
+
+def measure(name: str, search, terms, queries: int) -> None:
+    timings = []
+    for i in range(queries):
+        term = terms[i % len(terms)]
+        start = time.perf_counter()
+        search(term)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    p50 = timings[len(timings) // 2] * 1_000_000
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1_000_000
+    print(f"{name:<34} p50 {p50:9.1f} µs   p99 {p99:9.1f} µs")
+
+
+def main(products: int, queries: int, sql_queries: int) -> None:
+    seed_catalog(products)
+    print(f"{products} productos")
+
+    gc.collect()
+    tracemalloc.start()
+    catalog_index.build(engine)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats = catalog_index.stats()
+    print(f"construcción: {stats['duracion_construccion_s']} s (con tracemalloc)")
+    print(f"memoria retenida: {retained / 2**20:.1f} MiB ({retained / products:.0f} B/producto); "
+          f"pico: {peak / 2**20:.1f} MiB")
+    print(f"n-gramas: {stats['ngramas']}, entradas: {stats['entradas']}")
+
+    rng = random.Random(11)
+    exact = [f"{i % 97:02d}{i:08d}" for i in (rng.randint(1, products) for _ in range(200))]
+    prefixes = [code[:rng.randint(3, 6)] for code in exact]
+    words = [word.lower() for name in PRODUCTS + VARIANTS + BRANDS for word in name.split() if len(word) >= 4]
+    typed = [word[:rng.randint(3, len(word))] for word in words]
+    phrases = [f"{rng.choice(PRODUCTS)} {rng.choice(VARIANTS)}".lower() for _ in range(100)]
+
+    measure("código exacto (by_code)", catalog_index.by_code, exact, queries)
+    measure("prefijo de código", catalog_index.search, prefixes, queries)
+    measure("nombre, palabra parcial", catalog_index.search, typed, queries)
+    measure("nombre, frase", catalog_index.search, phrases, queries)
+
+    db = SessionLocal()
+    measure("SQL prefijo de código", lambda term: CatalogSearchService.search_sql(db, term), prefixes, sql_queries)
+    measure("SQL nombre, palabra parcial", lambda term: CatalogSearchService.search_sql(db, term), typed, sql_queries)
+    db.close()
+
+
+if __name__ == "__main__":
+    main(ARGS.products, ARGS.queries, ARGS.sql_queries)
@@ -0,0 +1,72 @@
+"""
+Benchmark: exportación de Kardex con KardexExportService (cursor del servidor con
+yield_per, un bloque serializado a la vez) frente a cargar todas las filas con
+.all() y serializarlas al final. Reporta el tiempo hasta el primer bloque de
+datos, el tiempo total y el pico de memoria de Python (tracemalloc).
+
+Usa SQLite por defecto; con --url se puede apuntar a una base PostgreSQL vacía.
+
+Uso:
+    python -m benchmarks.bench_kardex_export --rows 500000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+if __name__ == "__main__":
+    _parser = argparse.ArgumentParser(description=__doc__)
+    _parser.add_argument("--url", default=None, help="URL de base de datos (por defecto SQLite temporal)")
+    _parser.add_argument("--inventories", type=int, default=1000)
+    _parser.add_argument("--rows", type=int, default=500_000)
+    _parser.add_argument("--batch-size", type=int, default=5000)
+    ARGS = _parser.parse_args()
+    os.environ["DATABASE_URL"] = ARGS.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_kardex.db')}"
+    os.environ.setdefault("QUERY_STATS_ENABLED", "false")
+
+from app.config.database import SessionLocal, engine
+from app.services.kardex_export_service import FORMAT_CSV, KardexExportService, _csv_lines, _csv_value, kardex_export_query
+from benchmarks.inventory_data import seed_inventory, seed_kardex
+
+
+def export_all_at_once(db, statement, formato):
+    rows = db.execute(statement).all()
+    yield _csv_lines([[_csv_value(value) for value in row] for row in rows])
+
+
+def export_streaming(db, statement, formato, batch_size):
+    service = KardexExportService(db, batch_size=batch_size)
+    yield from service.stream(statement, formato)
+
+
+def run(name: str, export) -> None:
+    db = SessionLocal()
+    tracemalloc.start()
+    start = time.perf_counter()
+    first_data = None
+    size = 0
+    for n, chunk in enumerate(export(db, kardex_export_query(), FORMAT_CSV)):
+        # El primer bloque con filas (en streaming el bloque 0 es el encabezado)
+        if first_data is None and (n > 0 or name == "todo en memoria"):
+            first_data = time.perf_counter() - start
+        size += len(chunk)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    db.close()
+    print(f"{name:<16} primer bloque {first_data * 1000:9.1f} ms  total {elapsed:7.2f} s  "
+          f"pico {peak / 1024 / 1024:8.1f} MiB  ({size / 1024 / 1024:.1f} MiB exportados)")
+
+
+def main(inventories: int, rows: int, batch_size: int) -> None:
+    seed_inventory(engine, inventories)
+    seed_kardex(engine, inventories, rows)
+    print(f"{rows} filas de Kardex sobre {inventories} inventarios")
+
+    run("todo en memoria", export_all_at_once)
+    run("streaming", lambda db, statement, formato: export_streaming(db, statement, formato, batch_size))
+
+
+if __name__ == "__main__":
+    main(ARGS.inventories, ARGS.rows, ARGS.batch_size)
@@ -0,0 +1,103 @@
+"""
+Benchmark: documentos de movimiento registrados por minuto con MovementService
+(bloqueo ordenado, inserciones en bloque, UPDATE por delta) frente al registro
+línea a línea con el ORM (cargar Inventario, modificarlo y agregar un Kardex por
+línea).
+
+Usa SQLite por defecto; con --url se puede apuntar a una base PostgreSQL vacía.
+
+Uso:
+    python -m benchmarks.bench_movement_posting --documents 300 --lines 200
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+if __name__ == "__main__":
+    _parser = argparse.ArgumentParser(description=__doc__)
+    _parser.add_argument("--url", default=None, help="URL de base de datos (por defecto SQLite temporal)")
+    _parser.add_argument("--inventories", type=int, default=5000)
+    _parser.add_argument("--documents", type=int, default=300)
+    _parser.add_argument("--lines", type=int, default=200)
+    ARGS = _parser.parse_args()
+    os.environ["DATABASE_URL"] = ARGS.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_movimientos.db')}"
+    os.environ.setdefault("QUERY_STATS_ENABLED", "false")
+
+from datetime import datetime
+from decimal import Decimal
+
+from app.config.database import SessionLocal, engine
+from app.models.inventory_models import Inventario, Kardex, Movimiento, MovimientoDetalle
+from app.schemas.movement_schemas import MovimientoCreate
+from app.services.movement_service import MovementService
+from benchmarks.inventory_data import seed_inventory
+
+
+def make_documents(documents: int, lines: int, inventories: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [
+        MovimientoCreate(
+            tipo_movimiento="EGRESO" if n % 2 else "INGRESO",
+            id_motivo=2 if n % 2 else 1,
+            numero_documento=f"DOC-{n}",
+            detalles=[
+                {"id_inventario": rng.randint(1, inventories), "cantidad": Decimal(rng.randint(1, 5))}
+                for _ in range(lines)
+            ]
+        )
+        for n in range(documents)
+    ]
+
+
+def post_row_by_row(db, data: MovimientoCreate) -> None:
+    sign = 1 if data.tipo_movimiento == "INGRESO" else -1
+    now = datetime.utcnow()
+    movimiento = Movimiento(
+        tipo_movimiento=data.tipo_movimiento, id_motivo=data.id_motivo,
+        numero_documento=data.numero_documento, id_usuario=1, fecha_movimiento=now
+    )
+    db.add(movimiento)
+    db.flush()
+    for line in data.detalles:
+        inventario = db.get(Inventario, line.id_inventario, with_for_update=True)
+        anterior = inventario.cantidad_actual
+        inventario.cantidad_actual = anterior + sign * line.cantidad
+        db.add(MovimientoDetalle(
+            id_movimiento=movimiento.id_movimiento, id_inventario=line.id_inventario, cantidad=line.cantidad
+        ))
+        db.add(Kardex(
+            id_inventario=line.id_inventario, tipo_movimiento=data.tipo_movimiento,
+            id_motivo=data.id_motivo, cantidad=line.cantidad, cantidad_anterior=anterior,
+            cantidad_nueva=inventario.cantidad_actual, id_usuario=1, fecha_movimiento=now
+        ))
+        db.flush()
+    db.commit()
+
+
+def run(name: str, post, documents) -> None:
+    db = SessionLocal()
+    start = time.perf_counter()
+    for data in documents:
+        post(db, data)
+    elapsed = time.perf_counter() - start
+    db.close()
+    lines = sum(len(d.detalles) for d in documents)
+    print(f"{name:<14} {len(documents) / elapsed * 60:10.0f} documentos/min  "
+          f"{lines / elapsed:10.0f} líneas/s")
+
+
+def main(inventories: int, documents: int, lines: int) -> None:
+    docs = make_documents(documents, lines, inventories)
+    print(f"{documents} documentos de {lines} líneas sobre {inventories} inventarios")
+
+    seed_inventory(engine, inventories)
+    run("línea a línea", post_row_by_row, docs)
+
+    seed_inventory(engine, inventories)
+    run("MovementService", lambda db, data: MovementService(db).post_movement(data, id_usuario=1), docs)
+
+
+if __name__ == "__main__":
+    main(ARGS.inventories, ARGS.documents, ARGS.lines)
@@ -0,0 +1,100 @@
+"""
+Benchmark: latencia p99 de un endpoint no relacionado mientras se procesan logins.
+
+Compara el hashing de contraseñas en el event loop (verify_password) contra el
+pool de procesos (verify_password_async).
+
+Uso:
+    python -m benchmarks.bench_password_hashing --logins 40 --pings 400
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import httpx
+from fastapi import FastAPI
+
+from app.utils.auth import (
+    get_password_hash, verify_password, verify_password_async, password_executor
+)
+
+PASSWORD = "contraseña_benchmark"
+STORED_HASH = get_password_hash(PASSWORD)
+
+app = FastAPI()
+
+
+@app.post("/login-bloqueante")
+async def login_bloqueante():
+    return {"ok": verify_password(PASSWORD, STORED_HASH)}
+
+
+@app.post("/login-pool")
+async def login_pool():
+    return {"ok": await verify_password_async(PASSWORD, STORED_HASH)}
+
+
+@app.get("/ping")
+async def ping():
+    return {"ok": True}
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(login_path: str, logins: int, pings: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        latencies = []
+        interval = 0.005
+
+        async def pinger(start: float):
+            # La latencia se mide desde el instante programado del ping, así el
+            # tiempo que el event loop estuvo bloqueado también se contabiliza
+            for i in range(pings):
+                scheduled = start + i * interval
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await client.get("/ping")
+                latencies.append((time.perf_counter() - scheduled) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(
+            pinger(start),
+            *(client.post(login_path) for _ in range(logins))
+        )
+        elapsed = time.perf_counter() - start
+
+    return {
+        "modo": login_path,
+        "total_s": round(elapsed, 2),
+        "ping_p50_ms": round(statistics.median(latencies), 2),
+        "ping_p99_ms": round(percentile(latencies, 99), 2),
+        "ping_max_ms": round(max(latencies), 2),
+    }
+
+
+async def main(logins: int, pings: int) -> None:
+    # Calentar el pool para no medir el arranque de los procesos
+    await verify_password_async(PASSWORD, STORED_HASH)
+
+    for path in ("/login-bloqueante", "/login-pool"):
+        print(await run(path, logins, pings))
+
+    password_executor.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--pings", type=int, default=400)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.pings))
@@ -0,0 +1,92 @@
+"""
+Benchmark: precio vigente de una página de productos con una consulta por
+producto (ORDER BY fecha_inicio DESC LIMIT 1) frente a PriceService.resolve
+(una consulta en bloque sobre ix_precio_producto_vigencia) y a la caché de
+precios vigentes.
+
+Usa SQLite por defecto; con --url se puede apuntar a una base PostgreSQL vacía.
+
+Uso:
+    python -m benchmarks.bench_price_resolution --products 20000 --history 20 --page 200
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+if __name__ == "__main__":
+    _parser = argparse.ArgumentParser(description=__doc__)
+    _parser.add_argument("--url", default=None, help="URL de base de datos (por defecto SQLite temporal)")
+    _parser.add_argument("--products", type=int, default=20000)
+    _parser.add_argument("--history", type=int, default=20, help="Precios por producto")
+    _parser.add_argument("--page", type=int, default=200, help="Productos por consulta")
+    _parser.add_argument("--queries", type=int, default=200)
+    ARGS = _parser.parse_args()
+    os.environ["DATABASE_URL"] = ARGS.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_precios.db')}"
+    os.environ.setdefault("QUERY_STATS_ENABLED", "false")
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+
+from app.config.database import SessionLocal, engine
+from app.models.inventory_models import PrecioProducto
+from app.services.price_service import PriceService, price_cache
+from benchmarks.inventory_data import seed_inventory
+
+START = datetime(2020, 1, 1)
+
+
+def seed_prices(products: int, history: int) -> None:
+    # Un precio por día y producto; el último queda abierto
+    with engine.begin() as conn:
+        for id_producto in range(1, products + 1):
+            conn.execute(insert(PrecioProducto), [
+                {"id_producto": id_producto, "precio": 100 + day,
+                 "fecha_inicio": START + timedelta(days=day),
+                 "fecha_fin": START + timedelta(days=day + 1) if day < history - 1 else None}
+                for day in range(history)
+            ])
+
+
+def per_product(db, ids, fecha):
+    return {
+        id_producto: db.execute(
+            select(PrecioProducto.precio)
+            .where(PrecioProducto.id_producto == id_producto, PrecioProducto.fecha_inicio <= fecha)
+            .order_by(PrecioProducto.fecha_inicio.desc())
+            .limit(1)
+        ).scalar()
+        for id_producto in ids
+    }
+
+
+def run(name: str, read, products: int, page: int, queries: int) -> None:
+    rng = random.Random(7)
+    db = SessionLocal()
+    start = time.perf_counter()
+    for _ in range(queries):
+        first = rng.randint(1, products - page + 1)
+        read(db, range(first, first + page))
+    elapsed = time.perf_counter() - start
+    db.close()
+    print(f"{name:<28} {elapsed / queries * 1000:8.2f} ms/página")
+
+
+def main(products: int, history: int, page: int, queries: int) -> None:
+    seed_inventory(engine, products)
+    seed_prices(products, history)
+    fecha = START + timedelta(days=history // 2, hours=12)
+    print(f"{products} productos con {history} precios cada uno; páginas de {page} productos")
+
+    run("consulta por producto", lambda db, ids: per_product(db, ids, fecha), products, page, queries)
+    run("resolve a una fecha", lambda db, ids: PriceService.resolve(db, ids, fecha), products, page, queries)
+    price_cache.invalidate()
+    run("resolve vigente (caché fría)", PriceService.resolve, products, page, queries)
+    run("resolve vigente (caché)", PriceService.resolve, products, page, queries)
+    print(f"caché: {price_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main(ARGS.products, ARGS.history, ARGS.page, ARGS.queries)
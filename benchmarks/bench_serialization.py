@@ -0,0 +1,112 @@
+"""
+Benchmark: CPU y asignaciones de memoria por petición para una página de 100
+usuarios, con el camino anterior (objetos ORM completos -> UserResponse ->
+UserList -> validación y serialización del response_model de FastAPI) y con el
+camino actual (consulta por columnas -> JSON directo).
+
+Usa SQLite en un archivo temporal.
+
+Uso:
+    python -m benchmarks.bench_serialization --rows 100 --requests 2000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+if __name__ == "__main__":
+    _parser = argparse.ArgumentParser(description=__doc__)
+    _parser.add_argument("--rows", type=int, default=100)
+    _parser.add_argument("--requests", type=int, default=2000)
+    ARGS = _parser.parse_args()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_serializacion.db')}"
+    os.environ.setdefault("QUERY_STATS_ENABLED", "false")
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+
+from app.config.database import Base, SessionLocal, engine
+from app.models.auth_models import Usuario
+from app.schemas import user_schemas
+from app.services.user_service import TOTAL_NONE, UserService
+from app.utils.serialization import json_response
+
+# FastAPI valida el valor retornado contra response_model y luego lo serializa
+_response_model = TypeAdapter(user_schemas.UserList)
+
+
+def seed(rows: int) -> None:
+    Base.metadata.create_all(bind=engine, tables=[Usuario.__table__])
+    with engine.begin() as conn:
+        conn.execute(insert(Usuario), [
+            {
+                "id_usuario": i,
+                "nombre": f"Nombre{i}",
+                "apellido": f"Apellido{i}",
+                "email": f"usuario{i}@example.com",
+                "password_hash": "scrypt$v=1$ln=16,r=8,p=1$" + "x" * 80,
+                "id_sucursal": 1,
+                "id_rol": 1,
+                "activo": True,
+            }
+            for i in range(1, rows + 1)
+        ])
+
+
+def before(db, rows: int) -> bytes:
+    usuarios = db.query(Usuario).order_by(Usuario.id_usuario).limit(rows).all()
+    content = user_schemas.UserList(
+        total=None,
+        usuarios=[user_schemas.UserResponse.model_validate(u) for u in usuarios]
+    )
+    validated = _response_model.validate_python(content, from_attributes=True)
+    body = json.dumps(
+        _response_model.dump_python(validated, mode="json"),
+        ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+    db.expunge_all()
+    return body
+
+
+def after(db, rows: int) -> bytes:
+    usuarios, total = UserService(db).get_users(limit=rows, total_mode=TOTAL_NONE)
+    return json_response({
+        "total": total,
+        "usuarios": [u._asdict() for u in usuarios],
+        "siguiente_cursor": None,
+        "anterior_cursor": None,
+        "total_aproximado": False,
+    }).body
+
+
+def measure(name: str, fn, rows: int, requests: int) -> None:
+    db = SessionLocal()
+    for _ in range(20):
+        fn(db, rows)
+
+    start = time.process_time()
+    for _ in range(requests):
+        fn(db, rows)
+    cpu_us = (time.process_time() - start) / requests * 1_000_000
+
+    # Memoria asignada por una petición (tracemalloc solo durante la medición)
+    tracemalloc.start()
+    fn(db, rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    db.close()
+    print(f"{name:<8} cpu={cpu_us:9.1f} us/petición  pico de memoria={peak / 1024:8.1f} KiB")
+
+
+def main(rows: int, requests: int) -> None:
+    seed(rows)
+    print(f"Página de {rows} usuarios, {requests} peticiones")
+    measure("antes", before, rows, requests)
+    measure("después", after, rows, requests)
+
+
+if __name__ == "__main__":
+    main(ARGS.rows, ARGS.requests)
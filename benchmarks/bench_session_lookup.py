@@ -0,0 +1,125 @@
+"""
+Benchmark: búsqueda de sesiones por JWT completo (String(255) UNIQUE) contra
+búsqueda por digest con índice compuesto (token_digest, activa, fecha_expiracion),
+sobre una tabla con muchas sesiones históricas.
+
+Usa SQLite por defecto; con --url se puede apuntar a una base PostgreSQL vacía.
+
+Uso:
+    python -m benchmarks.bench_session_lookup --rows 1000000 --lookups 20000
+"""
+import argparse
+import hashlib
+import os
+import random
+import secrets
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import (
+    Boolean, Column, DateTime, Index, Integer, MetaData, String, Table, Text, create_engine, insert, select
+)
+
+metadata = MetaData()
+
+sesion_token = Table(
+    "bench_sesion_token", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("token_sesion", String(255), unique=True, nullable=False),
+    Column("activa", Boolean),
+    Column("fecha_expiracion", DateTime),
+)
+
+sesion_digest = Table(
+    "bench_sesion_digest", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("token_sesion", Text, nullable=False),
+    Column("token_digest", String(64), nullable=False),
+    Column("activa", Boolean),
+    Column("fecha_expiracion", DateTime),
+    Index("uq_bench_digest", "token_digest", unique=True),
+    Index("ix_bench_digest_activa_exp", "token_digest", "activa", "fecha_expiracion"),
+)
+
+
+def fake_token() -> str:
+    # Longitud similar a un JWT real de la aplicación
+    return f"eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.{secrets.token_urlsafe(120)}.{secrets.token_urlsafe(32)}"
+
+
+def populate(engine, rows: int, batch: int = 20000) -> list:
+    now = datetime.utcnow()
+    sample = []
+    with engine.begin() as conn:
+        for offset in range(0, rows, batch):
+            tokens = [fake_token() for _ in range(min(batch, rows - offset))]
+            expiration = now + timedelta(days=1)
+            conn.execute(insert(sesion_token), [
+                {"token_sesion": t, "activa": False, "fecha_expiracion": expiration} for t in tokens
+            ])
+            conn.execute(insert(sesion_digest), [
+                {
+                    "token_sesion": t,
+                    "token_digest": hashlib.sha256(t.encode()).hexdigest(),
+                    "activa": False,
+                    "fecha_expiracion": expiration,
+                } for t in tokens
+            ])
+            sample.extend(random.sample(tokens, min(len(tokens), 50)))
+    return sample
+
+
+def measure(engine, statement_for, tokens, lookups: int) -> dict:
+    latencies = []
+    with engine.connect() as conn:
+        for _ in range(lookups):
+            token = random.choice(tokens)
+            start = time.perf_counter()
+            conn.execute(statement_for(token)).first()
+            latencies.append((time.perf_counter() - start) * 1_000_000)
+    latencies.sort()
+    return {
+        "p50_us": round(statistics.median(latencies), 1),
+        "p99_us": round(latencies[int(len(latencies) * 0.99) - 1], 1),
+    }
+
+
+def main(url: str, rows: int, lookups: int) -> None:
+    engine = create_engine(url)
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+    start = time.perf_counter()
+    tokens = populate(engine, rows)
+    print(f"{rows:,} sesiones cargadas en {time.perf_counter() - start:.1f} s")
+
+    now = datetime.utcnow()
+    by_token = measure(engine, lambda t: select(sesion_token.c.id).where(
+        sesion_token.c.token_sesion == t,
+        sesion_token.c.activa.is_(False),
+        sesion_token.c.fecha_expiracion > now,
+    ), tokens, lookups)
+    by_digest = measure(engine, lambda t: select(sesion_digest.c.id).where(
+        sesion_digest.c.token_digest == hashlib.sha256(t.encode()).hexdigest(),
+        sesion_digest.c.activa.is_(False),
+        sesion_digest.c.fecha_expiracion > now,
+    ), tokens, lookups)
+
+    print(f"por token_sesion: {by_token}")
+    print(f"por token_digest: {by_digest}  (incluye el cálculo del SHA-256)")
+    metadata.drop_all(engine)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default=None, help="URL de base de datos (por defecto SQLite temporal)")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+
+    url = args.url
+    if url is None:
+        url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_sesiones.db')}"
+    main(url, args.rows, args.lookups)
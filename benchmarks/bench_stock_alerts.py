@@ -0,0 +1,64 @@
+"""
+Benchmark: costo de evaluar las alertas de stock en cada movimiento. Compara
+los documentos registrados por minuto con STOCK_ALERTS_ENABLED desactivado y
+activado, e informa las alertas abiertas, actualizadas y resueltas.
+
+El stock inicial queda cerca del mínimo para que los movimientos abran y
+resuelvan alertas continuamente (el peor caso).
+
+Usa SQLite por defecto; con --url se puede apuntar a una base PostgreSQL vacía.
+
+Uso:
+    python -m benchmarks.bench_stock_alerts --documents 300 --lines 200
+"""
+import argparse
+import os
+import tempfile
+import time
+
+if __name__ == "__main__":
+    _parser = argparse.ArgumentParser(description=__doc__)
+    _parser.add_argument("--url", default=None, help="URL de base de datos (por defecto SQLite temporal)")
+    _parser.add_argument("--inventories", type=int, default=5000)
+    _parser.add_argument("--documents", type=int, default=300)
+    _parser.add_argument("--lines", type=int, default=200)
+    ARGS = _parser.parse_args()
+    os.environ["DATABASE_URL"] = ARGS.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_alertas.db')}"
+    os.environ.setdefault("QUERY_STATS_ENABLED", "false")
+
+from app.config.database import SessionLocal, engine
+from app.config.settings import settings
+from app.services.movement_service import MovementService
+from app.services.stock_alert_service import _stats
+from benchmarks.bench_movement_posting import make_documents
+from benchmarks.inventory_data import seed_inventory
+
+
+def run(name: str, documents, enabled: bool, inventories: int) -> None:
+    # stock_minimo 10: con 100 unidades y margen 9 los inventarios oscilan
+    # alrededor del umbral de stock bajo (100)
+    seed_inventory(engine, inventories, cantidad=100)
+    settings.STOCK_ALERTS_ENABLED = enabled
+    settings.STOCK_ALERT_MARGIN = 9
+    before = dict(_stats)
+    db = SessionLocal()
+    start = time.perf_counter()
+    for data in documents:
+        MovementService(db).post_movement(data, id_usuario=1)
+    elapsed = time.perf_counter() - start
+    db.close()
+    lines = sum(len(d.detalles) for d in documents)
+    delta = {key: _stats[key] - before[key] for key in _stats}
+    print(f"{name:<16} {len(documents) / elapsed * 60:10.0f} documentos/min  "
+          f"{lines / elapsed:10.0f} líneas/s  alertas {delta}")
+
+
+def main(inventories: int, documents: int, lines: int) -> None:
+    docs = make_documents(documents, lines, inventories)
+    print(f"{documents} documentos de {lines} líneas sobre {inventories} inventarios")
+    run("sin alertas", docs, False, inventories)
+    run("con alertas", docs, True, inventories)
+
+
+if __name__ == "__main__":
+    main(ARGS.inventories, ARGS.documents, ARGS.lines)
@@ -0,0 +1,75 @@
+"""
+Benchmark: consulta de stock a una fecha con KardexCheckpointService (punto de
+control más cercano + filas posteriores) frente a recorrer todo el Kardex del
+inventario, para historiales de tamaño creciente. Con puntos de control el
+tiempo se mantiene constante; sin ellos crece con el historial.
+
+Usa SQLite por defecto; con --url se puede apuntar a una base PostgreSQL vacía.
+
+Uso:
+    python -m benchmarks.bench_stock_at_date --inventories 50 --sizes 50000 200000 800000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+if __name__ == "__main__":
+    _parser = argparse.ArgumentParser(description=__doc__)
+    _parser.add_argument("--url", default=None, help="URL de base de datos (por defecto SQLite temporal)")
+    _parser.add_argument("--inventories", type=int, default=50)
+    _parser.add_argument("--sizes", type=int, nargs="+", default=[50_000, 200_000, 800_000])
+    _parser.add_argument("--every", type=int, default=500)
+    _parser.add_argument("--queries", type=int, default=200)
+    ARGS = _parser.parse_args()
+    os.environ["DATABASE_URL"] = ARGS.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_stock_fecha.db')}"
+    os.environ.setdefault("QUERY_STATS_ENABLED", "false")
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete
+
+from app.config.database import SessionLocal, engine
+from app.models.inventory_models import KardexSaldo, KardexSaldoProgreso
+from app.services.kardex_checkpoint_service import KardexCheckpointService
+from benchmarks.inventory_data import seed_inventory, seed_kardex
+
+START = datetime(2024, 1, 1)
+STEP = timedelta(minutes=1)
+
+
+def measure(db, inventories: int, rows: int, queries: int, seed: int = 11) -> float:
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    for _ in range(queries):
+        # Fechas en el último tramo del historial (el peor caso sin puntos de control)
+        fecha = START + STEP * rng.randint(rows * 9 // 10, rows)
+        KardexCheckpointService.stock_at(db, [rng.randint(1, inventories)], fecha)
+    return (time.perf_counter() - start) / queries * 1000
+
+
+def main(inventories: int, sizes, every: int, queries: int) -> None:
+    print(f"{inventories} inventarios, punto de control cada {every} movimientos")
+    for rows in sizes:
+        seed_inventory(engine, inventories)
+        seed_kardex(engine, inventories, rows, start=START, step=STEP)
+        db = SessionLocal()
+
+        full = measure(db, inventories, rows, queries)
+
+        started = time.perf_counter()
+        KardexCheckpointService.build(db, every=every, lag_seconds=0)
+        build = time.perf_counter() - started
+        checkpointed = measure(db, inventories, rows, queries)
+
+        db.execute(delete(KardexSaldo))
+        db.execute(delete(KardexSaldoProgreso))
+        db.commit()
+        db.close()
+        print(f"{rows:>9} filas  recorrido completo {full:8.2f} ms  "
+              f"con puntos de control {checkpointed:6.2f} ms  (generación {build:.1f} s)")
+
+
+if __name__ == "__main__":
+    main(ARGS.inventories, ARGS.sizes, ARGS.every, ARGS.queries)
@@ -0,0 +1,108 @@
+"""
+Benchmark: muchos escritores concurrentes registrando egresos de una línea sobre
+un mismo inventario (SKU muy vendido), con cada modo de actualización de stock
+(STOCK_UPDATE_MODE). Reporta documentos por segundo, latencia, conflictos de
+versión (modo optimista) y, en el modo diferido, el tiempo de aplicar los
+cambios pendientes.
+
+Usa SQLite por defecto (que serializa todas las escrituras de la base); la
+contención por fila se aprecia mejor con --url apuntando a una base PostgreSQL
+vacía.
+
+Uso:
+    python -m benchmarks.bench_stock_contention --writers 32 --documents 50
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+if __name__ == "__main__":
+    _parser = argparse.ArgumentParser(description=__doc__)
+    _parser.add_argument("--url", default=None, help="URL de base de datos (por defecto SQLite temporal)")
+    _parser.add_argument("--writers", type=int, default=32)
+    _parser.add_argument("--documents", type=int, default=50, help="Documentos por escritor")
+    _parser.add_argument("--modes", default="bloqueo,delta,optimista,diferido")
+    ARGS = _parser.parse_args()
+    os.environ["DATABASE_URL"] = ARGS.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_contencion.db')}"
+    os.environ.setdefault("QUERY_STATS_ENABLED", "false")
+    os.environ["DB_POOL_SIZE"] = str(ARGS.writers + 2)
+    os.environ["STOCK_OPTIMISTIC_RETRIES"] = "50"
+
+from decimal import Decimal
+
+from fastapi import HTTPException
+
+from app.config.database import SessionLocal, engine
+from app.models.inventory_models import Inventario, Kardex
+from app.schemas.movement_schemas import MovimientoCreate
+from app.services import movement_service
+from app.services.movement_service import STOCK_MODE_DEFERRED, MovementService
+from app.services.stock_fold_service import StockFoldService
+from benchmarks.inventory_data import seed_inventory
+
+DOCUMENT = MovimientoCreate(
+    tipo_movimiento="EGRESO", id_motivo=2, detalles=[{"id_inventario": 1, "cantidad": Decimal(1)}]
+)
+
+
+def writer(mode: str, documents: int, latencies: list, failures: list) -> None:
+    db = SessionLocal()
+    service = MovementService(db, mode=mode)
+    for _ in range(documents):
+        start = time.perf_counter()
+        try:
+            service.post_movement(DOCUMENT, id_usuario=1)
+            latencies.append((time.perf_counter() - start) * 1000)
+        except HTTPException as e:
+            failures.append(e.status_code)
+    db.close()
+
+
+def run(mode: str, writers: int, documents: int) -> None:
+    seed_inventory(engine, inventories=10)
+    movement_service._stats.update(conflictos=0, reintentos_agotados=0)
+    latencies, failures = [], []
+    threads = [
+        threading.Thread(target=writer, args=(mode, documents, latencies, failures))
+        for _ in range(writers)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    fold = ""
+    if mode == STOCK_MODE_DEFERRED:
+        fold_start = time.perf_counter()
+        db = SessionLocal()
+        StockFoldService.fold(db)
+        db.close()
+        fold = f"  fold={(time.perf_counter() - fold_start) * 1000:.0f} ms"
+
+    db = SessionLocal()
+    stock = db.get(Inventario, 1).cantidad_actual
+    kardex = db.query(Kardex).count()
+    db.close()
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+    print(
+        f"{mode:<10} {len(latencies) / elapsed:8.0f} doc/s  p50={statistics.median(latencies or [0]):6.1f} ms  "
+        f"p95={p95:6.1f} ms  conflictos={movement_service._stats['conflictos']:<5} "
+        f"fallidos={len(failures):<4} stock={stock} kardex={kardex}{fold}"
+    )
+
+
+def main(writers: int, documents: int, modes: list) -> None:
+    print(f"{writers} escritores x {documents} egresos sobre el mismo inventario")
+    for mode in modes:
+        run(mode, writers, documents)
+
+
+if __name__ == "__main__":
+    main(ARGS.writers, ARGS.documents, ARGS.modes.split(","))
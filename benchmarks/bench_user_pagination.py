@@ -0,0 +1,90 @@
+"""
+Benchmark: latencia de una página del listado de usuarios según su profundidad,
+con paginación por offset (+ COUNT exacto, comportamiento anterior) y por cursor
+(keyset sobre id_usuario, sin total).
+
+Usa SQLite por defecto; con --url se puede apuntar a una base PostgreSQL vacía.
+
+Uso:
+    python -m benchmarks.bench_user_pagination --users 1000000 --page-size 50
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+if __name__ == "__main__":
+    _parser = argparse.ArgumentParser(description=__doc__)
+    _parser.add_argument("--url", default=None, help="URL de base de datos (por defecto SQLite temporal)")
+    _parser.add_argument("--users", type=int, default=1000000)
+    _parser.add_argument("--page-size", type=int, default=50)
+    _parser.add_argument("--rounds", type=int, default=20)
+    ARGS = _parser.parse_args()
+    os.environ["DATABASE_URL"] = ARGS.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_usuarios.db')}"
+    os.environ.setdefault("QUERY_STATS_ENABLED", "false")
+
+from sqlalchemy import insert
+
+from app.config.database import Base, SessionLocal, engine
+from app.models.auth_models import Usuario
+from app.services.user_service import TOTAL_NONE, UserService
+from app.utils.pagination import CURSOR_NEXT, encode_cursor
+
+
+def populate(users: int, batch: int = 50000) -> None:
+    Base.metadata.drop_all(bind=engine, tables=[Usuario.__table__])
+    Base.metadata.create_all(bind=engine, tables=[Usuario.__table__])
+    with engine.begin() as conn:
+        for offset in range(0, users, batch):
+            conn.execute(insert(Usuario), [
+                {
+                    "id_usuario": i,
+                    "nombre": f"Nombre{i}",
+                    "apellido": f"Apellido{i % 1000}",
+                    "email": f"usuario{i}@example.com",
+                    "password_hash": "x",
+                    "id_sucursal": 1,
+                    "id_rol": 1,
+                    "activo": i % 10 != 0,
+                }
+                for i in range(offset + 1, min(offset + batch, users) + 1)
+            ])
+
+
+def measure(fn, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main(users: int, page_size: int, rounds: int) -> None:
+    start = time.perf_counter()
+    populate(users)
+    print(f"{users:,} usuarios cargados en {time.perf_counter() - start:.1f} s")
+
+    db = SessionLocal()
+    service = UserService(db)
+    print(f"{'profundidad':>12} {'offset+count ms':>16} {'offset ms':>10} {'cursor ms':>10}")
+    for fraction in (0, 0.01, 0.1, 0.5, 0.9, 0.99):
+        skip = int(users * fraction)
+        # El cursor de esa página es el id del último usuario de la página anterior
+        cursor = encode_cursor(CURSOR_NEXT, skip) if skip else None
+
+        offset_count = measure(lambda: service.get_users(skip=skip, limit=page_size), rounds)
+        offset_only = measure(
+            lambda: service.get_users(skip=skip, limit=page_size, total_mode=TOTAL_NONE), rounds
+        )
+        keyset = measure(lambda: service.get_users_page(limit=page_size, cursor=cursor), rounds)
+        db.expunge_all()
+        print(f"{skip:>12,} {offset_count:>16.2f} {offset_only:>10.2f} {keyset:>10.2f}")
+
+    db.close()
+    Base.metadata.drop_all(bind=engine, tables=[Usuario.__table__])
+
+
+if __name__ == "__main__":
+    main(ARGS.users, ARGS.page_size, ARGS.rounds)
@@ -0,0 +1,45 @@
+"""
+Microbenchmark: throughput de verify_token con y sin la caché de claims.
+
+Uso:
+    python -m benchmarks.bench_verify_token --iterations 200000
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.utils.auth import create_access_token, verify_token, claims_cache
+
+
+def run(iterations: int, header: str) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        verify_token(header)
+    return iterations / (time.perf_counter() - start)
+
+
+def main(iterations: int) -> None:
+    token = create_access_token({"sub": "1", "email": "bench@example.com"})
+    header = f"Bearer {token}"
+    max_entries = claims_cache.max_entries
+
+    claims_cache.max_entries = 0
+    claims_cache.clear()
+    uncached = run(iterations, header)
+
+    claims_cache.max_entries = max_entries or 10000
+    claims_cache.clear()
+    cached = run(iterations, header)
+
+    print(f"sin caché: {uncached:12,.0f} verificaciones/s")
+    print(f"con caché: {cached:12,.0f} verificaciones/s  ({cached / uncached:.1f}x)")
+    print(claims_cache.stats())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200000)
+    args = parser.parse_args()
+    main(args.iterations)
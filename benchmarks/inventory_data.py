@@ -0,0 +1,68 @@
+"""
+Datos de prueba comunes a los benchmarks de inventario: una sucursal, una
+ubicación, `inventories` productos con su inventario, un usuario y los motivos
+de ingreso (1) y egreso (2); opcionalmente, un historial de Kardex.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.config.database import Base
+from app.models.auth_models import Usuario
+from app.models.inventory_models import Inventario, Kardex, MotivoMovimiento, Producto, Ubicacion
+from app.models.organization_models import Sucursal
+
+
+def seed_inventory(engine, inventories: int, cantidad: int = 1_000_000) -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Sucursal), [{"id_sucursal": 1, "nombre": "Central"}])
+        conn.execute(insert(Ubicacion), [
+            {"id_ubicacion": 1, "nombre": "Almacén", "codigo_ubicacion": "ALM", "id_sucursal": 1}
+        ])
+        conn.execute(insert(Usuario), [{
+            "id_usuario": 1, "nombre": "Bench", "apellido": "Bench", "email": "bench@example.com",
+            "password_hash": "x", "id_sucursal": 1, "id_rol": 1, "activo": True,
+        }])
+        conn.execute(insert(MotivoMovimiento), [
+            {"id_motivo": 1, "nombre": "Compra", "tipo_movimiento": "INGRESO"},
+            {"id_motivo": 2, "nombre": "Venta", "tipo_movimiento": "EGRESO"},
+        ])
+        conn.execute(insert(Producto), [
+            {"id_producto": i, "codigo_producto": f"P{i:07d}", "nombre": f"Producto {i}"}
+            for i in range(1, inventories + 1)
+        ])
+        conn.execute(insert(Inventario), [
+            {"id_inventario": i, "id_ubicacion": 1, "id_producto": i,
+             "cantidad_actual": cantidad, "stock_minimo": 10}
+            for i in range(1, inventories + 1)
+        ])
+
+
+def seed_kardex(
+    engine,
+    inventories: int,
+    rows: int,
+    start: datetime = datetime(2024, 1, 1),
+    step: timedelta = timedelta(minutes=1),
+    batch_size: int = 50_000
+) -> None:
+    """
+    Agrega `rows` ingresos de una unidad repartidos entre los inventarios, uno
+    cada `step` a partir de `start`, con saldos anterior/nuevo consistentes
+    """
+    saldo = [0] * (inventories + 1)
+    with engine.begin() as conn:
+        for offset in range(0, rows, batch_size):
+            batch = []
+            for n in range(offset, min(offset + batch_size, rows)):
+                id_inventario = n % inventories + 1
+                saldo[id_inventario] += 1
+                batch.append({
+                    "id_inventario": id_inventario, "tipo_movimiento": "INGRESO", "id_motivo": 1,
+                    "cantidad": 1, "cantidad_anterior": saldo[id_inventario] - 1,
+                    "cantidad_nueva": saldo[id_inventario], "numero_documento": f"DOC-{n}",
+                    "id_usuario": 1, "fecha_movimiento": start + n * step,
+                })
+            conn.execute(insert(Kardex), batch)
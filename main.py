@@ -1,12 +1,23 @@
 import logging
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
 from fastapi.security import OAuth2PasswordBearer
-from app.routes import auth, user, organization
+from app.routes import auth, user, organization, metrics, inventory
 from app.config.cors import setup_cors
+from app.config.database import dispose_engines, engine
+from app.config.query_stats import setup_query_stats
+from app.config.replicas import setup_replica_routing
 from app.config.settings import Settings
 from app.models import auth_models, organization_models  # Importar todos los modelos
-from app.utils.auth import verify_token
+from app.utils.auth import verify_token, password_executor
+from app.services.session_feed_service import SessionFeedService
+from app.services.session_purge_service import SessionPurgeService
+from app.services.catalog_search_service import catalog_index
+from app.services.kardex_checkpoint_service import KardexCheckpointService
+from app.services.movement_service import STOCK_MODE_DEFERRED
+from app.services.stock_fold_service import StockFoldService
+import asyncio
 
 # Cargar configuración
 settings = Settings()
@@ -17,8 +28,45 @@ logging.basicConfig(level=settings.LOG_LEVEL)
 logging.getLogger("python_multipart").setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    background_tasks = []
+    # Sincronizar revocaciones de sesión hechas en otros workers
+    if settings.SESSION_FEED_INTERVAL_SECONDS > 0:
+        feed = SessionFeedService()
+        background_tasks.append(asyncio.create_task(feed.run(settings.SESSION_FEED_INTERVAL_SECONDS)))
+    # Purgar periódicamente las sesiones vencidas
+    if settings.SESSION_PURGE_INTERVAL_MINUTES > 0:
+        background_tasks.append(asyncio.create_task(
+            SessionPurgeService.run(settings.SESSION_PURGE_INTERVAL_MINUTES)
+        ))
+    # Aplicar los cambios de stock diferidos; en los demás modos no hay nada que
+    # aplicar y cada worker consultaría la tabla inventario_delta en vano
+    if settings.STOCK_UPDATE_MODE == STOCK_MODE_DEFERRED and settings.STOCK_FOLD_INTERVAL_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(
+            StockFoldService.run(settings.STOCK_FOLD_INTERVAL_SECONDS)
+        ))
+    # Puntos de control de saldo del Kardex para las consultas de stock a una fecha
+    if settings.KARDEX_CHECKPOINT_INTERVAL_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(
+            KardexCheckpointService.run(settings.KARDEX_CHECKPOINT_INTERVAL_SECONDS)
+        ))
+    # Construir el índice de búsqueda de productos sin esperar la primera búsqueda
+    if settings.CATALOG_INDEX_ENABLED:
+        catalog_index.ensure_loaded(engine)
+
+    yield
+
+    for task in background_tasks:
+        task.cancel()
+    # Liberar el pool de procesos de hashing
+    password_executor.shutdown()
+    # Cerrar las conexiones de los pools de base de datos
+    await dispose_engines()
+
 # Crear aplicación FastAPI
 app = FastAPI(
+    lifespan=lifespan,
     title="Sistema de Control de Inventario",
     description="Backend para gestionar el inventario de productos",
     version="0.0.0",
@@ -28,11 +76,16 @@ app = FastAPI(
     openapi_tags=[
         {"name": "auth", "description": "Operaciones de autenticación"},
         {"name": "organization", "description": "Operaciones de organización"},
+        {"name": "inventory", "description": "Movimientos de inventario"},
     ]
 )
 
 # Configurar CORS usando la configuración centralizada
 setup_cors(app)
+# Fijar al primario a los clientes que acaban de escribir
+setup_replica_routing(app)
+# Contar las sentencias SQL de cada petición
+setup_query_stats(app)
 
 # Configurar el esquema de seguridad OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
@@ -40,4 +93,6 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 # Incluir routers
 app.include_router(auth.router, prefix="/api/auth")
 app.include_router(user.router)
-app.include_router(organization.router, prefix="/api")
\ No newline at end of file
+app.include_router(organization.router, prefix="/api")
+app.include_router(inventory.router)
+app.include_router(metrics.router, prefix="/api")
\ No newline at end of file
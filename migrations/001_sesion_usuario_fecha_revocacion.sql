@@ -0,0 +1,6 @@
+-- Fecha de revocación de sesiones, usada por el feed de revocaciones entre workers
+ALTER TABLE sesion_usuario ADD COLUMN IF NOT EXISTS fecha_revocacion TIMESTAMPTZ NULL;
+
+-- Las sesiones ya inactivas no necesitan propagarse: quedan con fecha_revocacion NULL
+CREATE INDEX IF NOT EXISTS ix_sesion_usuario_fecha_revocacion
+    ON sesion_usuario (fecha_revocacion);
@@ -0,0 +1,41 @@
+-- Búsqueda de sesiones por digest SHA-256 del token en lugar del JWT completo.
+--
+-- Ejecutar con psql fuera de una transacción (psql -f), ya que los índices se
+-- crean con CONCURRENTLY. Orden de despliegue:
+--   1. Ejecutar los pasos 1 y 2 antes de desplegar la nueva versión.
+--   2. Desplegar.
+--   3. Ejecutar el archivo completo: el paso 2 rellena las sesiones creadas por la
+--      versión anterior durante el despliegue y el resto termina la migración.
+
+-- 1. Columna nueva (nullable mientras se rellena)
+ALTER TABLE sesion_usuario ADD COLUMN IF NOT EXISTS token_digest VARCHAR(64);
+
+-- 2. Rellenar en lotes para mantener cortos los bloqueos
+DO $$
+DECLARE
+    filas INTEGER;
+BEGIN
+    LOOP
+        UPDATE sesion_usuario
+        SET token_digest = encode(sha256(convert_to(token_sesion, 'UTF8')), 'hex')
+        WHERE id_sesion IN (
+            SELECT id_sesion FROM sesion_usuario
+            WHERE token_digest IS NULL
+            LIMIT 50000
+        );
+        GET DIAGNOSTICS filas = ROW_COUNT;
+        EXIT WHEN filas = 0;
+        COMMIT;
+    END LOOP;
+END $$;
+
+-- 3. Índices nuevos
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_sesion_usuario_token_digest
+    ON sesion_usuario (token_digest);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_sesion_usuario_digest_activa_exp
+    ON sesion_usuario (token_digest, activa, fecha_expiracion);
+
+-- 4. El token completo ya no se indexa y puede superar los 255 caracteres
+ALTER TABLE sesion_usuario ALTER COLUMN token_digest SET NOT NULL;
+ALTER TABLE sesion_usuario DROP CONSTRAINT IF EXISTS sesion_usuario_token_sesion_key;
+ALTER TABLE sesion_usuario ALTER COLUMN token_sesion TYPE TEXT;
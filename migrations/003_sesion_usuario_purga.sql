@@ -0,0 +1,20 @@
+-- Purga de sesiones vencidas (ver app/services/session_purge_service.py).
+-- Ejecutar con psql fuera de una transacción (psql -f).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_sesion_usuario_usuario_activa
+    ON sesion_usuario (id_usuario, activa);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_sesion_usuario_fecha_expiracion
+    ON sesion_usuario (fecha_expiracion);
+
+CREATE TABLE IF NOT EXISTS sesion_usuario_archivo (
+    id_sesion UUID PRIMARY KEY,
+    id_usuario INTEGER NOT NULL,
+    token_digest VARCHAR(64) NOT NULL,
+    fecha_inicio TIMESTAMPTZ,
+    fecha_expiracion TIMESTAMPTZ,
+    fecha_revocacion TIMESTAMPTZ,
+    activa BOOLEAN,
+    fecha_archivo TIMESTAMPTZ DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS ix_sesion_usuario_archivo_id_usuario
+    ON sesion_usuario_archivo (id_usuario);
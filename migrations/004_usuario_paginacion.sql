@@ -0,0 +1,8 @@
+-- Paginación por cursor del listado de usuarios (ver UserService.get_users_page).
+-- Ejecutar con psql fuera de una transacción (psql -f).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_usuario_activo_id
+    ON usuario (activo, id_usuario);
+
+-- El total estimado usa pg_class.reltuples: mantener la tabla analizada
+ANALYZE usuario;
@@ -0,0 +1,13 @@
+-- Búsqueda de usuarios por subcadena (ver app/services/user_search_service.py).
+-- ILIKE '%término%' sobre nombre, apellido y email usa estos índices GIN en lugar
+-- de recorrer la tabla; similarity() ordena los resultados.
+-- Ejecutar con psql fuera de una transacción (psql -f).
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_usuario_nombre_trgm
+    ON usuario USING gin (nombre gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_usuario_apellido_trgm
+    ON usuario USING gin (apellido gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_usuario_email_trgm
+    ON usuario USING gin (email gin_trgm_ops);
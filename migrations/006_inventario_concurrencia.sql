@@ -0,0 +1,20 @@
+-- Modos de actualización de stock (ver MovementService y StockFoldService).
+
+-- Modo optimista: versión de cada fila de inventario
+ALTER TABLE inventario ADD COLUMN IF NOT EXISTS version integer NOT NULL DEFAULT 0;
+
+-- Modo diferido: cambios pendientes de aplicar a inventario y kardex
+CREATE TABLE IF NOT EXISTS inventario_delta (
+    id_delta serial PRIMARY KEY,
+    id_inventario integer NOT NULL REFERENCES inventario (id_inventario),
+    tipo_movimiento varchar(10) NOT NULL
+        CONSTRAINT inventario_delta_tipo_movimiento_check CHECK (tipo_movimiento IN ('INGRESO', 'EGRESO')),
+    id_motivo integer NOT NULL REFERENCES motivo_movimiento (id_motivo),
+    cantidad numeric(10, 2) NOT NULL,
+    observacion varchar(500),
+    numero_documento varchar(50),
+    id_usuario integer NOT NULL REFERENCES usuario (id_usuario),
+    fecha_movimiento timestamptz DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS ix_inventario_delta_id_inventario ON inventario_delta (id_inventario);
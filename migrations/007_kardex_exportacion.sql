@@ -0,0 +1,10 @@
+-- Exportación de Kardex (ver KardexExportService).
+-- Ejecutar con psql fuera de una transacción (psql -f).
+
+-- Filtro por inventario (sucursal o producto) en orden de registro
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_kardex_inventario_id
+    ON kardex (id_inventario, id_kardex);
+
+-- Filtro por rango de fecha_movimiento
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_kardex_fecha_movimiento
+    ON kardex (fecha_movimiento);
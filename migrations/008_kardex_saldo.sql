@@ -0,0 +1,21 @@
+-- Puntos de control de saldo del Kardex para consultar el stock a una fecha
+-- (ver KardexCheckpointService).
+
+CREATE TABLE IF NOT EXISTS kardex_saldo (
+    id_inventario integer NOT NULL REFERENCES inventario (id_inventario),
+    id_kardex integer NOT NULL REFERENCES kardex (id_kardex),
+    fecha_movimiento timestamptz NOT NULL,
+    cantidad numeric(10, 2) NOT NULL,
+    movimientos integer NOT NULL,
+    PRIMARY KEY (id_inventario, id_kardex)
+);
+
+CREATE INDEX IF NOT EXISTS ix_kardex_saldo_inventario_fecha
+    ON kardex_saldo (id_inventario, fecha_movimiento);
+
+-- Última fila de Kardex incorporada a los puntos de control
+CREATE TABLE IF NOT EXISTS kardex_saldo_progreso (
+    id_progreso integer PRIMARY KEY,
+    id_kardex integer NOT NULL DEFAULT 0,
+    fecha_actualizacion timestamptz DEFAULT now()
+);
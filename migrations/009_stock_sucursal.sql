@@ -0,0 +1,19 @@
+-- Stock total por sucursal y producto, mantenido por MovementService y
+-- StockFoldService (ver StockAggregateService). Reconstruir con
+-- python -m app.commands.reconcile_stock.
+
+CREATE TABLE IF NOT EXISTS stock_sucursal (
+    id_sucursal integer NOT NULL REFERENCES sucursal (id_sucursal),
+    id_producto integer NOT NULL REFERENCES producto (id_producto),
+    cantidad numeric(12, 2) NOT NULL DEFAULT 0,
+    fecha_actualizacion timestamptz DEFAULT now(),
+    PRIMARY KEY (id_sucursal, id_producto)
+);
+
+-- Carga inicial desde el stock actual
+INSERT INTO stock_sucursal (id_sucursal, id_producto, cantidad)
+SELECT u.id_sucursal, i.id_producto, SUM(i.cantidad_actual)
+FROM inventario i
+JOIN ubicacion u ON u.id_ubicacion = i.id_ubicacion
+GROUP BY u.id_sucursal, i.id_producto
+ON CONFLICT (id_sucursal, id_producto) DO NOTHING;
@@ -0,0 +1,20 @@
+-- Alertas de stock evaluadas en cada movimiento (ver StockAlertService).
+-- Ejecutar con psql fuera de una transacción (psql -f).
+
+ALTER TABLE alerta_stock ADD COLUMN IF NOT EXISTS fecha_resolucion timestamp;
+
+-- Alertas previas: dejar abierta solo la más reciente de cada inventario
+UPDATE alerta_stock a SET fecha_resolucion = now()
+WHERE a.fecha_resolucion IS NULL
+  AND EXISTS (
+      SELECT 1 FROM alerta_stock b
+      WHERE b.id_inventario = a.id_inventario
+        AND b.fecha_resolucion IS NULL
+        AND b.id_alerta > a.id_alerta
+  );
+
+-- Una sola alerta abierta por inventario; también sirve a la consulta de
+-- alertas abiertas por sucursal sin recorrer las resueltas
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ux_alerta_stock_abierta
+    ON alerta_stock (id_inventario)
+    WHERE fecha_resolucion IS NULL;
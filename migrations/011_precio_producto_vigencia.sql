@@ -0,0 +1,40 @@
+-- Resolución de precios vigentes o a una fecha (ver PriceService).
+-- Ejecutar con psql fuera de una transacción (psql -f).
+
+-- Precios abiertos repetidos: cerrar cada uno al inicio del siguiente
+UPDATE precio_producto a SET fecha_fin = (
+    SELECT min(b.fecha_inicio) FROM precio_producto b
+    WHERE b.id_producto = a.id_producto
+      AND b.fecha_fin IS NULL
+      AND (b.fecha_inicio, b.id_precio) > (a.fecha_inicio, a.id_precio)
+)
+WHERE a.fecha_fin IS NULL
+  AND EXISTS (
+      SELECT 1 FROM precio_producto b
+      WHERE b.id_producto = a.id_producto
+        AND b.fecha_fin IS NULL
+        AND (b.fecha_inicio, b.id_precio) > (a.fecha_inicio, a.id_precio)
+  );
+
+ALTER TABLE precio_producto
+    ADD CONSTRAINT chk_precio_producto_vigencia
+    CHECK (fecha_fin IS NULL OR fecha_fin >= fecha_inicio);
+
+-- Precio de varios productos a un instante: un rango del índice por producto,
+-- resuelto sin leer la tabla
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_precio_producto_vigencia
+    ON precio_producto (id_producto, fecha_inicio, fecha_fin) INCLUDE (precio);
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ux_precio_producto_abierto
+    ON precio_producto (id_producto)
+    WHERE fecha_fin IS NULL;
+
+-- Intervalos sin superposición por producto. Si falla, listar los conflictos con:
+--   SELECT a.id_precio, b.id_precio FROM precio_producto a
+--   JOIN precio_producto b ON b.id_producto = a.id_producto AND b.id_precio > a.id_precio
+--   WHERE tstzrange(a.fecha_inicio, a.fecha_fin) && tstzrange(b.fecha_inicio, b.fecha_fin);
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+ALTER TABLE precio_producto
+    ADD CONSTRAINT ex_precio_producto_vigencia
+    EXCLUDE USING gist (id_producto WITH =, tstzrange(fecha_inicio, fecha_fin) WITH &&);
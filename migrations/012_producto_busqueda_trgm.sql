@@ -0,0 +1,12 @@
+-- Búsqueda de productos por código o nombre con SQL (ver CatalogSearchService):
+-- se usa mientras se construye el índice en memoria o con
+-- CATALOG_INDEX_ENABLED=false. ILIKE 'término%' e ILIKE '%término%' usan estos
+-- índices GIN en lugar de recorrer la tabla.
+-- Ejecutar con psql fuera de una transacción (psql -f).
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_producto_codigo_trgm
+    ON producto USING gin (codigo_producto gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_producto_nombre_trgm
+    ON producto USING gin (nombre gin_trgm_ops);
@@ -1,22 +1,49 @@
 import pytest
 from app.services.auth_service import AuthService
 from app.models.auth_models import SesionUsuario
+from app.services.session_feed_service import SessionFeedService
+from app.utils.auth import (
+    get_password_hash, verify_password, password_needs_rehash, session_state, hash_token
+)
+from datetime import datetime
 from fastapi import HTTPException
 
-def test_authenticate_user_success(test_db, test_user):
+@pytest.mark.asyncio
+async def test_authenticate_user_success(test_db, test_user):
     """Prueba de autenticación exitosa"""
+    # Arrange
+    test_user.password_hash = get_password_hash("password123")
+    test_db.commit()
+
     # Act
-    user = AuthService.authenticate_user(test_db, test_user.email, "password123")
+    user = await AuthService.authenticate_user(test_db, test_user.email, "password123")
     
     # Assert
     assert user.email == test_user.email
     assert user.activo is True
 
-def test_authenticate_user_invalid_credentials(test_db, test_user):
+@pytest.mark.asyncio
+async def test_authenticate_user_rehashes_legacy_hash(test_db, test_user, make_legacy_hash):
+    """Prueba que un hash con formato antiguo se regenere al iniciar sesión"""
+    # Arrange
+    test_user.password_hash = make_legacy_hash("password123")
+    test_db.commit()
+
+    # Act
+    user = await AuthService.authenticate_user(test_db, test_user.email, "password123")
+
+    # Assert
+    test_db.refresh(user)
+    assert user.password_hash.startswith("scrypt$v=1$")
+    assert not password_needs_rehash(user.password_hash)
+    assert verify_password("password123", user.password_hash)
+
+@pytest.mark.asyncio
+async def test_authenticate_user_invalid_credentials(test_db, test_user):
     """Prueba de autenticación con credenciales inválidas"""
     # Act & Assert
     with pytest.raises(HTTPException) as exc_info:
-        AuthService.authenticate_user(test_db, test_user.email, "wrong_password")
+        await AuthService.authenticate_user(test_db, test_user.email, "wrong_password")
     assert exc_info.value.status_code == 401
     assert exc_info.value.detail == "Credenciales incorrectas"
 
@@ -51,4 +78,38 @@ def test_get_current_session_invalid(test_db):
     with pytest.raises(HTTPException) as exc_info:
         AuthService.get_current_session(test_db, "invalid_token")
     assert exc_info.value.status_code == 401
-    assert exc_info.value.detail == "Sesión inválida o expirada"
\ No newline at end of file
+    assert exc_info.value.detail == "Sesión inválida o expirada"
+def test_get_current_session_after_logout_is_rejected(test_db, test_user):
+    """Prueba que una sesión cerrada se rechace aunque estuviera en memoria"""
+    # Arrange
+    session = AuthService.create_user_session(test_db, test_user)
+    token = str(session.token_sesion)
+    assert AuthService.get_current_session(test_db, token).id_sesion == session.id_sesion
+
+    # Act
+    AuthService.logout_user(test_db, token)
+
+    # Assert
+    with pytest.raises(HTTPException) as exc_info:
+        AuthService.get_current_session(test_db, token)
+    assert exc_info.value.status_code == 401
+
+def test_session_feed_applies_revocations_from_other_workers(test_db, test_user):
+    """Prueba que el feed aplique revocaciones hechas directamente en la tabla"""
+    # Arrange
+    session = AuthService.create_user_session(test_db, test_user)
+    token = str(session.token_sesion)
+    AuthService.get_current_session(test_db, token)
+    # Simula un logout hecho por otro worker
+    session.activa = False
+    session.fecha_revocacion = datetime.utcnow()
+    test_db.commit()
+
+    # Act
+    read = SessionFeedService().poll(test_db)
+
+    # Assert
+    assert read >= 1
+    assert session_state.is_revoked(hash_token(token))
+    with pytest.raises(HTTPException):
+        AuthService.get_current_session(test_db, token)
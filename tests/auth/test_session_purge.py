@@ -0,0 +1,50 @@
+import uuid
+from datetime import datetime, timedelta
+from app.models.auth_models import SesionUsuario, SesionUsuarioArchivo
+from app.services.session_purge_service import SessionPurgeService
+
+def add_session(db, user, expira_hace_dias: int, activa: bool) -> SesionUsuario:
+    fecha_expiracion = datetime.utcnow() - timedelta(days=expira_hace_dias)
+    session = SesionUsuario(
+        id_usuario=user.id_usuario,
+        token_sesion=uuid.uuid4().hex,
+        token_digest=uuid.uuid4().hex,
+        fecha_inicio=fecha_expiracion - timedelta(days=1),
+        fecha_expiracion=fecha_expiracion,
+        activa=activa
+    )
+    db.add(session)
+    return session
+
+def test_purge_deletes_only_old_sessions_in_batches(test_db, test_user):
+    """Prueba que se eliminen en lotes solo las sesiones fuera del periodo de retención"""
+    # Arrange
+    for _ in range(5):
+        add_session(test_db, test_user, expira_hace_dias=40, activa=False)
+    recent = add_session(test_db, test_user, expira_hace_dias=-1, activa=True)
+    test_db.commit()
+
+    # Act
+    result = SessionPurgeService.purge(test_db, retention_days=30, batch_size=2)
+
+    # Assert
+    assert result["eliminadas"] == 5
+    assert result["lotes"] == 3
+    remaining = test_db.query(SesionUsuario).all()
+    assert [s.id_sesion for s in remaining] == [recent.id_sesion]
+
+def test_purge_archives_sessions(test_db, test_user):
+    """Prueba que con archive=True las sesiones se copien al archivo antes de eliminarse"""
+    # Arrange
+    old = add_session(test_db, test_user, expira_hace_dias=40, activa=False)
+    test_db.commit()
+    old_id = old.id_sesion
+
+    # Act
+    result = SessionPurgeService.purge(test_db, retention_days=30, archive=True)
+
+    # Assert
+    assert result["archivadas"] == 1
+    assert test_db.query(SesionUsuario).count() == 0
+    archived = test_db.query(SesionUsuarioArchivo).one()
+    assert archived.id_sesion == old_id
@@ -0,0 +1,12 @@
+import base64
+import pytest
+import scrypt
+
+@pytest.fixture
+def make_legacy_hash():
+    """Genera hashes en el formato antiguo scrypt$salt$hash (parámetros LEGACY_SCRYPT_PARAMS)"""
+    def make(password: str) -> str:
+        salt = b"0123456789abcdef"
+        hash_bytes = scrypt.hash(password.encode("utf-8"), salt=salt, N=2**16, r=8, p=1, buflen=32)
+        return f"scrypt${base64.b64encode(salt).decode()}${base64.b64encode(hash_bytes).decode()}"
+    return make
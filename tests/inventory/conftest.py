@@ -0,0 +1,41 @@
+import pytest
+from decimal import Decimal
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.config.database import Base
+from app.models.auth_models import Usuario
+from app.models.inventory_models import Inventario, MotivoMovimiento, Producto, Ubicacion
+from app.models.organization_models import Sucursal
+
+@pytest.fixture
+def inventory_db(tmp_path):
+    """
+    Base SQLite con dos sucursales, una ubicación por sucursal, tres inventarios
+    (10 y 5 unidades en la sucursal 1, 0 en la sucursal 2) y motivos de ingreso (1)
+    y egreso (2)
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'inventario.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        Sucursal(id_sucursal=1, nombre="Central"),
+        Sucursal(id_sucursal=2, nombre="Norte"),
+        Ubicacion(id_ubicacion=1, nombre="Estante A", codigo_ubicacion="A1", id_sucursal=1),
+        Ubicacion(id_ubicacion=2, nombre="Estante B", codigo_ubicacion="B1", id_sucursal=2),
+        Producto(id_producto=1, codigo_producto="P-001", nombre="Arroz"),
+        Producto(id_producto=2, codigo_producto="P-002", nombre="Azúcar"),
+        Usuario(id_usuario=1, nombre="Ana", apellido="Soto", email="ana@example.com",
+                password_hash="x", id_sucursal=1, id_rol=1, activo=True),
+        MotivoMovimiento(id_motivo=1, nombre="Compra", tipo_movimiento="INGRESO"),
+        MotivoMovimiento(id_motivo=2, nombre="Venta", tipo_movimiento="EGRESO"),
+    ])
+    session.flush()
+    session.add_all([
+        Inventario(id_inventario=1, id_ubicacion=1, id_producto=1, cantidad_actual=Decimal("10"), stock_minimo=Decimal("3")),
+        Inventario(id_inventario=2, id_ubicacion=1, id_producto=2, cantidad_actual=Decimal("5"), stock_minimo=Decimal("2")),
+        Inventario(id_inventario=3, id_ubicacion=2, id_producto=1, cantidad_actual=Decimal("0"), stock_minimo=Decimal("0")),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
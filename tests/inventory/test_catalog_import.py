@@ -0,0 +1,172 @@
+import asyncio
+import io
+import json
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.controllers import inventory_controller
+from app.models.inventory_models import Categoria, PrecioProducto, Producto, Proveedor, producto_proveedor
+from app.routes import inventory
+from app.services import catalog_import_service
+from app.services.catalog_import_service import FORMAT_CSV, FORMAT_NDJSON, CatalogImportService, read_records
+from app.utils.auth import create_access_token
+from app.utils.streaming import open_text
+
+CSV = """codigo_producto,nombre,id_categoria,precio,proveedores
+P-001,,1,12.50,1|2
+P-100,Fideos,,3.20,2
+P-101,,,1.00,
+P-102,Sal,9,,
+P-103,Aceite,1,abc,
+P-100,Fideos largos,,3.20,
+"""
+
+def run_import(db, text: str, formato: str = FORMAT_CSV, batch_size: int = 1000):
+    service = CatalogImportService(db, batch_size=batch_size)
+    return list(service.run(read_records(io.StringIO(text, newline=""), formato)))
+
+def seed_references(db):
+    db.add_all([Categoria(id_categoria=1, nombre="Abarrotes"), Proveedor(id_proveedor=1, nombre="Andes"),
+                Proveedor(id_proveedor=2, nombre="Sur")])
+    db.add(PrecioProducto(id_producto=1, precio=Decimal("10.00")))
+    db.commit()
+
+def test_import_upserts_products_prices_and_suppliers(inventory_db):
+    """Prueba el upsert por código, el cierre de precios y las relaciones con proveedores"""
+    # Arrange
+    seed_references(inventory_db)
+
+    # Act
+    *batches, summary = run_import(inventory_db, CSV, batch_size=4)
+
+    # Assert
+    assert summary["resumen"]["filas"] == 6 and summary["resumen"]["lotes"] == 2
+    errors = {e["fila"]: e["error"] for batch in batches for e in batch["errores"]}
+    assert set(errors) == {3, 4, 5}
+    assert "nombre" in errors[3] and "categoría 9" in errors[4] and "precio" in errors[5]
+
+    arroz = inventory_db.query(Producto).filter_by(codigo_producto="P-001").one()
+    assert arroz.nombre == "Arroz" and arroz.id_categoria == 1
+    fideos = inventory_db.query(Producto).filter_by(codigo_producto="P-100").one()
+    assert fideos.nombre == "Fideos largos" and fideos.unidad_medida == "UNIDAD" and fideos.activo
+
+    prices = inventory_db.query(PrecioProducto).filter_by(id_producto=1).order_by(PrecioProducto.id_precio).all()
+    assert [(p.precio, p.fecha_fin is None) for p in prices] == [(Decimal("10.00"), False), (Decimal("12.50"), True)]
+    assert prices[0].fecha_fin == prices[1].fecha_inicio
+    links = inventory_db.execute(producto_proveedor.select()).all()
+    assert sorted(links) == [(1, 1), (1, 2), (fideos.id_producto, 2)]
+
+def test_import_is_idempotent(inventory_db):
+    """Prueba que repetir la importación no duplique precios ni proveedores"""
+    seed_references(inventory_db)
+    run_import(inventory_db, CSV)
+
+    summary = run_import(inventory_db, CSV)[-1]["resumen"]
+
+    assert summary["insertados"] == 0 and summary["precios"] == 0 and summary["proveedores"] == 0
+    assert inventory_db.query(PrecioProducto).count() == 3
+
+def test_import_keeps_scheduled_prices(inventory_db):
+    """Prueba que la importación no superponga un precio con uno programado"""
+    # Arrange: el producto 1 ya tiene un precio desde una fecha futura
+    seed_references(inventory_db)
+    scheduled = inventory_db.query(PrecioProducto).filter_by(id_producto=1).one()
+    scheduled.fecha_inicio = datetime.utcnow() + timedelta(days=30)
+    inventory_db.commit()
+
+    # Act
+    batch, summary = run_import(inventory_db, "codigo_producto,precio\nP-001,12.50\nP-002,4.00\n")
+
+    # Assert
+    assert [e["fila"] for e in batch["errores"]] == [1] and "precio" in batch["errores"][0]["error"]
+    assert summary["resumen"]["precios"] == 1
+    assert inventory_db.query(PrecioProducto).filter_by(id_producto=1).count() == 1
+
+def test_import_endpoint_streams_ndjson(inventory_db, monkeypatch):
+    """Prueba el endpoint de importación con un cuerpo NDJSON enviado por partes"""
+    # Arrange
+    monkeypatch.setattr(inventory_controller, "SessionLocal", sessionmaker(bind=inventory_db.get_bind()))
+    app = FastAPI()
+    app.include_router(inventory.router)
+    client = TestClient(app)
+    lines = [{"codigo_producto": f"N-{i}", "nombre": f"Producto {i}"} for i in range(5)]
+    body = "\n".join(json.dumps(line) for line in lines) + "\nno es json\n"
+
+    # Act
+    response = client.post(
+        "/api/inventory/productos/importar",
+        content=iter([body[:30].encode(), body[30:].encode()]),
+        headers={"Authorization": "Bearer " + create_access_token({"sub": "1"}),
+                 "Content-Type": "application/x-ndjson"}
+    )
+
+    # Assert
+    assert response.status_code == 200
+    items = [json.loads(line) for line in response.text.splitlines()]
+    assert items[-1]["resumen"]["insertados"] == 5
+    assert items[0]["errores"] == [{"fila": 6, "error": "JSON inválido"}]
+
+@pytest.mark.asyncio
+async def test_import_endpoint_reports_progress_while_uploading(inventory_db, monkeypatch):
+    """Prueba que el progreso de un lote llegue antes de terminar de enviar el cuerpo"""
+    # Arrange: lotes de 2 filas; la segunda parte del cuerpo se envía recién al recibir progreso
+    monkeypatch.setattr(inventory_controller, "SessionLocal", sessionmaker(bind=inventory_db.get_bind()))
+    monkeypatch.setattr(inventory_controller.settings, "CATALOG_IMPORT_BATCH_SIZE", 2)
+    app = FastAPI()
+    app.include_router(inventory.router)
+    first = b'{"codigo_producto": "N-1", "nombre": "Uno"}\n{"codigo_producto": "N-2", "nombre": "Dos"}\n'
+    rest = b'{"codigo_producto": "N-3", "nombre": "Tres"}\n'
+    progress_sent = asyncio.Event()
+    received = [{"type": "http.request", "body": first, "more_body": True}]
+    sent = []
+
+    async def receive():
+        if received:
+            return received.pop(0)
+        await asyncio.wait_for(progress_sent.wait(), timeout=10)
+        return {"type": "http.request", "body": rest, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+        if message["type"] == "http.response.body" and message["body"]:
+            progress_sent.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST", "scheme": "http",
+        "path": "/api/inventory/productos/importar", "raw_path": b"/api/inventory/productos/importar",
+        "query_string": b"", "root_path": "", "server": ("test", 80), "client": ("test", 1),
+        "headers": [(b"authorization", ("Bearer " + create_access_token({"sub": "1"})).encode()),
+                    (b"content-type", b"application/x-ndjson")],
+    }
+
+    # Act
+    await asyncio.wait_for(app(scope, receive, send), timeout=20)
+
+    # Assert
+    items = [json.loads(line) for m in sent if m["type"] == "http.response.body" for line in m["body"].splitlines()]
+    assert [item.get("lote") for item in items[:-1]] == [1, 2]
+    assert items[-1]["resumen"]["insertados"] == 3
+
+def test_open_text_decodes_split_characters():
+    """Prueba la decodificación incremental con caracteres divididos entre bloques"""
+    data = "codigo_producto,nombre\nP-1,Azúcar\n".encode("utf-8")
+    split = data.index("ú".encode("utf-8")) + 1
+
+    rows = list(read_records(open_text([data[:split], data[split:]]), FORMAT_CSV))
+
+    assert rows == [(1, {"codigo_producto": "P-1", "nombre": "Azúcar"})]
+
+def test_import_without_on_conflict_support(inventory_db, monkeypatch):
+    """Prueba el upsert portable para motores sin INSERT ... ON CONFLICT"""
+    monkeypatch.setattr(catalog_import_service, "_INSERTS", {})
+    seed_references(inventory_db)
+
+    first = run_import(inventory_db, CSV)[-1]["resumen"]
+    second = run_import(inventory_db, CSV)[-1]["resumen"]
+
+    assert (first["insertados"], first["actualizados"]) == (1, 1)
+    assert (second["insertados"], second["actualizados"]) == (0, 2)
+    assert inventory_db.query(Producto).filter_by(codigo_producto="P-001").one().id_categoria == 1
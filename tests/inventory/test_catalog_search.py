@@ -0,0 +1,169 @@
+import io
+import random
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.config.database import get_db
+from app.models.inventory_models import Producto
+from app.routes import inventory
+from app.services.catalog_import_service import FORMAT_CSV, CatalogImportService, read_records
+from app.services.catalog_search_service import CatalogIndex, CatalogSearchService, catalog_index
+from app.utils.auth import create_access_token
+
+@pytest.fixture(autouse=True)
+def empty_catalog_index():
+    catalog_index.clear()
+    yield
+    catalog_index.wait()
+    catalog_index.clear()
+
+@pytest.fixture
+def catalog_db(inventory_db):
+    """
+    Productos del inventario (P-001 Arroz, P-002 Azúcar) más otros con "arroz"
+    en el código o el nombre y uno inactivo
+    """
+    inventory_db.add_all([
+        Producto(id_producto=3, codigo_producto="ARR-10", nombre="Arroz integral"),
+        Producto(id_producto=4, codigo_producto="H-200", nombre="Harina de arroz"),
+        Producto(id_producto=5, codigo_producto="P-003", nombre="Arroz viejo", activo=False),
+        Producto(id_producto=6, codigo_producto="ARR-1", nombre="Galletas"),
+    ])
+    inventory_db.commit()
+    return inventory_db
+
+def codes(matches) -> list:
+    return [codigo for _, codigo, _ in matches]
+
+def test_index_ranks_codes_before_names(catalog_db):
+    """Prueba el orden por código exacto, prefijo de código y nombre"""
+    # Arrange
+    catalog_index.build(catalog_db.get_bind())
+
+    # Act / Assert
+    assert codes(catalog_index.search("arr")) == ["ARR-1", "ARR-10", "P-001", "H-200"]
+    assert codes(catalog_index.search("arr-1")) == ["ARR-1", "ARR-10"]
+    assert codes(catalog_index.search("AZUCAR")) == ["P-002"]
+    assert codes(catalog_index.search("p-00", limit=1)) == ["P-001"]
+    # Términos más cortos que un n-grama: código e inicio de palabra
+    assert codes(catalog_index.search("ar")) == ["ARR-1", "ARR-10", "P-001", "H-200"]
+    assert codes(catalog_index.search("rroz")) == ["P-001", "ARR-10", "H-200"]
+    assert codes(catalog_index.search("de arr")) == ["H-200"]
+    assert catalog_index.by_code("p-002") == (2, "P-002", "Azúcar")
+    assert catalog_index.by_code("P-003") is None
+
+def test_index_follows_committed_changes(catalog_db):
+    """Prueba que el índice refleje altas, cambios y bajas de productos al confirmarse"""
+    # Arrange
+    catalog_index.build(catalog_db.get_bind())
+    builds = catalog_index.builds
+    catalog_db.add(Producto(id_producto=7, codigo_producto="AC-1", nombre="Aceite de oliva"))
+    catalog_db.get(Producto, 1).nombre = "Arroz grano largo"
+    catalog_db.get(Producto, 4).activo = False
+    catalog_db.flush()
+
+    # Act
+    before_commit = CatalogSearchService.search(catalog_db, "arroz")
+    catalog_db.commit()
+    after_commit = CatalogSearchService.search(catalog_db, "arroz")
+    renamed = CatalogSearchService.search(catalog_db, "oliva")
+    catalog_db.delete(catalog_db.get(Producto, 7))
+    catalog_db.commit()
+
+    # Assert
+    assert codes(before_commit) == ["P-001", "ARR-10", "H-200"]
+    assert [(codigo, nombre) for _, codigo, nombre in after_commit] == [
+        ("ARR-10", "Arroz integral"), ("P-001", "Arroz grano largo")
+    ]
+    assert codes(renamed) == ["AC-1"]
+    assert CatalogSearchService.search(catalog_db, "oliva") == []
+    # Sin reconstruir el índice completo
+    assert catalog_index.builds == builds
+
+def test_incremental_updates_match_a_rebuild(catalog_db):
+    """Prueba que muchas actualizaciones incrementales dejen el mismo índice que reconstruirlo"""
+    # Arrange
+    rng = random.Random(1)
+    words = ["arroz", "harina", "leche", "de", "integral", "sal"]
+    catalog_index.build(catalog_db.get_bind())
+
+    # Act
+    for step in range(60):
+        # Los productos 1 y 2 tienen inventario: no se eliminan
+        id_producto = rng.randint(3, 12)
+        product = catalog_db.get(Producto, id_producto)
+        nombre = " ".join(rng.choice(words) for _ in range(rng.randint(1, 3)))
+        if product is None:
+            catalog_db.add(Producto(id_producto=id_producto, codigo_producto=f"N-{id_producto}", nombre=nombre))
+        elif step % 5 == 0:
+            catalog_db.delete(product)
+        else:
+            product.nombre = nombre
+            product.activo = step % 7 != 0
+        catalog_db.commit()
+        CatalogSearchService.search(catalog_db, "x")
+    rebuilt = CatalogIndex(refresh_seconds=0)
+    rebuilt.build(catalog_db.get_bind())
+
+    # Assert
+    for term in words + ["a", "ar", "de ha", "n-1", "roz"]:
+        assert catalog_index.search(term, limit=100) == rebuilt.search(term, limit=100)
+
+@pytest.mark.parametrize("term", ["arr", "ARR-1", "harina", "p-00", "zz"])
+def test_cold_start_falls_back_to_sql(catalog_db, term):
+    """Prueba que sin índice se responda con SQL y con los mismos resultados"""
+    # Act
+    cold = CatalogSearchService.search(catalog_db, term)
+    catalog_index.wait()
+    warm = CatalogSearchService.search(catalog_db, term)
+
+    # Assert
+    assert catalog_index.loaded
+    assert codes(cold) == codes(warm)
+
+def test_catalog_import_updates_index(catalog_db):
+    """Prueba que los productos importados (escritura fuera del ORM) se reflejen en el índice"""
+    # Arrange
+    catalog_index.build(catalog_db.get_bind())
+    csv = "codigo_producto,nombre,activo\nQ-1,Quinoa,true\nP-001,,false\n"
+
+    # Act
+    list(CatalogImportService(catalog_db).run(read_records(io.StringIO(csv, newline=""), FORMAT_CSV)))
+
+    # Assert
+    assert codes(CatalogSearchService.search(catalog_db, "quinoa")) == ["Q-1"]
+    assert catalog_index.by_code("P-001") is None
+
+def test_search_endpoint(catalog_db):
+    """Prueba el endpoint de búsqueda de productos"""
+    # Arrange
+    catalog_index.build(catalog_db.get_bind())
+    app = FastAPI()
+    app.include_router(inventory.router)
+    app.dependency_overrides[get_db] = lambda: catalog_db
+    client = TestClient(app)
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "1"})}
+
+    # Act
+    response = client.get("/api/inventory/productos/buscar", params={"q": "arroz", "limit": 2}, headers=headers)
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id_producto": 1, "codigo_producto": "P-001", "nombre": "Arroz"},
+        {"id_producto": 3, "codigo_producto": "ARR-10", "nombre": "Arroz integral"},
+    ]
+
+@pytest.mark.parametrize("term", ["usb-", "cable.", "USB-0"])
+def test_single_word_with_punctuation(catalog_db, term):
+    """Prueba términos de una palabra con puntuación final, como al tipear un código"""
+    # Arrange
+    catalog_db.add(Producto(id_producto=7, codigo_producto="USB-01", nombre="Cable USB"))
+    catalog_db.commit()
+    catalog_index.build(catalog_db.get_bind())
+
+    # Act
+    matches = codes(catalog_index.search(term))
+
+    # Assert
+    assert matches == ([] if term == "cable." else ["USB-01"])
@@ -0,0 +1,119 @@
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select
+from app.config.database import get_db
+from app.models.inventory_models import Kardex, KardexSaldo, KardexSaldoProgreso
+from app.routes import inventory
+from app.services.kardex_checkpoint_service import KardexCheckpointService
+from app.utils.auth import create_access_token
+
+START = datetime(2024, 1, 1)
+
+def add_ledger(db, id_inventario: int, saldo: Decimal, movements) -> Decimal:
+    """
+    Agrega filas de Kardex (minutos desde START, cantidad con signo) a partir del
+    saldo indicado y retorna el saldo final
+    """
+    rows = []
+    for minute, signed in movements:
+        signed = Decimal(signed)
+        rows.append({
+            "id_inventario": id_inventario, "tipo_movimiento": "INGRESO" if signed > 0 else "EGRESO",
+            "id_motivo": 1 if signed > 0 else 2, "cantidad": abs(signed), "cantidad_anterior": saldo,
+            "cantidad_nueva": saldo + signed, "id_usuario": 1,
+            "fecha_movimiento": START + timedelta(minutes=minute),
+        })
+        saldo += signed
+    db.execute(insert(Kardex), rows)
+    db.commit()
+    return saldo
+
+def expected_at(db, id_inventario: int, fecha: datetime, opening: Decimal) -> Decimal:
+    # Saldo de referencia: cantidad_nueva de la última fila hasta la fecha
+    saldo = db.scalar(
+        select(Kardex.cantidad_nueva)
+        .where(Kardex.id_inventario == id_inventario, Kardex.fecha_movimiento <= fecha)
+        .order_by(Kardex.id_kardex.desc())
+        .limit(1)
+    )
+    return opening if saldo is None else saldo
+
+@pytest.mark.parametrize("with_checkpoints", [False, True])
+def test_stock_at_matches_full_replay(inventory_db, with_checkpoints):
+    """Prueba que el stock a una fecha coincida con recorrer todo el Kardex"""
+    # Arrange: inventario 1 parte de 10 y el 2 de 5
+    add_ledger(inventory_db, 1, Decimal("10"), [(m, "2" if m % 3 else "-1") for m in range(0, 40, 2)])
+    add_ledger(inventory_db, 2, Decimal("5"), [(m, "1.5") for m in range(1, 40, 4)])
+    if with_checkpoints:
+        KardexCheckpointService.build(inventory_db, every=3, batch_size=7, lag_seconds=0)
+        assert inventory_db.query(KardexSaldo).count() > 0
+
+    for minute in [-1, 0, 5, 17, 33, 60]:
+        fecha = START + timedelta(minutes=minute)
+
+        # Act
+        stock = KardexCheckpointService.stock_at(inventory_db, [1, 2, 3], fecha)
+
+        # Assert
+        assert stock == {
+            1: expected_at(inventory_db, 1, fecha, Decimal("10")),
+            2: expected_at(inventory_db, 2, fecha, Decimal("5")),
+            3: Decimal("0"),
+        }
+
+def test_build_is_incremental(inventory_db):
+    """Prueba que el job solo procese las filas nuevas de Kardex"""
+    # Arrange
+    saldo = add_ledger(inventory_db, 1, Decimal("10"), [(m, "1") for m in range(5)])
+    first = KardexCheckpointService.build(inventory_db, every=2, lag_seconds=0)
+
+    # Act
+    add_ledger(inventory_db, 1, saldo, [(m, "1") for m in range(5, 8)])
+    second = KardexCheckpointService.build(inventory_db, every=2, lag_seconds=0)
+
+    # Assert
+    assert (first["filas"], first["puntos_de_control"]) == (5, 2)
+    assert (second["filas"], second["puntos_de_control"]) == (3, 2)
+    checkpoints = inventory_db.execute(
+        select(KardexSaldo.movimientos, KardexSaldo.cantidad).order_by(KardexSaldo.id_kardex)
+    ).all()
+    assert checkpoints == [(2, Decimal("12")), (4, Decimal("14")), (6, Decimal("16")), (8, Decimal("18"))]
+    assert inventory_db.get(KardexSaldoProgreso, 1).id_kardex == 8
+
+def test_build_skips_recent_rows(inventory_db):
+    """Prueba que las filas más recientes que el margen esperen a la siguiente ejecución"""
+    inventory_db.execute(insert(Kardex), [{
+        "id_inventario": 1, "tipo_movimiento": "INGRESO", "id_motivo": 1, "cantidad": 1,
+        "cantidad_anterior": 10, "cantidad_nueva": 11, "id_usuario": 1,
+        "fecha_movimiento": datetime.utcnow(),
+    }])
+    inventory_db.commit()
+
+    result = KardexCheckpointService.build(inventory_db, every=1, lag_seconds=60)
+
+    assert result["filas"] == 0
+
+def test_stock_at_endpoint(inventory_db):
+    """Prueba el endpoint de stock a una fecha y la exigencia de un filtro"""
+    # Arrange
+    add_ledger(inventory_db, 1, Decimal("10"), [(0, "5"), (10, "-3")])
+    app = FastAPI()
+    app.include_router(inventory.router)
+    app.dependency_overrides[get_db] = lambda: inventory_db
+    client = TestClient(app)
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "1"})}
+    fecha = (START + timedelta(minutes=5)).isoformat()
+
+    # Act
+    response = client.get("/api/inventory/stock/historico", params={"fecha": fecha, "id_sucursal": 1}, headers=headers)
+    without_filter = client.get("/api/inventory/stock/historico", params={"fecha": fecha}, headers=headers)
+
+    # Assert
+    assert response.status_code == 200
+    assert [(item["id_inventario"], Decimal(item["cantidad"])) for item in response.json()] == [
+        (1, Decimal("15")), (2, Decimal("5"))
+    ]
+    assert without_filter.status_code == 400
@@ -0,0 +1,78 @@
+import csv
+import gzip
+import io
+import json
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.controllers import inventory_controller
+from app.routes import inventory
+from app.schemas.movement_schemas import MovimientoCreate
+from app.services.kardex_export_service import (
+    FORMAT_CSV, FORMAT_NDJSON, KARDEX_EXPORT_COLUMNS, KardexExportService, kardex_export_query
+)
+from app.services.movement_service import MovementService
+from app.utils.auth import create_access_token
+
+def post_documents(db) -> None:
+    service = MovementService(db)
+    service.post_movement(MovimientoCreate(
+        tipo_movimiento="INGRESO", id_motivo=1, numero_documento="F-1",
+        detalles=[{"id_inventario": 1, "cantidad": "4"}, {"id_inventario": 3, "cantidad": "2"}]
+    ), id_usuario=1)
+    service.post_movement(MovimientoCreate(
+        tipo_movimiento="EGRESO", id_motivo=2, numero_documento="V-1",
+        detalles=[{"id_inventario": 2, "cantidad": "1.5"}]
+    ), id_usuario=1)
+
+def test_export_csv_in_batches(inventory_db):
+    """Prueba que la exportación CSV entregue encabezado y filas legibles por bloques"""
+    # Arrange
+    post_documents(inventory_db)
+    service = KardexExportService(inventory_db, batch_size=1)
+
+    # Act
+    chunks = list(service.stream(kardex_export_query(id_sucursal=1), FORMAT_CSV))
+
+    # Assert: encabezado + un bloque por fila de la sucursal 1
+    assert len(chunks) == 3 and service.rows == 2
+    rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+    assert list(rows[0].keys()) == KARDEX_EXPORT_COLUMNS
+    assert [(row["codigo_producto"], row["motivo"], row["cantidad_nueva"]) for row in rows] == [
+        ("P-001", "Compra", "14.00"), ("P-002", "Venta", "3.50")
+    ]
+    assert rows[0]["usuario"] == "Ana Soto" and rows[0]["codigo_ubicacion"] == "A1"
+
+def test_export_ndjson_filtered_by_product(inventory_db):
+    """Prueba la exportación NDJSON filtrada por producto"""
+    post_documents(inventory_db)
+
+    chunks = KardexExportService(inventory_db).stream(kardex_export_query(id_producto=1), FORMAT_NDJSON)
+    items = [json.loads(line) for line in b"".join(chunks).splitlines()]
+
+    assert [(item["id_inventario"], item["id_sucursal"]) for item in items] == [(1, 1), (3, 2)]
+    assert items[0]["tipo_movimiento"] == "INGRESO" and items[0]["numero_documento"] == "F-1"
+
+def test_export_endpoint_gzip(inventory_db, monkeypatch):
+    """Prueba el endpoint de exportación con compresión gzip"""
+    # Arrange
+    post_documents(inventory_db)
+    monkeypatch.setattr(inventory_controller, "SessionLocal", sessionmaker(bind=inventory_db.get_bind()))
+    app = FastAPI()
+    app.include_router(inventory.router)
+    client = TestClient(app)
+
+    # Act
+    response = client.get(
+        "/api/inventory/kardex/exportar",
+        params={"formato": "csv", "comprimir": True},
+        headers={"Authorization": "Bearer " + create_access_token({"sub": "1"})}
+    )
+
+    # Assert
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/gzip"
+    assert 'filename="kardex.csv.gz"' in response.headers["content-disposition"]
+    lines = gzip.decompress(response.content).decode("utf-8").splitlines()
+    assert lines[0] == ",".join(KARDEX_EXPORT_COLUMNS)
+    assert len(lines) == 4
@@ -0,0 +1,177 @@
+import pytest
+from decimal import Decimal
+from fastapi import HTTPException
+from sqlalchemy import text
+from app.models.inventory_models import Inventario, InventarioDelta, Kardex, Movimiento, MovimientoDetalle
+from app.schemas.movement_schemas import MovimientoCreate
+from app.services import movement_service
+from app.services.movement_service import (
+    STOCK_MODE_DEFERRED, STOCK_MODE_DELTA, STOCK_MODE_LOCK, STOCK_MODE_OPTIMISTIC, MovementService
+)
+from app.services.stock_fold_service import StockFoldService
+
+def document(tipo: str, id_motivo: int, lines, **extra) -> MovimientoCreate:
+    return MovimientoCreate(
+        tipo_movimiento=tipo,
+        id_motivo=id_motivo,
+        detalles=[{"id_inventario": i, "cantidad": q} for i, q in lines],
+        **extra
+    )
+
+def stock(db) -> dict:
+    db.expire_all()
+    return {i.id_inventario: i.cantidad_actual for i in db.query(Inventario)}
+
+def test_post_ingreso_updates_stock_and_kardex(inventory_db):
+    """Prueba que un ingreso actualice el stock y registre detalle y kardex por línea"""
+    # Arrange
+    data = document("INGRESO", 1, [(2, "3"), (1, "4"), (2, "1.5")], numero_documento="F-100")
+
+    # Act
+    result = MovementService(inventory_db).post_movement(data, id_usuario=1)
+
+    # Assert
+    assert result.lineas == 3
+    assert stock(inventory_db) == {1: Decimal("14"), 2: Decimal("9.5"), 3: Decimal("0")}
+    movimiento = inventory_db.get(Movimiento, result.id_movimiento)
+    assert movimiento.id_sucursal == 1 and movimiento.numero_documento == "F-100"
+    assert inventory_db.query(MovimientoDetalle).count() == 3
+    kardex = inventory_db.query(Kardex).order_by(Kardex.id_kardex).all()
+    assert [(k.id_inventario, k.cantidad_anterior, k.cantidad_nueva) for k in kardex] == [
+        (2, Decimal("5"), Decimal("8")),
+        (1, Decimal("10"), Decimal("14")),
+        (2, Decimal("8"), Decimal("9.5")),
+    ]
+
+def test_post_egreso_rejects_insufficient_stock(inventory_db):
+    """Prueba que un egreso sin stock suficiente no modifique nada"""
+    data = document("EGRESO", 2, [(1, "4"), (2, "6")])
+
+    with pytest.raises(HTTPException) as exc:
+        MovementService(inventory_db).post_movement(data, id_usuario=1)
+
+    assert exc.value.status_code == 400
+    assert stock(inventory_db) == {1: Decimal("10"), 2: Decimal("5"), 3: Decimal("0")}
+    assert inventory_db.query(Movimiento).count() == 0
+    assert inventory_db.query(Kardex).count() == 0
+
+@pytest.mark.parametrize("data, status_code", [
+    # Motivo de ingreso en un egreso
+    (document("EGRESO", 1, [(1, "1")]), 400),
+    # Inventario inexistente
+    (document("INGRESO", 1, [(99, "1")]), 404),
+    # Inventario de otra sucursal
+    (document("INGRESO", 1, [(3, "1")], id_sucursal=1), 400),
+])
+def test_post_movement_validation(inventory_db, data, status_code):
+    """Prueba las validaciones del documento"""
+    with pytest.raises(HTTPException) as exc:
+        MovementService(inventory_db).post_movement(data, id_usuario=1)
+
+    assert exc.value.status_code == status_code
+
+@pytest.mark.parametrize("mode", [STOCK_MODE_LOCK, STOCK_MODE_DELTA, STOCK_MODE_OPTIMISTIC])
+def test_update_modes_give_same_ledger(inventory_db, mode):
+    """Prueba que todos los modos inmediatos dejen el mismo stock y kardex"""
+    service = MovementService(inventory_db, mode=mode)
+
+    service.post_movement(document("EGRESO", 2, [(1, "4"), (1, "1")]), id_usuario=1)
+    with pytest.raises(HTTPException) as exc:
+        service.post_movement(document("EGRESO", 2, [(2, "1"), (1, "6")]), id_usuario=1)
+
+    assert exc.value.status_code == 400
+    assert stock(inventory_db) == {1: Decimal("5"), 2: Decimal("5"), 3: Decimal("0")}
+    assert inventory_db.get(Inventario, 1).version == 1
+    kardex = inventory_db.query(Kardex).order_by(Kardex.id_kardex).all()
+    assert [(k.cantidad_anterior, k.cantidad_nueva) for k in kardex] == [
+        (Decimal("10"), Decimal("6")), (Decimal("6"), Decimal("5"))
+    ]
+
+def test_optimistic_mode_retries_on_version_conflict(inventory_db, monkeypatch):
+    """Prueba que el modo optimista reintente el documento ante un conflicto de versión"""
+    # Arrange: otra transacción modifica el inventario después de la primera lectura
+    service = MovementService(inventory_db, mode=STOCK_MODE_OPTIMISTIC)
+    read_inventories = service.read_inventories
+    reads = []
+
+    def concurrent_read(ids, lock=False):
+        rows = read_inventories(ids, lock)
+        reads.append(ids)
+        if len(reads) == 1:
+            with inventory_db.get_bind().begin() as other:
+                other.execute(text(
+                    "UPDATE inventario SET cantidad_actual = cantidad_actual + 1, version = version + 1 "
+                    "WHERE id_inventario = 1"
+                ))
+        return rows
+
+    monkeypatch.setattr(service, "read_inventories", concurrent_read)
+
+    # Act
+    service.post_movement(document("EGRESO", 2, [(1, "2")]), id_usuario=1)
+
+    # Assert
+    assert len(reads) == 2
+    assert stock(inventory_db)[1] == Decimal("9")
+    kardex = inventory_db.query(Kardex).one()
+    assert (kardex.cantidad_anterior, kardex.cantidad_nueva) == (Decimal("11"), Decimal("9"))
+
+@pytest.mark.asyncio
+async def test_async_retries_wait_outside_the_session(inventory_db, monkeypatch):
+    """Prueba que los reintentos desde el event loop esperen con asyncio.sleep y no con time.sleep"""
+    # Arrange: otra transacción modifica el inventario después de la primera lectura
+    read_inventories = MovementService.read_inventories
+    reads = []
+    waits = []
+
+    def concurrent_read(self, ids, lock=False):
+        rows = read_inventories(self, ids, lock)
+        reads.append(ids)
+        if len(reads) == 1:
+            with inventory_db.get_bind().begin() as other:
+                other.execute(text("UPDATE inventario SET version = version + 1 WHERE id_inventario = 1"))
+        return rows
+
+    async def fake_sleep(seconds):
+        waits.append(seconds)
+
+    monkeypatch.setattr(MovementService, "read_inventories", concurrent_read)
+    monkeypatch.setattr(movement_service.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(movement_service.time, "sleep", lambda seconds: pytest.fail("time.sleep en el event loop"))
+
+    # Act
+    result = await MovementService.post_movement_async(
+        inventory_db, document("EGRESO", 2, [(1, "2")]), id_usuario=1, mode=STOCK_MODE_OPTIMISTIC
+    )
+
+    # Assert
+    assert len(reads) == 2 and len(waits) == 1
+    assert result.lineas == 1
+    assert stock(inventory_db)[1] == Decimal("8")
+
+def test_deferred_mode_folds_pending_deltas(inventory_db):
+    """Prueba que el modo diferido acumule cambios y el fold los aplique a Inventario y Kardex"""
+    # Arrange
+    service = MovementService(inventory_db, mode=STOCK_MODE_DEFERRED)
+    service.post_movement(document("INGRESO", 1, [(1, "5")]), id_usuario=1)
+    service.post_movement(document("EGRESO", 2, [(1, "12"), (2, "1")]), id_usuario=1)
+
+    # El saldo pendiente (10 + 5 - 12 = 3) ya cuenta para validar egresos
+    with pytest.raises(HTTPException):
+        service.post_movement(document("EGRESO", 2, [(1, "4")]), id_usuario=1)
+    assert stock(inventory_db)[1] == Decimal("10")
+    assert inventory_db.query(InventarioDelta).count() == 3
+
+    # Act
+    result = StockFoldService.fold(inventory_db, batch_size=2)
+
+    # Assert
+    assert result["aplicados"] == 3 and result["lotes"] == 2
+    assert stock(inventory_db) == {1: Decimal("3"), 2: Decimal("4"), 3: Decimal("0")}
+    assert inventory_db.query(InventarioDelta).count() == 0
+    kardex = inventory_db.query(Kardex).order_by(Kardex.id_kardex).all()
+    assert [(k.id_inventario, k.cantidad_anterior, k.cantidad_nueva) for k in kardex] == [
+        (1, Decimal("10"), Decimal("15")),
+        (1, Decimal("15"), Decimal("3")),
+        (2, Decimal("5"), Decimal("4")),
+    ]
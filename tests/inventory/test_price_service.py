@@ -0,0 +1,150 @@
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from app.config.database import get_db
+from app.models.inventory_models import PrecioProducto
+from app.routes import inventory
+from app.services.price_service import CurrentPriceCache, PriceService, price_cache
+from app.utils.auth import create_access_token
+
+START = datetime(2024, 1, 1)
+
+@pytest.fixture(autouse=True)
+def empty_price_cache():
+    price_cache.invalidate()
+    yield
+    price_cache.invalidate()
+
+def set_price(db, id_producto: int, precio: str, day: int):
+    rejected = PriceService.set_prices(db, {id_producto: Decimal(precio)}, START + timedelta(days=day))
+    db.commit()
+    return rejected
+
+def test_resolve_current_and_as_of(inventory_db):
+    """Prueba el precio vigente y a una fecha de varios productos en bloque"""
+    # Arrange: producto 1 con tres precios, producto 2 con uno desde el día 5
+    set_price(inventory_db, 1, "10.00", 0)
+    set_price(inventory_db, 1, "11.00", 10)
+    set_price(inventory_db, 1, "12.00", 20)
+    set_price(inventory_db, 2, "3.00", 5)
+
+    # Act
+    as_of = {day: PriceService.resolve(inventory_db, [1, 2, 3], START + timedelta(days=day)) for day in [-1, 0, 7, 10, 25]}
+    current = PriceService.resolve(inventory_db, [1, 2, 3])
+
+    # Assert
+    assert as_of[-1] == {}
+    assert as_of[0] == {1: Decimal("10.00")}
+    assert as_of[7] == {1: Decimal("10.00"), 2: Decimal("3.00")}
+    assert as_of[10] == {1: Decimal("11.00"), 2: Decimal("3.00")}
+    assert as_of[25] == current == {1: Decimal("12.00"), 2: Decimal("3.00")}
+
+def test_set_prices_rejects_overlapping_intervals(inventory_db):
+    """Prueba que un precio que se superpone con el historial se rechace sin cambios"""
+    # Arrange
+    set_price(inventory_db, 1, "10.00", 0)
+    set_price(inventory_db, 1, "11.00", 10)
+
+    # Act
+    before_open = set_price(inventory_db, 1, "9.00", 5)
+    same_start = set_price(inventory_db, 1, "9.00", 10)
+    later = PriceService.set_prices(
+        inventory_db, {1: Decimal("12.00"), 2: Decimal("3.00")}, START + timedelta(days=15)
+    )
+    inventory_db.commit()
+
+    # Assert
+    assert before_open == {1} and same_start == {1} and later == set()
+    history = inventory_db.query(PrecioProducto).filter_by(id_producto=1).order_by(PrecioProducto.fecha_inicio).all()
+    assert [(p.precio, p.fecha_inicio.day, p.fecha_fin and p.fecha_fin.day) for p in history] == [
+        (Decimal("10.00"), 1, 11), (Decimal("11.00"), 11, 16), (Decimal("12.00"), 16, None)
+    ]
+
+def test_single_open_price_per_product(inventory_db):
+    """Prueba que la base rechace un segundo precio abierto del mismo producto"""
+    set_price(inventory_db, 1, "10.00", 0)
+
+    inventory_db.add(PrecioProducto(id_producto=1, precio=Decimal("11.00"), fecha_inicio=START + timedelta(days=3)))
+
+    with pytest.raises(IntegrityError):
+        inventory_db.commit()
+    inventory_db.rollback()
+
+def test_current_price_cache_is_invalidated_on_commit(inventory_db):
+    """Prueba que la caché de precios vigentes se invalide al insertar o cerrar precios"""
+    # Arrange
+    set_price(inventory_db, 1, "10.00", 0)
+    set_price(inventory_db, 2, "3.00", 0)
+    assert PriceService.resolve(inventory_db, [1, 2]) == {1: Decimal("10.00"), 2: Decimal("3.00")}
+    hits = price_cache.hits
+
+    # Act / Assert: lectura desde la caché
+    assert PriceService.resolve(inventory_db, [1, 2]) == {1: Decimal("10.00"), 2: Decimal("3.00")}
+    assert price_cache.hits == hits + 2
+
+    # Act / Assert: nuevo precio con PriceService, visible recién al confirmar
+    PriceService.set_prices(inventory_db, {1: Decimal("10.50")}, START + timedelta(days=1))
+    assert PriceService.resolve(inventory_db, [1])[1] == Decimal("10.00")
+    inventory_db.commit()
+    assert PriceService.resolve(inventory_db, [1, 2]) == {1: Decimal("10.50"), 2: Decimal("3.00")}
+
+    # Act / Assert: precio cerrado con el ORM
+    inventory_db.query(PrecioProducto).filter_by(id_producto=2, fecha_fin=None).one().fecha_fin = START + timedelta(days=2)
+    inventory_db.rollback()
+    assert PriceService.resolve(inventory_db, [2]) == {2: Decimal("3.00")}
+    inventory_db.query(PrecioProducto).filter_by(id_producto=2, fecha_fin=None).one().fecha_fin = START + timedelta(days=2)
+    inventory_db.commit()
+    assert PriceService.resolve(inventory_db, [1, 2]) == {1: Decimal("10.50")}
+
+def test_cache_entries_end_with_their_interval():
+    """Prueba que una entrada de la caché venza al terminar la vigencia del precio"""
+    # Arrange
+    cache = CurrentPriceCache(ttl_seconds=300, max_entries=2)
+    cache.put_many({1: (Decimal("5"), START + timedelta(days=1)), 2: (Decimal("6"), None)}, cache.generation)
+
+    # Act
+    before_end, _ = cache.get_many([1, 2], START)
+    after_end, missing = cache.get_many([1, 2], START + timedelta(days=1))
+    stale_generation = cache.generation
+    cache.invalidate([2])
+    cache.put_many({2: (Decimal("7"), None)}, stale_generation)
+
+    # Assert
+    assert before_end == {1: Decimal("5"), 2: Decimal("6")}
+    assert after_end == {2: Decimal("6")} and missing == [1]
+    assert cache.get_many([2], START) == ({}, [2])
+
+def test_prices_endpoint(inventory_db):
+    """Prueba el endpoint de precios vigentes y a una fecha"""
+    # Arrange
+    set_price(inventory_db, 1, "10.00", 0)
+    set_price(inventory_db, 1, "11.00", 10)
+    app = FastAPI()
+    app.include_router(inventory.router)
+    app.dependency_overrides[get_db] = lambda: inventory_db
+    client = TestClient(app)
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "1"})}
+
+    # Act
+    current = client.get("/api/inventory/precios", params={"id_producto": [1, 2]}, headers=headers)
+    as_of = client.get(
+        "/api/inventory/precios",
+        params={"id_producto": [1], "fecha": (START + timedelta(days=3)).isoformat()},
+        headers=headers
+    )
+
+    # Assert
+    assert [(item["id_producto"], Decimal(item["precio"])) for item in current.json()] == [(1, Decimal("11.00"))]
+    assert [Decimal(item["precio"]) for item in as_of.json()] == [Decimal("10.00")]
+
+def test_closing_after_start_is_required(inventory_db):
+    """Prueba que la base rechace un precio que termina antes de empezar"""
+    set_price(inventory_db, 1, "10.00", 5)
+
+    with pytest.raises(IntegrityError):
+        inventory_db.execute(update(PrecioProducto).values(fecha_fin=START))
+    inventory_db.rollback()
@@ -0,0 +1,102 @@
+import pytest
+from decimal import Decimal
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select, update
+from app.config.database import get_db
+from app.models.inventory_models import Inventario, StockSucursal, Ubicacion
+from app.routes import inventory
+from app.schemas.movement_schemas import MovimientoCreate
+from app.services import stock_aggregate_service
+from app.services.movement_service import (
+    STOCK_MODE_DEFERRED, STOCK_MODE_DELTA, STOCK_MODE_LOCK, STOCK_MODE_OPTIMISTIC, MovementService
+)
+from app.services.stock_aggregate_service import StockAggregateService
+from app.services.stock_fold_service import StockFoldService
+from app.utils.auth import create_access_token
+
+def document(tipo: str, id_motivo: int, lines) -> MovimientoCreate:
+    return MovimientoCreate(
+        tipo_movimiento=tipo,
+        id_motivo=id_motivo,
+        detalles=[{"id_inventario": i, "cantidad": q} for i, q in lines]
+    )
+
+def aggregate(db) -> dict:
+    db.expire_all()
+    return {(row.id_sucursal, row.id_producto): row.cantidad for row in db.query(StockSucursal)}
+
+def recomputed(db) -> dict:
+    return {
+        (id_sucursal, id_producto): cantidad
+        for id_sucursal, id_producto, cantidad in db.execute(
+            select(Ubicacion.id_sucursal, Inventario.id_producto, func.sum(Inventario.cantidad_actual))
+            .join(Ubicacion, Ubicacion.id_ubicacion == Inventario.id_ubicacion)
+            .group_by(Ubicacion.id_sucursal, Inventario.id_producto)
+        )
+    }
+
+@pytest.mark.parametrize("mode", [STOCK_MODE_LOCK, STOCK_MODE_DELTA, STOCK_MODE_OPTIMISTIC, STOCK_MODE_DEFERRED])
+def test_aggregate_follows_movements(inventory_db, mode):
+    """Prueba que stock_sucursal acompañe los movimientos en todos los modos"""
+    # Arrange
+    StockAggregateService.reconcile(inventory_db)
+    service = MovementService(inventory_db, mode=mode)
+
+    # Act
+    service.post_movement(document("INGRESO", 1, [(1, "4"), (2, "1"), (1, "0.5")]), id_usuario=1)
+    service.post_movement(document("INGRESO", 1, [(3, "7")]), id_usuario=1)
+    service.post_movement(document("EGRESO", 2, [(2, "3")]), id_usuario=1)
+    if mode == STOCK_MODE_DEFERRED:
+        StockFoldService.fold(inventory_db)
+
+    # Assert
+    assert aggregate(inventory_db) == {(1, 1): Decimal("14.5"), (1, 2): Decimal("3"), (2, 1): Decimal("7")}
+    assert aggregate(inventory_db) == recomputed(inventory_db)
+    assert StockAggregateService.get(inventory_db, 1, 1) == Decimal("14.5")
+    assert StockAggregateService.get(inventory_db, 2, 2) == Decimal("0")
+
+def test_aggregate_without_on_conflict_support(inventory_db, monkeypatch):
+    """Prueba la actualización del agregado en motores sin ON CONFLICT"""
+    monkeypatch.setattr(stock_aggregate_service, "_INSERTS", {})
+    service = MovementService(inventory_db)
+
+    service.post_movement(document("INGRESO", 1, [(1, "2"), (3, "1")]), id_usuario=1)
+    service.post_movement(document("INGRESO", 1, [(3, "1")]), id_usuario=1)
+
+    assert aggregate(inventory_db) == {(1, 1): Decimal("2"), (2, 1): Decimal("2")}
+
+def test_reconcile_rebuilds_from_inventory(inventory_db):
+    """Prueba que la reconciliación corrija cambios hechos fuera de la aplicación"""
+    # Arrange
+    first = StockAggregateService.reconcile(inventory_db)
+    inventory_db.execute(update(Inventario).where(Inventario.id_inventario == 2).values(cantidad_actual=8))
+    inventory_db.commit()
+
+    # Act
+    second = StockAggregateService.reconcile(inventory_db)
+
+    # Assert
+    assert first["filas"] == 3 and first["diferencias"] == 3
+    assert second["diferencias"] == 1
+    assert aggregate(inventory_db) == recomputed(inventory_db)
+
+def test_stock_by_sucursal_endpoint(inventory_db):
+    """Prueba el endpoint de stock por sucursal"""
+    # Arrange
+    StockAggregateService.reconcile(inventory_db)
+    app = FastAPI()
+    app.include_router(inventory.router)
+    app.dependency_overrides[get_db] = lambda: inventory_db
+    client = TestClient(app)
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "1"})}
+
+    # Act
+    all_products = client.get("/api/inventory/stock/sucursal/1", headers=headers)
+    one_product = client.get("/api/inventory/stock/sucursal/1", params={"id_producto": 2}, headers=headers)
+
+    # Assert
+    assert [(item["id_producto"], Decimal(item["cantidad"])) for item in all_products.json()] == [
+        (1, Decimal("10")), (2, Decimal("5"))
+    ]
+    assert [item["id_producto"] for item in one_product.json()] == [2]
@@ -0,0 +1,91 @@
+import pytest
+from decimal import Decimal
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.config.database import get_db
+from app.config.settings import settings
+from app.models.inventory_models import AlertaStock
+from app.routes import inventory
+from app.schemas.movement_schemas import MovimientoCreate
+from app.services.movement_service import STOCK_MODE_DEFERRED, STOCK_MODE_DELTA, STOCK_MODE_LOCK, MovementService
+from app.services.stock_alert_service import StockAlertService
+from app.services.stock_fold_service import StockFoldService
+from app.utils.auth import create_access_token
+
+def document(tipo: str, id_motivo: int, lines) -> MovimientoCreate:
+    return MovimientoCreate(
+        tipo_movimiento=tipo,
+        id_motivo=id_motivo,
+        detalles=[{"id_inventario": i, "cantidad": q} for i, q in lines]
+    )
+
+def alerts(db) -> list:
+    db.expire_all()
+    return [
+        (a.id_inventario, a.estado, a.cantidad_actual, a.fecha_resolucion is None)
+        for a in db.query(AlertaStock).order_by(AlertaStock.id_alerta)
+    ]
+
+@pytest.fixture(autouse=True)
+def alert_settings(monkeypatch):
+    monkeypatch.setattr(settings, "STOCK_ALERTS_ENABLED", True)
+    monkeypatch.setattr(settings, "STOCK_ALERT_MARGIN", 0.5)
+
+@pytest.mark.parametrize("mode", [STOCK_MODE_LOCK, STOCK_MODE_DELTA, STOCK_MODE_DEFERRED])
+def test_alert_lifecycle(inventory_db, mode):
+    """Prueba que una alerta se abra, escale y se resuelva con los movimientos (inventario 1, mínimo 3)"""
+    service = MovementService(inventory_db, mode=mode)
+
+    def post(tipo, id_motivo, cantidad):
+        service.post_movement(document(tipo, id_motivo, [(1, cantidad)]), id_usuario=1)
+        if mode == STOCK_MODE_DEFERRED:
+            StockFoldService.fold(inventory_db)
+        return alerts(inventory_db)
+
+    # 10 -> 4: bajo el margen (4.5)
+    assert post("EGRESO", 2, "6") == [(1, "stock_bajo", Decimal("4"), True)]
+    # 4 -> 3: llega al mínimo, se actualiza la misma alerta
+    assert post("EGRESO", 2, "1") == [(1, "stock_minimo", Decimal("3"), True)]
+    # 3 -> 13: se resuelve
+    assert post("INGRESO", 1, "10") == [(1, "stock_minimo", Decimal("3"), False)]
+    # 13 -> 2: nueva alerta abierta
+    assert post("EGRESO", 2, "11")[-1] == (1, "stock_minimo", Decimal("2"), True)
+    assert len(alerts(inventory_db)) == 2
+
+def test_only_touched_inventories_are_evaluated(inventory_db):
+    """Prueba que solo se evalúen los inventarios del movimiento"""
+    # Inventario 2 (5, mínimo 2) no se toca aunque esté dentro del margen (3)
+    MovementService(inventory_db).post_movement(document("EGRESO", 2, [(2, "2")]), id_usuario=1)
+    MovementService(inventory_db).post_movement(document("INGRESO", 1, [(1, "1")]), id_usuario=1)
+
+    assert alerts(inventory_db) == [(2, "stock_bajo", Decimal("3"), True)]
+
+def test_alerts_disabled(inventory_db, monkeypatch):
+    """Prueba que STOCK_ALERTS_ENABLED=false no genere alertas"""
+    monkeypatch.setattr(settings, "STOCK_ALERTS_ENABLED", False)
+
+    MovementService(inventory_db).post_movement(document("EGRESO", 2, [(1, "9")]), id_usuario=1)
+
+    assert alerts(inventory_db) == []
+
+def test_open_alerts_by_sucursal_endpoint(inventory_db):
+    """Prueba la consulta de alertas abiertas por sucursal"""
+    # Arrange
+    MovementService(inventory_db).post_movement(document("EGRESO", 2, [(1, "6"), (2, "4")]), id_usuario=1)
+    app = FastAPI()
+    app.include_router(inventory.router)
+    app.dependency_overrides[get_db] = lambda: inventory_db
+    client = TestClient(app)
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "1"})}
+
+    # Act
+    response = client.get("/api/inventory/alertas", params={"id_sucursal": 1}, headers=headers)
+    other = client.get("/api/inventory/alertas", params={"id_sucursal": 2}, headers=headers)
+
+    # Assert: stock_minimo (inventario 2 en 1) antes que stock_bajo (inventario 1 en 4)
+    items = response.json()
+    assert [(item["id_inventario"], item["estado"], item["codigo_producto"]) for item in items] == [
+        (2, "stock_minimo", "P-002"), (1, "stock_bajo", "P-001")
+    ]
+    assert other.json() == []
+    assert StockAlertService.open_by_sucursal(inventory_db, 1)[0]["codigo_ubicacion"] == "A1"
@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.utils.admission import AdmissionController, TokenBucketLimiter
+
+@pytest.mark.asyncio
+async def test_admission_rejects_when_queue_is_full():
+    """Prueba que se responda 503 con Retry-After cuando la cola está llena"""
+    # Arrange
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=1)
+    release = asyncio.Event()
+
+    async def job():
+        async with controller.slot():
+            await release.wait()
+
+    running = asyncio.create_task(job())
+    queued = asyncio.create_task(job())
+    await asyncio.sleep(0)
+
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc_info:
+        async with controller.slot():
+            pass
+    assert exc_info.value.status_code == 503
+    assert "Retry-After" in exc_info.value.headers
+    assert controller.queue_depth == 1
+
+    release.set()
+    await asyncio.gather(running, queued)
+    assert controller.active == 0
+    assert controller.stats()["rechazados_cola_llena"] == 1
+
+@pytest.mark.asyncio
+async def test_admission_rejects_after_queue_deadline():
+    """Prueba que un trabajo en cola se rechace al vencer el plazo de espera"""
+    # Arrange
+    controller = AdmissionController(max_concurrent=1, max_queue=5, queue_timeout=0.01)
+    release = asyncio.Event()
+
+    async def job():
+        async with controller.slot():
+            await release.wait()
+
+    running = asyncio.create_task(job())
+    await asyncio.sleep(0)
+
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc_info:
+        async with controller.slot():
+            pass
+    assert exc_info.value.status_code == 503
+    assert controller.queue_depth == 0
+
+    release.set()
+    await running
+    assert controller.active == 0
+
+def test_token_bucket_blocks_after_capacity_and_refills():
+    """Prueba que el bucket se agote tras los fallos permitidos y se recupere con el tiempo"""
+    # Arrange
+    limiter = TokenBucketLimiter(capacity=2, window_seconds=10)
+
+    # Act
+    limiter.consume("ip:1", now=0)
+    limiter.consume("ip:1", now=0)
+
+    # Assert
+    assert limiter.retry_after("ip:1", now=0) == pytest.approx(5)
+    assert limiter.retry_after("ip:1", now=5) == 0
+    assert limiter.retry_after("ip:2", now=0) == 0
@@ -0,0 +1,57 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app.config.database import Base, run_db, to_async_url
+from app.models.auth_models import Usuario
+from app.models.organization_models import Rol, Sucursal
+from app.schemas import user_schemas
+from app.services.auth_service import AuthService
+from app.services.organization_service import OrganizationService
+from app.services.user_search_service import user_search_index
+from app.services.user_service import UserService
+
+@pytest_asyncio.fixture
+async def async_db(tmp_path):
+    # Base SQLite en archivo accedida con aiosqlite
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async_test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    # El índice de búsqueda en memoria no debe conservar usuarios de otras pruebas
+    user_search_index.clear()
+    session_factory = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    async with session_factory() as db:
+        db.add_all([
+            Rol(id_rol=1, nombre="Administrador", activo=True),
+            Sucursal(id_sucursal=1, nombre="Central", activo=True),
+        ])
+        await db.commit()
+        yield db
+    await engine.dispose()
+
+def test_to_async_url():
+    """Prueba la conversión de URLs síncronas a drivers async"""
+    assert to_async_url("postgresql://u:p@host/db") == "postgresql+asyncpg://u:p@host/db"
+    assert to_async_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+    assert to_async_url("postgresql+asyncpg://u:p@host/db") == "postgresql+asyncpg://u:p@host/db"
+
+@pytest.mark.asyncio
+async def test_services_run_on_async_session(async_db):
+    """Prueba que los servicios funcionen sobre una AsyncSession"""
+    # Act
+    roles = await run_db(async_db, OrganizationService.get_roles)
+    created = await UserService(async_db).create_user(user_schemas.UserCreate(
+        nombre="Ana", apellido="Pérez", email="ana@example.com",
+        id_sucursal=1, id_rol=1, password="password123"
+    ))
+    user = await AuthService.authenticate_user(async_db, "ana@example.com", "password123")
+    session = await run_db(async_db, AuthService.create_user_session, user)
+    current = await run_db(async_db, AuthService.get_current_session, str(session.token_sesion))
+    usuarios, total = await run_db(async_db, lambda s: UserService(s).get_users(search="ana"))
+
+    # Assert
+    assert [rol.nombre for rol in roles] == ["Administrador"]
+    assert isinstance(created, Usuario)
+    assert user.id_usuario == created.id_usuario
+    assert current.id_sesion == session.id_sesion
+    assert total == 1 and usuarios[0].email == "ana@example.com"
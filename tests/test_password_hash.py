@@ -1,5 +1,10 @@
+import base64
 import pytest
-from app.utils.auth import get_password_hash, verify_password
+import scrypt
+from app.utils.auth import (
+    get_password_hash, verify_password, hash_password_async, verify_password_async,
+    password_needs_rehash, SCRYPT_PARAMS
+)
 
 def test_password_hash_generation():
     """Prueba la generación y verificación del hash de contraseña"""
@@ -12,9 +17,13 @@ def test_password_hash_generation():
     is_valid = verify_password(test_password, hashed)
     
     # Assert
+    log_n = SCRYPT_PARAMS.n.bit_length() - 1
     assert hash_parts[0] == "scrypt", "El algoritmo debe ser scrypt"
-    assert len(hash_parts) == 3, "El formato debe ser scrypt$salt$hash"
+    assert len(hash_parts) == 5, "El formato debe ser scrypt$v=1$parametros$salt$hash"
+    assert hash_parts[1] == "v=1"
+    assert hash_parts[2] == f"ln={log_n},r={SCRYPT_PARAMS.r},p={SCRYPT_PARAMS.p}"
     assert is_valid, "La verificación de la contraseña debe ser exitosa"
+    assert not password_needs_rehash(hashed)
 
 def test_password_hash_invalid_verification():
     """Prueba que la verificación falle con contraseña incorrecta"""
@@ -45,4 +54,56 @@ def test_invalid_hash_format():
     is_valid = verify_password(test_password, invalid_hash)
     
     # Assert
-    assert not is_valid, "La verificación debe fallar con formato de hash inválido"
\ No newline at end of file
+    assert not is_valid, "La verificación debe fallar con formato de hash inválido"
+
+@pytest.mark.asyncio
+async def test_async_hash_compatible_with_sync_verification():
+    """Prueba que los hashes del pool sean compatibles con la versión síncrona"""
+    # Arrange
+    test_password = "contraseña_prueba"
+
+    # Act
+    hashed = await hash_password_async(test_password)
+
+    # Assert
+    assert verify_password(test_password, hashed)
+    assert await verify_password_async(test_password, hashed)
+    assert not await verify_password_async("otra_contraseña", hashed)
+
+
+@pytest.mark.asyncio
+async def test_plain_text_hash_is_rejected():
+    """Prueba que un hash igual a la contraseña en texto plano no la valide"""
+    # Arrange
+    test_password = "contraseña_prueba"
+
+    # Act & Assert
+    assert not verify_password(test_password, test_password)
+    assert not await verify_password_async(test_password, test_password)
+
+def test_legacy_hash_is_verified_and_flagged_for_rehash(make_legacy_hash):
+    """Prueba que los hashes antiguos sigan siendo válidos y se marquen para regenerar"""
+    # Arrange
+    legacy_hash = make_legacy_hash("contraseña_prueba")
+
+    # Act & Assert
+    assert verify_password("contraseña_prueba", legacy_hash)
+    assert not verify_password("otra_contraseña", legacy_hash)
+    assert password_needs_rehash(legacy_hash)
+
+def test_hash_uses_encoded_parameters():
+    """Prueba que la verificación use los parámetros guardados en el hash"""
+    # Arrange
+    salt = b"0123456789abcdef"
+    hash_bytes = scrypt.hash(b"clave", salt=salt, N=2**10, r=4, p=1, buflen=32)
+    stored = (
+        f"scrypt$v=1$ln=10,r=4,p=1$"
+        f"{base64.b64encode(salt).decode()}${base64.b64encode(hash_bytes).decode()}"
+    )
+
+    # Act & Assert
+    assert verify_password("clave", stored)
+    assert password_needs_rehash(stored)
+    assert not verify_password("clave", stored.replace("ln=10", "ln=99"))
+    assert not verify_password("clave", stored.replace("r=4", "r=4096"))
+    assert not verify_password("clave", stored.replace("p=1", "p=1000"))
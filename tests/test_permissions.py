@@ -0,0 +1,121 @@
+import jwt
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.config.database import Base, get_db
+from app.config.settings import settings
+from app.models.auth_models import Usuario
+from app.models.organization_models import Permiso, Rol
+from app.services.auth_service import AuthService
+from app.services.permission_service import decode_bits, encode_bits, permission_cache
+from app.utils.auth import create_access_token
+from app.routes import metrics
+from app.utils.permissions import require_permission
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'permisos.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    usuarios = Permiso(id_permiso=1, modulo="usuarios", activo=True)
+    inventario = Permiso(id_permiso=2, modulo="inventario", activo=True)
+    reportes = Permiso(id_permiso=3, modulo="reportes", activo=False)
+    session.add_all([
+        Rol(id_rol=1, nombre="Administrador", activo=True, permisos=[usuarios, inventario, reportes]),
+        Rol(id_rol=2, nombre="Vendedor", activo=True, permisos=[inventario]),
+    ])
+    session.commit()
+    permission_cache.invalidate()
+    yield session
+    session.close()
+    engine.dispose()
+
+@pytest.fixture
+def client(db, monkeypatch):
+    monkeypatch.setattr(settings, "RBAC_ENABLED", True)
+    app = FastAPI()
+    app.dependency_overrides[get_db] = lambda: db
+
+    @app.get("/usuarios")
+    def list_users(token: dict = Depends(require_permission("usuarios"))):
+        return {"sub": token["sub"]}
+
+    return TestClient(app)
+
+def auth(claims: dict) -> dict:
+    return {"Authorization": "Bearer " + create_access_token(claims)}
+
+def test_compiled_bitsets(db):
+    """Prueba la compilación de los permisos activos en bitsets por rol"""
+    snapshot = permission_cache.get(db)
+
+    assert snapshot.role_bits == {1: 0b110, 2: 0b100}
+    assert snapshot.allows(snapshot.role_bits[1], "usuarios")
+    assert not snapshot.allows(snapshot.role_bits[2], "usuarios")
+    assert not snapshot.allows(snapshot.role_bits[1], "reportes")
+    assert decode_bits(encode_bits(0b110)) == 0b110
+
+def test_permission_checked_from_role_claim(client):
+    """Prueba que el permiso se resuelva desde el rol del token"""
+    assert client.get("/usuarios", headers=auth({"sub": "1", "rol": 1})).status_code == 200
+    assert client.get("/usuarios", headers=auth({"sub": "2", "rol": 2})).status_code == 403
+
+def test_permission_checked_from_token_bitset(client, db):
+    """Prueba que el bitset embebido en el token se use directamente"""
+    permission_cache.get(db)
+
+    allowed = client.get("/usuarios", headers=auth({"sub": "2", "rol": 2, "perm": encode_bits(0b10)}))
+    denied = client.get("/usuarios", headers=auth({"sub": "1", "rol": 1, "perm": encode_bits(0b100)}))
+
+    assert allowed.status_code == 200
+    assert denied.status_code == 403
+
+def test_role_change_invalidates_cache(db):
+    """Prueba que un cambio confirmado en los permisos de un rol invalide la caché"""
+    # Arrange
+    permission_cache.get(db)
+    vendedor = db.get(Rol, 2)
+
+    # Act
+    vendedor.permisos.append(db.get(Permiso, 1))
+    db.commit()
+
+    # Assert
+    assert permission_cache.current() is None
+    assert permission_cache.get(db).role_bits[2] == 0b110
+
+def test_session_token_embeds_permissions(db, monkeypatch):
+    """Prueba que el token de sesión incluya rol y bitset de permisos"""
+    monkeypatch.setattr(settings, "RBAC_TOKEN_PERMISSIONS", True)
+    user = Usuario(id_usuario=5, nombre="Ana", apellido="Soto", email="ana@example.com",
+                   password_hash="x", id_sucursal=1, id_rol=2, activo=True)
+    db.add(user)
+    db.commit()
+
+    session = AuthService.create_user_session(db, user)
+    claims = jwt.decode(session.token_sesion, options={"verify_signature": False})
+
+    assert claims["rol"] == 2
+    assert decode_bits(claims["perm"]) == 0b100
+
+def test_metrics_require_admin_permission(db, monkeypatch):
+    """Prueba que las métricas internas exijan el permiso de métricas"""
+    # Arrange
+    monkeypatch.setattr(settings, "RBAC_ENABLED", True)
+    administrador = db.get(Rol, 1)
+    administrador.permisos.append(Permiso(id_permiso=4, modulo="metricas", activo=True))
+    db.commit()
+    app = FastAPI()
+    app.dependency_overrides[get_db] = lambda: db
+    app.include_router(metrics.router)
+    client = TestClient(app)
+
+    # Act
+    admin = client.get("/metrics", headers=auth({"sub": "1", "rol": 1}))
+    vendedor = client.get("/metrics", headers=auth({"sub": "2", "rol": 2}))
+
+    # Assert
+    assert admin.status_code == 200
+    assert vendedor.status_code == 403
@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.config.database import engine_options
+from app.config.pool_monitor import InstrumentedQueuePool, attach_pool_monitor
+from app.utils.metrics import Histogram
+
+def make_engine(tmp_path, **options):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool, **options
+    )
+    return engine, attach_pool_monitor(engine, "test")
+
+def test_engine_options_skip_memory_sqlite():
+    """Prueba que SQLite en memoria conserve su pool por defecto"""
+    assert engine_options("sqlite://") == {}
+    options = engine_options("postgresql://u:p@host/db")
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert "pool_size" in options and "pool_pre_ping" in options
+
+def test_pool_monitor_counts_checkouts_and_overflow(tmp_path):
+    """Prueba que se registren conexiones en uso, esperas y overflow"""
+    # Arrange
+    engine, monitor = make_engine(tmp_path, pool_size=1, max_overflow=1)
+
+    # Act
+    first = engine.connect()
+    second = engine.connect()
+    first.execute(text("SELECT 1"))
+    stats = monitor.stats()
+    first.close()
+    second.close()
+
+    # Assert
+    assert stats["en_uso"] == 2
+    assert stats["checkouts"] == 2
+    assert stats["checkouts_overflow"] == 1
+    assert stats["espera_ms"]["count"] == 2
+    assert monitor.stats()["en_uso"] == 0
+    engine.dispose()
+
+def test_pool_monitor_counts_timeouts(tmp_path):
+    """Prueba que se cuenten los timeouts del pool"""
+    # Arrange
+    engine, monitor = make_engine(tmp_path, pool_size=1, max_overflow=0, pool_timeout=0.05)
+    held = engine.connect()
+
+    # Act
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+
+    # Assert
+    assert monitor.stats()["timeouts"] == 1
+    held.close()
+    engine.dispose()
+
+def test_histogram_buckets():
+    """Prueba la distribución de valores en el histograma"""
+    histogram = Histogram([1, 10])
+    for value in (0.5, 1, 5, 50):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"<=1": 2, "<=10": 1, "+inf": 1}
+    assert snapshot["count"] == 4
+    assert snapshot["max"] == 50
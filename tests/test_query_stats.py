@@ -0,0 +1,67 @@
+import logging
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from app.config import query_stats
+from app.config.query_stats import QueryStatsMiddleware, route_metrics
+from app.config.settings import settings
+
+def make_client(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'queries.db'}")
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware, repeat_threshold=3)
+
+    @app.get("/items/{item_id}")
+    def read_items(item_id: int):
+        # Ruta síncrona: se ejecuta en el threadpool
+        with engine.connect() as conn:
+            for _ in range(item_id):
+                conn.execute(text("SELECT 1"))
+        return {"ok": True}
+
+    return TestClient(app), engine
+
+def test_headers_report_statements_per_request(tmp_path):
+    """Prueba que las cabeceras reporten las sentencias de la petición"""
+    # Arrange
+    client, engine = make_client(tmp_path)
+
+    # Act
+    response = client.get("/items/2")
+
+    # Assert
+    assert response.headers["x-db-query-count"] == "2"
+    assert float(response.headers["x-db-time-ms"]) >= 0
+    assert route_metrics.stats()["GET /items/{item_id}"]["max_sentencias"] >= 2
+    engine.dispose()
+
+def test_repeated_statements_flagged_as_n_plus_one(tmp_path, caplog):
+    """Prueba que una sentencia repetida en una petición se marque como N+1"""
+    # Arrange
+    client, engine = make_client(tmp_path)
+
+    # Act
+    with caplog.at_level(logging.WARNING, logger=query_stats.__name__):
+        client.get("/items/4")
+
+    # Assert
+    assert any("Posible N+1 en GET /items/{item_id}" in r.getMessage() for r in caplog.records)
+    assert route_metrics.stats()["GET /items/{item_id}"]["posibles_n_mas_1"] >= 1
+    engine.dispose()
+
+def test_slow_statements_logged_with_route(tmp_path, caplog, monkeypatch):
+    """Prueba que las sentencias lentas se registren junto con su ruta"""
+    # Arrange
+    client, engine = make_client(tmp_path)
+    monkeypatch.setattr(settings, "QUERY_SLOW_MS", 0.000001)
+
+    # Act
+    with caplog.at_level(logging.WARNING, logger=query_stats.__name__):
+        client.get("/items/1")
+
+    # Assert
+    assert any(
+        "Sentencia lenta" in r.getMessage() and "GET /items/{item_id}" in r.getMessage()
+        for r in caplog.records
+    )
+    engine.dispose()
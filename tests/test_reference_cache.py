@@ -0,0 +1,77 @@
+import json
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.config.database import Base
+from app.controllers.organization_controller import OrganizationController
+from app.models.organization_models import Rol
+from app.services.organization_service import reference_cache
+from app.utils.reference_cache import ReferenceDataCache, etag_matches
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'referencia.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        Rol(id_rol=1, nombre="Administrador", activo=True),
+        Rol(id_rol=2, nombre="Vendedor", activo=True),
+        Rol(id_rol=3, nombre="Inactivo", activo=False),
+    ])
+    session.commit()
+    reference_cache.invalidate()
+    yield session
+    session.close()
+    engine.dispose()
+
+@pytest.mark.asyncio
+async def test_roles_served_from_cache_with_etag(db):
+    """Prueba que una carga repetida con If-None-Match retorne 304 sin consultar la base"""
+    # Arrange
+    first = await OrganizationController(db).get_roles()
+
+    # Act: sin sesión de base de datos, solo la caché puede responder
+    second = await OrganizationController(None).get_roles(first.headers["etag"])
+    third = await OrganizationController(None).get_roles()
+
+    # Assert
+    assert first.status_code == 200
+    assert json.loads(first.body) == [
+        {"id_rol": 1, "nombre": "Administrador"},
+        {"id_rol": 2, "nombre": "Vendedor"},
+    ]
+    assert second.status_code == 304 and second.body == b""
+    assert third.body == first.body
+
+@pytest.mark.asyncio
+async def test_commit_invalidates_cached_roles(db):
+    """Prueba que un cambio confirmado de Rol invalide la caché"""
+    # Arrange
+    first = await OrganizationController(db).get_roles()
+
+    # Act
+    db.get(Rol, 2).nombre = "Cajero"
+    db.commit()
+    second = await OrganizationController(db).get_roles(first.headers["etag"])
+
+    # Assert
+    assert second.status_code == 200
+    assert second.headers["etag"] != first.headers["etag"]
+    assert json.loads(second.body)[1]["nombre"] == "Cajero"
+
+def test_stale_load_not_cached():
+    """Prueba que una carga iniciada antes de una invalidación no se guarde"""
+    cache = ReferenceDataCache(ttl_seconds=60)
+    version = cache.version("roles")
+
+    cache.invalidate("roles")
+    cache.put("roles", b"[]", version)
+
+    assert cache.get("roles") is None
+
+def test_etag_matches():
+    """Prueba la evaluación de If-None-Match"""
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"x"')
+    assert not etag_matches(None, '"x"')
+    assert not etag_matches('"a"', '"b"')
@@ -0,0 +1,144 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session, sessionmaker
+from app.config import replicas
+from app.config.database import Base, get_db
+from app.config.replicas import ReadSession, ReplicaRouter, get_read_db, get_read_session, setup_replica_routing
+from app.models.organization_models import Rol
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def make_database(path, rol_name: str) -> str:
+    url = f"sqlite:///{path}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        db.add(Rol(id_rol=1, nombre=rol_name, activo=True))
+        db.commit()
+    engine.dispose()
+    return url
+
+@pytest.fixture
+def routed_app(tmp_path, monkeypatch):
+    # Dos archivos SQLite: uno hace de primario y otro de réplica
+    primary_url = make_database(tmp_path / "primary.db", "Primario")
+    replica_url = make_database(tmp_path / "replica.db", "Replica")
+    clock = FakeClock()
+    router = ReplicaRouter([replica_url], cooldown_seconds=30, pin_seconds=5, clock=clock)
+    monkeypatch.setattr(replicas, "replica_router", router)
+
+    primary_engine = create_engine(primary_url)
+    PrimarySession = sessionmaker(bind=primary_engine)
+
+    def override_get_db():
+        db = PrimarySession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    setup_replica_routing(app)
+    app.dependency_overrides[get_db] = override_get_db
+
+    @app.get("/rol")
+    def read_rol(db: Session = Depends(get_read_db)):
+        return {"nombre": db.scalar(select(Rol.nombre))}
+
+    @app.get("/rol/cache")
+    async def read_rol_cached(hit: bool, reader: ReadSession = Depends(get_read_session)):
+        if hit:
+            return {"nombre": "Cache"}
+        db = await reader.get()
+        return {"nombre": db.scalar(select(Rol.nombre))}
+
+    @app.post("/rol")
+    def write_rol(db: Session = Depends(get_db)):
+        return {"ok": True}
+
+    yield TestClient(app), router, clock
+    primary_engine.dispose()
+    for replica in router.replicas:
+        replica.engine.dispose()
+
+def test_reads_go_to_replica(routed_app):
+    """Prueba que las lecturas se sirvan desde la réplica"""
+    client, router, _ = routed_app
+
+    response = client.get("/rol")
+
+    assert response.json()["nombre"] == "Replica"
+    assert router.replicas[0].sessions == 1
+
+def test_read_after_write_is_pinned_to_primary(routed_app):
+    """Prueba que un cliente que acaba de escribir lea del primario"""
+    # Arrange
+    client, router, clock = routed_app
+    headers = {"Authorization": "Bearer token-de-prueba"}
+
+    # Act
+    client.post("/rol", headers=headers)
+    pinned = client.get("/rol", headers=headers).json()["nombre"]
+    other_client = client.get("/rol", headers={"Authorization": "Bearer otro"}).json()["nombre"]
+    clock.now += 6
+    after_window = client.get("/rol", headers=headers).json()["nombre"]
+
+    # Assert
+    assert pinned == "Primario"
+    assert other_client == "Replica"
+    assert after_window == "Replica"
+
+def test_unhealthy_replica_falls_back_to_primary(routed_app, tmp_path):
+    """Prueba que una réplica caída se descarte y se use el primario"""
+    # Arrange
+    client, router, clock = routed_app
+    broken = ReplicaRouter(
+        [f"sqlite:///{tmp_path / 'no_existe' / 'replica.db'}"], cooldown_seconds=30, clock=clock
+    )
+    replicas.replica_router = broken
+
+    # Act
+    first = client.get("/rol").json()["nombre"]
+    second = client.get("/rol").json()["nombre"]
+
+    # Assert
+    assert first == "Primario" and second == "Primario"
+    assert broken.replicas[0].failures == 1
+    assert broken.stats()["replicas"]["replica_0"]["sana"] is False
+
+def test_replica_refusing_connections_falls_back_to_primary(routed_app):
+    """Prueba que un error de red sin envolver por SQLAlchemy también lleve al primario"""
+    # Arrange: el driver rechaza la conexión como lo haría un socket
+    client, router, _ = routed_app
+
+    @event.listens_for(router.replicas[0].engine, "do_connect")
+    def refuse(dialect, conn_rec, cargs, cparams):
+        raise ConnectionRefusedError(111, "Connection refused")
+
+    # Act
+    response = client.get("/rol")
+
+    # Assert
+    assert response.json()["nombre"] == "Primario"
+    assert router.replicas[0].failures == 1 and router.replicas[0].sessions == 0
+
+def test_read_session_opens_replica_only_when_used(routed_app):
+    """Prueba que la sesión perezosa no abra la réplica si la petición no consulta la base"""
+    # Arrange
+    client, router, _ = routed_app
+
+    # Act
+    cached = client.get("/rol/cache", params={"hit": True}).json()["nombre"]
+    sessions_after_hit = router.replicas[0].sessions
+    loaded = client.get("/rol/cache", params={"hit": False}).json()["nombre"]
+
+    # Assert
+    assert cached == "Cache" and sessions_after_hit == 0
+    assert loaded == "Replica" and router.replicas[0].sessions == 1
@@ -0,0 +1,44 @@
+import json
+from datetime import datetime, timezone
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.config.database import Base
+from app.models.auth_models import Usuario
+from app.schemas import user_schemas
+from app.services.user_service import UserService
+from app.utils.serialization import json_response
+
+def test_lean_user_page_matches_response_model(tmp_path):
+    """Prueba que la serialización directa de filas coincida con UserList"""
+    # Arrange
+    engine = create_engine(f"sqlite:///{tmp_path / 'serializacion.db'}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all([
+        Usuario(id_usuario=i, nombre=f"Nombre{i}", apellido="Pérez", email=f"u{i}@example.com",
+                password_hash="x", id_sucursal=1, id_rol=1, id_supervisor=None, activo=True,
+                fecha_creacion=datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc))
+        for i in range(1, 4)
+    ])
+    db.commit()
+    rows, total = UserService(db).get_users(limit=10)
+    orm_users = db.query(Usuario).order_by(Usuario.id_usuario).all()
+
+    # Act
+    lean = json_response({
+        "total": total,
+        "usuarios": [row._asdict() for row in rows],
+        "siguiente_cursor": None,
+        "anterior_cursor": None,
+        "total_aproximado": False,
+    })
+    expected = user_schemas.UserList(
+        total=total,
+        usuarios=[user_schemas.UserResponse.model_validate(u) for u in orm_users]
+    ).model_dump(mode="json")
+
+    # Assert
+    assert json.loads(lean.body) == expected
+    assert "password_hash" not in lean.body.decode()
+    db.close()
+    engine.dispose()
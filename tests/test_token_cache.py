@@ -0,0 +1,67 @@
+import pytest
+from app.utils.token_cache import ClaimsCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_claims_cache_expires_at_token_exp():
+    """Prueba que una entrada deje de servirse al llegar al exp del token"""
+    # Arrange
+    clock = FakeClock()
+    cache = ClaimsCache(max_entries=10, clock=clock)
+    cache.put("a", {"sub": "1", "exp": 1010})
+
+    # Act & Assert
+    assert cache.get("a") == {"sub": "1", "exp": 1010}
+    clock.now = 1010
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.stats()["vencidas"] == 1
+
+def test_claims_cache_evicts_least_recently_used():
+    """Prueba que al superar el tamaño máximo se desaloje la entrada menos usada"""
+    # Arrange
+    cache = ClaimsCache(max_entries=2, clock=FakeClock())
+    cache.put("a", {"sub": "1", "exp": 2000})
+    cache.put("b", {"sub": "2", "exp": 2000})
+    cache.get("a")
+
+    # Act
+    cache.put("c", {"sub": "3", "exp": 2000})
+
+    # Assert
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+def test_claims_cache_invalidate_subject():
+    """Prueba que se purguen todos los tokens de un usuario"""
+    # Arrange
+    cache = ClaimsCache(max_entries=10, clock=FakeClock())
+    cache.put("a", {"sub": "1", "exp": 2000})
+    cache.put("b", {"sub": "1", "exp": 2000})
+    cache.put("c", {"sub": "2", "exp": 2000})
+
+    # Act
+    cache.invalidate_subject("1")
+
+    # Assert
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+    assert cache.stats()["invalidadas"] == 2
+
+def test_claims_cache_skips_tokens_without_exp():
+    """Prueba que no se cacheen tokens sin expiración"""
+    # Arrange
+    cache = ClaimsCache(max_entries=10, clock=FakeClock())
+
+    # Act
+    cache.put("a", {"sub": "1"})
+
+    # Assert
+    assert cache.get("a") is None
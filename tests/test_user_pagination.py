@@ -0,0 +1,91 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.config.database import Base
+from app.models.auth_models import Usuario
+from app.services.user_search_service import user_search_index
+from app.services.user_service import TOTAL_ESTIMATE, TOTAL_NONE, UserService
+from app.utils.pagination import CountCache, decode_cursor, encode_cursor
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'usuarios.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        Usuario(
+            id_usuario=i, nombre=f"Nombre{i}", apellido="Apellido", email=f"u{i}@example.com",
+            password_hash="x", id_sucursal=1, id_rol=1, activo=i % 2 == 0
+        )
+        for i in range(1, 26)
+    ])
+    session.commit()
+    user_search_index.clear()
+    yield session
+    session.close()
+    engine.dispose()
+
+def ids(usuarios):
+    return [u.id_usuario for u in usuarios]
+
+def test_cursor_pages_forward_and_back(db):
+    """Prueba recorrer páginas hacia adelante y hacia atrás con cursores"""
+    # Arrange
+    service = UserService(db)
+
+    # Act
+    first, next_cursor, prev_cursor = service.get_users_page(limit=10)
+    second, next_cursor_2, prev_cursor_2 = service.get_users_page(limit=10, cursor=next_cursor)
+    last, next_cursor_3, _ = service.get_users_page(limit=10, cursor=next_cursor_2)
+    back, _, _ = service.get_users_page(limit=10, cursor=prev_cursor_2)
+
+    # Assert
+    assert ids(first) == list(range(1, 11)) and prev_cursor is None
+    assert ids(second) == list(range(11, 21))
+    assert ids(last) == list(range(21, 26)) and next_cursor_3 is None
+    assert ids(back) == ids(first)
+
+def test_cursor_pages_keep_filters(db):
+    """Prueba que la paginación por cursor respete los filtros"""
+    service = UserService(db)
+
+    page, next_cursor, _ = service.get_users_page(limit=5, activo=True)
+    page_2, _, _ = service.get_users_page(limit=5, cursor=next_cursor, activo=True)
+
+    assert ids(page) == [2, 4, 6, 8, 10]
+    assert ids(page_2) == [12, 14, 16, 18, 20]
+
+def test_total_modes(db):
+    """Prueba los modos de cálculo del total"""
+    service = UserService(db)
+
+    _, exact = service.get_users(limit=5)
+    _, none = service.get_users(limit=5, total_mode=TOTAL_NONE)
+    estimate = service.count_users(activo=False, total_mode=TOTAL_ESTIMATE)
+
+    assert exact == 25
+    assert none is None
+    assert estimate == 13
+
+def test_invalid_cursor_rejected(db):
+    """Prueba que un cursor alterado se rechace con 400"""
+    with pytest.raises(HTTPException) as exc_info:
+        UserService(db).get_users_page(cursor="no-es-un-cursor")
+    assert exc_info.value.status_code == 400
+
+def test_cursor_round_trip_and_count_cache():
+    """Prueba la codificación de cursores y la vigencia de la caché de conteos"""
+    now = [0.0]
+    cache = CountCache(ttl_seconds=10, clock=lambda: now[0])
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert decode_cursor(encode_cursor("n", 42)) == ("n", 42)
+    assert cache.get_or_compute("k", compute) == 1
+    assert cache.get_or_compute("k", compute) == 1
+    now[0] = 11
+    assert cache.get_or_compute("k", compute) == 2
@@ -0,0 +1,91 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.config.database import Base
+from app.models.auth_models import Usuario
+from app.services.user_search_service import escape_like, user_search_index
+from app.services.user_service import UserService
+from app.utils.ngram_index import NGramIndex
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'busqueda.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        Usuario(id_usuario=1, nombre="Mariana", apellido="Soto", email="msoto@example.com",
+                password_hash="x", id_sucursal=1, id_rol=1, activo=True),
+        Usuario(id_usuario=2, nombre="Mario", apellido="Ramírez", email="mario@example.com",
+                password_hash="x", id_sucursal=1, id_rol=1, activo=True),
+        Usuario(id_usuario=3, nombre="Ana", apellido="Marín", email="ana@example.com",
+                password_hash="x", id_sucursal=1, id_rol=1, activo=False),
+    ])
+    session.commit()
+    user_search_index.clear()
+    yield session
+    session.close()
+    engine.dispose()
+
+def test_ngram_index_ranks_matches():
+    """Prueba el orden por relevancia del índice de n-gramas"""
+    # Arrange
+    index = NGramIndex()
+    index.add(1, ("Mariana", "mariana@example.com"))
+    index.add(2, ("Mario", "mario@example.com"))
+    index.add(3, ("Ana María", "am@example.com"))
+
+    # Act
+    results = [doc_id for doc_id, _ in index.search("mari")]
+
+    # Assert: prefijo antes que inicio de palabra; sin coincidencias por "mari" en 4
+    assert results[:2] == [2, 1]
+    assert results[2] == 3
+    assert index.search("xyz") == []
+
+def test_ngram_index_updates_and_removes():
+    """Prueba que las actualizaciones y eliminaciones se reflejen en las búsquedas"""
+    index = NGramIndex()
+    index.add(1, ("Pedro",))
+    index.add(1, ("Pablo",))
+    index.add(2, ("Pedro",))
+    index.remove(2)
+
+    assert index.search("pedro") == []
+    assert [doc_id for doc_id, _ in index.search("pab")] == [1]
+
+def test_user_search_is_ranked_and_filtered(db):
+    """Prueba la búsqueda de usuarios con orden por relevancia y filtro de estado"""
+    service = UserService(db)
+
+    usuarios, total = service.get_users(search="mar")
+    activos, total_activos = service.get_users(search="mar", activo=True)
+
+    # Prefijo en un campo corto (Mario, Marín) antes que en uno largo (Mariana)
+    assert [u.id_usuario for u in usuarios] == [2, 3, 1]
+    assert total == 3
+    assert [u.id_usuario for u in activos] == [2, 1] and total_activos == 2
+
+def test_user_search_ignores_accents_and_tracks_updates(db):
+    """Prueba que la búsqueda ignore acentos y refleje cambios del servicio"""
+    service = UserService(db)
+    assert [u.id_usuario for u in service.get_users(search="ramirez")[0]] == [2]
+
+    service.toggle_user_status(3, True)
+
+    assert service.get_users(search="marin", activo=True)[1] == 1
+
+def test_user_search_cursor_pages(db):
+    """Prueba la paginación por cursor de los resultados de búsqueda"""
+    service = UserService(db)
+
+    first, next_cursor, prev_cursor = service.get_users_page(limit=2, search="mar")
+    second, next_cursor_2, prev_cursor_2 = service.get_users_page(limit=2, cursor=next_cursor, search="mar")
+    back, _, _ = service.get_users_page(limit=2, cursor=prev_cursor_2, search="mar")
+
+    assert [u.id_usuario for u in first] == [2, 3] and prev_cursor is None
+    assert [u.id_usuario for u in second] == [1] and next_cursor_2 is None
+    assert [u.id_usuario for u in back] == [2, 3]
+
+def test_escape_like():
+    """Prueba que los comodines de LIKE se busquen literalmente"""
+    assert escape_like("50%_a") == "50\\%\\_a"